@@ -1,56 +1,92 @@
 import os
 import json
-from dotenv import load_dotenv
-from firebase_functions import https_fn
-from firebase_admin import initialize_app, credentials
+import threading
 
-from src.slack.app import create_slack_bot_function
-from src.warmup import warmup_function  # Import the warmup function
+from src.utils.cold_start import get_cold_start_profiler
+
+profiler = get_cold_start_profiler()
+
+with profiler.phase("import"), profiler.track_imports():
+    from dotenv import load_dotenv
+    from firebase_functions import https_fn
+
+    from src.slack.routes import dispatch_fast_path
+    from src.warmup import warmup_function  # Import the warmup function
 
 # 環境変数の読み込み
-load_dotenv()
-
-# Firebase認証情報の設定
-try:
-    cred_path = os.getenv('APP_FIREBASE_CREDENTIALS_PATH')
-    if not cred_path:
-        raise ValueError("Firebase credentials path not set in environment variables")
-    
-    if not os.path.exists(cred_path):
-        raise FileNotFoundError(f"Firebase credentials file not found at: {cred_path}")
-    
-    cred = credentials.Certificate(cred_path)
-    initialize_app(cred)
-except Exception as e:
-    print(f"Firebase initialization error: {str(e)}")
-    raise
+with profiler.phase("load_dotenv"):
+    load_dotenv()
+
+# 遅延importモード（デフォルト有効）
+# 有効な場合、Firebase Admin・Slack Bolt・各コマンドの読み込みとFirebaseの初期化を
+# Boltでの処理が必要なリクエストが最初に来た時点まで遅らせる
+LAZY_IMPORTS = os.getenv("APP_LAZY_IMPORTS", "true").lower() == "true"
+
+def _initialize_firebase() -> None:
+    """Firebase認証情報の設定"""
+    import firebase_admin
+    from src.repositories.firestore_client import get_firestore_client_factory
+
+    # 前回のリクエストで初期化済みの場合は何もしない
+    if firebase_admin._apps:
+        return
+
+    try:
+        cred_path = os.getenv('APP_FIREBASE_CREDENTIALS_PATH')
+        if not cred_path:
+            raise ValueError("Firebase credentials path not set in environment variables")
+
+        if not os.path.exists(cred_path):
+            raise FileNotFoundError(f"Firebase credentials file not found at: {cred_path}")
+
+        # 認証情報の読み込みはプロセスで1回だけ（クライアントもリポジトリ・OAuthのストアで共有する）
+        get_firestore_client_factory().initialize_app(credentials_path=cred_path)
+    except Exception as e:
+        print(f"Firebase initialization error: {str(e)}")
+        raise
+
+_slack_bot_function = None
+_slack_bot_function_lock = threading.Lock()
+
+def _load_slack_bot_function():
+    """Firebaseを初期化し、create_slack_bot_functionを読み込む（1プロセスにつき1回）"""
+    global _slack_bot_function
+    if _slack_bot_function is not None:
+        return _slack_bot_function
+
+    with _slack_bot_function_lock:
+        if _slack_bot_function is None:
+            with profiler.phase("firebase_init"), profiler.track_imports():
+                _initialize_firebase()
+            with profiler.phase("import_slack_app"), profiler.track_imports():
+                from src.slack.app import create_slack_bot_function
+            _slack_bot_function = create_slack_bot_function
+    return _slack_bot_function
+
+if not LAZY_IMPORTS:
+    _load_slack_bot_function()
 
 @https_fn.on_request()
 def slack_bot_function(request: https_fn.Request) -> https_fn.Response:
     """
     Slackボットのエントリーポイント関数
-    
+
     Args:
         request: Cloud Functionsのリクエストオブジェクト
-        
+
     Returns:
         Response: Cloud Functionsのレスポンスオブジェクト
     """
     try:
-        # ウォームアップリクエストの場合は処理せずにOKを返す
-        if request.path == "/warmup" and request.headers.get("X-Warmup-Request") == "true":
-            print("***** Received warmup request for slack_bot_function *****")
-            return https_fn.Response(
-                json.dumps({
-                    "status": "ok",
-                    "message": "Warmup successful"
-                }),
-                status=200,
-                mimetype='application/json'
-            )
-        
+        # 静的ページ・ウォームアップ・ヘルスチェックはBoltを組み立てずに返す
+        fast_response = dispatch_fast_path(request)
+        if fast_response is not None:
+            return fast_response
+
         # 通常のリクエストは全てcreate_slack_bot_functionで処理
-        return create_slack_bot_function(request)
+        response = _load_slack_bot_function()(request)
+        profiler.emit_report()
+        return response
     except Exception as e:
         print(f"Error in slack_bot_function: {str(e)}")
         return https_fn.Response(
@@ -60,4 +96,4 @@ def slack_bot_function(request: https_fn.Request) -> https_fn.Response:
             }),
             status=500,
             mimetype='application/json'
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""
+出勤中（end_timeがNull）の勤怠記録から active_attendance ポインタードキュメントを作成するバックフィルスクリプト
+
+get_active_attendance はポインタードキュメント経由で出勤中の記録を取得するため、
+デプロイ前から出勤中だったユーザーのポインターをこのスクリプトで作成しておく。
+同じユーザーに出勤中の記録が複数ある場合は、最も新しい出勤時刻の記録を指すポインターを作成する。
+
+使用方法:
+python scripts/backfill_active_attendance.py --project-id=slack-attendance-bot-4a3a5 --credentials-path=/path/to/firebase-credentials.json
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import firebase_admin
+from firebase_admin import credentials, firestore
+from google.cloud.firestore_v1.base_query import FieldFilter
+from tqdm import tqdm
+
+# functions/ をパスに追加して src パッケージを import 可能にする
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.models.attendance import Attendance
+from src.repositories.firestore_repository import active_pointer_id, build_active_pointer
+
+def parse_arguments():
+    """コマンドライン引数をパース"""
+    parser = argparse.ArgumentParser(description='出勤中の勤怠記録の active_attendance ポインターを作成')
+
+    parser.add_argument('--project-id', required=True, help='Firebaseプロジェクトのプロジェクトid')
+    parser.add_argument('--credentials-path', required=True, help='Firebase認証情報ファイルのパス')
+    parser.add_argument('--batch-size', type=int, default=100, help='一度に書き込むドキュメントの数（デフォルト: 100）')
+    parser.add_argument('--overwrite', action='store_true', help='既存のポインターも上書きする')
+    parser.add_argument('--dry-run', action='store_true', help='実際の書き込みは行わず、対象件数を表示するのみ')
+
+    return parser.parse_args()
+
+def collect_open_shifts(attendance_collection):
+    """出勤中の勤怠記録をポインターIDごとにまとめる（複数ある場合は最新の出勤時刻のものを残す）"""
+    latest = {}
+    duplicates = 0
+    docs = attendance_collection.where(filter=FieldFilter("end_time", "==", None)).stream()
+    for doc in docs:
+        attendance = Attendance.from_dict(doc.to_dict())
+        attendance.doc_id = doc.id
+        pointer_id = active_pointer_id(attendance.team_id, attendance.user_id)
+
+        current = latest.get(pointer_id)
+        if current is not None:
+            duplicates += 1
+            if current.start_time >= attendance.start_time:
+                continue
+        latest[pointer_id] = attendance
+    return latest, duplicates
+
+def main():
+    """メイン処理"""
+    args = parse_arguments()
+
+    # Firebaseを初期化
+    try:
+        cred = credentials.Certificate(args.credentials_path)
+        firebase_admin.initialize_app(cred, {
+            'projectId': args.project_id,
+        })
+        db = firestore.client()
+    except Exception as e:
+        print(f"Firebase初期化エラー: {e}")
+        return
+
+    pointer_collection = db.collection('active_attendance')
+    open_shifts, duplicates = collect_open_shifts(db.collection('attendance'))
+
+    if not open_shifts:
+        print("出勤中の勤怠記録はありませんでした。")
+        return
+
+    print(f"出勤中のユーザー: {len(open_shifts)}件")
+    if duplicates:
+        print(f"注意: 出勤中の記録が複数あるユーザーの古い記録 {duplicates}件はポインターの対象外です。")
+
+    if not args.overwrite:
+        existing = {
+            snapshot.id
+            for snapshot in db.get_all([pointer_collection.document(pointer_id) for pointer_id in open_shifts])
+            if snapshot.exists
+        }
+        for pointer_id in existing:
+            del open_shifts[pointer_id]
+        print(f"作成済みのポインター: {len(existing)}件（--overwrite で上書き可能）")
+
+    if args.dry_run:
+        print("ドライランモード: 実際の書き込みは行いません。")
+        for pointer_id, attendance in list(open_shifts.items())[:5]:
+            print(f"- {pointer_id} -> {attendance.doc_id}")
+        return
+
+    # バッチ書き込み
+    items = list(open_shifts.items())
+    total_written = 0
+    for i in tqdm(range(0, len(items), args.batch_size)):
+        batch = db.batch()
+        chunk = items[i:i + args.batch_size]
+        for pointer_id, attendance in chunk:
+            batch.set(pointer_collection.document(pointer_id), build_active_pointer(attendance))
+        batch.commit()
+        total_written += len(chunk)
+
+    print(f"バックフィル完了: 合計 {total_written}件のポインターを作成しました。")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""
+Slackボット構成要素の組み立てコストを比較するベンチマーク
+
+- per-request: 変更前と同じく、リクエストごとにリポジトリ・サービス・Bolt App・ハンドラーを組み立てる
+- registry:    AppRegistry で1度だけ組み立てたものを使い回す
+
+どちらも同じ ssl_check リクエストを SlackRequestHandler に渡し、1リクエストあたりの所要時間を比較する。
+.env（Slack/Firebaseの環境変数と認証情報）が必要。
+
+使用方法:
+python scripts/bench_app_registry.py --iterations=200 --threads=8
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from bench_utils import measure, print_report
+
+from flask import Flask, request
+
+from src.slack.registry import AppRegistry, build_components
+
+def parse_arguments():
+    """コマンドライン引数をパース"""
+    parser = argparse.ArgumentParser(description='AppRegistryの有無によるリクエスト処理時間の比較')
+
+    parser.add_argument('--iterations', type=int, default=100, help='1ケースあたりのリクエスト数（デフォルト: 100）')
+    parser.add_argument('--threads', type=int, default=8, help='並行リクエスト時のスレッド数（デフォルト: 8）')
+
+    return parser.parse_args()
+
+def main():
+    """メイン処理"""
+    args = parse_arguments()
+    flask_app = Flask(__name__)
+
+    def handle(handler):
+        # ssl_check は署名検証や Firestore へのアクセスなしに 200 を返すため、
+        # 構成要素の組み立て以外のコストをほぼ含まない
+        with flask_app.test_request_context(
+            "/slack/events",
+            method="POST",
+            data="ssl_check=1&token=benchmark",
+            content_type="application/x-www-form-urlencoded"
+        ):
+            return handler.handle(request)
+
+    def per_request():
+        handle(build_components().handler)
+
+    registry = AppRegistry()
+    registry.get()
+
+    def with_registry():
+        handle(registry.get().handler)
+
+    results = {
+        'per-request': measure(per_request, args.iterations, warmup=1),
+        'registry': measure(with_registry, args.iterations, warmup=1),
+    }
+
+    # 並行リクエストでも組み立てが1回だけであることを確認
+    build_count = 0
+
+    def counting_builder():
+        nonlocal build_count
+        build_count += 1
+        return build_components()
+
+    concurrent_registry = AppRegistry(builder=counting_builder)
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        list(executor.map(lambda _: concurrent_registry.get(), range(args.threads * 4)))
+
+    print_report(results)
+    print(f"\n並行取得時の組み立て回数: {build_count}（{args.threads}スレッド）")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""
+勤怠記録のデコード（Attendance.from_dict）のコストを比較するベンチマーク
+
+1か月分を想定した --records 件の勤怠記録（1件あたり --breaks 回の休憩）を
+- iso:       移行前のISO-8601文字列（datetime.fromisoformat でパース）
+- timestamp: Firestoreのタイムスタンプ（UTCのdatetimeとして返る値をタイムゾーン変換）
+の2形式で用意し、全件のデコードにかかる時間を計測する。
+timestamp 形式を select(TIMING_FIELDS) で読み込んだ場合の AttendanceTiming へのデコードも計測する。
+
+使用方法:
+python scripts/bench_attendance_decode.py --records=5000 --iterations=20
+"""
+
+import argparse
+from datetime import timedelta
+
+from bench_utils import measure, print_report
+
+import pytz
+
+from src.models.attendance import TIMING_FIELDS, Attendance, AttendanceTiming
+from src.utils.time_utils import get_start_of_month
+
+def parse_arguments():
+    """コマンドライン引数をパース"""
+    parser = argparse.ArgumentParser(description='勤怠記録のデコードのベンチマーク')
+
+    parser.add_argument('--records', type=int, default=5000, help='デコードする勤怠記録の件数（デフォルト: 5000）')
+    parser.add_argument('--breaks', type=int, default=2, help='1件あたりの休憩回数（デフォルト: 2）')
+    parser.add_argument('--iterations', type=int, default=20, help='計測回数（デフォルト: 20）')
+
+    return parser.parse_args()
+
+def build_records(count: int, breaks: int):
+    """ISO-8601文字列形式とタイムスタンプ形式の勤怠記録を同じ内容で作成"""
+    base = get_start_of_month(2024, 5)
+    iso_records = []
+    timestamp_records = []
+
+    for i in range(count):
+        start = base + timedelta(hours=i % 720, minutes=i % 60)
+        periods = [
+            (start + timedelta(hours=2 * (n + 1)), start + timedelta(hours=2 * (n + 1), minutes=30))
+            for n in range(breaks)
+        ]
+        end = start + timedelta(hours=2 * (breaks + 1))
+
+        common = {
+            "user_id": f"U{i % 50:05d}",
+            "user_name": "bench",
+            "team_id": "TBENCH",
+            "work_description": "業務内容",
+            "mention_user_ids": []
+        }
+        iso_records.append({
+            **common,
+            "start_time": start.isoformat(),
+            "end_time": end.isoformat(),
+            "break_periods": [{"start_time": s.isoformat(), "end_time": e.isoformat()} for s, e in periods]
+        })
+        # Firestoreはタイムスタンプを UTC の datetime として返す
+        timestamp_records.append({
+            **common,
+            "start_time": start.astimezone(pytz.utc),
+            "end_time": end.astimezone(pytz.utc),
+            "break_periods": [
+                {"start_time": s.astimezone(pytz.utc), "end_time": e.astimezone(pytz.utc)} for s, e in periods
+            ]
+        })
+
+    return iso_records, timestamp_records
+
+def main():
+    """メイン処理"""
+    args = parse_arguments()
+    iso_records, timestamp_records = build_records(args.records, args.breaks)
+    # select(TIMING_FIELDS) で読み込んだ場合のドキュメント
+    timing_records = [{name: data[name] for name in TIMING_FIELDS} for data in timestamp_records]
+
+    results = {
+        f"iso ({args.records} records)": measure(
+            lambda: [Attendance.from_dict(data) for data in iso_records], args.iterations, warmup=2
+        ),
+        f"timestamp ({args.records} records)": measure(
+            lambda: [Attendance.from_dict(data) for data in timestamp_records], args.iterations, warmup=2
+        ),
+        f"timing ({args.records} records)": measure(
+            lambda: [AttendanceTiming.from_dict(data) for data in timing_records], args.iterations, warmup=2
+        ),
+    }
+    print_report(results)
+
+if __name__ == "__main__":
+    main()
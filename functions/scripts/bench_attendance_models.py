@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+"""
+勤怠記録のモデル（Attendance・BreakPeriod）のメモリ使用量と処理時間を比較するベンチマーク
+
+Firestoreのタイムスタンプ形式の勤怠記録 --records 件（デフォルト: 100000、1件あたり --breaks 回の休憩）を
+- dataclass: 変更前のモデル（dataclass。日時は datetime、勤務時間は呼び出すたびに計算する）
+- slots:     現在のモデル（__slots__。日時はエポックの int、勤務時間はキャッシュする）
+にデコードし、以下を計測する。
+- decode:    from_dict で全件をデコードする時間
+- durations: 1件あたり get_working_time・get_total_break_time を勤怠統計（2回ずつ）と退勤（3回ずつ）と同じ回数呼ぶ時間
+- memory:    デコードした全件が保持するメモリ（tracemalloc で計測）
+
+変更前のモデルは比較のためにこのスクリプト内に残している。
+
+使用方法:
+python scripts/bench_attendance_models.py
+python scripts/bench_attendance_models.py --records=100000 --breaks=2 --iterations=3
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from bench_utils import measure, print_report
+
+import pytz
+
+from src.models.attendance import Attendance, decode_time
+from src.utils.time_utils import get_start_of_month
+
+# get_attendance_stats（2回）と退勤（3回）で勤務時間を計算する回数
+DURATION_CALLS = 5
+
+@dataclass
+class LegacyBreakPeriod:
+    """変更前の BreakPeriod"""
+    start_time: datetime
+    end_time: Optional[datetime] = None
+
+    def get_duration(self) -> float:
+        if not self.end_time:
+            return 0.0
+        return round((self.end_time - self.start_time).total_seconds() / 60, 2)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'LegacyBreakPeriod':
+        return cls(start_time=decode_time(data["start_time"]), end_time=decode_time(data.get("end_time")))
+
+@dataclass
+class LegacyAttendance:
+    """変更前の Attendance（変更の追跡を含む）"""
+    doc_id: Optional[str] = None
+    user_id: str = ""
+    user_name: str = ""
+    team_id: str = ""
+    start_time: datetime = None
+    end_time: Optional[datetime] = None
+    break_periods: List[LegacyBreakPeriod] = field(default_factory=list)
+    work_description: Optional[str] = None
+    work_progress: Optional[str] = None
+    report_channel_id: Optional[str] = None
+    mention_user_ids: List[str] = field(default_factory=list)
+    _dirty_fields: set = field(default_factory=set, init=False, repr=False, compare=False)
+    _appended_breaks: list = field(default_factory=list, init=False, repr=False, compare=False)
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if "_dirty_fields" in self.__dict__ and not name.startswith("_"):
+            self._dirty_fields.add(name)
+
+    def get_total_break_time(self) -> float:
+        return sum(period.get_duration() for period in self.break_periods)
+
+    def get_working_time(self) -> float:
+        if not self.end_time:
+            return 0.0
+        return round((self.end_time - self.start_time).total_seconds() / 60 - self.get_total_break_time(), 2)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'LegacyAttendance':
+        return cls(
+            doc_id=data.get("doc_id"),
+            user_id=data.get("user_id", ""),
+            user_name=data.get("user_name", ""),
+            team_id=data.get("team_id", ""),
+            start_time=decode_time(data["start_time"]),
+            end_time=decode_time(data.get("end_time")),
+            break_periods=[LegacyBreakPeriod.from_dict(bp) for bp in data.get("break_periods", [])],
+            work_description=data.get("work_description"),
+            work_progress=data.get("work_progress"),
+            report_channel_id=data.get("report_channel_id"),
+            mention_user_ids=data.get("mention_user_ids", [])
+        )
+
+MODELS = {
+    "dataclass": LegacyAttendance,
+    "slots": Attendance,
+}
+
+def parse_arguments():
+    """コマンドライン引数をパース"""
+    parser = argparse.ArgumentParser(description='勤怠記録のモデルのメモリ・処理時間のベンチマーク')
+
+    parser.add_argument('--records', type=int, default=100000, help='デコードする勤怠記録の件数（デフォルト: 100000）')
+    parser.add_argument('--breaks', type=int, default=2, help='1件あたりの休憩回数（デフォルト: 2）')
+    parser.add_argument('--iterations', type=int, default=3, help='計測回数（デフォルト: 3）')
+
+    return parser.parse_args()
+
+def build_documents(count: int, breaks: int) -> List[dict]:
+    """Firestoreから読み込んだ形式（日時はUTCのdatetime）の勤怠記録を作成"""
+    base = get_start_of_month(2024, 5)
+    documents = []
+    for i in range(count):
+        start = base + timedelta(hours=i % 720, minutes=i % 60)
+        periods = [
+            (start + timedelta(hours=2 * (n + 1)), start + timedelta(hours=2 * (n + 1), minutes=30))
+            for n in range(breaks)
+        ]
+        documents.append({
+            "user_id": f"U{i % 500:05d}",
+            "user_name": "bench",
+            "team_id": "TBENCH",
+            "start_time": start.astimezone(pytz.utc),
+            "end_time": (start + timedelta(hours=2 * (breaks + 1))).astimezone(pytz.utc),
+            "break_periods": [
+                {"start_time": s.astimezone(pytz.utc), "end_time": e.astimezone(pytz.utc)} for s, e in periods
+            ],
+            "mention_user_ids": []
+        })
+    return documents
+
+def measure_memory(model, documents: List[dict]) -> int:
+    """デコードした全件が保持するメモリ（バイト）"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    records = [model.from_dict(data) for data in documents]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del records
+    return size
+
+def compute_durations(records) -> float:
+    """勤怠統計・退勤と同じ回数だけ勤務時間を計算"""
+    total = 0.0
+    for record in records:
+        for _ in range(DURATION_CALLS):
+            total += record.get_working_time() + record.get_total_break_time()
+    return total
+
+def measure_durations(model, documents: List[dict], iterations: int) -> List[float]:
+    """キャッシュした値が次の計測に残らないよう、計測ごとにデコードし直して勤務時間の計算だけを計測"""
+    timings = []
+    for _ in range(iterations):
+        records = [model.from_dict(data) for data in documents]
+        started = time.perf_counter()
+        compute_durations(records)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+def main():
+    """メイン処理"""
+    args = parse_arguments()
+    documents = build_documents(args.records, args.breaks)
+
+    results = {}
+    memory = {}
+    for name, model in MODELS.items():
+        results[f"decode {name} ({args.records} records)"] = measure(
+            lambda: [model.from_dict(data) for data in documents], args.iterations, warmup=1
+        )
+        results[f"durations {name} ({args.records} records)"] = measure_durations(model, documents, args.iterations)
+        memory[name] = measure_memory(model, documents)
+
+    print_report(results)
+    print()
+    print("デコードした全件が保持するメモリ")
+    for name, size in memory.items():
+        print(f"{name.ljust(10)}  {size / 1024 / 1024:>8.1f}MB  ({size / args.records:.0f} bytes/record)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+"""
+複数ユーザーの出勤中の勤怠記録・ロールアップの読み込み方法を比較するベンチマーク
+
+従業員 --users 人（デフォルト: 10, 100, 1000）について、
+- per-user: ユーザーごとに get_active_attendance（ポインター → 勤怠記録の2回の読み取り）・get_rollup を呼ぶ（従来の方法）
+- batched:  get_active_attendances_for_users・get_rollups_for_users で、get_all を GET_ALL_CHUNK_SIZE 件ずつに分けて並列に読む
+の所要時間を比較する。
+
+実データを汚さないよう、Firestoreエミュレーター（FIRESTORE_EMULATOR_HOST）での実行を推奨。
+計測用の勤怠記録・ポインター・ロールアップは --team-id で指定したワークスペースIDで作られ、終了時に削除される。
+
+使用方法:
+FIRESTORE_EMULATOR_HOST=localhost:8080 python scripts/bench_batch_reads.py
+FIRESTORE_EMULATOR_HOST=localhost:8080 python scripts/bench_batch_reads.py --users 10 100 1000 --iterations=5
+"""
+
+import argparse
+from datetime import timedelta
+
+from bench_utils import measure, print_report
+
+from google.cloud.firestore_v1.base_query import FieldFilter
+from tqdm import tqdm
+
+from src.config import get_config
+from src.models.attendance import Attendance, BreakPeriod
+from src.repositories.firestore_repository import (
+    GET_ALL_CHUNK_SIZE,
+    FirestoreRepository,
+    build_active_pointer,
+    stage_attendance_set
+)
+from src.repositories.rollups import apply_shift, rollup_key, rollup_key_of
+from src.utils.time_utils import get_current_time
+
+def parse_arguments():
+    """コマンドライン引数をパース"""
+    parser = argparse.ArgumentParser(description='複数ユーザーの一括読み取りのベンチマーク')
+
+    parser.add_argument('--users', type=int, nargs='+', default=[10, 100, 1000], help='ユーザー数（複数指定可、デフォルト: 10 100 1000）')
+    parser.add_argument('--iterations', type=int, default=5, help='計測回数（デフォルト: 5）')
+    parser.add_argument('--team-id', default='TBATCHBENCH', help='ベンチマーク用のワークスペースID（デフォルト: TBATCHBENCH）')
+
+    return parser.parse_args()
+
+def seed(repository: FirestoreRepository, user_ids, team_id: str) -> None:
+    """ユーザーごとに出勤中の勤怠記録（とポインター）と、前日の勤務を反映したロールアップを作成"""
+    now = get_current_time()
+    writer = repository.db.bulk_writer()
+    for user_id in tqdm(user_ids, desc="seed", unit="users"):
+        active = Attendance(user_id=user_id, user_name=user_id, team_id=team_id, start_time=now - timedelta(hours=2))
+        active.doc_id = repository.attendance_collection.document().id
+        stage_attendance_set(writer, repository.attendance_collection, repository.report_collection, active)
+        writer.set(repository._active_pointer_ref(user_id, team_id), build_active_pointer(active))
+
+        start = now - timedelta(days=1)
+        closed = Attendance(
+            user_id=user_id,
+            user_name=user_id,
+            team_id=team_id,
+            start_time=start,
+            end_time=start + timedelta(hours=8),
+            break_periods=[BreakPeriod(start + timedelta(hours=3), start + timedelta(hours=4))]
+        )
+        closed.doc_id = repository.attendance_collection.document().id
+        stage_attendance_set(writer, repository.attendance_collection, repository.report_collection, closed)
+        writer.set(repository._rollup_ref(rollup_key_of(closed)), apply_shift(None, closed, None))
+    writer.close()
+
+def cleanup(repository: FirestoreRepository, team_id: str) -> int:
+    """ベンチマークで作成した勤怠記録・ポインター・ロールアップを削除"""
+    deleted = 0
+    writer = repository.db.bulk_writer()
+    for collection in (repository.attendance_collection, repository.active_attendance_collection, repository.rollup_collection):
+        for doc in collection.where(filter=FieldFilter("team_id", "==", team_id)).stream():
+            writer.delete(doc.reference)
+            deleted += 1
+    writer.close()
+    return deleted
+
+def main():
+    """メイン処理"""
+    args = parse_arguments()
+    config = get_config()
+
+    repository = FirestoreRepository(
+        project_id=config.firebase.project_id,
+        credentials_path=config.firebase.credentials_path
+    )
+
+    now = get_current_time()
+    year, month = (now - timedelta(days=1)).year, (now - timedelta(days=1)).month
+    all_user_ids = [f"UBATCH{i:05d}" for i in range(max(args.users))]
+
+    results = {}
+    try:
+        seed(repository, all_user_ids, args.team_id)
+        for users in args.users:
+            user_ids = all_user_ids[:users]
+
+            def per_user_active():
+                return [repository.get_active_attendance(user_id, args.team_id) for user_id in user_ids]
+
+            def batched_active():
+                return repository.get_active_attendances_for_users(user_ids, args.team_id)
+
+            def per_user_rollups():
+                return [repository.get_rollup(rollup_key(args.team_id, user_id, year, month)) for user_id in user_ids]
+
+            def batched_rollups():
+                return repository.get_rollups_for_users(user_ids, year, month, args.team_id)
+
+            assert len(batched_active()) == users and len(batched_rollups()) == users
+
+            results[f"active per-user ({users} users)"] = measure(per_user_active, args.iterations, warmup=1)
+            results[f"active batched ({users} users)"] = measure(batched_active, args.iterations, warmup=1)
+            results[f"rollups per-user ({users} users)"] = measure(per_user_rollups, args.iterations, warmup=1)
+            results[f"rollups batched ({users} users)"] = measure(batched_rollups, args.iterations, warmup=1)
+    finally:
+        deleted = cleanup(repository, args.team_id)
+
+    print(f"get_all のチャンクサイズ: {GET_ALL_CHUNK_SIZE}")
+    print_report(results)
+    print(f"\n後片付け: {deleted}件のドキュメントを削除しました。")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""
+設定の読み込みと属性アクセスのコストを比較するベンチマーク
+
+- load:   OmegaConfでのYAMLパース＋マージ（変更前） / スナップショットからの構築 / YAMLからの構築
+- access: OmegaConfのノード参照（変更前） / 読み取り専用dataclassの属性参照
+- get_current_time: 呼び出しごとに設定とタイムゾーンを引く（変更前） / キャッシュ済みタイムゾーン
+
+使用方法:
+python scripts/bench_config_access.py --iterations=100000
+"""
+
+import argparse
+import os
+from datetime import datetime
+
+from bench_utils import measure, print_report
+
+import pytz
+from omegaconf import OmegaConf
+
+from src.config import CONFIG_PATH, build_config, build_snapshot, load_yaml_config
+from src.utils.time_utils import get_current_time
+
+def parse_arguments():
+    """コマンドライン引数をパース"""
+    parser = argparse.ArgumentParser(description='設定の読み込み・属性アクセスのベンチマーク')
+
+    parser.add_argument('--iterations', type=int, default=100000, help='属性アクセスの計測回数（デフォルト: 100000）')
+    parser.add_argument('--load-iterations', type=int, default=200, help='読み込みの計測回数（デフォルト: 200）')
+
+    return parser.parse_args()
+
+def load_with_omegaconf():
+    """変更前の init_config と同じ読み込み処理"""
+    config = OmegaConf.load(CONFIG_PATH)
+    env_config = OmegaConf.create({
+        "slack": {
+            "bot_token": os.getenv("SLACK_BOT_TOKEN"),
+            "signing_secret": os.getenv("SLACK_SIGNING_SECRET"),
+            "app_token": os.getenv("SLACK_APP_TOKEN"),
+            "client_id": os.getenv("SLACK_CLIENT_ID"),
+            "client_secret": os.getenv("SLACK_CLIENT_SECRET")
+        },
+        "firebase": {
+            "project_id": os.getenv("APP_FIREBASE_PROJECT_ID"),
+            "credentials_path": os.getenv("APP_FIREBASE_CREDENTIALS_PATH"),
+        }
+    })
+    return OmegaConf.merge(config, env_config)
+
+def main():
+    """メイン処理"""
+    args = parse_arguments()
+
+    snapshot = build_snapshot()["config"]
+    omegaconf_config = load_with_omegaconf()
+    frozen_config = build_config(snapshot)
+
+    load_results = {
+        'load: omegaconf (before)': measure(load_with_omegaconf, args.load_iterations, warmup=5),
+        'load: yaml -> AppConfig': measure(lambda: build_config(load_yaml_config()), args.load_iterations, warmup=5),
+        'load: snapshot -> AppConfig': measure(lambda: build_config(snapshot), args.load_iterations, warmup=5),
+    }
+
+    def access_omegaconf():
+        for _ in range(1000):
+            omegaconf_config.application.timezone
+
+    def access_frozen():
+        for _ in range(1000):
+            frozen_config.application.timezone
+
+    def current_time_before():
+        for _ in range(1000):
+            datetime.now(pytz.timezone(omegaconf_config.application.timezone))
+
+    def current_time_after():
+        for _ in range(1000):
+            get_current_time()
+
+    # 1000回分の所要時間を1回として計測
+    rounds = max(1, args.iterations // 1000)
+    access_results = {
+        'access x1000: omegaconf (before)': measure(access_omegaconf, rounds, warmup=1),
+        'access x1000: AppConfig': measure(access_frozen, rounds, warmup=1),
+        'get_current_time x1000 (before)': measure(current_time_before, rounds, warmup=1),
+        'get_current_time x1000 (after)': measure(current_time_after, rounds, warmup=1),
+    }
+
+    print_report(load_results)
+    print()
+    print_report(access_results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+"""
+ファストパスルーター（src/slack/routes.py）のマイクロベンチマーク
+
+静的ページ・ウォームアップ・ヘルスチェックの各ルートと、
+ルートに該当せずBoltへ委譲されるリクエストの振り分けコストを計測する。
+Firestore・OAuth・Bolt Appは一切組み立てないため、環境変数や認証情報は不要。
+
+使用方法:
+python scripts/bench_fast_path.py --iterations=10000
+"""
+
+import argparse
+import io
+from contextlib import redirect_stdout
+
+from bench_utils import measure, print_report
+
+from flask import Flask, request
+
+from src.slack.routes import dispatch_fast_path
+
+CASES = {
+    'GET /slack/oauth_success': ("/slack/oauth_success", "GET", {}),
+    'GET /slack/oauth_failure': ("/slack/oauth_failure?error=access_denied", "GET", {}),
+    'GET /warmup': ("/warmup", "GET", {"X-Warmup-Request": "true"}),
+    'GET /health': ("/health", "GET", {}),
+    'POST /slack/events (miss)': ("/slack/events", "POST", {}),
+}
+
+def parse_arguments():
+    """コマンドライン引数をパース"""
+    parser = argparse.ArgumentParser(description='ファストパスルーターのマイクロベンチマーク')
+
+    parser.add_argument('--iterations', type=int, default=10000, help='1ケースあたりの実行回数（デフォルト: 10000）')
+
+    return parser.parse_args()
+
+def main():
+    """メイン処理"""
+    args = parse_arguments()
+    flask_app = Flask(__name__)
+
+    results = {}
+    for label, (path, method, headers) in CASES.items():
+        # ウォームアップのログ出力は計測中は捨てる
+        with flask_app.test_request_context(path, method=method, headers=headers), redirect_stdout(io.StringIO()):
+            # リクエストコンテキストの生成コストは含めず、振り分けとレスポンス生成のみを計測
+            results[label] = measure(lambda: dispatch_fast_path(request), args.iterations, warmup=100)
+
+    print_report(results)
+
+if __name__ == "__main__":
+    main()
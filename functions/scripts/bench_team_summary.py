@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""
+ワークスペース全員の月次サマリー（/teamsummary・チームCSV）の集計方法を比較するベンチマーク
+
+従業員 --members 人（デフォルト: 50, 500, 5000）が1か月に --shifts 回ずつ勤務した勤怠記録を用意し、
+- per-user: ユーザーごとに期間検索のクエリを発行し、summarize_attendance で1人ずつ集計する（従来の方法）
+- team:     iter_team_attendance_by_period の1つのクエリで全員分を読み、summarize_team_attendance で振り分けて集計する
+の2つを比較する。
+
+集計とCSV生成の処理時間はメモリ上の勤怠記録で計測し、Firestoreとの往復回数は
+--page-size 件ずつのページングから算出する（--rtt-ms を掛けた値をネットワーク待ちの目安として表示する）。
+
+使用方法:
+python scripts/bench_team_summary.py
+python scripts/bench_team_summary.py --members 50 500 5000 --shifts=20 --iterations=5 --rtt-ms=30
+"""
+
+import argparse
+import math
+from datetime import timedelta
+
+from bench_utils import measure, print_report, summarize
+
+from src.models.attendance import Attendance, BreakPeriod
+from src.repositories.base import DEFAULT_PAGE_SIZE
+from src.services.monthly_summary_service import (
+    build_summary_csv,
+    build_team_summary_csv,
+    summarize_attendance,
+    summarize_team_attendance
+)
+from src.utils.time_utils import get_start_of_month
+
+YEAR, MONTH = 2024, 5
+
+def parse_arguments():
+    """コマンドライン引数をパース"""
+    parser = argparse.ArgumentParser(description='チームサマリーの集計方法のベンチマーク')
+
+    parser.add_argument('--members', type=int, nargs='+', default=[50, 500, 5000], help='従業員数（複数指定可、デフォルト: 50 500 5000）')
+    parser.add_argument('--shifts', type=int, default=20, help='1人あたりの月間の勤務回数（デフォルト: 20）')
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE, help=f'1ページで読み込む件数（デフォルト: {DEFAULT_PAGE_SIZE}）')
+    parser.add_argument('--rtt-ms', type=float, default=30.0, help='Firestoreとの1往復あたりの待ち時間の目安（ミリ秒、デフォルト: 30）')
+    parser.add_argument('--iterations', type=int, default=5, help='計測回数（デフォルト: 5）')
+
+    return parser.parse_args()
+
+def build_records(members: int, shifts: int):
+    """ユーザーごとの勤怠記録と、全員分を出勤時刻順に並べた勤怠記録を作成"""
+    base = get_start_of_month(YEAR, MONTH)
+    by_user = {}
+    for m in range(members):
+        user_id = f"U{m:05d}"
+        records = []
+        for s in range(shifts):
+            start = base + timedelta(days=s % 28, hours=9, minutes=m % 60)
+            records.append(Attendance(
+                doc_id=f"{user_id}-{s}",
+                user_id=user_id,
+                user_name=f"member{m:05d}",
+                team_id="TBENCH",
+                start_time=start,
+                end_time=start + timedelta(hours=8),
+                break_periods=[BreakPeriod(start + timedelta(hours=3), start + timedelta(hours=4))],
+                work_description="業務内容"
+            ))
+        by_user[user_id] = records
+
+    merged = sorted((record for records in by_user.values() for record in records), key=lambda record: record.start_time)
+    return by_user, merged
+
+def round_trips(record_count: int, page_size: int) -> int:
+    """1つのクエリを page_size 件ずつ読むときの往復回数（0件でも1回は問い合わせる）"""
+    return max(1, math.ceil(record_count / page_size))
+
+def per_user(by_user):
+    """ユーザーごとに集計してCSVを作る（従来の方法）"""
+    return [
+        build_summary_csv(summarize_attendance(records, YEAR, MONTH), records[0].user_name)
+        for records in by_user.values()
+    ]
+
+def team(merged):
+    """全員分を1回で読み、振り分けて集計してCSVを作る"""
+    return build_team_summary_csv(summarize_team_attendance(merged, YEAR, MONTH), "TBENCH")
+
+def main():
+    """メイン処理"""
+    args = parse_arguments()
+
+    results = {}
+    estimates = []
+    for members in args.members:
+        by_user, merged = build_records(members, args.shifts)
+
+        per_user_timings = measure(lambda: per_user(by_user), args.iterations, warmup=1)
+        team_timings = measure(lambda: team(merged), args.iterations, warmup=1)
+        results[f"per-user ({members} members)"] = per_user_timings
+        results[f"team ({members} members)"] = team_timings
+
+        per_user_trips = sum(round_trips(len(records), args.page_size) for records in by_user.values())
+        team_trips = round_trips(len(merged), args.page_size)
+        estimates.append((f"per-user ({members} members)", per_user_trips, summarize(per_user_timings)['p50']))
+        estimates.append((f"team ({members} members)", team_trips, summarize(team_timings)['p50']))
+
+    print("集計・CSV生成の処理時間")
+    print_report(results)
+
+    print()
+    print(f"Firestoreとの往復回数と所要時間の目安（page_size={args.page_size}, rtt={args.rtt_ms}ms）")
+    label_width = max(len(label) for label, _, _ in estimates)
+    print(f"{'case'.ljust(label_width)}  {'requests':>8}  {'network':>12}  {'total':>12}")
+    for label, trips, cpu_ms in estimates:
+        network_ms = trips * args.rtt_ms
+        print(f"{label.ljust(label_width)}  {trips:>8}  {network_ms:>10.1f}ms  {network_ms + cpu_ms:>10.1f}ms")
+
+if __name__ == "__main__":
+    main()
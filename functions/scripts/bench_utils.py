@@ -0,0 +1,57 @@
+"""
+ベンチマークスクリプト共通のユーティリティ
+
+scripts/ 配下のベンチマークから src パッケージを import できるようにし、
+計測と結果表示の処理をまとめる。
+"""
+
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# functions/ をパスに追加して src パッケージを import 可能にする
+FUNCTIONS_DIR = Path(__file__).resolve().parent.parent
+if str(FUNCTIONS_DIR) not in sys.path:
+    sys.path.insert(0, str(FUNCTIONS_DIR))
+
+def measure(func: Callable[[], object], iterations: int, warmup: int = 0) -> List[float]:
+    """funcをiterations回実行し、1回ごとの所要時間（ミリ秒）を返す"""
+    for _ in range(warmup):
+        func()
+
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+def summarize(timings: List[float]) -> Dict[str, float]:
+    """計測結果から平均・中央値・p95・p99を算出"""
+    ordered = sorted(timings)
+
+    def percentile(p: float) -> float:
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    return {
+        'mean': statistics.mean(ordered),
+        'p50': percentile(50),
+        'p95': percentile(95),
+        'p99': percentile(99),
+        'max': ordered[-1],
+    }
+
+def print_report(results: Dict[str, List[float]], unit: str = "ms") -> None:
+    """ラベルごとの計測結果を表形式で表示"""
+    label_width = max(len(label) for label in results)
+    print(f"{'case'.ljust(label_width)}  {'n':>6}  {'mean':>10}  {'p50':>10}  {'p95':>10}  {'p99':>10}  {'max':>10}")
+    for label, timings in results.items():
+        stats = summarize(timings)
+        print(
+            f"{label.ljust(label_width)}  {len(timings):>6}  "
+            f"{stats['mean']:>8.3f}{unit}  {stats['p50']:>8.3f}{unit}  "
+            f"{stats['p95']:>8.3f}{unit}  {stats['p99']:>8.3f}{unit}  {stats['max']:>8.3f}{unit}"
+        )
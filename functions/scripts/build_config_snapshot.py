@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+"""
+config/config.yaml から事前コンパイル済みの設定スナップショット（config/config.snapshot.json）を作成するスクリプト
+
+スナップショットがあれば、コールドスタート時にOmegaConfでのYAMLパースを省略できる。
+秘密情報は含まれない（"${SLACK_BOT_TOKEN}" などの環境変数参照はそのまま保存され、起動時に解決される）。
+config.yaml の内容と一致しないスナップショットは無視されるため、config.yaml を変更したら再作成すること。
+
+使用方法:
+python scripts/build_config_snapshot.py
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# functions/ をパスに追加して src パッケージを import 可能にする
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config import CONFIG_PATH, SNAPSHOT_PATH, build_snapshot
+
+def parse_arguments():
+    """コマンドライン引数をパース"""
+    parser = argparse.ArgumentParser(description='設定スナップショットの作成')
+
+    parser.add_argument('--config-path', default=str(CONFIG_PATH), help='読み込むYAMLファイルのパス')
+    parser.add_argument('--output', default=str(SNAPSHOT_PATH), help='出力するJSONファイルのパス')
+
+    return parser.parse_args()
+
+def main():
+    """メイン処理"""
+    args = parse_arguments()
+
+    snapshot = build_snapshot(Path(args.config_path))
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, ensure_ascii=False, indent=2)
+
+    print(f"スナップショットを作成しました: {args.output}")
+
+if __name__ == "__main__":
+    main()
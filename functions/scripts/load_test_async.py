@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+"""
+打刻処理の同時実行スループットを計測する負荷テスト
+
+仮想ユーザーごとに 出勤 → 休憩開始 → 休憩終了 → 退勤 を実行し、
+- sync:  同期版サービス（変更前のSocket Modeと同じく、イベントループ上で1件ずつブロックしながら処理）
+- async: 非同期版サービス（firestore.AsyncClient で複数ユーザーを並行処理）
+のスループットと1ユーザーあたりの所要時間を比較する。
+
+実データを汚さないよう、Firestoreエミュレーター（FIRESTORE_EMULATOR_HOST）での実行を推奨。
+作成した勤怠記録は --team-id で指定したワークスペースIDで作られ、終了時に削除される。
+
+使用方法:
+FIRESTORE_EMULATOR_HOST=localhost:8080 python scripts/load_test_async.py --users=200 --concurrency=50
+"""
+
+import argparse
+import asyncio
+import time
+
+from bench_utils import print_report
+
+from google.cloud.firestore_v1.base_query import FieldFilter
+
+from src.config import get_config
+from src.repositories.async_firestore_repository import AsyncFirestoreRepository
+from src.repositories.firestore_repository import FirestoreRepository
+from src.services.async_attendance_service import AsyncAttendanceService
+from src.services.attendance_service import AttendanceService
+
+def parse_arguments():
+    """コマンドライン引数をパース"""
+    parser = argparse.ArgumentParser(description='同期版・非同期版の打刻スループット比較')
+
+    parser.add_argument('--users', type=int, default=100, help='仮想ユーザー数（デフォルト: 100）')
+    parser.add_argument('--concurrency', type=int, default=50, help='非同期版の同時実行数（デフォルト: 50）')
+    parser.add_argument('--mode', choices=['sync', 'async', 'both'], default='both', help='計測する実装（デフォルト: both）')
+    parser.add_argument('--team-id', default='TLOADTEST', help='負荷テスト用のワークスペースID（デフォルト: TLOADTEST）')
+
+    return parser.parse_args()
+
+async def run_sync(service: AttendanceService, users, team_id: str):
+    """同期版: イベントループ上で1ユーザーずつブロックしながら処理"""
+    timings = []
+    for user_id in users:
+        started = time.perf_counter()
+        service.punch_in(user_id=user_id, user_name=user_id, team_id=team_id)
+        service.start_break(user_id=user_id, team_id=team_id)
+        service.end_break(user_id=user_id, team_id=team_id)
+        service.punch_out(user_id=user_id, team_id=team_id)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+async def run_async(service: AsyncAttendanceService, users, team_id: str, concurrency: int):
+    """非同期版: 同時実行数を制限しながら並行処理"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_user(user_id: str) -> float:
+        async with semaphore:
+            started = time.perf_counter()
+            await service.punch_in(user_id=user_id, user_name=user_id, team_id=team_id)
+            await service.start_break(user_id=user_id, team_id=team_id)
+            await service.end_break(user_id=user_id, team_id=team_id)
+            await service.punch_out(user_id=user_id, team_id=team_id)
+            return (time.perf_counter() - started) * 1000
+
+    return list(await asyncio.gather(*(one_user(user_id) for user_id in users)))
+
+def cleanup(repository: FirestoreRepository, team_id: str) -> int:
+    """負荷テストで作成した勤怠記録（とポインター・在席状況のドキュメント）を削除"""
+    deleted = 0
+    docs = repository.attendance_collection.where(filter=FieldFilter("team_id", "==", team_id)).stream()
+    for doc in docs:
+        doc.reference.delete()
+        deleted += 1
+
+    pointers = repository.active_attendance_collection.where(filter=FieldFilter("team_id", "==", team_id)).stream()
+    for pointer in pointers:
+        pointer.reference.delete()
+
+    presence_docs = repository.presence_collection.where(filter=FieldFilter("team_id", "==", team_id)).stream()
+    for presence in presence_docs:
+        presence.reference.delete()
+    return deleted
+
+async def main():
+    """メイン処理"""
+    args = parse_arguments()
+    config = get_config()
+
+    sync_repository = FirestoreRepository(
+        project_id=config.firebase.project_id,
+        credentials_path=config.firebase.credentials_path
+    )
+    async_repository = AsyncFirestoreRepository(
+        project_id=config.firebase.project_id,
+        credentials_path=config.firebase.credentials_path
+    )
+
+    results = {}
+    throughput = {}
+    try:
+        if args.mode in ('sync', 'both'):
+            users = [f"USYNC{i:05d}" for i in range(args.users)]
+            started = time.perf_counter()
+            results['sync (per user)'] = await run_sync(AttendanceService(sync_repository), users, args.team_id)
+            throughput['sync'] = args.users / (time.perf_counter() - started)
+
+        if args.mode in ('async', 'both'):
+            users = [f"UASYNC{i:05d}" for i in range(args.users)]
+            started = time.perf_counter()
+            results['async (per user)'] = await run_async(
+                AsyncAttendanceService(async_repository), users, args.team_id, args.concurrency
+            )
+            throughput['async'] = args.users / (time.perf_counter() - started)
+    finally:
+        deleted = cleanup(sync_repository, args.team_id)
+
+    print_report(results)
+    print()
+    for label, users_per_second in throughput.items():
+        print(f"{label}: {users_per_second:.1f} users/s（{users_per_second * 4:.1f} 打刻/s）")
+    print(f"\n後片付け: {deleted}件の勤怠記録を削除しました。")
+
+if __name__ == "__main__":
+    asyncio.run(main())
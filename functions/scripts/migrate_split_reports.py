@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+"""
+勤怠記録に保存されている業務報告（work_description, work_progress）を attendance_reports/{attendance_id} に移すマイグレーションスクリプト
+
+- 業務報告は数KBになることがあるため、打刻のたびに読み書きする勤怠記録とは別のドキュメントに保存する。
+  移行前の記録もそのまま読み込めるが、移行すると休憩・退勤の打刻で読み書きする勤怠記録が小さくなる。
+- attendance_reports への書き込みが完了してから、勤怠記録の業務報告のフィールドを削除する（scripts/migration_utils.py）。
+  中断した場合は同じコマンドを再実行すると続きから再開する（最初からやり直す場合は --restart）。
+- 移行済みの記録は書き込まないため、何度実行しても結果は変わらない。
+
+使用方法:
+python scripts/migrate_split_reports.py --project-id=slack-attendance-bot-4a3a5 --credentials-path=/path/to/firebase-credentials.json
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import firebase_admin
+from firebase_admin import credentials, firestore
+
+from migration_utils import CollectionMigration, MigrationError, add_migration_arguments, run_migrations
+
+# functions/ をパスに追加して src パッケージを import 可能にする
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.repositories.reports import REPORT_FIELDS
+
+DEFAULT_CHECKPOINT = Path(__file__).resolve().parent / ".migrate_split_reports.checkpoint.json"
+
+def parse_arguments():
+    """コマンドライン引数をパース"""
+    parser = argparse.ArgumentParser(description='勤怠記録の業務報告を attendance_reports に移す')
+
+    parser.add_argument('--project-id', required=True, help='Firebaseプロジェクトのプロジェクトid')
+    parser.add_argument('--credentials-path', required=True, help='Firebase認証情報ファイルのパス')
+    add_migration_arguments(parser, DEFAULT_CHECKPOINT)
+
+    return parser.parse_args()
+
+def remove_report_fields(data):
+    """勤怠記録に残っている業務報告のフィールドを削除する変換関数"""
+    return {name: firestore.DELETE_FIELD for name in REPORT_FIELDS if name in data}
+
+def copy_report(doc_id, data):
+    """
+    attendance_reports に書き込む内容
+    - 値が None のフィールドは書き込まない（移行前に attendance_reports に保存された業務報告を上書きしない）
+    """
+    report = {name: data[name] for name in REPORT_FIELDS if data.get(name) is not None}
+    if not report:
+        return []
+    return [('attendance_reports', doc_id, {
+        'user_id': data.get('user_id'),
+        'team_id': data.get('team_id') or '',
+        'start_time': data.get('start_time'),
+        **report
+    })]
+
+def main():
+    """メイン処理"""
+    args = parse_arguments()
+
+    # Firebaseを初期化
+    try:
+        cred = credentials.Certificate(args.credentials_path)
+        firebase_admin.initialize_app(cred, {
+            'projectId': args.project_id,
+        })
+        db = firestore.client()
+    except Exception as e:
+        print(f"Firebase初期化エラー: {e}")
+        return
+
+    migration = CollectionMigration(
+        'attendance',
+        remove_report_fields,
+        fields=['user_id', 'team_id', 'start_time', *REPORT_FIELDS],
+        prepare=copy_report
+    )
+    try:
+        total = run_migrations(db, [migration], args)
+    except MigrationError as e:
+        print(f"マイグレーションを中断しました: {e}")
+        print("同じコマンドを再実行すると続きから再開します。")
+        return
+
+    print(f"マイグレーション完了: 合計 {total}件の記録を{'移行対象として検出' if args.dry_run else '移行'}しました。")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""
+勤怠記録の日時（start_time, end_time, 休憩の開始・終了）をISO-8601文字列からFirestoreのタイムスタンプに変換するマイグレーションスクリプト
+
+- コレクションをパーティションに分割して並列に読み進め、変換が必要なフィールドだけを書き込む（scripts/migration_utils.py）。
+  中断した場合は同じコマンドを再実行すると続きから再開する（最初からやり直す場合は --restart）。
+- 変換済みのドキュメントは書き込まないため、何度実行しても結果は変わらない。
+- active_attendance ポインタードキュメントの start_time も同様に変換する。
+
+移行が完了したら config.yaml の storage.read_legacy_timestamps を false にすると、
+期間検索で文字列の記録を探すクエリが不要になる。
+
+使用方法:
+python scripts/migrate_timestamps.py --project-id=slack-attendance-bot-4a3a5 --credentials-path=/path/to/firebase-credentials.json
+"""
+
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+import firebase_admin
+import pytz
+from firebase_admin import credentials, firestore
+
+from migration_utils import CollectionMigration, MigrationError, add_migration_arguments, run_migrations
+
+DEFAULT_CHECKPOINT = Path(__file__).resolve().parent / ".migrate_timestamps.checkpoint.json"
+
+def parse_arguments():
+    """コマンドライン引数をパース"""
+    parser = argparse.ArgumentParser(description='勤怠記録の日時をタイムスタンプ型に変換')
+
+    parser.add_argument('--project-id', required=True, help='Firebaseプロジェクトのプロジェクトid')
+    parser.add_argument('--credentials-path', required=True, help='Firebase認証情報ファイルのパス')
+    parser.add_argument('--timezone', default='Asia/Tokyo', help='UTCオフセットのない文字列を解釈するタイムゾーン（デフォルト: Asia/Tokyo）')
+    add_migration_arguments(parser, DEFAULT_CHECKPOINT)
+
+    return parser.parse_args()
+
+def to_timestamp(value, timezone):
+    """ISO-8601文字列を timezone-aware な datetime に変換（文字列以外はそのまま）"""
+    if not isinstance(value, str):
+        return value
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = timezone.localize(parsed)
+    return parsed
+
+def convert_attendance(data, timezone):
+    """勤怠記録の変換が必要なフィールドだけを返す"""
+    updates = {}
+    for name in ("start_time", "end_time"):
+        if isinstance(data.get(name), str):
+            updates[name] = to_timestamp(data[name], timezone)
+
+    break_periods = data.get("break_periods") or []
+    if any(isinstance(bp.get(name), str) for bp in break_periods for name in ("start_time", "end_time")):
+        updates["break_periods"] = [
+            {
+                "start_time": to_timestamp(bp.get("start_time"), timezone),
+                "end_time": to_timestamp(bp.get("end_time"), timezone)
+            }
+            for bp in break_periods
+        ]
+    return updates
+
+def convert_pointer(data, timezone):
+    """ポインタードキュメントの変換が必要なフィールドだけを返す"""
+    if isinstance(data.get("start_time"), str):
+        return {"start_time": to_timestamp(data["start_time"], timezone)}
+    return {}
+
+def main():
+    """メイン処理"""
+    args = parse_arguments()
+
+    # Firebaseを初期化
+    try:
+        cred = credentials.Certificate(args.credentials_path)
+        firebase_admin.initialize_app(cred, {
+            'projectId': args.project_id,
+        })
+        db = firestore.client()
+    except Exception as e:
+        print(f"Firebase初期化エラー: {e}")
+        return
+
+    timezone = pytz.timezone(args.timezone)
+    migrations = [
+        CollectionMigration(
+            'attendance',
+            lambda data: convert_attendance(data, timezone),
+            fields=['start_time', 'end_time', 'break_periods']
+        ),
+        CollectionMigration('active_attendance', lambda data: convert_pointer(data, timezone), fields=['start_time'])
+    ]
+    try:
+        total = run_migrations(db, migrations, args)
+    except MigrationError as e:
+        print(f"マイグレーションを中断しました: {e}")
+        print("同じコマンドを再実行すると続きから再開します。")
+        return
+
+    print(f"マイグレーション完了: 合計 {total}件のドキュメントを{'変換対象として検出' if args.dry_run else '変換'}しました。")
+    if not args.dry_run:
+        print("storage.read_legacy_timestamps を false にできます。")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+マイグレーションスクリプト共通のフレームワーク
+
+コレクションをドキュメントID順の範囲（パーティション）に分割し、パーティションごとに並列で
+カーソルを使って --batch-size 件ずつ読み進め、変更が必要なフィールドだけを BulkWriter で書き込む。
+
+- 件数に上限はなく、一度にメモリに載せるのは1ページ分だけ
+- ページの書き込みが完了するたびに、パーティションごとの処理済みの最後のドキュメントIDをチェックポイントファイルに保存する。
+  中断した場合は同じコマンドを再実行すると続きから再開する（最初からやり直す場合は --restart）。
+- 変換関数は更新が必要なフィールドだけを返すため、変換済みのドキュメントは書き込まず、何度実行しても結果は変わらない
+- ルートのコレクションを対象とする（同じ名前のサブコレクションがないこと）
+- 別のコレクションへ値を移す場合は prepare で移動先の書き込みを返す。移動先の書き込みがページ単位で完了してから、
+  移動元のドキュメントを更新する
+
+使用例:
+    migration = CollectionMigration('attendance', add_team_id, fields=['team_id'])
+    run_migrations(db, [migration], args)
+"""
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from tqdm import tqdm
+
+# ドキュメントの内容を受け取り、更新が必要なフィールドだけを返す（不要な場合は空のdict）
+Transform = Callable[[Dict[str, Any]], Dict[str, Any]]
+# ドキュメントIDと内容を受け取り、更新の前に書き込む (コレクション名, ドキュメントID, 内容) を返す（merge で書き込む）
+Prepare = Callable[[str, Dict[str, Any]], List[Tuple[str, str, Dict[str, Any]]]]
+# パーティションの [開始, 終了) のドキュメントID（None は先頭・末尾）
+Bounds = Tuple[Optional[str], Optional[str]]
+
+# BulkWriter が1件の書き込みを再試行する回数の上限
+MAX_WRITE_ATTEMPTS = 5
+
+@dataclass
+class CollectionMigration:
+    """1つのコレクションに対するマイグレーション"""
+    collection: str
+    transform: Transform
+    # 読み込むフィールド（None はドキュメント全体。変換に使うフィールドだけを select で読み込む）
+    fields: Optional[List[str]] = None
+    # 変換対象のドキュメントを更新する前に書き込む、別のコレクションのドキュメント
+    prepare: Optional[Prepare] = None
+
+class MigrationError(Exception):
+    """書き込みに失敗したドキュメントがあり、パーティションの処理を中断した"""
+
+def add_migration_arguments(parser, checkpoint_file: Path, batch_size: int = 500) -> None:
+    """マイグレーションスクリプト共通のコマンドライン引数を追加"""
+    parser.add_argument('--batch-size', type=int, default=batch_size, help=f'1ページで読み込むドキュメントの数（デフォルト: {batch_size}）')
+    parser.add_argument('--partitions', type=int, default=8, help='コレクションを分割するパーティションの数（デフォルト: 8）')
+    parser.add_argument('--workers', type=int, default=8, help='並列に処理するパーティションの数（デフォルト: 8）')
+    parser.add_argument('--checkpoint-file', default=str(checkpoint_file), help='再開用のチェックポイントファイル')
+    parser.add_argument('--restart', action='store_true', help='チェックポイントを無視して最初から処理する')
+    parser.add_argument('--dry-run', action='store_true', help='実際の更新は行わず、変換対象の件数を表示するのみ')
+
+class Checkpoint:
+    """
+    コレクションごとのパーティションの境界と、パーティションごとの進捗を保存するチェックポイントファイル
+
+    形式: {collection: {"partitions": [[start, end], ...], "progress": {"0": {"last_id": ..., "done": ...}}}}
+    - 複数のパーティションのスレッドから更新するため、ロックを取得して書き込む
+    - 分割前の migrate_timestamps.py の形式（{collection: last_id}）も1パーティションとして読み込む
+    """
+
+    def __init__(self, path: Path, restart: bool = False, persist: bool = True):
+        self.path = path
+        self.persist = persist
+        self._lock = threading.Lock()
+        self._data = {} if restart else self._load()
+
+    def _load(self) -> Dict[str, Any]:
+        if not self.path.exists():
+            return {}
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        for name, value in data.items():
+            if isinstance(value, str):
+                data[name] = {"partitions": [[None, None]], "progress": {"0": {"last_id": value}}}
+        return data
+
+    def _save(self) -> None:
+        """書きかけのファイルが残らないよう置き換える（ロックを取得して呼ぶこと）"""
+        if not self.persist:
+            return
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._data, f, ensure_ascii=False, indent=2)
+        tmp_path.replace(self.path)
+
+    def partitions(self, collection: str) -> Optional[List[Bounds]]:
+        """保存済みのパーティションの境界（未保存ならNone）"""
+        entry = self._data.get(collection)
+        if entry is None:
+            return None
+        return [tuple(bounds) for bounds in entry["partitions"]]
+
+    def set_partitions(self, collection: str, partitions: List[Bounds]) -> None:
+        with self._lock:
+            self._data[collection] = {"partitions": [list(bounds) for bounds in partitions], "progress": {}}
+            self._save()
+
+    def progress(self, collection: str, index: int) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._data[collection]["progress"].get(str(index), {}))
+
+    def record(self, collection: str, index: int, last_id: Optional[str], done: bool) -> None:
+        with self._lock:
+            self._data[collection]["progress"][str(index)] = {"last_id": last_id, "done": done}
+            self._save()
+
+def split_collection(db, collection: str, partitions: int) -> List[Bounds]:
+    """
+    コレクションをドキュメント数がほぼ均等なドキュメントIDの範囲に分割
+    - Firestore の PartitionQuery（collection_group の get_partitions）で境界を求める
+    - 使えない環境（エミュレーターなど）では1つのパーティションで処理する
+    """
+    if partitions <= 1:
+        return [(None, None)]
+    try:
+        parts = list(db.collection_group(collection).get_partitions(partitions))
+    except Exception as e:
+        print(f"{collection}: パーティションに分割できないため1つで処理します（{e}）")
+        return [(None, None)]
+    return [
+        (part.start_at.id if part.start_at else None, part.end_at.id if part.end_at else None)
+        for part in parts
+    ]
+
+def flush_writer(writer, failures: List[Any], collection: str) -> None:
+    """登録済みの書き込みの完了を待ち、失敗したドキュメントがあれば MigrationError を送出"""
+    writer.flush()
+    if failures:
+        failed_ids = ", ".join(failure.operation.reference.id for failure in failures[:5])
+        raise MigrationError(f"{collection}: {len(failures)}件の書き込みに失敗しました（{failed_ids} など）")
+
+def migrate_partition(db, migration: CollectionMigration, index: int, bounds: Bounds, args, checkpoint: Checkpoint, progress: tqdm) -> int:
+    """
+    パーティションを --batch-size 件ずつ処理し、更新した（ドライランでは更新対象の）件数を返す
+    - ページの書き込みがすべて完了してからチェックポイントを進めるため、中断しても未反映のページは再実行される
+    """
+    collection = db.collection(migration.collection)
+    query = collection.order_by("__name__")
+    if migration.fields is not None:
+        query = query.select(migration.fields)
+    start_id, end_id = bounds
+    if end_id:
+        query = query.end_before({"__name__": collection.document(end_id)})
+
+    state = checkpoint.progress(migration.collection, index)
+    if state.get("done"):
+        return 0
+    last_id = state.get("last_id")
+
+    failures = []
+    writer = None
+    if not args.dry_run:
+        writer = db.bulk_writer()
+
+        def on_write_error(failure, _writer) -> bool:
+            if failure.attempts < MAX_WRITE_ATTEMPTS:
+                return True
+            failures.append(failure)
+            return False
+
+        writer.on_write_error(on_write_error)
+
+    updated = 0
+    try:
+        while True:
+            if last_id:
+                page = query.start_after({"__name__": collection.document(last_id)})
+            elif start_id:
+                page = query.start_at({"__name__": collection.document(start_id)})
+            else:
+                page = query
+            docs = list(page.limit(args.batch_size).stream())
+            if not docs:
+                # 件数が --batch-size の倍数だった場合も、再開時に読み直さないよう完了を記録する
+                checkpoint.record(migration.collection, index, last_id, True)
+                break
+
+            pending = []
+            for doc in docs:
+                data = doc.to_dict()
+                updates = migration.transform(data)
+                if not updates:
+                    continue
+                updated += 1
+                if writer is None:
+                    continue
+                if migration.prepare is not None:
+                    for target, target_id, target_data in migration.prepare(doc.id, data):
+                        writer.set(db.collection(target).document(target_id), target_data, merge=True)
+                pending.append((doc.reference, updates))
+
+            if writer is not None:
+                # prepare の書き込みが完了してから更新する（失敗した場合は移動元の値を残す）
+                if migration.prepare is not None and pending:
+                    flush_writer(writer, failures, migration.collection)
+                for reference, updates in pending:
+                    writer.update(reference, updates)
+                flush_writer(writer, failures, migration.collection)
+
+            last_id = docs[-1].id
+            done = len(docs) < args.batch_size
+            checkpoint.record(migration.collection, index, last_id, done)
+            progress.update(len(docs))
+            if done:
+                break
+    finally:
+        if writer is not None:
+            writer.close()
+    return updated
+
+def run_migrations(db, migrations: List[CollectionMigration], args) -> int:
+    """マイグレーションを順に実行し、更新した（ドライランでは更新対象の）ドキュメントの合計件数を返す"""
+    checkpoint = Checkpoint(Path(args.checkpoint_file), restart=args.restart, persist=not args.dry_run)
+    if args.dry_run:
+        print("ドライランモード: 実際の更新は行いません。")
+
+    total = 0
+    for migration in migrations:
+        partitions = checkpoint.partitions(migration.collection)
+        if partitions is None:
+            partitions = split_collection(db, migration.collection, args.partitions)
+            checkpoint.set_partitions(migration.collection, partitions)
+        else:
+            print(f"{migration.collection}: チェックポイントの {len(partitions)}パーティションの続きから再開します。")
+
+        updated = 0
+        with tqdm(desc=migration.collection, unit="docs") as progress, ThreadPoolExecutor(max_workers=args.workers) as executor:
+            futures = [
+                executor.submit(migrate_partition, db, migration, index, bounds, args, checkpoint, progress)
+                for index, bounds in enumerate(partitions)
+            ]
+            for future in as_completed(futures):
+                updated += future.result()
+
+        print(f"{migration.collection}: {updated}件を{'更新対象として検出' if args.dry_run else '更新'}しました。")
+        total += updated
+    return total
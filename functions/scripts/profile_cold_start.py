@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""
+エントリーポイント（functions/main.py）のコールドスタートを計測するスクリプト
+
+`python -X importtime -c "import main"` を新しいプロセスで実行し、
+モジュールごとのimport時間（self / cumulative）を集計して表示する。
+--mode=both の場合は遅延importモードの有効・無効を比較する。
+
+使用方法:
+python scripts/profile_cold_start.py --mode=both --top=25
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+from bench_utils import FUNCTIONS_DIR
+
+from src.utils.cold_start import parse_importtime
+
+def parse_arguments():
+    """コマンドライン引数をパース"""
+    parser = argparse.ArgumentParser(description='main.py のコールドスタート時のimport時間を計測')
+
+    parser.add_argument('--mode', choices=['lazy', 'eager', 'both'], default='both', help='計測する遅延importモード（デフォルト: both）')
+    parser.add_argument('--top', type=int, default=20, help='表示するモジュール数（デフォルト: 20）')
+    parser.add_argument('--runs', type=int, default=3, help='1モードあたりの計測回数。最も速い回を採用（デフォルト: 3）')
+
+    return parser.parse_args()
+
+def profile_import(lazy: bool):
+    """新しいプロセスで main を import し、経過時間とimport時間を返す"""
+    env = dict(os.environ)
+    env['APP_LAZY_IMPORTS'] = 'true' if lazy else 'false'
+
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import main'],
+        cwd=FUNCTIONS_DIR,
+        env=env,
+        capture_output=True,
+        text=True
+    )
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    if completed.returncode != 0:
+        # import time の行を除いたエラー出力を表示
+        errors = "\n".join(line for line in completed.stderr.splitlines() if not line.startswith("import time:"))
+        raise RuntimeError(f"main の import に失敗しました:\n{errors}")
+
+    return elapsed_ms, parse_importtime(completed.stderr)
+
+def print_profile(label: str, elapsed_ms: float, timings, top: int) -> None:
+    """計測結果を表示"""
+    top_level = [timing for timing in timings if timing.depth == 0]
+    total_ms = sum(timing.cumulative_us for timing in top_level) / 1000
+
+    print(f"\n=== {label} ===")
+    print(f"プロセス起動〜import完了: {elapsed_ms:.1f}ms / import合計: {total_ms:.1f}ms / モジュール数: {len(timings)}")
+
+    print(f"\n-- cumulative 上位{top}（トップレベル） --")
+    for timing in sorted(top_level, key=lambda t: t.cumulative_us, reverse=True)[:top]:
+        print(f"{timing.cumulative_us / 1000:>10.2f}ms  {timing.name}")
+
+    print(f"\n-- self 上位{top} --")
+    for timing in sorted(timings, key=lambda t: t.self_us, reverse=True)[:top]:
+        print(f"{timing.self_us / 1000:>10.2f}ms  {timing.name}")
+
+def main():
+    """メイン処理"""
+    args = parse_arguments()
+    modes = {'lazy': [True], 'eager': [False], 'both': [True, False]}[args.mode]
+
+    for lazy in modes:
+        runs = [profile_import(lazy) for _ in range(args.runs)]
+        elapsed_ms, timings = min(runs, key=lambda run: run[0])
+        print_profile('遅延importモード' if lazy else '通常モード', elapsed_ms, timings, args.top)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""
+勤怠記録から attendance_rollups（ユーザー・月ごとの勤務時間のロールアップ）を作り直すスクリプト
+
+- 勤怠記録を team_id・user_id・start_time だけ読み込んで対象の（ワークスペース, ユーザー, 月）を洗い出し、
+  --workers 件ずつ並列に、その月の勤怠記録からロールアップを再計算する。
+- 再計算中に退勤した勤務は既存のロールアップの値が残るため、稼働中に実行してもよい。
+- 作り直したロールアップは完全なもの（complete: true）として保存され、月次サマリー・統計で使われる。
+
+ロールアップ導入時は全期間を作り直したうえで、config.yaml の storage.rollups_complete_since に
+実行した月（例: "2024-06"）を設定する。集計値がずれた場合も、対象を絞って再実行すればよい。
+
+使用方法:
+python scripts/rebuild_rollups.py --project-id=slack-attendance-bot-4a3a5 --credentials-path=/path/to/firebase-credentials.json --workers=8
+python scripts/rebuild_rollups.py --project-id=... --credentials-path=... --team-id=TXXX123456 --from-month=2024-04 --to-month=2024-05
+"""
+
+import argparse
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from google.cloud.firestore_v1.base_query import FieldFilter
+from tqdm import tqdm
+
+# functions/ をパスに追加して src パッケージを import 可能にする
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.models.attendance import decode_time
+from src.repositories.firestore_repository import FirestoreRepository
+
+def parse_arguments():
+    """コマンドライン引数をパース"""
+    parser = argparse.ArgumentParser(description='勤怠記録からロールアップを作り直す')
+
+    parser.add_argument('--project-id', required=True, help='Firebaseプロジェクトのプロジェクトid')
+    parser.add_argument('--credentials-path', required=True, help='Firebase認証情報ファイルのパス')
+    parser.add_argument('--team-id', help='対象のSlackワークスペースID（省略時はすべて）')
+    parser.add_argument('--user-id', help='対象のユーザーID（省略時はすべて）')
+    parser.add_argument('--from-month', help='対象の最初の月（YYYY-MM）')
+    parser.add_argument('--to-month', help='対象の最後の月（YYYY-MM）')
+    parser.add_argument('--workers', type=int, default=8, help='並列に作り直すロールアップの数（デフォルト: 8）')
+    parser.add_argument('--dry-run', action='store_true', help='実際の書き込みは行わず、対象の件数を表示するのみ')
+
+    return parser.parse_args()
+
+def collect_targets(repository: FirestoreRepository, args):
+    """作り直す（team_id, user_id, year, month）を洗い出す"""
+    query = repository.attendance_collection.select(["team_id", "user_id", "start_time"])
+    if args.team_id:
+        query = query.where(filter=FieldFilter("team_id", "==", args.team_id))
+    if args.user_id:
+        query = query.where(filter=FieldFilter("user_id", "==", args.user_id))
+
+    targets = set()
+    for doc in query.stream():
+        data = doc.to_dict()
+        start_time = decode_time(data.get("start_time"))
+        if start_time is None:
+            continue
+
+        month_label = f"{start_time.year:04d}-{start_time.month:02d}"
+        if args.from_month and month_label < args.from_month:
+            continue
+        if args.to_month and month_label > args.to_month:
+            continue
+        targets.add((data.get("team_id", ""), data["user_id"], start_time.year, start_time.month))
+    return sorted(targets)
+
+def main():
+    """メイン処理"""
+    args = parse_arguments()
+
+    try:
+        repository = FirestoreRepository(
+            project_id=args.project_id,
+            credentials_path=args.credentials_path
+        )
+    except Exception as e:
+        print(f"Firebase初期化エラー: {e}")
+        return
+
+    targets = collect_targets(repository, args)
+    if not targets:
+        print("対象の勤怠記録はありませんでした。")
+        return
+
+    print(f"作り直すロールアップ: {len(targets)}件")
+    if args.dry_run:
+        print("ドライランモード: 実際の書き込みは行いません。")
+        for team_id, user_id, year, month in targets[:5]:
+            print(f"- {team_id}-{user_id}-{year:04d}-{month:02d}")
+        return
+
+    failures = []
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = {
+            executor.submit(repository.rebuild_rollup, user_id, year, month, team_id): (team_id, user_id, year, month)
+            for team_id, user_id, year, month in targets
+        }
+        for future in tqdm(as_completed(futures), total=len(futures)):
+            try:
+                future.result()
+            except Exception as e:
+                failures.append((futures[future], e))
+
+    for (team_id, user_id, year, month), error in failures:
+        print(f"失敗: {team_id}-{user_id}-{year:04d}-{month:02d}: {error}")
+    print(f"再計算完了: {len(targets) - len(failures)}/{len(targets)}件のロールアップを作り直しました。")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""
+出勤中の勤怠記録からチームの在席状況（team_presence）を作り直すスクリプト
+
+- 出勤中のポインター（active_attendance）と既存の在席状況から対象のワークスペースを洗い出し、
+  --workers 件ずつ並列に、出勤中の勤怠記録から在席状況の全シャードを作り直す。
+- 作り直しは在席状況のシャードを読み取ったトランザクションで行うため、稼働中に実行してもよい。
+- 在席状況の導入時、storage.presence_shards を変更したとき、定期的な整合性チェックとして実行する。
+
+使用方法:
+python scripts/reconcile_presence.py --project-id=slack-attendance-bot-4a3a5 --credentials-path=/path/to/firebase-credentials.json
+python scripts/reconcile_presence.py --project-id=... --credentials-path=... --team-id=TXXX123456 --shards=4
+"""
+
+import argparse
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from tqdm import tqdm
+
+# functions/ をパスに追加して src パッケージを import 可能にする
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.repositories.firestore_repository import FirestoreRepository
+from src.repositories.presence import DEFAULT_PRESENCE_SHARDS
+
+def parse_arguments():
+    """コマンドライン引数をパース"""
+    parser = argparse.ArgumentParser(description='出勤中の勤怠記録から在席状況を作り直す')
+
+    parser.add_argument('--project-id', required=True, help='Firebaseプロジェクトのプロジェクトid')
+    parser.add_argument('--credentials-path', required=True, help='Firebase認証情報ファイルのパス')
+    parser.add_argument('--team-id', help='対象のSlackワークスペースID（省略時はすべて）')
+    parser.add_argument('--shards', type=int, default=DEFAULT_PRESENCE_SHARDS, help=f'在席状況のシャード数（config.yaml の storage.presence_shards と同じ値、デフォルト: {DEFAULT_PRESENCE_SHARDS}）')
+    parser.add_argument('--workers', type=int, default=8, help='並列に作り直すワークスペースの数（デフォルト: 8）')
+    parser.add_argument('--dry-run', action='store_true', help='実際の書き込みは行わず、対象のワークスペースを表示するのみ')
+
+    return parser.parse_args()
+
+def collect_team_ids(repository: FirestoreRepository):
+    """出勤中のポインターまたは在席状況があるワークスペースを洗い出す"""
+    team_ids = set()
+    for collection in (repository.active_attendance_collection, repository.presence_collection):
+        for doc in collection.select(["team_id"]).stream():
+            team_id = (doc.to_dict() or {}).get("team_id")
+            # ワークスペースのない記録は対象外（全ワークスペースの記録を集めてしまうため）
+            if team_id:
+                team_ids.add(team_id)
+    return sorted(team_ids)
+
+def main():
+    """メイン処理"""
+    args = parse_arguments()
+
+    try:
+        repository = FirestoreRepository(
+            project_id=args.project_id,
+            credentials_path=args.credentials_path,
+            presence_shards=args.shards
+        )
+    except Exception as e:
+        print(f"Firebase初期化エラー: {e}")
+        return
+
+    team_ids = [args.team_id] if args.team_id else collect_team_ids(repository)
+    if not team_ids:
+        print("対象のワークスペースはありませんでした。")
+        return
+
+    print(f"在席状況を作り直すワークスペース: {len(team_ids)}件")
+    if args.dry_run:
+        print("ドライランモード: 実際の書き込みは行いません。")
+        for team_id in team_ids[:5]:
+            print(f"- {team_id}")
+        return
+
+    failures = []
+    active_total = 0
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = {executor.submit(repository.rebuild_team_presence, team_id): team_id for team_id in team_ids}
+        for future in tqdm(as_completed(futures), total=len(futures)):
+            try:
+                active_total += future.result()
+            except Exception as e:
+                failures.append((futures[future], e))
+
+    for team_id, error in failures:
+        print(f"失敗: {team_id}: {error}")
+    print(f"再作成完了: {len(team_ids) - len(failures)}/{len(team_ids)}件のワークスペース（出勤中 {active_total}人）")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+"""
+同じユーザーの打刻を同時に送り、状態遷移が1回だけ記録されることを確認するストレステスト
+
+二重タップやSlackのリトライを想定し、ユーザーごとに以下を並列に実行する。
+1. 出勤を --parallel 件同時に打刻 → 成功は1件、出勤中の勤怠記録も1件だけであること
+2. 休憩開始を --parallel 件同時に打刻 → 成功は1件、休憩記録も1件だけであること
+3. 休憩終了・退勤を同時に打刻 → どちらの順序で処理されても、退勤時に休憩中のままにならないこと
+
+実データを汚さないよう、Firestoreエミュレーター（FIRESTORE_EMULATOR_HOST）での実行を推奨。
+作成した勤怠記録は --team-id で指定したワークスペースIDで作られ、終了時に削除される。
+
+使用方法:
+FIRESTORE_EMULATOR_HOST=localhost:8080 python scripts/stress_punch_concurrency.py --users=20 --parallel=10
+"""
+
+import argparse
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from google.cloud.firestore_v1.base_query import FieldFilter
+
+# functions/ をパスに追加して src パッケージを import 可能にする
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config import get_config
+from src.repositories.firestore_repository import FirestoreRepository
+from src.services.attendance_service import AttendanceService
+
+def parse_arguments():
+    """コマンドライン引数をパース"""
+    parser = argparse.ArgumentParser(description='同時打刻のストレステスト')
+
+    parser.add_argument('--users', type=int, default=20, help='仮想ユーザー数（デフォルト: 20）')
+    parser.add_argument('--parallel', type=int, default=10, help='1ユーザーあたりの同時打刻数（デフォルト: 10）')
+    parser.add_argument('--team-id', default='TSTRESSTEST', help='ストレステスト用のワークスペースID（デフォルト: TSTRESSTEST）')
+
+    return parser.parse_args()
+
+def fire(executor: ThreadPoolExecutor, calls):
+    """打刻をまとめて同時に実行し、成功した件数を返す"""
+    futures = [executor.submit(call) for call in calls]
+    return sum(1 for future in futures if future.result()[0])
+
+def open_shifts(repository: FirestoreRepository, user_id: str, team_id: str):
+    """ユーザーの出勤中の勤怠記録（ポインターを使わずクエリで確認）"""
+    query = (
+        repository.attendance_collection
+        .where(filter=FieldFilter("user_id", "==", user_id))
+        .where(filter=FieldFilter("team_id", "==", team_id))
+        .where(filter=FieldFilter("end_time", "==", None))
+    )
+    return list(query.get())
+
+def check_user(service: AttendanceService, executor: ThreadPoolExecutor, user_id: str, team_id: str, parallel: int):
+    """1ユーザー分の検証を行い、違反内容のリストを返す"""
+    repository = service.repository
+    errors = []
+
+    succeeded = fire(executor, [
+        lambda: service.punch_in(user_id=user_id, user_name=user_id, team_id=team_id)
+    ] * parallel)
+    shifts = open_shifts(repository, user_id, team_id)
+    if succeeded != 1 or len(shifts) != 1:
+        errors.append(f"punch_in: 成功 {succeeded}件 / 出勤中の記録 {len(shifts)}件")
+
+    succeeded = fire(executor, [lambda: service.start_break(user_id=user_id, team_id=team_id)] * parallel)
+    active = repository.get_active_attendance(user_id, team_id)
+    breaks = len(active.break_periods) if active else 0
+    if succeeded != 1 or breaks != 1:
+        errors.append(f"start_break: 成功 {succeeded}件 / 休憩記録 {breaks}件")
+
+    fire(executor, [
+        lambda: service.end_break(user_id=user_id, team_id=team_id),
+        lambda: service.punch_out(user_id=user_id, team_id=team_id),
+    ])
+    # 休憩終了より先に退勤が処理された場合は、休憩終了後に改めて退勤する
+    service.punch_out(user_id=user_id, team_id=team_id)
+    for shift in shifts:
+        attendance = repository._convert_to_attendance(shift.reference.get())
+        if attendance.break_periods and not attendance.break_periods[-1].end_time:
+            errors.append("punch_out: 休憩中のまま退勤が記録されました")
+    if open_shifts(repository, user_id, team_id):
+        errors.append("punch_out: 退勤後も出勤中の記録が残っています")
+
+    return errors
+
+def cleanup(repository: FirestoreRepository, team_id: str) -> int:
+    """ストレステストで作成した勤怠記録とポインタードキュメントを削除"""
+    deleted = 0
+    for collection in (repository.attendance_collection, repository.active_attendance_collection):
+        for doc in collection.where(filter=FieldFilter("team_id", "==", team_id)).stream():
+            doc.reference.delete()
+            deleted += 1
+    return deleted
+
+def main():
+    """メイン処理"""
+    args = parse_arguments()
+    config = get_config()
+
+    repository = FirestoreRepository(
+        project_id=config.firebase.project_id,
+        credentials_path=config.firebase.credentials_path
+    )
+    service = AttendanceService(repository)
+
+    failures = {}
+    try:
+        with ThreadPoolExecutor(max_workers=args.parallel) as executor:
+            for i in range(args.users):
+                user_id = f"USTRESS{i:05d}"
+                errors = check_user(service, executor, user_id, args.team_id, args.parallel)
+                if errors:
+                    failures[user_id] = errors
+    finally:
+        deleted = cleanup(repository, args.team_id)
+
+    for user_id, errors in failures.items():
+        for error in errors:
+            print(f"NG {user_id}: {error}")
+    print(f"\n{args.users - len(failures)}/{args.users} ユーザーで状態遷移が1回だけ記録されました。")
+    print(f"後片付け: {deleted}件のドキュメントを削除しました。")
+
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
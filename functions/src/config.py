@@ -1,49 +1,195 @@
+import hashlib
+import json
 import os
+import re
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Dict, Optional
 from dotenv import load_dotenv
 
-from omegaconf import OmegaConf
+CONFIG_DIR = Path(__file__).parent.parent / "config"
+# デフォルトの設定ファイルのパス
+CONFIG_PATH = CONFIG_DIR / "config.yaml"
+# scripts/build_config_snapshot.py で生成する事前コンパイル済みの設定
+SNAPSHOT_PATH = CONFIG_DIR / "config.snapshot.json"
 
-_config = None
+# "${SLACK_BOT_TOKEN}" のような環境変数参照
+_ENV_REFERENCE = re.compile(r"^\$\{(\w+)\}$")
 
-def init_config() -> Any:
+@dataclass(frozen=True)
+class SlackConfig:
+    __slots__ = ("bot_token", "signing_secret", "app_token", "client_id", "client_secret")
+    bot_token: Optional[str]
+    signing_secret: Optional[str]
+    app_token: Optional[str]
+    client_id: Optional[str]
+    client_secret: Optional[str]
+
+@dataclass(frozen=True)
+class FirebaseConfig:
+    __slots__ = ("project_id", "credentials_path", "channel_options")
+    project_id: Optional[str]
+    credentials_path: Optional[str]
+    # FirestoreのgRPCチャネルのオプション（"grpc." を省略したチャネル引数名 -> 値）
+    # プロセスで共有する1つのチャネルに、src/repositories/firestore_client.py の既定値を上書きして適用する
+    channel_options: Optional[Dict[str, Any]]
+
+@dataclass(frozen=True)
+class ApplicationConfig:
+    __slots__ = ("timezone", "ack_first")
+    timezone: str
+    # Trueの場合、Slackへのackを先に返し、Firestore・Slack APIへのアクセスはレスポンス送信後に実行する
+    # （CPUの常時割り当てでデプロイした環境専用。処理はキューに保存しない）
+    ack_first: bool
+
+@dataclass(frozen=True)
+class StorageConfig:
+    __slots__ = (
+        "read_legacy_timestamps",
+        "page_size",
+        "persist_closed_months",
+        "rollups_complete_since",
+        "presence_shards",
+        "read_presence",
+        "backend",
+        "sqlite_path"
+    )
+    # Trueの場合、日時をISO-8601文字列で保存していた移行前の勤怠記録も期間検索の対象にする
+    # （scripts/migrate_timestamps.py での移行が完了したら false にする）
+    read_legacy_timestamps: bool
+    # 期間検索で1回のクエリで読み込む件数
+    page_size: int
+    # Trueの場合、締め済みの月の月次サマリーをFirestoreにも保存し、インスタンス間で共有する
+    persist_closed_months: bool
+    # この月（"YYYY-MM"）以降に新しく作るロールアップは、全勤務を含む完全なものとして扱う
+    # （scripts/rebuild_rollups.py で既存の月を作り直したら設定する。未設定の間は勤怠記録から集計する）
+    rollups_complete_since: Optional[str]
+    # チームの在席状況（team_presence）を分割するドキュメント数（変更したら scripts/reconcile_presence.py で作り直す）
+    presence_shards: int
+    # Trueの場合、/allstatus は勤怠記録を検索せずに在席状況ドキュメントから一覧を作る
+    read_presence: bool
+    # 勤怠記録の保存先（"firestore" / "memory" / "sqlite"）
+    backend: str
+    # backend が "sqlite" の場合のデータベースファイルのパス
+    sqlite_path: str
+
+@dataclass(frozen=True)
+class AppConfig:
+    """起動時に1度だけ構築する読み取り専用の設定"""
+    __slots__ = ("slack", "firebase", "application", "storage")
+    slack: SlackConfig
+    firebase: FirebaseConfig
+    application: ApplicationConfig
+    storage: StorageConfig
+
+_config: Optional[AppConfig] = None
+
+# 環境変数で上書きする項目: (セクション, キー) -> 環境変数名
+ENV_OVERRIDES = {
+    ("slack", "bot_token"): "SLACK_BOT_TOKEN",
+    ("slack", "signing_secret"): "SLACK_SIGNING_SECRET",
+    ("slack", "app_token"): "SLACK_APP_TOKEN",
+    ("slack", "client_id"): "SLACK_CLIENT_ID",
+    ("slack", "client_secret"): "SLACK_CLIENT_SECRET",
+    ("firebase", "project_id"): "APP_FIREBASE_PROJECT_ID",
+    ("firebase", "credentials_path"): "APP_FIREBASE_CREDENTIALS_PATH",
+}
+
+# 設定ファイルに記載がない場合の値: (セクション, キー) -> 値
+DEFAULTS = {
+    ("application", "ack_first"): False,
+    ("storage", "read_legacy_timestamps"): True,
+    ("storage", "page_size"): 300,
+    ("storage", "persist_closed_months"): True,
+    ("storage", "presence_shards"): 4,
+    ("storage", "read_presence"): False,
+    ("storage", "backend"): "firestore",
+    ("storage", "sqlite_path"): "attendance.sqlite3",
+}
+
+def _source_digest(config_path: Path) -> str:
+    """設定ファイルの内容のハッシュ（スナップショットが古くないかの判定に使う）"""
+    return hashlib.sha256(config_path.read_bytes()).hexdigest()
+
+def load_yaml_config(config_path: Path = CONFIG_PATH) -> Dict[str, Any]:
+    """YAMLの設定ファイルを（環境変数参照を解決せずに）dictとして読み込む"""
+    # OmegaConfはスナップショットがない場合のみ使うため、ここで import する
+    from omegaconf import OmegaConf
+    return OmegaConf.to_container(OmegaConf.load(config_path), resolve=False)
+
+def build_snapshot(config_path: Path = CONFIG_PATH) -> Dict[str, Any]:
+    """事前コンパイル用のスナップショットを作成"""
+    return {
+        "source_sha256": _source_digest(config_path),
+        "config": load_yaml_config(config_path)
+    }
+
+def _load_base_config() -> Dict[str, Any]:
+    """
+    基本設定を読み込む
+
+    設定ファイルと内容が一致するスナップショットがあればそれを使い、YAMLのパースを省略する。
+    """
+    snapshot_path = Path(os.getenv("APP_CONFIG_SNAPSHOT", str(SNAPSHOT_PATH)))
+    if snapshot_path.exists():
+        with open(snapshot_path, encoding="utf-8") as f:
+            snapshot = json.load(f)
+        if snapshot.get("source_sha256") == _source_digest(CONFIG_PATH):
+            return snapshot["config"]
+        print(f"Config snapshot is stale, falling back to {CONFIG_PATH.name}: {snapshot_path}")
+    return load_yaml_config()
+
+def _resolve_value(value: Any) -> Any:
+    """"${VAR}" 形式の値を環境変数で解決"""
+    if isinstance(value, str):
+        match = _ENV_REFERENCE.match(value)
+        if match:
+            return os.getenv(match.group(1))
+    return value
+
+def _build_section(section_cls, data: Dict[str, Any]):
+    """dictから設定セクションを構築（未知のキーは無視する）"""
+    return section_cls(**{
+        name: _resolve_value(data.get(name))
+        for name in section_cls.__slots__
+    })
+
+def build_config(base: Dict[str, Any]) -> AppConfig:
+    """基本設定に環境変数を反映して AppConfig を構築"""
+    sections = {name: dict(base.get(name) or {}) for name in AppConfig.__slots__}
+
+    for (section, key), value in DEFAULTS.items():
+        sections[section].setdefault(key, value)
+
+    # 環境変数で上書き
+    for (section, key), env_name in ENV_OVERRIDES.items():
+        value = os.getenv(env_name)
+        if value is not None:
+            sections[section][key] = value
+
+    return AppConfig(
+        slack=_build_section(SlackConfig, sections["slack"]),
+        firebase=_build_section(FirebaseConfig, sections["firebase"]),
+        application=_build_section(ApplicationConfig, sections["application"]),
+        storage=_build_section(StorageConfig, sections["storage"])
+    )
+
+def init_config() -> AppConfig:
     """設定を初期化"""
     global _config
-    
+
     if _config is not None:
         return _config
 
     # .envファイルを読み込む
     load_dotenv()
-    
-    # デフォルトの設定ファイルのパス
-    config_path = Path(__file__).parent.parent / "config" / "config.yaml"
-    
-    # 基本設定の読み込み
-    _config = OmegaConf.load(config_path)
-    
-    # 環境変数で上書き
-    env_config = OmegaConf.create({
-        "slack": {
-            "bot_token": os.getenv("SLACK_BOT_TOKEN"),
-            "signing_secret": os.getenv("SLACK_SIGNING_SECRET"),
-            "app_token": os.getenv("SLACK_APP_TOKEN"),
-            "client_id": os.getenv("SLACK_CLIENT_ID"),
-            "client_secret": os.getenv("SLACK_CLIENT_SECRET")
-        },
-        "firebase": {
-            "project_id": os.getenv("APP_FIREBASE_PROJECT_ID"),
-            "credentials_path": os.getenv("APP_FIREBASE_CREDENTIALS_PATH"),
-        }
-    })
-    
-    _config = OmegaConf.merge(_config, env_config)
+
+    _config = build_config(_load_base_config())
     return _config
 
-def get_config() -> Any:
+def get_config() -> AppConfig:
     """設定を取得"""
     global _config
     if _config is None:
         _config = init_config()
-    return _config
\ No newline at end of file
+    return _config
@@ -0,0 +1,105 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from src.config import get_config
+from src.utils.time_utils import get_current_time
+
+# 準備済みのインスタンスで、前回のディープウォームアップからこの秒数が経つまでは再実行しない
+DEEP_WARMUP_MIN_INTERVAL_SECONDS = 240
+
+# 同時に届いたディープウォームアップを1つだけ実行するためのロック
+_deep_warmup_lock = threading.Lock()
+# 最後にディープウォームアップが成功した時刻（time.monotonic()）
+_last_deep_warmup: Optional[float] = None
+
+def _run_phase(phases: List[Dict[str, Any]], name: str, func: Callable[[], Any]) -> Any:
+    """フェーズを実行して所要時間を記録する"""
+    started = time.perf_counter()
+    try:
+        result = func()
+    except Exception as e:
+        phases.append({
+            'name': name,
+            'ok': False,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 2),
+            'error': str(e)
+        })
+        raise
+
+    phase = {
+        'name': name,
+        'ok': True,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 2)
+    }
+    if isinstance(result, dict):
+        phase['detail'] = result
+    phases.append(phase)
+    return result
+
+def run_deep_warmup(team_limit: int = 50) -> Dict[str, Any]:
+    """
+    実際のリクエストで必要になるものを事前に準備するウォームアップ
+
+    1. 設定ファイルの読み込み
+    2. タイムゾーン情報の読み込み
+    3. AppRegistry（リポジトリ・サービス・Bolt App）の構築
+    4. 軽量な読み取りによるFirestoreのgRPCチャネル確立（チャネルの接続状態を結果に含める）
+    5. インストール済みワークスペースのBot情報・インストール情報のキャッシュ
+
+    いずれかのフェーズが失敗した場合は以降のフェーズを実行せず、そこまでの結果を返す。
+    AppRegistryが準備済みで、前回の成功から DEEP_WARMUP_MIN_INTERVAL_SECONDS 秒以内の場合と、
+    別のディープウォームアップが実行中の場合は、何もせずに skipped を返す。
+
+    Args:
+        team_limit: キャッシュに読み込むワークスペース数の上限
+
+    Returns:
+        Dict[str, Any]: フェーズごとの所要時間を含む結果
+    """
+    # registry は Bolt・Firestore を読み込むため、ディープウォームアップ時にのみ import する
+    from src.slack.registry import get_app_registry
+
+    global _last_deep_warmup
+
+    registry = get_app_registry()
+    was_ready = registry.is_ready()
+    recently_primed = (
+        _last_deep_warmup is not None
+        and time.monotonic() - _last_deep_warmup < DEEP_WARMUP_MIN_INTERVAL_SECONDS
+    )
+    # 準備済みで直近に実行済みの場合・実行中の場合は、Firestoreを読み込まずに終了する
+    if (was_ready and recently_primed) or not _deep_warmup_lock.acquire(blocking=False):
+        return {
+            'status': 'ok',
+            'skipped': True,
+            'registry_was_ready': was_ready
+        }
+
+    phases: List[Dict[str, Any]] = []
+    started = time.perf_counter()
+    try:
+        _run_phase(phases, 'config', get_config)
+        _run_phase(phases, 'timezone', get_current_time)
+        components = _run_phase(phases, 'app_registry', registry.get)
+        # OAuthのストアと共有するクライアントを使うため、storage.backend に関係なく確立する
+        from src.repositories.firestore_client import get_firestore_client_factory
+        _run_phase(phases, 'firestore_channel', get_firestore_client_factory().warm_up)
+
+        installation_store = components.app.installation_store
+        if hasattr(installation_store, 'prime_cache'):
+            _run_phase(phases, 'installation_cache', lambda: installation_store.prime_cache(team_limit=team_limit))
+        status = 'ok'
+        _last_deep_warmup = time.monotonic()
+    except Exception as e:
+        print(f"***** Deep warmup failed: {str(e)} *****")
+        status = 'error'
+    finally:
+        _deep_warmup_lock.release()
+
+    return {
+        'status': status,
+        'registry_was_ready': was_ready,
+        'total_ms': round((time.perf_counter() - started) * 1000, 2),
+        'phases': phases
+    }
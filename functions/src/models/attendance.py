@@ -1,47 +1,329 @@
-from dataclasses import dataclass, field
-from datetime import datetime
-from typing import List, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Any, List, Optional, Sequence, Set, Tuple, Union
+
+from src.utils.time_utils import get_timezone
+
+# Firestoreに保存するフィールド（変更の追跡対象）
+PERSISTED_FIELDS = frozenset({
+    "user_id", "user_name", "team_id", "start_time", "end_time", "break_periods",
+    "work_description", "work_progress", "report_channel_id", "mention_user_ids"
+})
+
+# 勤務時間の集計・在席状況に必要なフィールド（select で読み込むフィールドを絞る）
+TIMING_FIELDS = ("user_id", "user_name", "team_id", "start_time", "end_time", "break_periods")
+# 月次サマリー・ロールアップ用（日ごとの業務内容も集計する。Firestore では業務内容を attendance_reports から読み込む）
+SUMMARY_FIELDS = TIMING_FIELDS + ("work_description",)
+
+def decode_time(value: Any) -> Optional[datetime]:
+    """
+    保存された日時を datetime に変換
+    - Firestoreのタイムスタンプ（UTCのdatetimeとして返る）は設定のタイムゾーンに変換する
+    - 移行前のISO-8601文字列もそのまま読み込める
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value.astimezone(get_timezone())
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+def to_epoch(value: Any) -> Optional[int]:
+    """
+    保存された日時をUNIXエポックからのマイクロ秒（int）に変換
+    - Firestoreのタイムスタンプ・datetime・移行前のISO-8601文字列のどれでもよい（タイムゾーン変換はしない）
+    - UTCオフセットのない日時は設定のタイムゾーンの時刻とみなす
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = get_timezone().localize(value)
+    return (value - _EPOCH) // _MICROSECOND
+
+def from_epoch(value: Optional[int]) -> Optional[datetime]:
+    """to_epoch の値を設定のタイムゾーンの datetime に変換"""
+    if value is None:
+        return None
+    return (_EPOCH + timedelta(microseconds=value)).astimezone(get_timezone())
+
+def minutes_between(start: int, end: int) -> float:
+    """2つのエポック（マイクロ秒）の間の時間（分）"""
+    return (end - start) / 10**6 / 60
+
+def _repr(obj, names: Sequence[str]) -> str:
+    return f"{type(obj).__name__}({', '.join(f'{name}={getattr(obj, name)!r}' for name in names)})"
 
-@dataclass
 class BreakPeriod:
-    start_time: datetime
-    end_time: Optional[datetime] = None
+    """
+    1回分の休憩
+    - 日時はエポック（マイクロ秒）で保持し、start_time・end_time で datetime として読み書きする
+    - 休憩時間（分）は最初の get_duration でキャッシュし、start_time・end_time を変更すると破棄する
+    - 勤怠記録に追加した休憩は、変更を勤怠記録に通知する（勤怠記録の総休憩時間・実労働時間のキャッシュも破棄される）
+    """
+    __slots__ = ("_start", "_end", "_duration", "_owner")
+
+    def __init__(self, start_time: Any, end_time: Any = None):
+        self._start = to_epoch(start_time)
+        self._end = to_epoch(end_time)
+        self._duration: Optional[float] = None
+        # この休憩を保持している勤怠記録（_WorkingTimeMixin）
+        self._owner = None
+
+    def _changed(self) -> None:
+        self._duration = None
+        if self._owner is not None:
+            self._owner._on_break_changed()
+
+    @property
+    def start_time(self) -> Optional[datetime]:
+        return from_epoch(self._start)
+
+    @start_time.setter
+    def start_time(self, value: Any) -> None:
+        self._start = to_epoch(value)
+        self._changed()
+
+    @property
+    def end_time(self) -> Optional[datetime]:
+        return from_epoch(self._end)
+
+    @end_time.setter
+    def end_time(self, value: Any) -> None:
+        self._end = to_epoch(value)
+        self._changed()
+
+    @property
+    def start_epoch(self) -> Optional[int]:
+        return self._start
+
+    @property
+    def end_epoch(self) -> Optional[int]:
+        return self._end
 
     def get_duration(self) -> float:
         """休憩時間を分単位で計算"""
-        if not self.end_time:
-            return 0.0
-        duration = (self.end_time - self.start_time).total_seconds() / 60
-        return round(duration, 2)
-
-@dataclass
-class Attendance:
-    doc_id: Optional[str] = None  # ★ ドキュメントIDを保持するフィールドを追加
-    user_id: str = ""
-    user_name: str = ""
-    team_id: str = ""  # ★ ワークスペースIDを追加
-    start_time: datetime = None
-    end_time: Optional[datetime] = None
-    break_periods: List[BreakPeriod] = field(default_factory=list)
-    work_description: Optional[str] = None
-    work_progress: Optional[str] = None
-    report_channel_id: Optional[str] = None
-    mention_user_ids: List[str] = field(default_factory=list)
-
-    def __post_init__(self):
-        if self.break_periods is None:
-            self.break_periods = []
+        if self._duration is None:
+            self._duration = 0.0 if self._end is None else round(minutes_between(self._start, self._end), 2)
+        return self._duration
+
+    def to_dict(self) -> dict:
+        """Firestoreに保存するためのdict形式に変換"""
+        return {
+            "start_time": self.start_time,
+            "end_time": self.end_time
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'BreakPeriod':
+        """dict形式からBreakPeriodオブジェクトを生成"""
+        return cls(data["start_time"], data.get("end_time"))
+
+    def __eq__(self, other):
+        if not isinstance(other, BreakPeriod):
+            return NotImplemented
+        return (self._start, self._end) == (other._start, other._end)
+
+    def __repr__(self):
+        return _repr(self, ("start_time", "end_time"))
+
+class _WorkingTimeMixin:
+    """
+    start_time・end_time・break_periods の保持と勤務時間の計算
+    - 日時はエポック（マイクロ秒）で保持し、datetime への変換は読み出すときだけ行う
+    - 総休憩時間・実労働時間は最初の計算結果をキャッシュし、start_time・end_time・break_periods の代入、
+      休憩の追加・休憩の start_time・end_time の変更で破棄する
+    - break_periods は読み取り専用のタプルを返す（休憩の追加は add_break、置き換えは break_periods への代入で行う）
+    """
+    __slots__ = ("_start", "_end", "_breaks", "_break_time", "_working_time")
+
+    def _init_timing(self, start_time: Any, end_time: Any, break_periods: Optional[List[BreakPeriod]]) -> None:
+        object.__setattr__(self, "_start", to_epoch(start_time))
+        object.__setattr__(self, "_end", to_epoch(end_time))
+        self._set_breaks(break_periods)
+        self.invalidate_durations()
+
+    def _set_breaks(self, break_periods: Optional[Sequence[BreakPeriod]]) -> None:
+        # 置き換える前の休憩からは通知を受け取らない
+        for period in getattr(self, "_breaks", ()):
+            if period._owner is self:
+                period._owner = None
+        breaks = list(break_periods) if break_periods is not None else []
+        for period in breaks:
+            period._owner = self
+        object.__setattr__(self, "_breaks", breaks)
+
+    def _append_break(self, period: BreakPeriod) -> None:
+        period._owner = self
+        self._breaks.append(period)
+        self.invalidate_durations()
+
+    def _on_break_changed(self) -> None:
+        """保持している休憩が変更された"""
+        self.invalidate_durations()
+
+    def invalidate_durations(self) -> None:
+        """キャッシュした総休憩時間・実労働時間を破棄"""
+        object.__setattr__(self, "_break_time", None)
+        object.__setattr__(self, "_working_time", None)
+
+    @property
+    def start_time(self) -> Optional[datetime]:
+        return from_epoch(self._start)
+
+    @start_time.setter
+    def start_time(self, value: Any) -> None:
+        object.__setattr__(self, "_start", to_epoch(value))
+        self.invalidate_durations()
+
+    @property
+    def end_time(self) -> Optional[datetime]:
+        return from_epoch(self._end)
+
+    @end_time.setter
+    def end_time(self, value: Any) -> None:
+        object.__setattr__(self, "_end", to_epoch(value))
+        self.invalidate_durations()
+
+    @property
+    def break_periods(self) -> Tuple[BreakPeriod, ...]:
+        return tuple(self._breaks)
+
+    @break_periods.setter
+    def break_periods(self, value: Optional[Sequence[BreakPeriod]]) -> None:
+        self._set_breaks(value)
+        self.invalidate_durations()
+
+    @property
+    def start_epoch(self) -> Optional[int]:
+        return self._start
+
+    @property
+    def end_epoch(self) -> Optional[int]:
+        return self._end
 
     def get_total_break_time(self) -> float:
         """総休憩時間を分単位で計算"""
-        return sum(period.get_duration() for period in self.break_periods)
+        if self._break_time is None:
+            object.__setattr__(self, "_break_time", sum(period.get_duration() for period in self._breaks))
+        return self._break_time
 
     def get_working_time(self) -> float:
         """実労働時間を分単位で計算（休憩時間を除く）"""
-        if not self.end_time:
-            return 0.0
-        total_duration = (self.end_time - self.start_time).total_seconds() / 60
-        return round(total_duration - self.get_total_break_time(), 2)
+        if self._working_time is None:
+            if self._end is None:
+                working_time = 0.0
+            else:
+                working_time = round(minutes_between(self._start, self._end) - self.get_total_break_time(), 2)
+            object.__setattr__(self, "_working_time", working_time)
+        return self._working_time
+
+# Attendance の repr・比較に使うフィールド
+_ATTENDANCE_FIELDS = (
+    "doc_id", "user_id", "user_name", "team_id", "start_time", "end_time", "break_periods",
+    "work_description", "work_progress", "report_channel_id", "mention_user_ids"
+)
+
+class Attendance(_WorkingTimeMixin):
+    """
+    1回分の勤務の勤怠記録
+    - 読み込み後に変更されたフィールドを記録し、部分更新に使う（__init__ での設定は記録しない）
+    """
+    __slots__ = (
+        "doc_id",  # ★ ドキュメントIDを保持するフィールドを追加
+        "user_id",
+        "user_name",
+        "team_id",  # ★ ワークスペースIDを追加
+        "work_description",
+        "work_progress",
+        "report_channel_id",
+        "mention_user_ids",
+        # 読み込み後に変更されたフィールド（部分更新に使う）
+        "_dirty_fields",
+        # 読み込み後に追加された休憩（break_periods全体ではなく追加分だけを書き込む）
+        "_appended_breaks"
+    )
+
+    def __init__(
+        self,
+        doc_id: Optional[str] = None,
+        user_id: str = "",
+        user_name: str = "",
+        team_id: str = "",
+        start_time: Any = None,
+        end_time: Any = None,
+        break_periods: Optional[List[BreakPeriod]] = None,
+        work_description: Optional[str] = None,
+        work_progress: Optional[str] = None,
+        report_channel_id: Optional[str] = None,
+        mention_user_ids: Optional[List[str]] = None
+    ):
+        # 変更の追跡をしないよう、object.__setattr__ で設定する
+        init = object.__setattr__
+        init(self, "doc_id", doc_id)
+        init(self, "user_id", user_id)
+        init(self, "user_name", user_name)
+        init(self, "team_id", team_id)
+        init(self, "work_description", work_description)
+        init(self, "work_progress", work_progress)
+        init(self, "report_channel_id", report_channel_id)
+        init(self, "mention_user_ids", mention_user_ids if mention_user_ids is not None else [])
+        init(self, "_dirty_fields", set())
+        init(self, "_appended_breaks", [])
+        self._init_timing(start_time, end_time, break_periods)
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name in PERSISTED_FIELDS:
+            self._dirty_fields.add(name)
+
+    def __eq__(self, other):
+        if not isinstance(other, Attendance):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in _ATTENDANCE_FIELDS)
+
+    def __repr__(self):
+        return _repr(self, _ATTENDANCE_FIELDS)
+
+    @property
+    def dirty_fields(self) -> Set[str]:
+        """読み込み後に変更されたフィールド名"""
+        return set(self._dirty_fields)
+
+    @property
+    def appended_breaks(self) -> List[BreakPeriod]:
+        """読み込み後に追加された休憩"""
+        return list(self._appended_breaks)
+
+    def mark_dirty(self, name: str) -> None:
+        """リストの要素の変更など、代入では検知できない変更を記録"""
+        if name not in PERSISTED_FIELDS:
+            raise ValueError(f"Unknown field: {name}")
+        self._dirty_fields.add(name)
+        if name == "break_periods":
+            self.invalidate_durations()
+
+    def _on_break_changed(self) -> None:
+        """保持している休憩が変更された（配列の要素は部分更新できないため、break_periods全体を変更扱いにする）"""
+        self.mark_dirty("break_periods")
+
+    def clear_dirty(self) -> None:
+        """変更の記録を消去（保存後に呼ぶ）"""
+        self._dirty_fields.clear()
+        self._appended_breaks.clear()
+
+    def add_break(self, period: BreakPeriod) -> None:
+        """休憩を追加"""
+        self._append_break(period)
+        self._appended_breaks.append(period)
+
+    def end_current_break(self, end_time: datetime) -> BreakPeriod:
+        """最後の休憩を終了（休憩の変更の通知で、break_periods全体が変更扱いになる）"""
+        current_break = self._breaks[-1]
+        current_break.end_time = end_time
+        return current_break
 
     def to_dict(self) -> dict:
         """Firestoreに保存するためのdict形式に変換"""
@@ -49,15 +331,10 @@ class Attendance:
             "user_id": self.user_id,
             "user_name": self.user_name,
             "team_id": self.team_id,  # ★ team_idを追加
-            "start_time": self.start_time.isoformat(),
-            "end_time": self.end_time.isoformat() if self.end_time else None,
-            "break_periods": [
-                {
-                    "start_time": period.start_time.isoformat(),
-                    "end_time": period.end_time.isoformat() if period.end_time else None
-                }
-                for period in self.break_periods
-            ],
+            # 日時はFirestoreのタイムスタンプとして保存する
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "break_periods": [period.to_dict() for period in self.break_periods],
             "work_description": self.work_description,
             "work_progress": self.work_progress,
             "report_channel_id": self.report_channel_id,
@@ -71,27 +348,83 @@ class Attendance:
 
     @classmethod
     def from_dict(cls, data: dict) -> 'Attendance':
-        """dict形式からAttendanceオブジェクトを生成"""
-        from datetime import datetime
-        break_periods_data = data.get("break_periods", [])
-        break_periods = []
-        for bp_data in break_periods_data:
-            bp = BreakPeriod(
-                start_time=datetime.fromisoformat(bp_data["start_time"]),
-                end_time=datetime.fromisoformat(bp_data["end_time"]) if bp_data.get("end_time") else None
-            )
-            break_periods.append(bp)
+        """dict形式からAttendanceオブジェクトを生成（日時はタイムスタンプ・ISO-8601文字列のどちらでもよい）"""
+        break_periods = [BreakPeriod.from_dict(bp_data) for bp_data in data.get("break_periods", [])]
 
         return cls(
             doc_id=data.get("doc_id"),  # to_dict内でdoc_idを格納している場合のみ有効
             user_id=data.get("user_id", ""),
             user_name=data.get("user_name", ""),
             team_id=data.get("team_id", ""),  # ★ team_idを追加
-            start_time=datetime.fromisoformat(data["start_time"]),
-            end_time=datetime.fromisoformat(data["end_time"]) if data.get("end_time") else None,
+            start_time=data["start_time"],
+            end_time=data.get("end_time"),
             break_periods=break_periods,
             work_description=data.get("work_description"),
             work_progress=data.get("work_progress"),
             report_channel_id=data.get("report_channel_id"),
             mention_user_ids=data.get("mention_user_ids", [])
-        )
\ No newline at end of file
+        )
+
+# AttendanceTiming の repr・比較に使うフィールド
+_TIMING_RECORD_FIELDS = (
+    "doc_id", "user_id", "user_name", "team_id", "start_time", "end_time", "break_periods", "work_description"
+)
+
+class AttendanceTiming(_WorkingTimeMixin):
+    """
+    TIMING_FIELDS・SUMMARY_FIELDS だけを読み込んだ軽量な勤怠記録（集計・在席状況の表示用）
+    - 勤務時間の計算は Attendance と同じ。変更の追跡はせず、保存には使えない
+    - 読み込んでいないフィールドは空の値になる
+    """
+    __slots__ = ("doc_id", "user_id", "user_name", "team_id", "work_description")
+
+    def __init__(
+        self,
+        doc_id: Optional[str] = None,
+        user_id: str = "",
+        user_name: str = "",
+        team_id: str = "",
+        start_time: Any = None,
+        end_time: Any = None,
+        break_periods: Optional[List[BreakPeriod]] = None,
+        work_description: Optional[str] = None
+    ):
+        self.doc_id = doc_id
+        self.user_id = user_id
+        self.user_name = user_name
+        self.team_id = team_id
+        self.work_description = work_description
+        self._init_timing(start_time, end_time, break_periods)
+
+    def __eq__(self, other):
+        if not isinstance(other, AttendanceTiming):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in _TIMING_RECORD_FIELDS)
+
+    def __repr__(self):
+        return _repr(self, _TIMING_RECORD_FIELDS)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'AttendanceTiming':
+        """dict形式（select で一部のフィールドだけを読み込んだものでもよい）から生成"""
+        return cls(
+            doc_id=data.get("doc_id"),
+            user_id=data.get("user_id", ""),
+            user_name=data.get("user_name", ""),
+            team_id=data.get("team_id", ""),
+            start_time=data["start_time"],
+            end_time=data.get("end_time"),
+            break_periods=[BreakPeriod.from_dict(bp_data) for bp_data in data.get("break_periods") or []],
+            work_description=data.get("work_description")
+        )
+
+# 期間検索・出勤中の記録の一覧が返す記録（projection を指定した場合は AttendanceTiming）
+AttendanceRecord = Union[Attendance, AttendanceTiming]
+# 読み込むフィールド（None はドキュメント全体）
+Projection = Optional[Sequence[str]]
+
+def record_from_dict(data: dict, projection: Projection = None) -> AttendanceRecord:
+    """projection を指定した場合は AttendanceTiming、それ以外は Attendance に変換"""
+    if projection:
+        return AttendanceTiming.from_dict(data)
+    return Attendance.from_dict(data)
@@ -0,0 +1,136 @@
+import asyncio
+import functools
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.models.attendance import Attendance, AttendanceRecord, Projection
+from src.repositories.base import DEFAULT_ACTIVE_PAGE_SIZE, AttendanceRepository
+from src.repositories.closed_month_cache import ClosedMonthSnapshot, MonthKey
+
+class AsyncRepositoryAdapter:
+    """
+    同期版の AttendanceRepository を AsyncAttendanceRepository として使うためのラッパー
+
+    - InMemoryRepository・SqliteRepository を AsyncApp から使う場合に包む
+    - 各メソッドはスレッドプールで実行するため、SQLiteへのアクセス中もイベントループをブロックしない
+    """
+
+    def __init__(self, repository: AttendanceRepository):
+        self.repository = repository
+
+    async def _run(self, func: Callable, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+    async def create_attendance(self, attendance: Attendance) -> None:
+        await self._run(self.repository.create_attendance, attendance)
+
+    async def create_active_attendance(self, attendance: Attendance) -> bool:
+        return await self._run(self.repository.create_active_attendance, attendance)
+
+    async def update_active_attendance(
+        self,
+        user_id: str,
+        team_id: Optional[str],
+        mutate: Callable[[Optional[Attendance]], Attendance]
+    ) -> Attendance:
+        return await self._run(self.repository.update_active_attendance, user_id, team_id, mutate)
+
+    async def get_active_attendance(self, user_id: str, team_id: str = None) -> Optional[Attendance]:
+        return await self._run(self.repository.get_active_attendance, user_id, team_id)
+
+    async def get_active_attendance_page(
+        self,
+        team_id: str = None,
+        cursor: Optional[str] = None,
+        page_size: int = DEFAULT_ACTIVE_PAGE_SIZE,
+        projection: Projection = None
+    ) -> Tuple[List[AttendanceRecord], Optional[str]]:
+        return await self._run(self.repository.get_active_attendance_page, team_id, cursor, page_size, projection)
+
+    async def get_all_active_attendances(self, team_id: str = None, projection: Projection = None) -> List[AttendanceRecord]:
+        return await self._run(self.repository.get_all_active_attendances, team_id, projection)
+
+    async def get_active_attendances_for_users(
+        self,
+        user_ids: Sequence[str],
+        team_id: str = None,
+        projection: Projection = None
+    ) -> Dict[str, AttendanceRecord]:
+        return await self._run(self.repository.get_active_attendances_for_users, user_ids, team_id, projection)
+
+    async def get_team_presence(self, team_id: str) -> Dict[str, Dict[str, Any]]:
+        return await self._run(self.repository.get_team_presence, team_id)
+
+    async def update_attendance(self, attendance: Attendance) -> None:
+        await self._run(self.repository.update_attendance, attendance)
+
+    async def update_attendance_fields(self, attendance: Attendance) -> None:
+        await self._run(self.repository.update_attendance_fields, attendance)
+
+    async def get_complete_rollup(self, user_id: str, year: int, month: int, team_id: str = None) -> Optional[Dict[str, Any]]:
+        return await self._run(self.repository.get_complete_rollup, user_id, year, month, team_id)
+
+    async def get_rollups_for_users(
+        self,
+        user_ids: Sequence[str],
+        year: int,
+        month: int,
+        team_id: str = None
+    ) -> Dict[str, Dict[str, Any]]:
+        return await self._run(self.repository.get_rollups_for_users, user_ids, year, month, team_id)
+
+    async def get_work_descriptions(self, attendance_ids: Sequence[str]) -> Dict[str, str]:
+        return await self._run(self.repository.get_work_descriptions, attendance_ids)
+
+    async def get_closed_month_summary(self, key: MonthKey) -> ClosedMonthSnapshot:
+        return await self._run(self.repository.get_closed_month_summary, key)
+
+    async def save_closed_month_summary(self, key: MonthKey, data: Dict[str, Any], version: int) -> bool:
+        return await self._run(self.repository.save_closed_month_summary, key, data, version)
+
+    async def iter_attendance_by_period(
+        self,
+        user_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        team_id: str = None,
+        page_size: Optional[int] = None,
+        projection: Projection = None
+    ) -> AsyncIterator[AttendanceRecord]:
+        """指定期間の勤怠記録を1件ずつ返す（読み込みはスレッドプールでまとめて行う）"""
+        for record in await self.get_attendance_by_period(user_id, start_date, end_date, team_id, page_size, projection):
+            yield record
+
+    async def get_attendance_by_period(
+        self,
+        user_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        team_id: str = None,
+        page_size: Optional[int] = None,
+        projection: Projection = None
+    ) -> List[AttendanceRecord]:
+        return await self._run(self.repository.get_attendance_by_period, user_id, start_date, end_date, team_id, page_size, projection)
+
+    async def iter_team_attendance_by_period(
+        self,
+        team_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        page_size: Optional[int] = None,
+        projection: Projection = None
+    ) -> AsyncIterator[AttendanceRecord]:
+        """ワークスペース全員の指定期間の勤怠記録を1件ずつ返す（読み込みはスレッドプールでまとめて行う）"""
+        for record in await self.get_team_attendance_by_period(team_id, start_date, end_date, page_size, projection):
+            yield record
+
+    async def get_team_attendance_by_period(
+        self,
+        team_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        page_size: Optional[int] = None,
+        projection: Projection = None
+    ) -> List[AttendanceRecord]:
+        return await self._run(self.repository.get_team_attendance_by_period, team_id, start_date, end_date, page_size, projection)
@@ -0,0 +1,519 @@
+import asyncio
+import heapq
+from datetime import datetime
+from typing import AsyncIterator, Callable, Optional, List, Dict, Any, Sequence, Tuple
+from google.cloud.firestore import async_transactional
+
+from src.models.attendance import Attendance, AttendanceRecord, Projection, record_from_dict
+from src.repositories.base import (
+    DEFAULT_ACTIVE_PAGE_SIZE,
+    DEFAULT_PAGE_SIZE,
+    active_pointer_id,
+    in_period,
+    invalidate_cached_month,
+    validate_page_cursor
+)
+from src.repositories.closed_month_cache import ClosedMonthSnapshot, MonthKey, closed_month_doc_id
+from src.repositories.firestore_client import get_firestore_client_factory
+from src.repositories.firestore_repository import (
+    GET_ALL_CHUNK_SIZE,
+    LegacyReorderBuffer,
+    build_active_attendance_query,
+    build_active_pointer,
+    build_field_updates,
+    build_period_queries,
+    build_team_period_queries,
+    chunked,
+    closed_month_snapshot_of,
+    collect_work_descriptions,
+    project_query,
+    stage_active_attendance_update,
+    stage_attendance_field_updates,
+    stage_attendance_set,
+    stage_closed_month_invalidation,
+    stage_pointer_release,
+    stage_presence_release,
+    stage_presence_update,
+    stage_rollup_update
+)
+from src.repositories.presence import DEFAULT_PRESENCE_SHARDS, merge_presence_members, presence_doc_id
+from src.repositories.reports import attach_reports, report_fields_in
+from src.repositories.rollups import RollupKey, rollup_doc_id, rollup_key, rollup_key_of
+
+async def get_all_documents(
+    db,
+    refs: Sequence[Any],
+    field_paths: Optional[List[str]] = None,
+    chunk_size: int = GET_ALL_CHUNK_SIZE
+) -> Dict[str, Any]:
+    """
+    firestore_repository.get_all_documents の非同期版
+    - chunk_size 件ずつの get_all に分け、すべてのチャンクを並行に読み込む
+    """
+    async def read(chunk):
+        return [snapshot async for snapshot in db.get_all(chunk, field_paths=field_paths) if snapshot.exists]
+
+    pages = await asyncio.gather(*(read(chunk) for chunk in chunked(refs, chunk_size)))
+    return {snapshot.id: snapshot for page in pages for snapshot in page}
+
+async def reorder_legacy_stream(stream: AsyncIterator[AttendanceRecord]) -> AsyncIterator[AttendanceRecord]:
+    """firestore_repository.reorder_legacy_stream の非同期版"""
+    buffer = LegacyReorderBuffer()
+    async for record in stream:
+        for ready in buffer.push(record):
+            yield ready
+    for ready in buffer.drain():
+        yield ready
+
+async def merge_period_streams(streams: List[AsyncIterator[AttendanceRecord]]) -> AsyncIterator[AttendanceRecord]:
+    """
+    build_range_queries のクエリごとの結果を出勤時刻順にマージ（firestore_repository.merge_period_streams の非同期版）
+    - 各ストリームの先頭の1件だけを保持し、最も早いものから返す
+    """
+    timestamp_stream, *legacy_streams = streams
+    iterators = [timestamp_stream.__aiter__()] + [reorder_legacy_stream(stream).__aiter__() for stream in legacy_streams]
+    heads = []
+    for index, iterator in enumerate(iterators):
+        try:
+            record = await iterator.__anext__()
+        except StopAsyncIteration:
+            continue
+        heads.append((record.start_time, index, record))
+    heapq.heapify(heads)
+
+    while heads:
+        _, index, record = heapq.heappop(heads)
+        yield record
+        try:
+            following = await iterators[index].__anext__()
+        except StopAsyncIteration:
+            continue
+        heapq.heappush(heads, (following.start_time, index, following))
+
+class AsyncFirestoreRepository:
+    """
+    FirestoreRepository の非同期版（firestore.AsyncClient を使用）
+
+    Socket Mode の AsyncApp から使い、Firestore へのアクセス中もイベントループをブロックしない。
+    """
+
+    def __init__(
+        self,
+        project_id: str,
+        credentials_path: str,
+        read_legacy_timestamps: bool = True,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        rollups_complete_since: Optional[str] = None,
+        presence_shards: int = DEFAULT_PRESENCE_SHARDS,
+        channel_options: Optional[Dict[str, Any]] = None
+    ):
+        self.read_legacy_timestamps = read_legacy_timestamps
+        self.page_size = page_size
+        self.rollups_complete_since = rollups_complete_since
+        # チームの在席状況を分割するドキュメント数（変更した場合は scripts/reconcile_presence.py で作り直す）
+        self.presence_shards = presence_shards
+        try:
+            # プロセスで共有するクライアント（認証情報の読み込みとチャネルの作成は1回だけ）
+            self.db = get_firestore_client_factory().async_client(project_id, credentials_path, channel_options)
+            self.attendance_collection = self.db.collection('attendance')
+            # 出勤中の勤怠記録へのポインター（ドキュメントID: {team_id}-{user_id}）
+            self.active_attendance_collection = self.db.collection('active_attendance')
+            # 締め済みの月の月次サマリー（ドキュメントID: {team_id}-{user_id}-{yyyy}-{mm}）
+            self.closed_month_collection = self.db.collection('closed_month_summaries')
+            # ユーザー・月ごとの勤務時間のロールアップ（ドキュメントID: {team_id}-{user_id}-{yyyy}-{mm}）
+            self.rollup_collection = self.db.collection('attendance_rollups')
+            # チームごとの出勤中の従業員の在席状況（ドキュメントID: {team_id}-{shard}）
+            self.presence_collection = self.db.collection('team_presence')
+            # 勤怠記録ごとの業務報告（ドキュメントID: 勤怠記録のドキュメントID）
+            self.report_collection = self.db.collection('attendance_reports')
+        except Exception as e:
+            print(f"Firebase initialization error: {str(e)}")
+            raise
+
+    def _convert_to_attendance(self, doc, projection: Projection = None) -> AttendanceRecord:
+        """
+        Firestoreのドキュメントを勤怠オブジェクトに変換
+        - doc.id を attendance.doc_id に保持
+        - projection を指定して読み込んだドキュメントは AttendanceTiming に変換
+        """
+        attendance = record_from_dict(doc.to_dict(), projection)
+        attendance.doc_id = doc.id
+        return attendance
+
+    def _active_pointer_ref(self, user_id: str, team_id: Optional[str]):
+        return self.active_attendance_collection.document(active_pointer_id(team_id, user_id))
+
+    def _presence_refs(self, team_id: Optional[str]) -> List[Any]:
+        return [
+            self.presence_collection.document(presence_doc_id(team_id, shard))
+            for shard in range(self.presence_shards)
+        ]
+
+    def _rollup_ref(self, key: RollupKey):
+        return self.rollup_collection.document(rollup_doc_id(key))
+
+    async def _commit_attendance_write(self, attendance: Attendance, stage_writes: Callable[[Any], None]) -> None:
+        """
+        勤怠記録の書き込みを実行
+        - 退勤済みの記録はロールアップも同じトランザクションで更新し、ポインタードキュメントがこの記録を指していれば削除する
+        - チームの在席状況も同じバッチ・トランザクションで更新する（退勤済みであれば本人を削除する）
+        """
+        if attendance.end_time is None:
+            batch = self.db.batch()
+            stage_writes(batch)
+            stage_presence_update(batch, self.presence_collection, attendance, self.presence_shards)
+            invalidated = stage_closed_month_invalidation(batch, self.closed_month_collection, attendance)
+            await batch.commit()
+        else:
+            rollup_ref = self._rollup_ref(rollup_key_of(attendance))
+            pointer_ref = self._active_pointer_ref(attendance.user_id, attendance.team_id)
+
+            @async_transactional
+            async def run(transaction):
+                rollup_snapshot = await rollup_ref.get(transaction=transaction)
+                pointer_snapshot = await pointer_ref.get(transaction=transaction)
+                stage_writes(transaction)
+                stage_pointer_release(transaction, pointer_ref, pointer_snapshot, attendance)
+                stage_presence_release(transaction, self.presence_collection, pointer_snapshot, attendance, self.presence_shards)
+                stage_rollup_update(transaction, rollup_ref, rollup_snapshot, attendance, self.rollups_complete_since)
+                return stage_closed_month_invalidation(transaction, self.closed_month_collection, attendance)
+
+            invalidated = await run(self.db.transaction())
+
+        invalidate_cached_month(invalidated)
+        attendance.clear_dirty()
+
+    async def create_attendance(self, attendance: Attendance) -> None:
+        """
+        新しい勤怠記録を作成
+        - ドキュメントIDを自動生成し、attendance.doc_id に保持
+        - 出勤中の記録であれば、ポインタードキュメントも同じバッチで作成する
+        """
+        doc_ref = self.attendance_collection.document()
+        attendance.doc_id = doc_ref.id
+
+        def stage_writes(writer):
+            stage_attendance_set(writer, self.attendance_collection, self.report_collection, attendance)
+            if attendance.end_time is None:
+                writer.set(self._active_pointer_ref(attendance.user_id, attendance.team_id), build_active_pointer(attendance))
+
+        await self._commit_attendance_write(attendance, stage_writes)
+
+    async def create_active_attendance(self, attendance: Attendance) -> bool:
+        """
+        出勤中の勤怠記録をポインタードキュメントと同時に作成（1つのトランザクション）
+        - ポインターが出勤中の記録を指している場合は False を返し、古くなったポインターは上書きする
+        """
+        doc_ref = self.attendance_collection.document()
+        attendance.doc_id = doc_ref.id
+        pointer_ref = self._active_pointer_ref(attendance.user_id, attendance.team_id)
+
+        @async_transactional
+        async def run(transaction):
+            if await self._read_active_attendance(pointer_ref, transaction) is not None:
+                return False
+            transaction.set(pointer_ref, build_active_pointer(attendance))
+            stage_attendance_set(transaction, self.attendance_collection, self.report_collection, attendance)
+            stage_presence_update(transaction, self.presence_collection, attendance, self.presence_shards)
+            return True
+
+        if not await run(self.db.transaction()):
+            attendance.doc_id = None
+            return False
+        attendance.clear_dirty()
+        return True
+
+    async def update_active_attendance(
+        self,
+        user_id: str,
+        team_id: Optional[str],
+        mutate: Callable[[Optional[Attendance]], Attendance]
+    ) -> Attendance:
+        """出勤中の勤怠記録の読み取り・変更・書き込みを1つのトランザクションで実行"""
+        pointer_ref = self._active_pointer_ref(user_id, team_id)
+
+        @async_transactional
+        async def run(transaction):
+            active_attendance = await self._read_active_attendance(pointer_ref, transaction)
+            attendance = mutate(active_attendance)
+
+            # 退勤した場合は、書き込みの前にロールアップも読み取っておく
+            rollup_snapshot = None
+            if attendance.end_time is not None:
+                rollup_ref = self._rollup_ref(rollup_key_of(attendance))
+                rollup_snapshot = await rollup_ref.get(transaction=transaction)
+
+            invalidated = stage_active_attendance_update(
+                transaction,
+                self.attendance_collection,
+                self.report_collection,
+                self.closed_month_collection,
+                pointer_ref,
+                attendance
+            )
+            stage_presence_update(transaction, self.presence_collection, attendance, self.presence_shards)
+            if rollup_snapshot is not None:
+                stage_rollup_update(transaction, rollup_ref, rollup_snapshot, attendance, self.rollups_complete_since)
+            return attendance, invalidated
+
+        attendance, invalidated = await run(self.db.transaction())
+        invalidate_cached_month(invalidated)
+        attendance.clear_dirty()
+        return attendance
+
+    async def get_active_attendance(self, user_id: str, team_id: str = None) -> Optional[Attendance]:
+        """ユーザーのアクティブな（終了していない）勤怠記録をポインタードキュメント経由で取得"""
+        return await self._read_active_attendance(self._active_pointer_ref(user_id, team_id))
+
+    async def _read_active_attendance(self, pointer_ref, transaction=None) -> Optional[Attendance]:
+        """ポインタードキュメントが指す出勤中の勤怠記録を読み取る"""
+        pointer = await pointer_ref.get(transaction=transaction)
+        if not pointer.exists:
+            return None
+
+        doc = await self.attendance_collection.document(pointer.get("attendance_id")).get(transaction=transaction)
+        if not doc.exists:
+            return None
+
+        attendance = self._convert_to_attendance(doc)
+        # 退勤済みの記録を指している場合は出勤中とみなさない
+        if attendance.end_time is not None:
+            return None
+        return attendance
+
+    async def get_active_attendance_page(
+        self,
+        team_id: str = None,
+        cursor: Optional[str] = None,
+        page_size: int = DEFAULT_ACTIVE_PAGE_SIZE,
+        projection: Projection = None
+    ) -> Tuple[List[AttendanceRecord], Optional[str]]:
+        """アクティブな勤怠記録をドキュメントID順に page_size 件ずつ取得（次のページのカーソルも返す）"""
+        query = project_query(build_active_attendance_query(self.attendance_collection, team_id), projection)
+        if cursor is not None:
+            query = query.start_after({"__name__": self.attendance_collection.document(validate_page_cursor(cursor))})
+
+        # 1件多く読み、次のページがあるかを判定する
+        docs = [doc async for doc in query.limit(page_size + 1).stream()]
+        records = [self._convert_to_attendance(doc, projection) for doc in docs[:page_size]]
+        next_cursor = records[-1].doc_id if len(docs) > page_size else None
+        return records, next_cursor
+
+    async def get_all_active_attendances(self, team_id: str = None, projection: Projection = None) -> List[AttendanceRecord]:
+        """すべてのアクティブな（終了していない）勤怠記録を取得（最後のページまで読む）"""
+        active_attendances = []
+        cursor = None
+        while True:
+            records, cursor = await self.get_active_attendance_page(team_id, cursor, projection=projection)
+            active_attendances.extend(records)
+            if cursor is None:
+                return active_attendances
+
+    async def get_active_pointers(self, user_ids: Sequence[str], team_id: str = None) -> Dict[str, Dict[str, Any]]:
+        """複数のユーザーのポインタードキュメントをまとめて取得（user_id -> ポインターの内容）"""
+        pointer_ids = {active_pointer_id(team_id, user_id): user_id for user_id in user_ids}
+        refs = [self.active_attendance_collection.document(pointer_id) for pointer_id in pointer_ids]
+        snapshots = await get_all_documents(self.db, refs)
+        return {pointer_ids[pointer_id]: snapshot.to_dict() for pointer_id, snapshot in snapshots.items()}
+
+    async def get_active_attendances_for_users(
+        self,
+        user_ids: Sequence[str],
+        team_id: str = None,
+        projection: Projection = None
+    ) -> Dict[str, AttendanceRecord]:
+        """複数のユーザーの出勤中の勤怠記録を、ポインター・勤怠記録それぞれの一括読み取りで取得（user_id -> 勤怠記録）"""
+        pointers = await self.get_active_pointers(user_ids, team_id)
+        refs = [self.attendance_collection.document(pointer["attendance_id"]) for pointer in pointers.values()]
+        snapshots = await get_all_documents(self.db, refs, field_paths=list(projection) if projection else None)
+
+        records = {}
+        for user_id, pointer in pointers.items():
+            snapshot = snapshots.get(pointer["attendance_id"])
+            if snapshot is None:
+                continue
+            record = self._convert_to_attendance(snapshot, projection)
+            # 退勤済みの記録を指している場合は出勤中とみなさない
+            if record.end_time is None:
+                records[user_id] = record
+        await self._attach_reports(list(records.values()), projection)
+        return records
+
+    async def get_team_presence(self, team_id: str) -> Dict[str, Dict[str, Any]]:
+        """チームの在席状況（user_id -> 状態）を全シャードの一括読み取り1回で取得"""
+        snapshots = [snapshot async for snapshot in self.db.get_all(self._presence_refs(team_id))]
+        return merge_presence_members(snapshot.to_dict() for snapshot in snapshots if snapshot.exists)
+
+    async def update_attendance(self, attendance: Attendance) -> None:
+        """ドキュメントIDを用いて勤怠記録を更新"""
+        if not attendance.doc_id:
+            raise ValueError("Cannot update attendance without doc_id.")
+
+        # 退勤した場合、ポインタードキュメントがこの記録を指していれば同時に削除する
+        def stage_writes(writer):
+            stage_attendance_set(writer, self.attendance_collection, self.report_collection, attendance)
+
+        await self._commit_attendance_write(attendance, stage_writes)
+
+    async def update_attendance_fields(self, attendance: Attendance) -> None:
+        """読み込み後に変更されたフィールドだけを更新（変更がなければ何も書き込まない）"""
+        if not attendance.doc_id:
+            raise ValueError("Cannot update attendance without doc_id.")
+
+        if not build_field_updates(attendance):
+            return
+
+        def stage_writes(writer):
+            stage_attendance_field_updates(writer, self.attendance_collection, self.report_collection, attendance)
+
+        await self._commit_attendance_write(attendance, stage_writes)
+
+    async def get_complete_rollup(self, user_id: str, year: int, month: int, team_id: str = None) -> Optional[Dict[str, Any]]:
+        """全勤務を含むロールアップを取得（ない場合・不完全な場合はNone）"""
+        doc = await self._rollup_ref(rollup_key(team_id, user_id, year, month)).get()
+        if not doc.exists:
+            return None
+        data = doc.to_dict()
+        return data if data.get("complete") else None
+
+    async def get_rollups_for_users(
+        self,
+        user_ids: Sequence[str],
+        year: int,
+        month: int,
+        team_id: str = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """複数のユーザーの指定月のロールアップを get_all でまとめて取得（user_id -> ロールアップ）"""
+        doc_ids = {rollup_doc_id(rollup_key(team_id, user_id, year, month)): user_id for user_id in user_ids}
+        snapshots = await get_all_documents(self.db, [self.rollup_collection.document(doc_id) for doc_id in doc_ids])
+        return {doc_ids[doc_id]: snapshot.to_dict() for doc_id, snapshot in snapshots.items()}
+
+    async def get_work_descriptions(self, attendance_ids: Sequence[str]) -> Dict[str, str]:
+        """勤怠記録ごとの業務内容を get_all でまとめて取得（attendance_reports にない記録は移行前の勤怠記録から読む）"""
+        fields = ["work_description"]
+        reports = await get_all_documents(self.db, [self.report_collection.document(doc_id) for doc_id in attendance_ids], fields)
+        missing = [doc_id for doc_id in attendance_ids if doc_id not in reports]
+        legacy = await get_all_documents(self.db, [self.attendance_collection.document(doc_id) for doc_id in missing], fields)
+        return collect_work_descriptions(legacy, reports)
+
+    async def get_closed_month_summary(self, key: MonthKey) -> ClosedMonthSnapshot:
+        """保存済みの締め済みの月の月次サマリー（encode_summary の形式）と、その月のバージョンを取得"""
+        return closed_month_snapshot_of(await self.closed_month_collection.document(closed_month_doc_id(key)).get())
+
+    async def save_closed_month_summary(self, key: MonthKey, data: Dict[str, Any], version: int) -> bool:
+        """締め済みの月の月次サマリーを、トランザクションで読み直したバージョンが version のままの場合だけ保存"""
+        summary_ref = self.closed_month_collection.document(closed_month_doc_id(key))
+
+        @async_transactional
+        async def run(transaction):
+            if closed_month_snapshot_of(await summary_ref.get(transaction=transaction)).version != version:
+                return False
+            transaction.set(summary_ref, {"version": version, "summary": data})
+            return True
+
+        return await run(self.db.transaction())
+
+    async def iter_attendance_by_period(
+        self,
+        user_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        team_id: str = None,
+        page_size: Optional[int] = None,
+        projection: Projection = None
+    ) -> AsyncIterator[AttendanceRecord]:
+        """指定期間の勤怠記録を page_size 件ずつ読み込みながら、出勤時刻順に1件ずつ返す"""
+        page_size = page_size or self.page_size
+        queries = build_period_queries(
+            self.attendance_collection, user_id, start_date, end_date, team_id, self.read_legacy_timestamps
+        )
+        streams = [self._stream_query(project_query(query, projection), page_size, projection) for query in queries]
+        async for record in merge_period_streams(streams):
+            if in_period(record, start_date, end_date):
+                yield record
+
+    async def iter_team_attendance_by_period(
+        self,
+        team_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        page_size: Optional[int] = None,
+        projection: Projection = None
+    ) -> AsyncIterator[AttendanceRecord]:
+        """ワークスペース全員の指定期間の勤怠記録を page_size 件ずつ読み込みながら、出勤時刻順に1件ずつ返す"""
+        page_size = page_size or self.page_size
+        queries = build_team_period_queries(
+            self.attendance_collection, team_id, start_date, end_date, self.read_legacy_timestamps
+        )
+        streams = [self._stream_query(project_query(query, projection), page_size, projection) for query in queries]
+        async for record in merge_period_streams(streams):
+            if in_period(record, start_date, end_date):
+                yield record
+
+    async def get_team_attendance_by_period(
+        self,
+        team_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        page_size: Optional[int] = None,
+        projection: Projection = None
+    ) -> List[AttendanceRecord]:
+        """ワークスペース全員の指定期間の勤怠記録を出勤時刻順のリストで取得"""
+        try:
+            return [
+                record async for record in self.iter_team_attendance_by_period(
+                    team_id, start_date, end_date, page_size, projection
+                )
+            ]
+        except Exception as e:
+            print(f"Error retrieving team attendance records: {str(e)}")
+            raise
+
+    async def _attach_reports(self, records: List[AttendanceRecord], projection: Projection) -> None:
+        """projection に業務報告のフィールドが含まれる場合だけ、attendance_reports から一括で読み込んで設定"""
+        fields = report_fields_in(projection)
+        if not fields or not records:
+            return
+        refs = [self.report_collection.document(record.doc_id) for record in records]
+        snapshots = await get_all_documents(self.db, refs, field_paths=list(fields))
+        attach_reports(records, {doc_id: snapshot.to_dict() for doc_id, snapshot in snapshots.items()}, fields)
+
+    async def _stream_query(self, query, page_size: int, projection: Projection = None) -> AsyncIterator[AttendanceRecord]:
+        """
+        クエリの結果を page_size 件ずつ読み込みながら1件ずつ返す
+        - projection に業務報告のフィールドが含まれる場合は、ページごとに attendance_reports も一括で読み込む
+        """
+        query = query.limit(page_size)
+        last_doc = None
+        while True:
+            page = query.start_after(last_doc) if last_doc else query
+            docs = [doc async for doc in page.stream()]
+            records = [self._convert_to_attendance(doc, projection) for doc in docs]
+            await self._attach_reports(records, projection)
+            for record in records:
+                yield record
+
+            # 最後のページ
+            if len(docs) < page_size:
+                return
+            last_doc = docs[-1]
+
+    async def get_attendance_by_period(
+        self,
+        user_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        team_id: str = None,
+        page_size: Optional[int] = None,
+        projection: Projection = None
+    ) -> List[AttendanceRecord]:
+        """指定期間の勤怠記録を出勤時刻順のリストで取得（iter_attendance_by_period のラッパー）"""
+        try:
+            return [
+                record async for record in self.iter_attendance_by_period(
+                    user_id, start_date, end_date, team_id, page_size, projection
+                )
+            ]
+        except Exception as e:
+            print(f"Error retrieving attendance records: {str(e)}")
+            raise
@@ -0,0 +1,385 @@
+import copy
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Protocol, Sequence, Tuple
+
+from src.models.attendance import Attendance, AttendanceRecord, Projection
+from src.repositories.closed_month_cache import ClosedMonthSnapshot, MonthKey, get_closed_month_cache, month_key
+from src.utils.time_utils import is_closed_month
+
+# 期間検索で1回のクエリで読み込む件数
+DEFAULT_PAGE_SIZE = 300
+# /allstatus の1ページに表示するアクティブな勤怠記録の数
+DEFAULT_ACTIVE_PAGE_SIZE = 60
+# FirestoreのドキュメントIDの最大長（バイト）
+MAX_DOCUMENT_ID_BYTES = 1500
+
+def active_pointer_id(team_id: Optional[str], user_id: str) -> str:
+    """active_attendance コレクションのドキュメントID（ワークスペース×ユーザーで一意）"""
+    return f"{team_id or ''}-{user_id}"
+
+def validate_page_cursor(cursor: Any) -> str:
+    """
+    get_active_attendance_page のカーソル（前のページの最後のドキュメントID）を検証（正しくなければ ValueError）
+    - ボタンの value から戻ってきた値を、そのままドキュメントのパスとして使わないようにする
+    """
+    if (
+        not isinstance(cursor, str)
+        or not cursor
+        or "/" in cursor
+        or cursor in (".", "..")
+        or (cursor.startswith("__") and cursor.endswith("__"))
+        or len(cursor.encode("utf-8")) > MAX_DOCUMENT_ID_BYTES
+    ):
+        raise ValueError(f"Invalid page cursor: {cursor!r}")
+    return cursor
+
+def in_period(record: Attendance, start_date: datetime, end_date: datetime) -> bool:
+    """
+    出勤時刻が期間内かどうか
+    - 文字列の範囲比較はUTCオフセットが異なる記録を正しく判定できないため、日時で判定し直す
+    """
+    return start_date <= record.start_time <= end_date
+
+def closed_month_of(attendance: Attendance) -> Optional[MonthKey]:
+    """記録の出勤日が締め済みの月であれば、その月のキーを返す"""
+    start_time = attendance.start_time
+    if start_time is None or not is_closed_month(start_time.year, start_time.month):
+        return None
+    return month_key(attendance.team_id, attendance.user_id, start_time.year, start_time.month)
+
+def invalidate_cached_month(key: Optional[MonthKey]) -> None:
+    """書き込み後にプロセス内の月次サマリーのキャッシュを無効化"""
+    if key is not None:
+        get_closed_month_cache().invalidate(key)
+
+def apply_field_updates(data: Dict[str, Any], attendance: Attendance) -> Dict[str, Any]:
+    """
+    保存済みの記録（to_dict の形式）に、読み込み後に変更されたフィールドだけを反映
+    - 追加された休憩だけの場合は break_periods に追記する（Firestoreの ArrayUnion と同じ）
+    """
+    updated = copy.deepcopy(data)
+    current = attendance.to_dict()
+    for name in attendance.dirty_fields:
+        updated[name] = copy.deepcopy(current[name])
+    if "break_periods" not in attendance.dirty_fields and attendance.appended_breaks:
+        updated.setdefault("break_periods", []).extend(period.to_dict() for period in attendance.appended_breaks)
+    return updated
+
+def build_attendance_stats(records: Iterable[AttendanceRecord]) -> Dict[str, Any]:
+    """勤怠記録から期間の勤怠統計（合計・日ごとの勤務時間と休憩時間・件数）を集計"""
+    total_working_time = 0
+    total_break_time = 0
+    daily_stats = {}
+    record_count = 0
+
+    for record in records:
+        record_count += 1
+        date_key = record.start_time.date().isoformat()
+
+        if date_key not in daily_stats:
+            daily_stats[date_key] = {
+                'working_time': 0,
+                'break_time': 0,
+                'attendance_count': 0
+            }
+
+        working_time = record.get_working_time()
+        break_time = record.get_total_break_time()
+        daily_stats[date_key]['working_time'] += working_time
+        daily_stats[date_key]['break_time'] += break_time
+        daily_stats[date_key]['attendance_count'] += 1
+
+        total_working_time += working_time
+        total_break_time += break_time
+
+    return {
+        'total_working_time': total_working_time,
+        'total_break_time': total_break_time,
+        'daily_stats': daily_stats,
+        'record_count': record_count
+    }
+
+class AttendanceRepository(Protocol):
+    """
+    サービス・コマンドが使う勤怠記録のストレージのインターフェース
+    - Firestore（FirestoreRepository）、メモリ（InMemoryRepository）、SQLite（SqliteRepository）が実装する
+    - どの実装を使うかは config.yaml の storage.backend で選ぶ
+    """
+
+    def create_attendance(self, attendance: Attendance) -> None:
+        """新しい勤怠記録を作成し、attendance.doc_id に採番したIDを保持"""
+        ...
+
+    def create_active_attendance(self, attendance: Attendance) -> bool:
+        """
+        出勤中の勤怠記録を作成（同じユーザーの出勤中の記録が既にあれば何も書き込まずに False）
+        - ポインターが退勤済み・削除済みの記録を指している（古くなっている）場合は、出勤中ではないものとして上書きする
+        """
+        ...
+
+    def update_active_attendance(
+        self,
+        user_id: str,
+        team_id: Optional[str],
+        mutate: Callable[[Optional[Attendance]], Attendance]
+    ) -> Attendance:
+        """出勤中の勤怠記録の読み取り・変更・書き込みを不可分に実行"""
+        ...
+
+    def get_active_attendance(self, user_id: str, team_id: str = None) -> Optional[Attendance]:
+        """ユーザーの出勤中の勤怠記録を取得"""
+        ...
+
+    def get_active_attendance_page(
+        self,
+        team_id: str = None,
+        cursor: Optional[str] = None,
+        page_size: int = DEFAULT_ACTIVE_PAGE_SIZE,
+        projection: Projection = None
+    ) -> Tuple[List[AttendanceRecord], Optional[str]]:
+        """
+        アクティブな勤怠記録を1ページ分取得（次のページのカーソルも返す）
+        - projection（TIMING_FIELDS など）を指定した場合は、そのフィールドだけを読み込んだ AttendanceTiming を返す
+        """
+        ...
+
+    def get_all_active_attendances(self, team_id: str = None, projection: Projection = None) -> List[AttendanceRecord]:
+        """すべてのアクティブな勤怠記録を取得"""
+        ...
+
+    def get_active_attendances_for_users(
+        self,
+        user_ids: Sequence[str],
+        team_id: str = None,
+        projection: Projection = None
+    ) -> Dict[str, AttendanceRecord]:
+        """
+        複数のユーザーの出勤中の勤怠記録をまとめて取得（user_id -> 勤怠記録。出勤中でないユーザーは含まない）
+        - ユーザーごとに get_active_attendance を呼ぶ代わりに使う（Firestore では get_all を分割して並列に読む）
+        """
+        ...
+
+    def get_team_presence(self, team_id: str) -> Dict[str, Dict[str, Any]]:
+        """チームの在席状況（user_id -> presence_entry の形式）を取得"""
+        ...
+
+    def update_attendance(self, attendance: Attendance) -> None:
+        """勤怠記録全体を上書き"""
+        ...
+
+    def update_attendance_fields(self, attendance: Attendance) -> None:
+        """読み込み後に変更されたフィールドだけを更新"""
+        ...
+
+    def get_complete_rollup(self, user_id: str, year: int, month: int, team_id: str = None) -> Optional[Dict[str, Any]]:
+        """全勤務を含むロールアップを取得（ない場合・不完全な場合はNone）"""
+        ...
+
+    def get_rollups_for_users(
+        self,
+        user_ids: Sequence[str],
+        year: int,
+        month: int,
+        team_id: str = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        複数のユーザーの指定月のロールアップをまとめて取得（user_id -> ロールアップ。ないユーザーは含まない）
+        - 不完全なロールアップも返すため、必要に応じて "complete" を確認すること
+        """
+        ...
+
+    def get_work_descriptions(self, attendance_ids: Sequence[str]) -> Dict[str, str]:
+        """
+        勤怠記録ごとの業務内容をまとめて取得（doc_id -> 業務内容。記載のない記録は含まない）
+        - ロールアップには業務内容を保存しないため、ロールアップから作る月次サマリーで使う
+        """
+        ...
+
+    def get_closed_month_summary(self, key: MonthKey) -> ClosedMonthSnapshot:
+        """
+        保存済みの締め済みの月の月次サマリー（encode_summary の形式。なければNone）と、その月のバージョンを取得
+        - 締め済みの月の記録を変更する書き込みは、同じバッチ・トランザクションでサマリーを削除してバージョンを増やすこと
+        """
+        ...
+
+    def save_closed_month_summary(self, key: MonthKey, data: Dict[str, Any], version: int) -> bool:
+        """
+        締め済みの月の月次サマリー（encode_summary の形式）を、バージョンが集計前に読んだ version のままの場合だけ保存
+        - 集計中に記録が変更された場合は保存せずFalse（古い集計を期限なしで残さない）
+        """
+        ...
+
+    def iter_attendance_by_period(
+        self,
+        user_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        team_id: str = None,
+        page_size: Optional[int] = None,
+        projection: Projection = None
+    ) -> Iterator[AttendanceRecord]:
+        """
+        指定期間の勤怠記録を出勤時刻順に1件ずつ返す
+        - projection（TIMING_FIELDS・SUMMARY_FIELDS など）を指定した場合は、そのフィールドだけを読み込んだ AttendanceTiming を返す
+        - 業務報告（work_description・work_progress）は projection に含めた場合だけ読み込む（それ以外では None になることがある）
+        """
+        ...
+
+    def get_attendance_by_period(
+        self,
+        user_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        team_id: str = None,
+        page_size: Optional[int] = None,
+        projection: Projection = None
+    ) -> List[AttendanceRecord]:
+        """指定期間の勤怠記録をリストで取得"""
+        ...
+
+    def iter_team_attendance_by_period(
+        self,
+        team_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        page_size: Optional[int] = None,
+        projection: Projection = None
+    ) -> Iterator[AttendanceRecord]:
+        """ワークスペース全員の指定期間の勤怠記録を出勤時刻順に1件ずつ返す"""
+        ...
+
+    def get_team_attendance_by_period(
+        self,
+        team_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        page_size: Optional[int] = None,
+        projection: Projection = None
+    ) -> List[AttendanceRecord]:
+        """ワークスペース全員の指定期間の勤怠記録をリストで取得"""
+        ...
+
+    def get_attendance_stats(
+        self,
+        user_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        team_id: str = None
+    ) -> Dict[str, Any]:
+        """指定期間の勤怠統計を取得"""
+        ...
+
+class AsyncAttendanceRepository(Protocol):
+    """
+    AttendanceRepository の非同期版
+    - Firestore（AsyncFirestoreRepository）が実装し、それ以外は AsyncRepositoryAdapter で同期版を包む
+    """
+
+    async def create_attendance(self, attendance: Attendance) -> None:
+        ...
+
+    async def create_active_attendance(self, attendance: Attendance) -> bool:
+        ...
+
+    async def update_active_attendance(
+        self,
+        user_id: str,
+        team_id: Optional[str],
+        mutate: Callable[[Optional[Attendance]], Attendance]
+    ) -> Attendance:
+        ...
+
+    async def get_active_attendance(self, user_id: str, team_id: str = None) -> Optional[Attendance]:
+        ...
+
+    async def get_active_attendance_page(
+        self,
+        team_id: str = None,
+        cursor: Optional[str] = None,
+        page_size: int = DEFAULT_ACTIVE_PAGE_SIZE,
+        projection: Projection = None
+    ) -> Tuple[List[AttendanceRecord], Optional[str]]:
+        ...
+
+    async def get_all_active_attendances(self, team_id: str = None, projection: Projection = None) -> List[AttendanceRecord]:
+        ...
+
+    async def get_active_attendances_for_users(
+        self,
+        user_ids: Sequence[str],
+        team_id: str = None,
+        projection: Projection = None
+    ) -> Dict[str, AttendanceRecord]:
+        ...
+
+    async def get_team_presence(self, team_id: str) -> Dict[str, Dict[str, Any]]:
+        ...
+
+    async def update_attendance(self, attendance: Attendance) -> None:
+        ...
+
+    async def update_attendance_fields(self, attendance: Attendance) -> None:
+        ...
+
+    async def get_complete_rollup(self, user_id: str, year: int, month: int, team_id: str = None) -> Optional[Dict[str, Any]]:
+        ...
+
+    async def get_rollups_for_users(
+        self,
+        user_ids: Sequence[str],
+        year: int,
+        month: int,
+        team_id: str = None
+    ) -> Dict[str, Dict[str, Any]]:
+        ...
+
+    async def get_work_descriptions(self, attendance_ids: Sequence[str]) -> Dict[str, str]:
+        ...
+
+    async def get_closed_month_summary(self, key: MonthKey) -> ClosedMonthSnapshot:
+        ...
+
+    async def save_closed_month_summary(self, key: MonthKey, data: Dict[str, Any], version: int) -> bool:
+        ...
+
+    def iter_attendance_by_period(
+        self,
+        user_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        team_id: str = None,
+        page_size: Optional[int] = None,
+        projection: Projection = None
+    ) -> AsyncIterator[AttendanceRecord]:
+        ...
+
+    async def get_attendance_by_period(
+        self,
+        user_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        team_id: str = None,
+        page_size: Optional[int] = None,
+        projection: Projection = None
+    ) -> List[AttendanceRecord]:
+        ...
+
+    def iter_team_attendance_by_period(
+        self,
+        team_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        page_size: Optional[int] = None,
+        projection: Projection = None
+    ) -> AsyncIterator[AttendanceRecord]:
+        ...
+
+    async def get_team_attendance_by_period(
+        self,
+        team_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        page_size: Optional[int] = None,
+        projection: Projection = None
+    ) -> List[AttendanceRecord]:
+        ...
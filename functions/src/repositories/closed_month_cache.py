@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+# (team_id, user_id, year, month)
+MonthKey = Tuple[str, str, int, int]
+
+class ClosedMonthSnapshot(NamedTuple):
+    """
+    保存済みの月次サマリーと、その月のバージョン
+    - バージョンは締め済みの月の記録を変更するたびに増えるため、集計前に読んだ値を保存時の前提条件に使う
+    """
+    summary: Optional[Dict[str, Any]]
+    version: int
+
+def month_key(team_id: Optional[str], user_id: str, year: int, month: int) -> MonthKey:
+    return (team_id or "", user_id, year, month)
+
+def closed_month_doc_id(key: MonthKey) -> str:
+    """closed_month_summaries コレクションのドキュメントID"""
+    team_id, user_id, year, month = key
+    return f"{team_id}-{user_id}-{year:04d}-{month:02d}"
+
+def encode_summary(summary: Dict[str, Any]) -> Dict[str, Any]:
+    """月次サマリーをFirestoreに保存できる形式に変換（mapのキーは文字列にする）"""
+    return {
+        'daily_records': {
+            day.isoformat(): dict(record) for day, record in summary['daily_records'].items()
+        },
+        'weekly_totals': {str(week): total for week, total in summary['weekly_totals'].items()},
+        'total_working_time': summary['total_working_time'],
+        'year': summary['year'],
+        'month': summary['month']
+    }
+
+def decode_summary(data: Dict[str, Any]) -> Dict[str, Any]:
+    """encode_summary の逆変換"""
+    return {
+        'daily_records': {
+            date.fromisoformat(day): {
+                **record,
+                'work_description': list(record.get('work_description', []))
+            }
+            for day, record in data['daily_records'].items()
+        },
+        'weekly_totals': {int(week): total for week, total in data['weekly_totals'].items()},
+        'total_working_time': data['total_working_time'],
+        'year': data['year'],
+        'month': data['month']
+    }
+
+class ClosedMonthCache:
+    """
+    締め済みの月の月次サマリーを保持するプロセス内のLRUキャッシュ
+
+    - 呼び出し元が結果を書き換えても影響しないよう、エンコード済みの形で保持して取得のたびに復元する
+    - 同じインスタンスでの記録の変更は invalidate で即座に反映し、他インスタンスでの変更はTTLで反映する
+    - 集計中に invalidate された月は、generation を渡した put で古い集計を保持しない
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: int = 600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[MonthKey, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        # 月ごとの invalidate の回数（締め済みの月の記録の変更はまれなため、増え続けても小さい）
+        self._generations: Dict[MonthKey, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: MonthKey) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, encoded = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return decode_summary(encoded)
+
+    def generation(self, key: MonthKey) -> int:
+        """集計を始める前に取得し、put に渡す"""
+        with self._lock:
+            return self._generations.get(key, 0)
+
+    def put(self, key: MonthKey, summary: Dict[str, Any], generation: Optional[int] = None) -> None:
+        """サマリーを保持（generation を渡した場合、それ以降に invalidate されていれば保持しない）"""
+        encoded = encode_summary(summary)
+        with self._lock:
+            if generation is not None and self._generations.get(key, 0) != generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, encoded)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: MonthKey) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+_closed_month_cache: Optional[ClosedMonthCache] = None
+_closed_month_cache_lock = threading.Lock()
+
+def get_closed_month_cache() -> ClosedMonthCache:
+    """プロセス内で共有する ClosedMonthCache を取得"""
+    global _closed_month_cache
+    if _closed_month_cache is None:
+        with _closed_month_cache_lock:
+            if _closed_month_cache is None:
+                _closed_month_cache = ClosedMonthCache()
+    return _closed_month_cache
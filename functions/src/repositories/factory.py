@@ -0,0 +1,68 @@
+from src.config import AppConfig
+from src.repositories.base import AsyncAttendanceRepository, AttendanceRepository
+
+# storage.backend に指定できる値
+BACKEND_FIRESTORE = "firestore"
+BACKEND_MEMORY = "memory"
+BACKEND_SQLITE = "sqlite"
+BACKENDS = (BACKEND_FIRESTORE, BACKEND_MEMORY, BACKEND_SQLITE)
+
+def _check_backend(backend: str) -> str:
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown storage backend: {backend} (expected one of {', '.join(BACKENDS)})")
+    return backend
+
+def create_repository(config: AppConfig) -> AttendanceRepository:
+    """
+    config.yaml の storage.backend に応じた勤怠記録のストレージを作成
+    - 使わないバックエンドのモジュール（Firebase Admin など）は読み込まない
+    """
+    storage = config.storage
+    backend = _check_backend(storage.backend)
+
+    if backend == BACKEND_MEMORY:
+        from src.repositories.memory_repository import InMemoryRepository
+        return InMemoryRepository(
+            page_size=storage.page_size,
+            rollups_complete_since=storage.rollups_complete_since
+        )
+
+    if backend == BACKEND_SQLITE:
+        from src.repositories.sqlite_repository import SqliteRepository
+        return SqliteRepository(
+            storage.sqlite_path,
+            page_size=storage.page_size,
+            rollups_complete_since=storage.rollups_complete_since
+        )
+
+    from src.repositories.firestore_repository import FirestoreRepository
+    return FirestoreRepository(
+        project_id=config.firebase.project_id,
+        credentials_path=config.firebase.credentials_path,
+        read_legacy_timestamps=storage.read_legacy_timestamps,
+        page_size=storage.page_size,
+        rollups_complete_since=storage.rollups_complete_since,
+        presence_shards=storage.presence_shards,
+        channel_options=config.firebase.channel_options
+    )
+
+def create_async_repository(config: AppConfig) -> AsyncAttendanceRepository:
+    """
+    create_repository の非同期版
+    - Firestore は AsyncClient を使う実装、それ以外は同期版を AsyncRepositoryAdapter で包む
+    """
+    storage = config.storage
+    if _check_backend(storage.backend) != BACKEND_FIRESTORE:
+        from src.repositories.async_adapter import AsyncRepositoryAdapter
+        return AsyncRepositoryAdapter(create_repository(config))
+
+    from src.repositories.async_firestore_repository import AsyncFirestoreRepository
+    return AsyncFirestoreRepository(
+        project_id=config.firebase.project_id,
+        credentials_path=config.firebase.credentials_path,
+        read_legacy_timestamps=storage.read_legacy_timestamps,
+        page_size=storage.page_size,
+        rollups_complete_since=storage.rollups_complete_since,
+        presence_shards=storage.presence_shards,
+        channel_options=config.firebase.channel_options
+    )
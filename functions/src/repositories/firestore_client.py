@@ -0,0 +1,187 @@
+import threading
+import time
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import firebase_admin
+from firebase_admin import credentials, firestore, firestore_async
+
+# FirestoreのgRPCチャネルのオプション（config.yaml の firebase.channel_options で上書きする）
+# キーは "grpc." を省略したgRPCのチャネル引数名
+DEFAULT_CHANNEL_OPTIONS = {
+    # アイドル中も接続を維持するためのPINGの間隔と、応答を待つ時間
+    "keepalive_time_ms": 30000,
+    "keepalive_timeout_ms": 10000,
+    # google-cloud-firestore の既定と同じく、メッセージサイズの上限をなくす（大きなバッチ・get_all用）
+    "max_send_message_length": -1,
+    "max_receive_message_length": -1,
+}
+
+def build_channel_options(channel_options: Optional[Mapping[str, Any]] = None) -> List[Tuple[str, Any]]:
+    """既定値に channel_options を反映したgRPCのチャネル引数"""
+    options = dict(DEFAULT_CHANNEL_OPTIONS)
+    options.update(channel_options or {})
+    return [
+        (name if name.startswith("grpc.") else f"grpc.{name}", value)
+        for name, value in options.items()
+    ]
+
+class _ChannelStatus:
+    """クライアントが使うgRPCチャネルと、接続状態の変化の記録"""
+
+    def __init__(self, kind: str, channel, options: List[Tuple[str, Any]]):
+        self.kind = kind
+        self.channel = channel
+        self.options = options
+        self.created_at = time.time()
+        self.state: Optional[str] = None
+        self.state_changed_at: Optional[float] = None
+        self.transitions = 0
+        if kind == "sync":
+            # 同期版のチャネルは接続状態の変化をコールバックで受け取る（接続は開始しない）
+            channel.subscribe(self._on_state_change, try_to_connect=False)
+
+    def _on_state_change(self, connectivity) -> None:
+        self.state = connectivity.name
+        self.state_changed_at = time.time()
+        self.transitions += 1
+
+    def current_state(self) -> Optional[str]:
+        if self.kind == "async":
+            return self.channel.get_state(try_to_connect=False).name
+        return self.state
+
+    def report(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            "state": self.current_state(),
+            "age_s": round(now - self.created_at, 1),
+            "since_state_change_s": round(now - self.state_changed_at, 1) if self.state_changed_at else None,
+            "transitions": self.transitions,
+            "options": dict(self.options)
+        }
+
+class FirestoreClientFactory:
+    """
+    プロセス全体で1つの Firebase アプリと Firestore クライアント（同期版・非同期版それぞれ1つのgRPCチャネル）を保持する
+
+    - 認証情報ファイルは Firebase アプリの初期化時に1度だけ読み込む（初期化済みのアプリがあればそれを使う）
+    - クライアントは最初に要求した時点の channel_options でチャネルを作り、以降のリポジトリ・OAuthのストアで共有する
+    - チャネルの接続状態は health() で取得でき、ディープウォームアップの結果に含める
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._app = None
+        self._client = None
+        self._async_client = None
+        self._channels: Dict[str, _ChannelStatus] = {}
+
+    def initialize_app(self, project_id: Optional[str] = None, credentials_path: Optional[str] = None):
+        """
+        Firebase アプリを初期化（1プロセスにつき1回）
+        - credentials_path を省略した場合はアプリケーションのデフォルト認証情報を使う
+        """
+        if self._app is not None:
+            return self._app
+
+        with self._lock:
+            if self._app is None:
+                if firebase_admin._apps:
+                    self._app = firebase_admin.get_app()
+                else:
+                    cred = credentials.Certificate(credentials_path) if credentials_path else None
+                    options = {'projectId': project_id} if project_id else None
+                    self._app = firebase_admin.initialize_app(cred, options)
+            return self._app
+
+    def client(
+        self,
+        project_id: Optional[str] = None,
+        credentials_path: Optional[str] = None,
+        channel_options: Optional[Mapping[str, Any]] = None
+    ) -> firestore.Client:
+        """同期版の Firestore クライアントを取得（未作成なら作成する）"""
+        if self._client is not None:
+            return self._client
+
+        with self._lock:
+            if self._client is None:
+                app = self.initialize_app(project_id, credentials_path)
+                client = firestore.client(app)
+                self._open_channel(client, "sync", channel_options)
+                self._client = client
+            return self._client
+
+    def async_client(
+        self,
+        project_id: Optional[str] = None,
+        credentials_path: Optional[str] = None,
+        channel_options: Optional[Mapping[str, Any]] = None
+    ):
+        """非同期版の Firestore クライアント（AsyncClient）を取得（未作成なら作成する。チャネルを作るためイベントループ内で呼ぶこと）"""
+        if self._async_client is not None:
+            return self._async_client
+
+        with self._lock:
+            if self._async_client is None:
+                app = self.initialize_app(project_id, credentials_path)
+                client = firestore_async.client(app)
+                self._open_channel(client, "async", channel_options)
+                self._async_client = client
+            return self._async_client
+
+    def _open_channel(self, client, kind: str, channel_options: Optional[Mapping[str, Any]]) -> None:
+        """
+        channel_options でgRPCチャネルを作成し、クライアントに設定する
+        - google-cloud-firestore はチャネル引数を指定する方法を公開していないため、
+          クライアントが最初のリクエストで行うチャネルの作成（_firestore_api_helper）をここで同じように行う
+          （requirements.txt で確認済みのマイナーバージョンに固定している）
+        - ライブラリの内部の属性が見つからない場合は何も設定せず、ライブラリが最初のリクエストで作る既定のチャネルを使う
+        - エミュレーター接続時はライブラリのチャネルをそのまま使う
+        """
+        try:
+            if client._emulator_host is not None or client._firestore_api_internal is not None:
+                return
+
+            if kind == "async":
+                from google.cloud.firestore_v1 import async_client as client_module
+                transport_class = client_module.firestore_grpc_transport.FirestoreGrpcAsyncIOTransport
+                api_class = client_module.firestore_client.FirestoreAsyncClient
+            else:
+                from google.cloud.firestore_v1 import client as client_module
+                transport_class = client_module.firestore_grpc_transport.FirestoreGrpcTransport
+                api_class = client_module.firestore_client.FirestoreClient
+
+            options = build_channel_options(channel_options)
+            channel = transport_class.create_channel(client._target, credentials=client._credentials, options=options)
+            transport = transport_class(host=client._target, channel=channel)
+            api = api_class(transport=transport, client_options=client._client_options)
+            client_info = client._client_info
+        except AttributeError as e:
+            print(f"Firestore channel options not applied, using the default channel: {str(e)}")
+            return
+
+        # 作成に成功した場合だけクライアントに設定する（途中で失敗しても既定のチャネルで動作する）
+        client._transport = transport
+        client._firestore_api_internal = api
+        client_module.firestore_client._client_info = client_info
+        self._channels[kind] = _ChannelStatus(kind, channel, options)
+
+    def warm_up(self) -> Dict[str, Any]:
+        """同期版のクライアントで軽量な読み取りを行ってチャネルを確立し、接続状態を返す"""
+        self.client().collection('slack_bots').limit(1).get()
+        return self.health()
+
+    def health(self) -> Dict[str, Any]:
+        """Firebase アプリ・クライアント・チャネルの状態（エミュレーター接続時はチャネルの情報なし）"""
+        return {
+            "app_initialized": self._app is not None,
+            "clients": [kind for kind, client in (("sync", self._client), ("async", self._async_client)) if client is not None],
+            "channels": {kind: status.report() for kind, status in self._channels.items()}
+        }
+
+_factory = FirestoreClientFactory()
+
+def get_firestore_client_factory() -> FirestoreClientFactory:
+    """プロセス共通の Firestore クライアントのファクトリーを取得"""
+    return _factory
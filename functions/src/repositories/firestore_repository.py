@@ -1,92 +1,627 @@
-import firebase_admin
-from firebase_admin import credentials, firestore
-from datetime import datetime
-from typing import Optional, List, Dict, Any
+from firebase_admin import firestore
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time, timedelta
+from typing import Callable, Iterator, Optional, List, Dict, Any, Sequence, Tuple
 from google.cloud.firestore_v1.base_query import FieldFilter
 
-from src.models.attendance import Attendance  # 絶対パスに修正
-from src.utils.time_utils import get_current_time
+from src.models.attendance import (  # 絶対パスに修正
+    SUMMARY_FIELDS,
+    TIMING_FIELDS,
+    Attendance,
+    AttendanceRecord,
+    Projection,
+    record_from_dict
+)
+from src.repositories.base import (
+    DEFAULT_ACTIVE_PAGE_SIZE,
+    DEFAULT_PAGE_SIZE,
+    active_pointer_id,
+    build_attendance_stats,
+    closed_month_of,
+    in_period,
+    invalidate_cached_month,
+    validate_page_cursor
+)
+from src.repositories.closed_month_cache import ClosedMonthSnapshot, MonthKey, closed_month_doc_id, month_key
+from src.repositories.firestore_client import get_firestore_client_factory
+from src.repositories.presence import (
+    DEFAULT_PRESENCE_SHARDS,
+    build_presence_shards,
+    merge_presence_members,
+    presence_doc_id,
+    presence_entry,
+    presence_shard
+)
+from src.repositories.reports import attach_reports, build_report_document, report_fields_in, split_report_fields
+from src.repositories.rollups import (
+    RollupKey,
+    apply_shift,
+    rebuild_rollup,
+    rollup_doc_id,
+    rollup_key,
+    rollup_key_of
+)
+from src.utils.time_utils import get_current_time, get_end_of_month, get_start_of_month
+
+# 1回の get_all（BatchGetDocuments）で読み込むドキュメントの数
+GET_ALL_CHUNK_SIZE = 100
+# 分割した get_all を並列に実行する数
+GET_ALL_WORKERS = 8
+
+def chunked(items: Sequence[Any], size: int) -> List[Sequence[Any]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+def get_all_documents(
+    db,
+    refs: Sequence[Any],
+    field_paths: Optional[List[str]] = None,
+    chunk_size: int = GET_ALL_CHUNK_SIZE,
+    workers: int = GET_ALL_WORKERS
+) -> Dict[str, Any]:
+    """
+    複数のドキュメントをまとめて読み込み、存在するものだけを ドキュメントID -> スナップショット で返す
+    - chunk_size 件ずつの get_all に分け、複数のチャンクは workers 並列で読み込む
+    - refs は同じコレクションのドキュメントであること（ドキュメントIDをキーにするため）
+    """
+    def read(chunk):
+        return [snapshot for snapshot in db.get_all(chunk, field_paths=field_paths) if snapshot.exists]
+
+    chunks = chunked(refs, chunk_size)
+    if len(chunks) <= 1:
+        pages = [read(chunk) for chunk in chunks]
+    else:
+        with ThreadPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+            pages = list(executor.map(read, chunks))
+    return {snapshot.id: snapshot for page in pages for snapshot in page}
+
+def project_query(query, projection: Projection):
+    """projection を指定した場合は select で読み込むフィールドを絞る（業務報告などを転送・デコードしない）"""
+    return query.select(list(projection)) if projection else query
+
+def build_active_pointer(attendance: Attendance) -> Dict[str, Any]:
+    """出勤中の勤怠記録を指すポインタードキュメントの内容"""
+    return {
+        "attendance_id": attendance.doc_id,
+        "user_id": attendance.user_id,
+        "team_id": attendance.team_id,
+        "start_time": attendance.start_time
+    }
+
+def build_range_queries(
+    base_query,
+    start_date: datetime,
+    end_date: datetime,
+    read_legacy_timestamps: bool = True
+) -> List[Any]:
+    """
+    base_query に出勤時刻の範囲条件をつけたクエリを作成
+    - タイムスタンプ型と文字列型は別々に並び替えられるため、移行前のISO-8601文字列の記録は別のクエリで検索する
+    """
+    bounds = [(start_date, end_date)]
+    if read_legacy_timestamps:
+        bounds.append((start_date.isoformat(), end_date.isoformat()))
+
+    queries = []
+    for lower, upper in bounds:
+        query = (
+            base_query
+            .where(filter=FieldFilter("start_time", ">=", lower))
+            .where(filter=FieldFilter("start_time", "<=", upper))
+        )
+        queries.append(query.order_by("start_time"))
+    return queries
+
+def build_period_queries(
+    attendance_collection,
+    user_id: str,
+    start_date: datetime,
+    end_date: datetime,
+    team_id: Optional[str] = None,
+    read_legacy_timestamps: bool = True
+) -> List[Any]:
+    """ユーザーの期間検索のクエリを作成"""
+    query = attendance_collection.where(filter=FieldFilter("user_id", "==", user_id))
+    # team_idが指定されている場合はワークスペースでフィルタリング
+    if team_id:
+        query = query.where(filter=FieldFilter("team_id", "==", team_id))
+    return build_range_queries(query, start_date, end_date, read_legacy_timestamps)
+
+def build_team_period_queries(
+    attendance_collection,
+    team_id: str,
+    start_date: datetime,
+    end_date: datetime,
+    read_legacy_timestamps: bool = True
+) -> List[Any]:
+    """
+    ワークスペース全員の期間検索のクエリを作成
+    - ユーザーごとにクエリを発行せず、（team_id, start_time）の複合インデックスを1回の範囲検索で読む
+    """
+    query = attendance_collection.where(filter=FieldFilter("team_id", "==", team_id))
+    return build_range_queries(query, start_date, end_date, read_legacy_timestamps)
+
+def start_time_of(record: AttendanceRecord) -> datetime:
+    return record.start_time
+
+# 移行前のISO-8601文字列は現地時刻の文字列順に並び、UTCオフセットは -14:00〜+14:00 の範囲にある。
+# そのため後に読む記録の出勤時刻は、読み込み済みの記録の出勤時刻より最大28時間しか早くならない
+LEGACY_REORDER_WINDOW = timedelta(hours=28)
+
+class LegacyReorderBuffer:
+    """
+    文字列の順に並んだ移行前の記録を出勤時刻順に並べ直すバッファ
+    - 最後に読み込んだ記録から LEGACY_REORDER_WINDOW より前の記録は、以降に読む記録より必ず早いため順に取り出す
+    - 保持するのは直近の LEGACY_REORDER_WINDOW 分の記録だけで、期間の記録をすべて読み込むことはない
+    """
+
+    def __init__(self, window: timedelta = LEGACY_REORDER_WINDOW):
+        self.window = window
+        self._heap: List[Tuple[datetime, int, AttendanceRecord]] = []
+        self._count = 0
+
+    def push(self, record: AttendanceRecord) -> List[AttendanceRecord]:
+        """記録を追加し、出勤時刻順が確定した記録を返す"""
+        heapq.heappush(self._heap, (record.start_time, self._count, record))
+        self._count += 1
+        watermark = record.start_time - self.window
+        ready = []
+        while self._heap and self._heap[0][0] < watermark:
+            ready.append(heapq.heappop(self._heap)[2])
+        return ready
+
+    def drain(self) -> List[AttendanceRecord]:
+        """残っている記録を出勤時刻順に返す"""
+        return [heapq.heappop(self._heap)[2] for _ in range(len(self._heap))]
+
+def reorder_legacy_stream(stream: Iterator[AttendanceRecord]) -> Iterator[AttendanceRecord]:
+    """移行前の記録のクエリ結果を LegacyReorderBuffer で出勤時刻順にして1件ずつ返す"""
+    buffer = LegacyReorderBuffer()
+    for record in stream:
+        yield from buffer.push(record)
+    yield from buffer.drain()
+
+def merge_period_streams(streams: List[Iterator[AttendanceRecord]]) -> Iterator[AttendanceRecord]:
+    """
+    build_range_queries のクエリごとの結果を出勤時刻順にマージ
+    - タイムスタンプの記録はクエリの並び順（start_time）がそのまま出勤時刻順になる
+    - 移行前のISO-8601文字列の記録は文字列の順に並ぶため、UTCオフセットが混在すると出勤時刻順にならない。
+      LegacyReorderBuffer で直近の記録だけを保持して並べ直すため、どちらのクエリもページ単位で読み進める
+    """
+    timestamp_stream, *legacy_streams = streams
+    return heapq.merge(timestamp_stream, *(reorder_legacy_stream(stream) for stream in legacy_streams), key=start_time_of)
+
+def collect_work_descriptions(*snapshot_maps: Dict[str, Any]) -> Dict[str, str]:
+    """読み込んだスナップショット（doc_id -> スナップショット）から業務内容を取り出す（後に渡したものを優先）"""
+    descriptions = {}
+    for snapshots in snapshot_maps:
+        for doc_id, snapshot in snapshots.items():
+            text = (snapshot.to_dict() or {}).get("work_description")
+            if text:
+                descriptions[doc_id] = text
+    return descriptions
+
+def build_active_attendance_query(attendance_collection, team_id: Optional[str] = None):
+    """アクティブな（終了していない）勤怠記録をドキュメントID順に返すクエリを作成"""
+    query = attendance_collection.where(filter=FieldFilter("end_time", "==", None))
+    # team_idが指定されている場合はワークスペースでフィルタリング
+    if team_id:
+        query = query.where(filter=FieldFilter("team_id", "==", team_id))
+    return query.order_by("__name__")
+
+def build_field_updates(attendance: Attendance) -> Dict[str, Any]:
+    """
+    変更されたフィールドだけの更新内容を作成
+    - 追加された休憩だけの場合は ArrayUnion で追記し、break_periods 全体は書き込まない
+    """
+    data = attendance.to_dict()
+    updates = {name: data[name] for name in attendance.dirty_fields}
+    if "break_periods" not in updates and attendance.appended_breaks:
+        updates["break_periods"] = firestore.ArrayUnion([period.to_dict() for period in attendance.appended_breaks])
+    return updates
+
+def stage_report_write(writer, report_collection, attendance: Attendance, report: Dict[str, Any]) -> None:
+    """業務報告のフィールドがあれば attendance_reports/{attendance_id} への書き込みを登録"""
+    if report:
+        writer.set(report_collection.document(attendance.doc_id), build_report_document(attendance, report), merge=True)
+
+def stage_attendance_set(writer, attendance_collection, report_collection, attendance: Attendance) -> None:
+    """勤怠記録全体の書き込みを登録（業務報告のフィールドは attendance_reports に分けて書き込む）"""
+    data, report = split_report_fields(attendance, attendance.to_dict())
+    writer.set(attendance_collection.document(attendance.doc_id), data)
+    stage_report_write(writer, report_collection, attendance, report)
+
+def stage_attendance_field_updates(writer, attendance_collection, report_collection, attendance: Attendance) -> Dict[str, Any]:
+    """
+    変更されたフィールドだけの更新を登録し、勤怠記録への更新内容を返す
+    - 業務報告のフィールドは attendance_reports に書き込み、勤怠記録に残っている移行前の値は削除する
+    """
+    updates, report = split_report_fields(attendance, build_field_updates(attendance))
+    for name in report:
+        updates[name] = firestore.DELETE_FIELD
+    if updates:
+        writer.update(attendance_collection.document(attendance.doc_id), updates)
+    stage_report_write(writer, report_collection, attendance, report)
+    return updates
+
+def stage_closed_month_summary_reset(writer, summary_ref) -> None:
+    """
+    保存済みの月次サマリーを削除し、月のバージョンを増やす書き込みを登録
+    - closed_month_summaries のドキュメントは {"version": 変更回数, "summary": encode_summary の形式}
+    - 集計中にバージョンが変わった場合、save_closed_month_summary は古い集計を保存しない
+    """
+    writer.set(summary_ref, {"version": firestore.Increment(1), "summary": firestore.DELETE_FIELD}, merge=True)
+
+def closed_month_snapshot_of(snapshot) -> ClosedMonthSnapshot:
+    """closed_month_summaries のドキュメントを変換（バージョンを持たない以前の形式は未保存として扱う）"""
+    data = snapshot.to_dict() if snapshot.exists else None
+    if not data:
+        return ClosedMonthSnapshot(None, 0)
+    return ClosedMonthSnapshot(data.get("summary"), data.get("version", 0))
+
+def stage_closed_month_invalidation(writer, closed_month_collection, attendance: Attendance) -> Optional[MonthKey]:
+    """
+    締め済みの月の記録を変更する場合は、保存済みの月次サマリーの削除を同じバッチ・トランザクションに登録
+    - 書き込み後に、返したキーでプロセス内のキャッシュも無効化すること
+    """
+    key = closed_month_of(attendance)
+    if key is not None:
+        stage_closed_month_summary_reset(writer, closed_month_collection.document(closed_month_doc_id(key)))
+    return key
+
+def stage_active_attendance_update(
+    transaction,
+    attendance_collection,
+    report_collection,
+    closed_month_collection,
+    pointer_ref,
+    attendance: Attendance
+) -> Optional[MonthKey]:
+    """トランザクションに出勤中の勤怠記録の更新を登録（退勤した場合はポインタードキュメントも削除）"""
+    stage_attendance_field_updates(transaction, attendance_collection, report_collection, attendance)
+    if attendance.end_time is not None:
+        transaction.delete(pointer_ref)
+    return stage_closed_month_invalidation(transaction, closed_month_collection, attendance)
+
+def stage_pointer_release(writer, pointer_ref, pointer_snapshot, attendance: Attendance) -> None:
+    """ポインタードキュメントがこの記録を指している場合だけ削除を登録（pointer_snapshot は同じトランザクションで読み取ったもの）"""
+    if pointer_snapshot.exists and pointer_snapshot.get("attendance_id") == attendance.doc_id:
+        writer.delete(pointer_ref)
+
+def stage_rollup_update(writer, rollup_ref, rollup_snapshot, attendance: Attendance, complete_since: Optional[str]) -> None:
+    """退勤済みの勤務を反映したロールアップの書き込みを登録（rollup_snapshot は同じトランザクションで読み取ったもの）"""
+    existing = rollup_snapshot.to_dict() if rollup_snapshot.exists else None
+    writer.set(rollup_ref, apply_shift(existing, attendance, complete_since))
+
+def stage_presence_update(writer, presence_collection, attendance: Attendance, shards: int) -> None:
+    """チームの在席状況の書き込みを登録（出勤中なら本人の状態を更新し、退勤した場合は削除する）"""
+    shard = presence_shard(attendance.user_id, shards)
+    value = presence_entry(attendance) if attendance.end_time is None else firestore.DELETE_FIELD
+    writer.set(
+        presence_collection.document(presence_doc_id(attendance.team_id, shard)),
+        {"team_id": attendance.team_id or "", "shard": shard, "members": {attendance.user_id: value}},
+        merge=True
+    )
+
+def stage_presence_release(writer, presence_collection, pointer_snapshot, attendance: Attendance, shards: int) -> None:
+    """
+    退勤済みの記録の在席状況の削除を登録（pointer_snapshot は同じトランザクションで読み取ったもの）
+    - ポインタードキュメントが別の出勤中の記録を指している場合は、その記録の在席状況を残す
+    """
+    if pointer_snapshot.exists and pointer_snapshot.get("attendance_id") != attendance.doc_id:
+        return
+    stage_presence_update(writer, presence_collection, attendance, shards)
 
 class FirestoreRepository:
-    def __init__(self, project_id: str, credentials_path: str):
+    def __init__(
+        self,
+        project_id: str,
+        credentials_path: str,
+        read_legacy_timestamps: bool = True,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        rollups_complete_since: Optional[str] = None,
+        presence_shards: int = DEFAULT_PRESENCE_SHARDS,
+        channel_options: Optional[Dict[str, Any]] = None
+    ):
+        self.read_legacy_timestamps = read_legacy_timestamps
+        self.page_size = page_size
+        # この月（"YYYY-MM"）以降に新しく作るロールアップは、全勤務を含む完全なものとして扱う
+        self.rollups_complete_since = rollups_complete_since
+        # チームの在席状況を分割するドキュメント数（変更した場合は scripts/reconcile_presence.py で作り直す）
+        self.presence_shards = presence_shards
         try:
-            cred = credentials.Certificate(credentials_path)
-            # アプリが初期化されていない場合のみ初期化
-            if not firebase_admin._apps:
-                firebase_admin.initialize_app(cred, {
-                    'projectId': project_id,
-                })
-            self.db = firestore.client()
+            # プロセスで共有するクライアント（認証情報の読み込みとチャネルの作成は1回だけ）
+            self.db = get_firestore_client_factory().client(project_id, credentials_path, channel_options)
             self.attendance_collection = self.db.collection('attendance')
+            # 出勤中の勤怠記録へのポインター（ドキュメントID: {team_id}-{user_id}）
+            self.active_attendance_collection = self.db.collection('active_attendance')
+            # 締め済みの月の月次サマリー（ドキュメントID: {team_id}-{user_id}-{yyyy}-{mm}）
+            self.closed_month_collection = self.db.collection('closed_month_summaries')
+            # ユーザー・月ごとの勤務時間のロールアップ（ドキュメントID: {team_id}-{user_id}-{yyyy}-{mm}）
+            self.rollup_collection = self.db.collection('attendance_rollups')
+            # チームごとの出勤中の従業員の在席状況（ドキュメントID: {team_id}-{shard}）
+            self.presence_collection = self.db.collection('team_presence')
+            # 勤怠記録ごとの業務報告（ドキュメントID: 勤怠記録のドキュメントID）
+            self.report_collection = self.db.collection('attendance_reports')
         except Exception as e:
             print(f"Firebase initialization error: {str(e)}")
             raise
 
+    def _active_pointer_ref(self, user_id: str, team_id: Optional[str]):
+        return self.active_attendance_collection.document(active_pointer_id(team_id, user_id))
+
+    def _presence_refs(self, team_id: Optional[str]) -> List[Any]:
+        return [
+            self.presence_collection.document(presence_doc_id(team_id, shard))
+            for shard in range(self.presence_shards)
+        ]
+
+    def _rollup_ref(self, key: RollupKey):
+        return self.rollup_collection.document(rollup_doc_id(key))
+
+    def _attach_reports(self, records: List[AttendanceRecord], projection: Projection) -> None:
+        """projection に業務報告のフィールドが含まれる場合だけ、attendance_reports から一括で読み込んで設定"""
+        fields = report_fields_in(projection)
+        if not fields or not records:
+            return
+        refs = [self.report_collection.document(record.doc_id) for record in records]
+        snapshots = get_all_documents(self.db, refs, field_paths=list(fields))
+        attach_reports(records, {doc_id: snapshot.to_dict() for doc_id, snapshot in snapshots.items()}, fields)
+
+    def _commit_attendance_write(self, attendance: Attendance, stage_writes: Callable[[Any], None]) -> None:
+        """
+        勤怠記録の書き込みを実行
+        - 退勤済みの記録はロールアップも同じトランザクションで更新し、
+          ポインタードキュメントがこの記録を指していれば削除する（別の出勤中の記録へのポインターは残す）
+        - チームの在席状況も同じバッチ・トランザクションで更新する（退勤済みであれば本人を削除する）
+        - 締め済みの月の記録であれば、保存済みの月次サマリーも無効化する
+        """
+        if attendance.end_time is None:
+            batch = self.db.batch()
+            stage_writes(batch)
+            stage_presence_update(batch, self.presence_collection, attendance, self.presence_shards)
+            invalidated = stage_closed_month_invalidation(batch, self.closed_month_collection, attendance)
+            batch.commit()
+        else:
+            rollup_ref = self._rollup_ref(rollup_key_of(attendance))
+            pointer_ref = self._active_pointer_ref(attendance.user_id, attendance.team_id)
+
+            @firestore.transactional
+            def run(transaction):
+                rollup_snapshot = rollup_ref.get(transaction=transaction)
+                pointer_snapshot = pointer_ref.get(transaction=transaction)
+                stage_writes(transaction)
+                stage_pointer_release(transaction, pointer_ref, pointer_snapshot, attendance)
+                stage_presence_release(transaction, self.presence_collection, pointer_snapshot, attendance, self.presence_shards)
+                stage_rollup_update(transaction, rollup_ref, rollup_snapshot, attendance, self.rollups_complete_since)
+                return stage_closed_month_invalidation(transaction, self.closed_month_collection, attendance)
+
+            invalidated = run(self.db.transaction())
+
+        invalidate_cached_month(invalidated)
+        attendance.clear_dirty()
+
     def create_attendance(self, attendance: Attendance) -> None:
         """
         新しい勤怠記録を作成
         - ドキュメントIDを自動生成し、attendance.doc_id に保持
+        - 出勤中の記録であれば、ポインタードキュメントも同じバッチで作成する
         """
         doc_ref = self.attendance_collection.document()
         attendance.doc_id = doc_ref.id  # ★ 生成したIDをAttendanceにセット
-        doc_ref.set(attendance.to_dict())
+
+        def stage_writes(writer):
+            stage_attendance_set(writer, self.attendance_collection, self.report_collection, attendance)
+            if attendance.end_time is None:
+                writer.set(self._active_pointer_ref(attendance.user_id, attendance.team_id), build_active_pointer(attendance))
+
+        self._commit_attendance_write(attendance, stage_writes)
+
+    def create_active_attendance(self, attendance: Attendance) -> bool:
+        """
+        出勤中の勤怠記録をポインタードキュメントと同時に作成（1つのトランザクション）
+        - ポインターが出勤中の記録を指している場合は何も書き込まずに False を返す
+        - ポインターが退勤済み・削除済みの記録を指している（古くなっている）場合は上書きする
+        - 同時に出勤を打刻しても、作成されるのは1件だけ
+        """
+        doc_ref = self.attendance_collection.document()
+        attendance.doc_id = doc_ref.id
+        pointer_ref = self._active_pointer_ref(attendance.user_id, attendance.team_id)
+
+        @firestore.transactional
+        def run(transaction):
+            if self._read_active_attendance(pointer_ref, transaction) is not None:
+                return False
+            transaction.set(pointer_ref, build_active_pointer(attendance))
+            stage_attendance_set(transaction, self.attendance_collection, self.report_collection, attendance)
+            stage_presence_update(transaction, self.presence_collection, attendance, self.presence_shards)
+            return True
+
+        if not run(self.db.transaction()):
+            attendance.doc_id = None
+            return False
+        attendance.clear_dirty()
+        return True
+
+    def update_active_attendance(
+        self,
+        user_id: str,
+        team_id: Optional[str],
+        mutate: Callable[[Optional[Attendance]], Attendance]
+    ) -> Attendance:
+        """
+        出勤中の勤怠記録の読み取り・変更・書き込みを1つのトランザクションで実行
+
+        Args:
+            mutate: 出勤中の記録（なければNone）を受け取り、変更後の記録を返す。
+                    競合時はトランザクションごと再実行されるため、引数の記録だけから結果を決めること。
+                    送出した例外は何も書き込まずにそのまま呼び出し元へ伝わる。
+        """
+        pointer_ref = self._active_pointer_ref(user_id, team_id)
+
+        @firestore.transactional
+        def run(transaction):
+            active_attendance = self._read_active_attendance(pointer_ref, transaction)
+            attendance = mutate(active_attendance)
+
+            # 退勤した場合は、書き込みの前にロールアップも読み取っておく
+            rollup_snapshot = None
+            if attendance.end_time is not None:
+                rollup_ref = self._rollup_ref(rollup_key_of(attendance))
+                rollup_snapshot = rollup_ref.get(transaction=transaction)
+
+            invalidated = stage_active_attendance_update(
+                transaction,
+                self.attendance_collection,
+                self.report_collection,
+                self.closed_month_collection,
+                pointer_ref,
+                attendance
+            )
+            stage_presence_update(transaction, self.presence_collection, attendance, self.presence_shards)
+            if rollup_snapshot is not None:
+                stage_rollup_update(transaction, rollup_ref, rollup_snapshot, attendance, self.rollups_complete_since)
+            return attendance, invalidated
+
+        attendance, invalidated = run(self.db.transaction())
+        invalidate_cached_month(invalidated)
+        attendance.clear_dirty()
+        return attendance
 
     def get_active_attendance(self, user_id: str, team_id: str = None) -> Optional[Attendance]:
         """
         ユーザーのアクティブな（終了していない）勤怠記録を取得
+        - クエリではなく、ポインタードキュメントと勤怠記録のドキュメントIDによる読み取りで取得する
         
         Args:
             user_id: ユーザーID
             team_id: チームID (Slackワークスペース)
         """
-        query = (
-            self.attendance_collection
-            .where(filter=FieldFilter("user_id", "==", user_id))
-            .where(filter=FieldFilter("end_time", "==", None))
-        )
-        
-        # team_idが指定されている場合はさらにフィルタリング
-        if team_id:
-            query = query.where(filter=FieldFilter("team_id", "==", team_id))
-            
-        query = query.limit(1)
-        docs = query.get()
-        
-        for doc in docs:
-            attendance = Attendance.from_dict(doc.to_dict())
-            attendance.doc_id = doc.id  # ★ ドキュメントIDを保持
-            return attendance
-        return None
+        return self._read_active_attendance(self._active_pointer_ref(user_id, team_id))
+
+    def _read_active_attendance(self, pointer_ref, transaction=None) -> Optional[Attendance]:
+        """ポインタードキュメントが指す出勤中の勤怠記録を読み取る"""
+        pointer = pointer_ref.get(transaction=transaction)
+        if not pointer.exists:
+            return None
+
+        doc = self.attendance_collection.document(pointer.get("attendance_id")).get(transaction=transaction)
+        if not doc.exists:
+            return None
+
+        attendance = self._convert_to_attendance(doc)
+        # 退勤済みの記録を指している場合は出勤中とみなさない
+        if attendance.end_time is not None:
+            return None
+        return attendance
     
-    def get_all_active_attendances(self, team_id: str = None) -> List[Attendance]:
+    def get_active_attendance_page(
+        self,
+        team_id: str = None,
+        cursor: Optional[str] = None,
+        page_size: int = DEFAULT_ACTIVE_PAGE_SIZE,
+        projection: Projection = None
+    ) -> Tuple[List[AttendanceRecord], Optional[str]]:
         """
-        すべてのアクティブな（終了していない）勤怠記録を取得
-        
+        アクティブな（終了していない）勤怠記録をドキュメントID順に page_size 件ずつ取得
+
         Args:
             team_id: チームID (Slackワークスペース)
-        
+            cursor: 前のページの next_cursor（最初のページは None。ドキュメントIDとして正しくない場合は ValueError）
+            page_size: 1ページの件数
+            projection: 読み込むフィールド（TIMING_FIELDS など。指定した場合は AttendanceTiming を返す）
+
         Returns:
-            List[Attendance]: アクティブな勤怠記録のリスト
+            Tuple[List[AttendanceRecord], Optional[str]]: 勤怠記録のリストと次のページのカーソル（最後のページは None）
         """
-        query = (
-            self.attendance_collection
-            .where(filter=FieldFilter("end_time", "==", None))
-        )
+        query = project_query(build_active_attendance_query(self.attendance_collection, team_id), projection)
+        if cursor is not None:
+            query = query.start_after({"__name__": self.attendance_collection.document(validate_page_cursor(cursor))})
+
+        # 1件多く読み、次のページがあるかを判定する
+        docs = list(query.limit(page_size + 1).stream())
+        records = [self._convert_to_attendance(doc, projection) for doc in docs[:page_size]]
+        next_cursor = records[-1].doc_id if len(docs) > page_size else None
+        return records, next_cursor
+
+    def get_all_active_attendances(self, team_id: str = None, projection: Projection = None) -> List[AttendanceRecord]:
+        """
+        すべてのアクティブな（終了していない）勤怠記録を取得（get_active_attendance_page を最後のページまで読む）
         
-        # team_idが指定されている場合はワークスペースでフィルタリング
-        if team_id:
-            query = query.where(filter=FieldFilter("team_id", "==", team_id))
-            
-        query = query.limit(100)  # 上限を設定（必要に応じて調整）
-        docs = query.get()
+        Args:
+            team_id: チームID (Slackワークスペース)
+            projection: 読み込むフィールド（指定した場合は AttendanceTiming を返す）
         
+        Returns:
+            List[AttendanceRecord]: アクティブな勤怠記録のリスト
+        """
         active_attendances = []
-        for doc in docs:
-            attendance = Attendance.from_dict(doc.to_dict())
-            attendance.doc_id = doc.id
-            active_attendances.append(attendance)
-        
-        return active_attendances
+        cursor = None
+        while True:
+            records, cursor = self.get_active_attendance_page(team_id, cursor, projection=projection)
+            active_attendances.extend(records)
+            if cursor is None:
+                return active_attendances
+
+    def get_active_pointers(self, user_ids: Sequence[str], team_id: str = None) -> Dict[str, Dict[str, Any]]:
+        """複数のユーザーのポインタードキュメントをまとめて取得（user_id -> ポインターの内容。出勤中でないユーザーは含まない）"""
+        pointer_ids = {active_pointer_id(team_id, user_id): user_id for user_id in user_ids}
+        refs = [self.active_attendance_collection.document(pointer_id) for pointer_id in pointer_ids]
+        snapshots = get_all_documents(self.db, refs)
+        return {pointer_ids[pointer_id]: snapshot.to_dict() for pointer_id, snapshot in snapshots.items()}
+
+    def get_active_attendances_for_users(
+        self,
+        user_ids: Sequence[str],
+        team_id: str = None,
+        projection: Projection = None
+    ) -> Dict[str, AttendanceRecord]:
+        """
+        複数のユーザーの出勤中の勤怠記録を取得（user_id -> 勤怠記録）
+        - ポインター・勤怠記録をそれぞれ get_all でまとめて読むため、ユーザー数に関係なく2回の並列な一括読み取りで済む
+        - projection（TIMING_FIELDS など）を指定した場合は、そのフィールドだけを読み込んだ AttendanceTiming を返す
+        """
+        pointers = self.get_active_pointers(user_ids, team_id)
+        refs = [self.attendance_collection.document(pointer["attendance_id"]) for pointer in pointers.values()]
+        snapshots = get_all_documents(self.db, refs, field_paths=list(projection) if projection else None)
+
+        records = {}
+        for user_id, pointer in pointers.items():
+            snapshot = snapshots.get(pointer["attendance_id"])
+            if snapshot is None:
+                continue
+            record = self._convert_to_attendance(snapshot, projection)
+            # 退勤済みの記録を指している場合は出勤中とみなさない
+            if record.end_time is None:
+                records[user_id] = record
+        self._attach_reports(list(records.values()), projection)
+        return records
+
+    def get_team_presence(self, team_id: str) -> Dict[str, Dict[str, Any]]:
+        """
+        チームの在席状況（user_id -> 状態・出勤時刻・休憩開始時刻など）を取得
+        - 全シャードを1回の一括読み取りで取得し、勤怠記録は読まない
+        """
+        snapshots = self.db.get_all(self._presence_refs(team_id))
+        return merge_presence_members(snapshot.to_dict() for snapshot in snapshots if snapshot.exists)
+
+    def rebuild_team_presence(self, team_id: str) -> int:
+        """
+        出勤中の勤怠記録からチームの在席状況を作り直し、出勤中の人数を返す
+        - シャードを先に同じトランザクションで読み取るため、作り直し中の打刻は作り直した内容の上に反映される
+        """
+        presence_refs = self._presence_refs(team_id)
+        query = project_query(build_active_attendance_query(self.attendance_collection, team_id), TIMING_FIELDS)
+
+        @firestore.transactional
+        def run(transaction):
+            list(transaction.get_all(presence_refs))
+            records = [self._convert_to_attendance(doc, TIMING_FIELDS) for doc in transaction.get(query)]
+            for shard, data in build_presence_shards(team_id, records, self.presence_shards).items():
+                transaction.set(presence_refs[shard], data)
+            return len(records)
+
+        return run(self.db.transaction())
 
     def update_attendance(self, attendance: Attendance) -> None:
         """
@@ -95,9 +630,193 @@ class FirestoreRepository:
         """
         if not attendance.doc_id:
             raise ValueError("Cannot update attendance without doc_id.")
-        # doc_id で指定
-        doc_ref = self.attendance_collection.document(attendance.doc_id)
-        doc_ref.set(attendance.to_dict())
+        # 退勤した場合、ポインタードキュメントがこの記録を指していれば同時に削除する
+        def stage_writes(writer):
+            stage_attendance_set(writer, self.attendance_collection, self.report_collection, attendance)
+
+        self._commit_attendance_write(attendance, stage_writes)
+
+    def update_attendance_fields(self, attendance: Attendance) -> None:
+        """
+        読み込み後に変更されたフィールドだけを更新（ドキュメント全体は書き換えない）
+        - 変更がなければ何も書き込まない
+        - end_time をセットした場合、ポインタードキュメントがこの記録を指していれば同時に削除する
+        """
+        if not attendance.doc_id:
+            raise ValueError("Cannot update attendance without doc_id.")
+
+        if not build_field_updates(attendance):
+            return
+
+        def stage_writes(writer):
+            stage_attendance_field_updates(writer, self.attendance_collection, self.report_collection, attendance)
+
+        self._commit_attendance_write(attendance, stage_writes)
+
+    def get_rollup(self, key: RollupKey) -> Optional[Dict[str, Any]]:
+        """ユーザー・月ごとのロールアップを取得"""
+        doc = self._rollup_ref(key).get()
+        return doc.to_dict() if doc.exists else None
+
+    def get_complete_rollup(self, user_id: str, year: int, month: int, team_id: str = None) -> Optional[Dict[str, Any]]:
+        """全勤務を含むロールアップを取得（ない場合・不完全な場合はNone）"""
+        data = self.get_rollup(rollup_key(team_id, user_id, year, month))
+        if data is None or not data.get("complete"):
+            return None
+        return data
+
+    def get_rollups_for_users(
+        self,
+        user_ids: Sequence[str],
+        year: int,
+        month: int,
+        team_id: str = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """複数のユーザーの指定月のロールアップを get_all でまとめて取得（user_id -> ロールアップ）"""
+        doc_ids = {rollup_doc_id(rollup_key(team_id, user_id, year, month)): user_id for user_id in user_ids}
+        snapshots = get_all_documents(self.db, [self.rollup_collection.document(doc_id) for doc_id in doc_ids])
+        return {doc_ids[doc_id]: snapshot.to_dict() for doc_id, snapshot in snapshots.items()}
+
+    def get_work_descriptions(self, attendance_ids: Sequence[str]) -> Dict[str, str]:
+        """
+        勤怠記録ごとの業務内容を get_all でまとめて取得（記載のない記録は含まない）
+        - attendance_reports にない記録は、移行前の勤怠記録に残っている業務内容を読む
+        """
+        fields = ["work_description"]
+        reports = get_all_documents(self.db, [self.report_collection.document(doc_id) for doc_id in attendance_ids], fields)
+        missing = [doc_id for doc_id in attendance_ids if doc_id not in reports]
+        legacy = get_all_documents(self.db, [self.attendance_collection.document(doc_id) for doc_id in missing], fields)
+        return collect_work_descriptions(legacy, reports)
+
+    def rebuild_rollup(self, user_id: str, year: int, month: int, team_id: str = None) -> Dict[str, Any]:
+        """
+        勤怠記録からロールアップを作り直す（完全なものとして保存）
+        - 勤怠記録の読み込み中に退勤した勤務は、既存のロールアップの値を残す
+        - 保存済みの月次サマリーも同じトランザクションで削除し、他のインスタンスが作り直す前の集計を返さないようにする
+        """
+        key = rollup_key(team_id, user_id, year, month)
+        rollup_ref = self._rollup_ref(key)
+        summary_key = month_key(team_id, user_id, year, month)
+        summary_ref = self.closed_month_collection.document(closed_month_doc_id(summary_key))
+        scanned_at = get_current_time()
+        records = list(self.iter_attendance_by_period(
+            user_id, get_start_of_month(year, month), get_end_of_month(year, month), team_id, projection=SUMMARY_FIELDS
+        ))
+
+        @firestore.transactional
+        def run(transaction):
+            snapshot = rollup_ref.get(transaction=transaction)
+            data = rebuild_rollup(key, records, snapshot.to_dict() if snapshot.exists else None, scanned_at)
+            transaction.set(rollup_ref, data)
+            stage_closed_month_summary_reset(transaction, summary_ref)
+            return data
+
+        data = run(self.db.transaction())
+        invalidate_cached_month(summary_key)
+        return data
+
+    def get_closed_month_summary(self, key: MonthKey) -> ClosedMonthSnapshot:
+        """保存済みの締め済みの月の月次サマリー（encode_summary の形式）と、その月のバージョンを取得"""
+        return closed_month_snapshot_of(self.closed_month_collection.document(closed_month_doc_id(key)).get())
+
+    def save_closed_month_summary(self, key: MonthKey, data: Dict[str, Any], version: int) -> bool:
+        """
+        締め済みの月の月次サマリーを保存（トランザクションでバージョンを読み直し、version のままの場合だけ書き込む）
+        - 集計中に他のインスタンスで記録が変更された場合は保存せずFalse
+        """
+        summary_ref = self.closed_month_collection.document(closed_month_doc_id(key))
+
+        @firestore.transactional
+        def run(transaction):
+            if closed_month_snapshot_of(summary_ref.get(transaction=transaction)).version != version:
+                return False
+            transaction.set(summary_ref, {"version": version, "summary": data})
+            return True
+
+        return run(self.db.transaction())
+
+    def iter_attendance_by_period(
+        self,
+        user_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        team_id: str = None,
+        page_size: Optional[int] = None,
+        projection: Projection = None
+    ) -> Iterator[AttendanceRecord]:
+        """
+        指定期間の勤怠記録を出勤時刻順に1件ずつ返す
+        - page_size 件ずつ query.stream() で読み込むため、期間が長くてもメモリ使用量は1ページ分に収まる
+        - projection を指定した場合は select でそのフィールドだけを読み込み、AttendanceTiming を返す
+        """
+        page_size = page_size or self.page_size
+        queries = build_period_queries(
+            self.attendance_collection, user_id, start_date, end_date, team_id, self.read_legacy_timestamps
+        )
+        streams = [self._stream_query(project_query(query, projection), page_size, projection) for query in queries]
+
+        for record in merge_period_streams(streams):
+            if in_period(record, start_date, end_date):
+                yield record
+
+    def iter_team_attendance_by_period(
+        self,
+        team_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        page_size: Optional[int] = None,
+        projection: Projection = None
+    ) -> Iterator[AttendanceRecord]:
+        """
+        ワークスペース全員の指定期間の勤怠記録を出勤時刻順に1件ずつ返す
+        - ユーザー数によらず1つのクエリを page_size 件ずつ読み進める
+        - projection を指定した場合は select でそのフィールドだけを読み込み、AttendanceTiming を返す
+        """
+        page_size = page_size or self.page_size
+        queries = build_team_period_queries(
+            self.attendance_collection, team_id, start_date, end_date, self.read_legacy_timestamps
+        )
+        streams = [self._stream_query(project_query(query, projection), page_size, projection) for query in queries]
+
+        for record in merge_period_streams(streams):
+            if in_period(record, start_date, end_date):
+                yield record
+
+    def get_team_attendance_by_period(
+        self,
+        team_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        page_size: Optional[int] = None,
+        projection: Projection = None
+    ) -> List[AttendanceRecord]:
+        """
+        ワークスペース全員の指定期間の勤怠記録をリストで取得（iter_team_attendance_by_period のラッパー）
+        """
+        try:
+            return list(self.iter_team_attendance_by_period(team_id, start_date, end_date, page_size, projection))
+        except Exception as e:
+            print(f"Error retrieving team attendance records: {str(e)}")
+            raise
+
+    def _stream_query(self, query, page_size: int, projection: Projection = None) -> Iterator[AttendanceRecord]:
+        """
+        クエリの結果を page_size 件ずつ読み込みながら1件ずつ返す
+        - projection に業務報告のフィールドが含まれる場合は、ページごとに attendance_reports も一括で読み込む
+        """
+        query = query.limit(page_size)
+        last_doc = None
+        while True:
+            page = query.start_after(last_doc) if last_doc else query
+            docs = list(page.stream())
+            records = [self._convert_to_attendance(doc, projection) for doc in docs]
+            self._attach_reports(records, projection)
+            yield from records
+
+            # 最後のページ
+            if len(docs) < page_size:
+                return
+            last_doc = docs[-1]
 
     def get_attendance_by_period(
         self, 
@@ -105,53 +824,26 @@ class FirestoreRepository:
         start_date: datetime, 
         end_date: datetime,
         team_id: str = None,
-        batch_size: int = 100
-    ) -> List[Attendance]:
+        page_size: Optional[int] = None,
+        projection: Projection = None
+    ) -> List[AttendanceRecord]:
         """
-        指定期間の勤怠記録を取得
+        指定期間の勤怠記録をリストで取得（iter_attendance_by_period のラッパー）
         """
         try:
-            query = (
-                self.attendance_collection
-                .where(filter=FieldFilter("user_id", "==", user_id))
-                .where(filter=FieldFilter("start_time", ">=", start_date.isoformat()))
-                .where(filter=FieldFilter("start_time", "<=", end_date.isoformat()))
-            )
-            
-            # team_idが指定されている場合はワークスペースでフィルタリング
-            if team_id:
-                query = query.where(filter=FieldFilter("team_id", "==", team_id))
-                
-            query = query.order_by("start_time").limit(batch_size)
-            
-            records = []
-            docs = query.get()
-            
-            while docs:
-                for d in docs:
-                    attendance = self._convert_to_attendance(d)
-                    records.append(attendance)
-                
-                # 次のバッチがあるか確認
-                last_doc = docs[-1]
-                docs = (
-                    query
-                    .start_after(last_doc)
-                    .get()
-                )
-            
-            return records
+            return list(self.iter_attendance_by_period(user_id, start_date, end_date, team_id, page_size, projection))
         except Exception as e:
             print(f"Error retrieving attendance records: {str(e)}")
             raise
 
-    def _convert_to_attendance(self, doc: firestore.DocumentSnapshot) -> Attendance:
+    def _convert_to_attendance(self, doc: firestore.DocumentSnapshot, projection: Projection = None) -> AttendanceRecord:
         """
         Firestoreのドキュメントを勤怠オブジェクトに変換
         - doc.id を attendance.doc_id に保持
+        - projection を指定して読み込んだドキュメントは AttendanceTiming に変換
         """
         data = doc.to_dict()
-        attendance = Attendance.from_dict(data)
+        attendance = record_from_dict(data, projection)
         attendance.doc_id = doc.id  # ★ 取得したドキュメントIDを保持
         return attendance
 
@@ -164,33 +856,67 @@ class FirestoreRepository:
     ) -> Dict[str, Any]:
         """
         指定期間の勤怠統計を取得
+        - 日単位の期間であれば、勤怠記録ではなく各月のロールアップから集計する
         """
-        records = self.get_attendance_by_period(user_id, start_date, end_date, team_id)
-        
-        total_working_time = 0
-        total_break_time = 0
+        stats = self._get_attendance_stats_from_rollups(user_id, start_date, end_date, team_id)
+        if stats is not None:
+            return stats
+
+        return build_attendance_stats(
+            self.iter_attendance_by_period(user_id, start_date, end_date, team_id, projection=TIMING_FIELDS)
+        )
+
+    def _get_attendance_stats_from_rollups(
+        self,
+        user_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        team_id: str = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        期間内の各月のロールアップから勤怠統計を集計
+        - ロールアップは日単位のため、期間が日の途中で始まる・終わる場合や、
+          完全なロールアップがない月を含む場合は None を返す
+        - ロールアップには退勤済みの勤務だけが含まれるため、出勤中の勤務は勤怠記録から加える
+          （勤怠記録から集計する場合と同じ件数・休憩時間になる）
+        """
+        if start_date.time() != time.min or end_date.time() < time(23, 59, 59):
+            return None
+
+        keys = []
+        year, month = start_date.year, start_date.month
+        while (year, month) <= (end_date.year, end_date.month):
+            keys.append(rollup_key(team_id, user_id, year, month))
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+        rollups = [
+            snapshot.to_dict() for snapshot in self.db.get_all([self._rollup_ref(key) for key in keys])
+            if snapshot.exists
+        ]
+        if len(rollups) != len(keys) or not all(rollup.get("complete") for rollup in rollups):
+            return None
+
+        first_day = start_date.date().isoformat()
+        last_day = end_date.date().isoformat()
         daily_stats = {}
-        
-        for record in records:
-            date_key = record.start_time.date().isoformat()
-            
-            if date_key not in daily_stats:
-                daily_stats[date_key] = {
-                    'working_time': 0,
-                    'break_time': 0,
-                    'attendance_count': 0
-                }
-            
-            daily_stats[date_key]['working_time'] += record.get_working_time()
-            daily_stats[date_key]['break_time'] += record.get_total_break_time()
-            daily_stats[date_key]['attendance_count'] += 1
-            
-            total_working_time += record.get_working_time()
-            total_break_time += record.get_total_break_time()
-        
+        for rollup in rollups:
+            for day, totals in rollup["days"].items():
+                if first_day <= day <= last_day:
+                    daily_stats[day] = dict(totals)
+
+        active = self.get_active_attendance(user_id, team_id)
+        if active is not None and in_period(active, start_date, end_date):
+            day = daily_stats.setdefault(
+                active.start_time.date().isoformat(),
+                {'working_time': 0, 'break_time': 0, 'attendance_count': 0}
+            )
+            day['working_time'] += active.get_working_time()
+            day['break_time'] += active.get_total_break_time()
+            day['attendance_count'] += 1
+
         return {
-            'total_working_time': total_working_time,
-            'total_break_time': total_break_time,
+            'total_working_time': sum(day['working_time'] for day in daily_stats.values()),
+            'total_break_time': sum(day['break_time'] for day in daily_stats.values()),
             'daily_stats': daily_stats,
-            'record_count': len(records)
-        }
\ No newline at end of file
+            'record_count': sum(day['attendance_count'] for day in daily_stats.values())
+        }
@@ -0,0 +1,312 @@
+import copy
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from src.models.attendance import TIMING_FIELDS, Attendance, AttendanceRecord, Projection, record_from_dict
+from src.repositories.base import (
+    DEFAULT_ACTIVE_PAGE_SIZE,
+    DEFAULT_PAGE_SIZE,
+    active_pointer_id,
+    apply_field_updates,
+    build_attendance_stats,
+    closed_month_of,
+    in_period,
+    invalidate_cached_month,
+    validate_page_cursor
+)
+from src.repositories.closed_month_cache import ClosedMonthSnapshot, MonthKey, closed_month_doc_id
+from src.repositories.presence import presence_entry
+from src.repositories.rollups import apply_shift, rollup_doc_id, rollup_key, rollup_key_of
+
+class InMemoryRepository:
+    """
+    プロセス内のdictに保存する勤怠記録のストレージ（AttendanceRepository の実装）
+
+    - Firestoreなしでハンドラーのベンチマーク・負荷テストを行うために使う（プロセスを終了すると消える）
+    - 保存時・取得時に記録をコピーするため、呼び出し元での変更は保存するまで反映されない
+    - 1つのロックで書き込みを直列化し、Firestoreのバッチ・トランザクションと同じ単位で不可分に反映する
+    """
+
+    def __init__(self, page_size: int = DEFAULT_PAGE_SIZE, rollups_complete_since: Optional[str] = None):
+        self.page_size = page_size
+        self.rollups_complete_since = rollups_complete_since
+        self._lock = threading.RLock()
+        # doc_id -> 勤怠記録（to_dict の形式）
+        self._attendance: Dict[str, Dict[str, Any]] = {}
+        # {team_id}-{user_id} -> 出勤中の勤怠記録の doc_id
+        self._active: Dict[str, str] = {}
+        self._rollups: Dict[str, Dict[str, Any]] = {}
+        self._closed_months: Dict[str, Dict[str, Any]] = {}
+        # 締め済みの月ごとの、記録を変更した回数（月次サマリーの保存の前提条件に使う）
+        self._closed_month_versions: Dict[str, int] = {}
+        # 勤怠記録を書き込んだ回数（1回の操作が何回の書き込みになるかの確認に使う）
+        self.write_count = 0
+
+    def _load(self, doc_id: str, projection: Projection = None) -> AttendanceRecord:
+        """保存した記録を変換（projection を指定した場合は AttendanceTiming）"""
+        attendance = record_from_dict(copy.deepcopy(self._attendance[doc_id]), projection)
+        attendance.doc_id = doc_id
+        return attendance
+
+    def _store(self, attendance: Attendance, data: Dict[str, Any]) -> None:
+        """
+        記録を保存し、退勤済みであればポインターの削除とロールアップの更新、
+        締め済みの月であれば保存済みの月次サマリーの削除も行う（ロックを取得して呼ぶこと）
+        """
+        # ロールアップを先に計算し、失敗した場合は記録もポインターも変更しない
+        rollup = None
+        if attendance.end_time is not None:
+            rollup_id = rollup_doc_id(rollup_key_of(attendance))
+            rollup = apply_shift(self._rollups.get(rollup_id), attendance, self.rollups_complete_since)
+
+        self._attendance[attendance.doc_id] = data
+        self.write_count += 1
+        if rollup is not None:
+            pointer_id = active_pointer_id(attendance.team_id, attendance.user_id)
+            if self._active.get(pointer_id) == attendance.doc_id:
+                del self._active[pointer_id]
+            self._rollups[rollup_id] = rollup
+
+        closed = closed_month_of(attendance)
+        if closed is not None:
+            summary_id = closed_month_doc_id(closed)
+            self._closed_months.pop(summary_id, None)
+            self._closed_month_versions[summary_id] = self._closed_month_versions.get(summary_id, 0) + 1
+        invalidate_cached_month(closed)
+        attendance.clear_dirty()
+
+    def create_attendance(self, attendance: Attendance) -> None:
+        """新しい勤怠記録を作成（出勤中の記録であればポインターも作成する）"""
+        attendance.doc_id = uuid.uuid4().hex
+        with self._lock:
+            if attendance.end_time is None:
+                self._active[active_pointer_id(attendance.team_id, attendance.user_id)] = attendance.doc_id
+            self._store(attendance, copy.deepcopy(attendance.to_dict()))
+
+    def create_active_attendance(self, attendance: Attendance) -> bool:
+        """
+        出勤中の勤怠記録をポインターと同時に作成（出勤中の記録が既にあればFalse）
+        - ポインターが退勤済み・削除済みの記録を指している場合は上書きする
+        """
+        pointer_id = active_pointer_id(attendance.team_id, attendance.user_id)
+        with self._lock:
+            if self.get_active_attendance(attendance.user_id, attendance.team_id) is not None:
+                return False
+            attendance.doc_id = uuid.uuid4().hex
+            self._active[pointer_id] = attendance.doc_id
+            self._store(attendance, copy.deepcopy(attendance.to_dict()))
+        return True
+
+    def update_active_attendance(
+        self,
+        user_id: str,
+        team_id: Optional[str],
+        mutate: Callable[[Optional[Attendance]], Attendance]
+    ) -> Attendance:
+        """出勤中の勤怠記録の読み取り・変更・書き込みをロックを取得したまま実行"""
+        with self._lock:
+            attendance = mutate(self.get_active_attendance(user_id, team_id))
+            self._store(attendance, apply_field_updates(self._attendance[attendance.doc_id], attendance))
+        return attendance
+
+    def get_active_attendance(self, user_id: str, team_id: str = None) -> Optional[Attendance]:
+        """ポインターから出勤中の勤怠記録を取得"""
+        with self._lock:
+            doc_id = self._active.get(active_pointer_id(team_id, user_id))
+            if doc_id is None or doc_id not in self._attendance:
+                return None
+            attendance = self._load(doc_id)
+        return attendance if attendance.end_time is None else None
+
+    def get_active_attendances_for_users(
+        self,
+        user_ids: Sequence[str],
+        team_id: str = None,
+        projection: Projection = None
+    ) -> Dict[str, AttendanceRecord]:
+        """ポインターから複数のユーザーの出勤中の勤怠記録を取得"""
+        records = {}
+        with self._lock:
+            for user_id in user_ids:
+                doc_id = self._active.get(active_pointer_id(team_id, user_id))
+                if doc_id is None or doc_id not in self._attendance:
+                    continue
+                record = self._load(doc_id, projection)
+                if record.end_time is None:
+                    records[user_id] = record
+        return records
+
+    def _active_doc_ids(self, team_id: Optional[str]) -> List[str]:
+        return sorted(
+            doc_id for doc_id, data in self._attendance.items()
+            if data.get("end_time") is None and (not team_id or data.get("team_id") == team_id)
+        )
+
+    def get_active_attendance_page(
+        self,
+        team_id: str = None,
+        cursor: Optional[str] = None,
+        page_size: int = DEFAULT_ACTIVE_PAGE_SIZE,
+        projection: Projection = None
+    ) -> Tuple[List[AttendanceRecord], Optional[str]]:
+        """アクティブな勤怠記録をID順に page_size 件ずつ取得（次のページのカーソルも返す）"""
+        if cursor is not None:
+            validate_page_cursor(cursor)
+        with self._lock:
+            doc_ids = [doc_id for doc_id in self._active_doc_ids(team_id) if cursor is None or doc_id > cursor]
+            records = [self._load(doc_id, projection) for doc_id in doc_ids[:page_size]]
+        next_cursor = records[-1].doc_id if len(doc_ids) > page_size else None
+        return records, next_cursor
+
+    def get_all_active_attendances(self, team_id: str = None, projection: Projection = None) -> List[AttendanceRecord]:
+        """すべてのアクティブな勤怠記録を取得"""
+        with self._lock:
+            return [self._load(doc_id, projection) for doc_id in self._active_doc_ids(team_id)]
+
+    def get_team_presence(self, team_id: str) -> Dict[str, Dict[str, Any]]:
+        """チームの在席状況を出勤中の勤怠記録から作成"""
+        return {record.user_id: presence_entry(record) for record in self.get_all_active_attendances(team_id, TIMING_FIELDS)}
+
+    def update_attendance(self, attendance: Attendance) -> None:
+        """勤怠記録全体を上書き"""
+        if not attendance.doc_id:
+            raise ValueError("Cannot update attendance without doc_id.")
+        with self._lock:
+            self._store(attendance, copy.deepcopy(attendance.to_dict()))
+
+    def update_attendance_fields(self, attendance: Attendance) -> None:
+        """読み込み後に変更されたフィールドだけを更新（変更がなければ何もしない）"""
+        if not attendance.doc_id:
+            raise ValueError("Cannot update attendance without doc_id.")
+        if not attendance.dirty_fields and not attendance.appended_breaks:
+            return
+        with self._lock:
+            self._store(attendance, apply_field_updates(self._attendance[attendance.doc_id], attendance))
+
+    def get_complete_rollup(self, user_id: str, year: int, month: int, team_id: str = None) -> Optional[Dict[str, Any]]:
+        """全勤務を含むロールアップを取得（ない場合・不完全な場合はNone）"""
+        with self._lock:
+            data = self._rollups.get(rollup_doc_id(rollup_key(team_id, user_id, year, month)))
+            if data is None or not data.get("complete"):
+                return None
+            return copy.deepcopy(data)
+
+    def get_rollups_for_users(
+        self,
+        user_ids: Sequence[str],
+        year: int,
+        month: int,
+        team_id: str = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """複数のユーザーの指定月のロールアップを取得"""
+        rollups = {}
+        with self._lock:
+            for user_id in user_ids:
+                data = self._rollups.get(rollup_doc_id(rollup_key(team_id, user_id, year, month)))
+                if data is not None:
+                    rollups[user_id] = copy.deepcopy(data)
+        return rollups
+
+    def get_work_descriptions(self, attendance_ids: Sequence[str]) -> Dict[str, str]:
+        """勤怠記録ごとの業務内容を取得（記載のない記録は含まない）"""
+        with self._lock:
+            records = [(doc_id, self._attendance.get(doc_id) or {}) for doc_id in attendance_ids]
+        return {doc_id: data["work_description"] for doc_id, data in records if data.get("work_description")}
+
+    def get_closed_month_summary(self, key: MonthKey) -> ClosedMonthSnapshot:
+        """保存済みの締め済みの月の月次サマリーと、その月のバージョンを取得"""
+        summary_id = closed_month_doc_id(key)
+        with self._lock:
+            data = self._closed_months.get(summary_id)
+            return ClosedMonthSnapshot(
+                copy.deepcopy(data) if data is not None else None,
+                self._closed_month_versions.get(summary_id, 0)
+            )
+
+    def save_closed_month_summary(self, key: MonthKey, data: Dict[str, Any], version: int) -> bool:
+        """締め済みの月の月次サマリーを、バージョンが version のままの場合だけ保存"""
+        summary_id = closed_month_doc_id(key)
+        with self._lock:
+            if self._closed_month_versions.get(summary_id, 0) != version:
+                return False
+            self._closed_months[summary_id] = copy.deepcopy(data)
+            return True
+
+    def _select(
+        self,
+        predicate: Callable[[Dict[str, Any]], bool],
+        start_date: datetime,
+        end_date: datetime,
+        projection: Projection
+    ) -> List[AttendanceRecord]:
+        """条件に合う期間内の勤怠記録を出勤時刻順に取得"""
+        with self._lock:
+            records = [self._load(doc_id, projection) for doc_id, data in self._attendance.items() if predicate(data)]
+        records = [record for record in records if in_period(record, start_date, end_date)]
+        records.sort(key=lambda record: record.start_time)
+        return records
+
+    def iter_attendance_by_period(
+        self,
+        user_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        team_id: str = None,
+        page_size: Optional[int] = None,
+        projection: Projection = None
+    ) -> Iterator[AttendanceRecord]:
+        """指定期間の勤怠記録を出勤時刻順に1件ずつ返す"""
+        return iter(self.get_attendance_by_period(user_id, start_date, end_date, team_id, page_size, projection))
+
+    def get_attendance_by_period(
+        self,
+        user_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        team_id: str = None,
+        page_size: Optional[int] = None,
+        projection: Projection = None
+    ) -> List[AttendanceRecord]:
+        """指定期間の勤怠記録をリストで取得"""
+        return self._select(
+            lambda data: data.get("user_id") == user_id and (not team_id or data.get("team_id") == team_id),
+            start_date,
+            end_date,
+            projection
+        )
+
+    def iter_team_attendance_by_period(
+        self,
+        team_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        page_size: Optional[int] = None,
+        projection: Projection = None
+    ) -> Iterator[AttendanceRecord]:
+        """ワークスペース全員の指定期間の勤怠記録を出勤時刻順に1件ずつ返す"""
+        return iter(self.get_team_attendance_by_period(team_id, start_date, end_date, page_size, projection))
+
+    def get_team_attendance_by_period(
+        self,
+        team_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        page_size: Optional[int] = None,
+        projection: Projection = None
+    ) -> List[AttendanceRecord]:
+        """ワークスペース全員の指定期間の勤怠記録をリストで取得"""
+        return self._select(lambda data: data.get("team_id") == team_id, start_date, end_date, projection)
+
+    def get_attendance_stats(
+        self,
+        user_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        team_id: str = None
+    ) -> Dict[str, Any]:
+        """指定期間の勤怠統計を勤怠記録から集計"""
+        return build_attendance_stats(
+            self.iter_attendance_by_period(user_id, start_date, end_date, team_id, projection=TIMING_FIELDS)
+        )
@@ -0,0 +1,53 @@
+import zlib
+from typing import Any, Dict, Iterable, Optional
+
+from src.models.attendance import AttendanceRecord, decode_time
+
+# チームの在席状況を分割するドキュメント数のデフォルト（出勤が集中しても1ドキュメントへの書き込みが詰まらないようにする）
+DEFAULT_PRESENCE_SHARDS = 4
+
+def presence_shard(user_id: str, shards: int) -> int:
+    """ユーザーの在席状況を保存するシャード番号（プロセスをまたいで変わらないハッシュで決める）"""
+    return zlib.crc32(user_id.encode("utf-8")) % shards
+
+def presence_doc_id(team_id: Optional[str], shard: int) -> str:
+    """team_presence コレクションのドキュメントID"""
+    return f"{team_id or ''}-{shard}"
+
+def presence_entry(attendance: AttendanceRecord) -> Dict[str, Any]:
+    """
+    出勤中の勤怠記録から在席状況の1人分を作成
+    - 経過時間は表示時に計算するため、時刻と終了済みの休憩時間の合計だけを保存する
+    """
+    current_break = attendance.break_periods[-1] if attendance.break_periods else None
+    on_break = current_break is not None and current_break.end_time is None
+    return {
+        "attendance_id": attendance.doc_id,
+        "user_name": attendance.user_name,
+        "status": "on_break" if on_break else "working",
+        "start_time": attendance.start_time,
+        "break_start_time": current_break.start_time if on_break else None,
+        "total_break_time": attendance.get_total_break_time()
+    }
+
+def build_presence_shards(team_id: Optional[str], records: Iterable[AttendanceRecord], shards: int) -> Dict[int, Dict[str, Any]]:
+    """出勤中の勤怠記録から全シャードの内容を作成（出勤中の人がいないシャードも空で作る）"""
+    docs = {
+        shard: {"team_id": team_id or "", "shard": shard, "members": {}}
+        for shard in range(shards)
+    }
+    for record in records:
+        docs[presence_shard(record.user_id, shards)]["members"][record.user_id] = presence_entry(record)
+    return docs
+
+def merge_presence_members(shard_docs: Iterable[Optional[Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """シャードごとのドキュメントから user_id -> 在席状況 のdictを作成（時刻は datetime に変換）"""
+    members = {}
+    for data in shard_docs:
+        for user_id, entry in ((data or {}).get("members") or {}).items():
+            members[user_id] = {
+                **entry,
+                "start_time": decode_time(entry.get("start_time")),
+                "break_start_time": decode_time(entry.get("break_start_time"))
+            }
+    return members
@@ -0,0 +1,52 @@
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from src.models.attendance import Attendance, AttendanceRecord, Projection
+
+# 業務報告の自由記述のフィールド
+# 数KBになることがあるため、打刻のたびに読み書きする勤怠記録とは別の attendance_reports/{attendance_id} に保存する
+REPORT_FIELDS = ("work_description", "work_progress")
+
+def report_fields_in(projection: Projection) -> Tuple[str, ...]:
+    """projection に含まれる業務報告のフィールド（含まれていなければ空で、業務報告は読み込まない）"""
+    if not projection:
+        return ()
+    return tuple(name for name in REPORT_FIELDS if name in projection)
+
+def split_report_fields(attendance: Attendance, data: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    勤怠記録の書き込み内容から業務報告のフィールドを取り出し、(勤怠記録に書き込む内容, 業務報告) を返す
+    - 業務報告は値があるか、読み込み後に変更されたフィールドだけを返す
+      （業務報告を読み込んでいない記録を上書きしても、保存済みの業務報告は消えない）
+    """
+    hot = {name: value for name, value in data.items() if name not in REPORT_FIELDS}
+    dirty_fields = attendance.dirty_fields
+    report = {
+        name: data[name]
+        for name in REPORT_FIELDS
+        if name in data and (data[name] is not None or name in dirty_fields)
+    }
+    return hot, report
+
+def build_report_document(attendance: Attendance, report: Dict[str, Any]) -> Dict[str, Any]:
+    """attendance_reports に保存する内容（どの勤務の報告かを検索できるよう、ユーザー・出勤時刻も保存する）"""
+    return {
+        "user_id": attendance.user_id,
+        "team_id": attendance.team_id or "",
+        "start_time": attendance.start_time,
+        **report
+    }
+
+def attach_reports(records: Iterable[AttendanceRecord], reports: Dict[str, Optional[Dict[str, Any]]], fields: Iterable[str]) -> None:
+    """
+    読み込んだ業務報告（doc_id -> attendance_reports の内容）を勤怠記録に設定
+    - 移行前の記録のように勤怠記録に業務報告が残っている場合は、attendance_reports の内容を優先する
+    - 読み込み後の変更としては扱わない
+    """
+    fields = tuple(fields)
+    for record in records:
+        report = reports.get(record.doc_id)
+        if not report:
+            continue
+        for name in fields:
+            if name in report:
+                object.__setattr__(record, name, report[name])
@@ -0,0 +1,147 @@
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.models.attendance import AttendanceRecord, decode_time
+
+# (team_id, user_id, year, month)
+RollupKey = Tuple[str, str, int, int]
+
+def rollup_key(team_id: Optional[str], user_id: str, year: int, month: int) -> RollupKey:
+    return (team_id or "", user_id, year, month)
+
+def rollup_key_of(attendance: AttendanceRecord) -> RollupKey:
+    """勤怠記録を集計する月（出勤日の月）のキー"""
+    return rollup_key(attendance.team_id, attendance.user_id, attendance.start_time.year, attendance.start_time.month)
+
+def rollup_doc_id(key: RollupKey) -> str:
+    """attendance_rollups コレクションのドキュメントID"""
+    team_id, user_id, year, month = key
+    return f"{team_id}-{user_id}-{year:04d}-{month:02d}"
+
+def is_complete_since(key: RollupKey, complete_since: Optional[str]) -> bool:
+    """complete_since（"YYYY-MM"）以降の月であれば、新しく作るロールアップを完全なものとして扱う"""
+    _, _, year, month = key
+    return complete_since is not None and f"{year:04d}-{month:02d}" >= complete_since
+
+def shift_entry(attendance: AttendanceRecord) -> Dict[str, Any]:
+    """
+    ロールアップに保存する退勤済みの勤務1件分の集計値
+    - 業務内容は保存しない（退勤のたびに月全体の業務報告を読み書きしないよう、attendance_reports から読む）
+    """
+    return {
+        "date": attendance.start_time.date().isoformat(),
+        "start_time": attendance.start_time,
+        "end_time": attendance.end_time,
+        "working_time": attendance.get_working_time(),
+        "break_time": attendance.get_total_break_time()
+    }
+
+def _timing_shifts(shifts: Optional[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """保存済みの勤務ごとの集計値（以前のロールアップに残っている業務内容は取り除く）"""
+    return {
+        doc_id: {name: value for name, value in entry.items() if name != "work_description"}
+        for doc_id, entry in (shifts or {}).items()
+    }
+
+def aggregate_shifts(shifts: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """勤務ごとの集計値から日ごと・週ごと・月間の合計を計算"""
+    days = {}
+    weekly_totals = {str(week): 0 for week in range(1, 6)}
+    total_working_time = 0
+    total_break_time = 0
+
+    for entry in shifts.values():
+        day = days.setdefault(entry["date"], {"working_time": 0, "break_time": 0, "attendance_count": 0})
+        day["working_time"] += entry["working_time"]
+        day["break_time"] += entry["break_time"]
+        day["attendance_count"] += 1
+
+        week_number = (date.fromisoformat(entry["date"]).day - 1) // 7 + 1
+        weekly_totals[str(week_number)] += entry["working_time"]
+        total_working_time += entry["working_time"]
+        total_break_time += entry["break_time"]
+
+    return {
+        "days": days,
+        "weekly_totals": weekly_totals,
+        "total_working_time": total_working_time,
+        "total_break_time": total_break_time,
+        "record_count": len(shifts)
+    }
+
+def _new_rollup(key: RollupKey, complete: bool) -> Dict[str, Any]:
+    team_id, user_id, year, month = key
+    return {
+        "team_id": team_id,
+        "user_id": user_id,
+        "year": year,
+        "month": month,
+        "complete": complete,
+        "shifts": {}
+    }
+
+def apply_shift(existing: Optional[Dict[str, Any]], attendance: AttendanceRecord, complete_since: Optional[str]) -> Dict[str, Any]:
+    """
+    退勤済みの勤務をロールアップに反映（同じ勤務を何度反映しても結果は変わらない）
+    - ロールアップがまだない場合は作成し、complete_since 以降の月であれば完全なものとして扱う
+    """
+    key = rollup_key_of(attendance)
+    data = dict(existing) if existing else _new_rollup(key, is_complete_since(key, complete_since))
+    shifts = _timing_shifts(data.get("shifts"))
+    shifts[attendance.doc_id] = shift_entry(attendance)
+    data["shifts"] = shifts
+    data.update(aggregate_shifts(shifts))
+    return data
+
+def rebuild_rollup(
+    key: RollupKey,
+    records: Iterable[AttendanceRecord],
+    existing: Optional[Dict[str, Any]],
+    scanned_at: datetime
+) -> Dict[str, Any]:
+    """
+    勤怠記録からロールアップを作り直す
+    - 読み込み後（scanned_at 以降）に退勤した勤務は既存のロールアップの値を残す
+    """
+    shifts = {
+        record.doc_id: shift_entry(record)
+        for record in records
+        if record.end_time is not None
+    }
+    for doc_id, entry in _timing_shifts((existing or {}).get("shifts")).items():
+        end_time = decode_time(entry.get("end_time"))
+        if doc_id not in shifts and end_time is not None and end_time >= scanned_at:
+            shifts[doc_id] = entry
+
+    data = _new_rollup(key, complete=True)
+    data["shifts"] = shifts
+    data.update(aggregate_shifts(shifts))
+    return data
+
+def rollup_to_summary(data: Dict[str, Any], work_descriptions: Dict[str, str]) -> Dict[str, Any]:
+    """
+    ロールアップから月次サマリー（summarize_attendance と同じ形式）を作成
+    - work_descriptions: 勤怠記録ごとの業務内容（doc_id -> 業務内容。リポジトリの get_work_descriptions で取得する）
+    """
+    descriptions: Dict[str, List[Tuple[datetime, str]]] = {}
+    for doc_id, entry in data["shifts"].items():
+        if work_descriptions.get(doc_id):
+            descriptions.setdefault(entry["date"], []).append((decode_time(entry["start_time"]), work_descriptions[doc_id]))
+
+    daily_records = {}
+    for day, totals in data["days"].items():
+        day_date = date.fromisoformat(day)
+        daily_records[day_date] = {
+            'working_time': totals["working_time"],
+            'break_time': totals["break_time"],
+            'week_number': (day_date.day - 1) // 7 + 1,
+            'work_description': [text for _, text in sorted(descriptions.get(day, []), key=lambda item: item[0])]
+        }
+
+    return {
+        'daily_records': daily_records,
+        'weekly_totals': {int(week): total for week, total in data["weekly_totals"].items()},
+        'total_working_time': data["total_working_time"],
+        'year': data["year"],
+        'month': data["month"]
+    }
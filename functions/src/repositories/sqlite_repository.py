@@ -0,0 +1,464 @@
+import json
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from src.models.attendance import TIMING_FIELDS, Attendance, AttendanceRecord, Projection, record_from_dict
+from src.repositories.base import (
+    DEFAULT_ACTIVE_PAGE_SIZE,
+    DEFAULT_PAGE_SIZE,
+    apply_field_updates,
+    build_attendance_stats,
+    closed_month_of,
+    invalidate_cached_month,
+    validate_page_cursor
+)
+from src.repositories.closed_month_cache import ClosedMonthSnapshot, MonthKey, closed_month_doc_id
+from src.repositories.presence import presence_entry
+from src.repositories.rollups import apply_shift, rollup_doc_id, rollup_key, rollup_key_of
+
+# 期間検索・出勤中の記録の一覧に使う列にインデックスを張る
+# （記録の本体は data 列にJSONで保存し、日時はISO-8601文字列にする）
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attendance (
+    doc_id TEXT PRIMARY KEY,
+    team_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    start_time REAL NOT NULL,
+    end_time REAL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS attendance_user_period ON attendance (user_id, start_time);
+CREATE INDEX IF NOT EXISTS attendance_team_period ON attendance (team_id, start_time);
+CREATE INDEX IF NOT EXISTS attendance_open ON attendance (team_id, doc_id) WHERE end_time IS NULL;
+
+CREATE TABLE IF NOT EXISTS active_attendance (
+    team_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    attendance_id TEXT NOT NULL,
+    PRIMARY KEY (team_id, user_id)
+);
+
+CREATE TABLE IF NOT EXISTS attendance_rollups (
+    doc_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS closed_month_summaries (
+    doc_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS closed_month_versions (
+    doc_id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+"""
+
+# IN (...) に1回で渡すパラメーターの数（SQLiteの変数の上限 999 より小さくする）
+IN_CHUNK_SIZE = 500
+
+def _encode(data: Dict[str, Any]) -> str:
+    """dictをJSONに変換（datetime はISO-8601文字列にする）"""
+    return json.dumps(data, ensure_ascii=False, default=lambda value: value.isoformat())
+
+def _epoch(value: Optional[datetime]) -> Optional[float]:
+    return value.timestamp() if value is not None else None
+
+class SqliteRepository:
+    """
+    SQLiteに保存する勤怠記録のストレージ（AttendanceRepository の実装）
+
+    - 小規模なチームでFirestoreを使わずにセルフホストするために使う
+    - 書き込みは BEGIN IMMEDIATE のトランザクションで直列化し、出勤の重複は active_attendance の主キーと、指す記録が出勤中かどうかの条件で防ぐ
+    - 期間検索は (user_id, start_time)・(team_id, start_time) のインデックスを page_size 件ずつ読み進める
+    """
+
+    def __init__(self, path: str, page_size: int = DEFAULT_PAGE_SIZE, rollups_complete_since: Optional[str] = None):
+        self.page_size = page_size
+        self.rollups_complete_since = rollups_complete_since
+        self._lock = threading.RLock()
+        # トランザクションは明示的に開始する（isolation_level=None）
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _transaction(self):
+        """書き込みのトランザクション（例外が発生した場合はロールバック）"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _query(self, sql: str, params: Tuple = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _to_attendance(row: sqlite3.Row, projection: Projection = None) -> AttendanceRecord:
+        """行を変換（projection を指定した場合は AttendanceTiming）"""
+        attendance = record_from_dict(json.loads(row["data"]), projection)
+        attendance.doc_id = row["doc_id"]
+        return attendance
+
+    def _write(self, conn: sqlite3.Connection, attendance: Attendance, data: Dict[str, Any]) -> Optional[MonthKey]:
+        """
+        トランザクション内で記録を保存し、退勤済みであればポインターの削除とロールアップの更新、
+        締め済みの月であれば保存済みの月次サマリーの削除とバージョンの更新も行う
+        """
+        conn.execute(
+            "INSERT OR REPLACE INTO attendance (doc_id, team_id, user_id, start_time, end_time, data) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                attendance.doc_id,
+                attendance.team_id or "",
+                attendance.user_id,
+                _epoch(attendance.start_time),
+                _epoch(attendance.end_time),
+                _encode(data)
+            )
+        )
+        if attendance.end_time is not None:
+            conn.execute(
+                "DELETE FROM active_attendance WHERE team_id = ? AND user_id = ? AND attendance_id = ?",
+                (attendance.team_id or "", attendance.user_id, attendance.doc_id)
+            )
+            rollup_id = rollup_doc_id(rollup_key_of(attendance))
+            row = conn.execute("SELECT data FROM attendance_rollups WHERE doc_id = ?", (rollup_id,)).fetchone()
+            rollup = apply_shift(json.loads(row["data"]) if row else None, attendance, self.rollups_complete_since)
+            conn.execute("INSERT OR REPLACE INTO attendance_rollups (doc_id, data) VALUES (?, ?)", (rollup_id, _encode(rollup)))
+
+        closed = closed_month_of(attendance)
+        if closed is not None:
+            summary_id = closed_month_doc_id(closed)
+            conn.execute("DELETE FROM closed_month_summaries WHERE doc_id = ?", (summary_id,))
+            conn.execute(
+                "INSERT INTO closed_month_versions (doc_id, version) VALUES (?, 1)"
+                " ON CONFLICT (doc_id) DO UPDATE SET version = version + 1",
+                (summary_id,)
+            )
+        return closed
+
+    def _commit(self, attendance: Attendance, write: Callable[[sqlite3.Connection], Dict[str, Any]]) -> None:
+        """write(conn) が返した内容で記録を保存するトランザクションを実行"""
+        with self._transaction() as conn:
+            invalidated = self._write(conn, attendance, write(conn))
+        invalidate_cached_month(invalidated)
+        attendance.clear_dirty()
+
+    def create_attendance(self, attendance: Attendance) -> None:
+        """新しい勤怠記録を作成（出勤中の記録であればポインターも作成する）"""
+        attendance.doc_id = uuid.uuid4().hex
+
+        def write(conn):
+            if attendance.end_time is None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO active_attendance (team_id, user_id, attendance_id) VALUES (?, ?, ?)",
+                    (attendance.team_id or "", attendance.user_id, attendance.doc_id)
+                )
+            return attendance.to_dict()
+
+        self._commit(attendance, write)
+
+    def create_active_attendance(self, attendance: Attendance) -> bool:
+        """
+        出勤中の勤怠記録をポインターと同時に作成（出勤中の記録が既にあればFalse）
+        - ポインターが退勤済み・削除済みの記録を指している場合は上書きする
+        """
+        attendance.doc_id = uuid.uuid4().hex
+
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "INSERT INTO active_attendance (team_id, user_id, attendance_id) VALUES (?, ?, ?)"
+                " ON CONFLICT (team_id, user_id) DO UPDATE SET attendance_id = excluded.attendance_id"
+                " WHERE NOT EXISTS ("
+                "SELECT 1 FROM attendance a WHERE a.doc_id = active_attendance.attendance_id AND a.end_time IS NULL"
+                ")",
+                (attendance.team_id or "", attendance.user_id, attendance.doc_id)
+            )
+            if cursor.rowcount == 0:
+                attendance.doc_id = None
+                return False
+            invalidated = self._write(conn, attendance, attendance.to_dict())
+        invalidate_cached_month(invalidated)
+        attendance.clear_dirty()
+        return True
+
+    def _read_active(self, conn: sqlite3.Connection, user_id: str, team_id: Optional[str]) -> Optional[Attendance]:
+        row = conn.execute(
+            "SELECT a.doc_id, a.data FROM active_attendance p JOIN attendance a ON a.doc_id = p.attendance_id"
+            " WHERE p.team_id = ? AND p.user_id = ? AND a.end_time IS NULL",
+            (team_id or "", user_id)
+        ).fetchone()
+        return self._to_attendance(row) if row else None
+
+    def update_active_attendance(
+        self,
+        user_id: str,
+        team_id: Optional[str],
+        mutate: Callable[[Optional[Attendance]], Attendance]
+    ) -> Attendance:
+        """出勤中の勤怠記録の読み取り・変更・書き込みを1つのトランザクションで実行"""
+        with self._transaction() as conn:
+            active_attendance = self._read_active(conn, user_id, team_id)
+            attendance = mutate(active_attendance)
+            row = conn.execute("SELECT data FROM attendance WHERE doc_id = ?", (attendance.doc_id,)).fetchone()
+            invalidated = self._write(conn, attendance, apply_field_updates(json.loads(row["data"]), attendance))
+        invalidate_cached_month(invalidated)
+        attendance.clear_dirty()
+        return attendance
+
+    def get_active_attendance(self, user_id: str, team_id: str = None) -> Optional[Attendance]:
+        """ポインターから出勤中の勤怠記録を取得"""
+        with self._lock:
+            return self._read_active(self._conn, user_id, team_id)
+
+    def get_active_attendances_for_users(
+        self,
+        user_ids: Sequence[str],
+        team_id: str = None,
+        projection: Projection = None
+    ) -> Dict[str, AttendanceRecord]:
+        """ポインターから複数のユーザーの出勤中の勤怠記録を IN_CHUNK_SIZE 人ずつ取得"""
+        user_ids = list(dict.fromkeys(user_ids))
+        records = {}
+        for i in range(0, len(user_ids), IN_CHUNK_SIZE):
+            chunk = user_ids[i:i + IN_CHUNK_SIZE]
+            rows = self._query(
+                "SELECT p.user_id, a.doc_id, a.data FROM active_attendance p JOIN attendance a ON a.doc_id = p.attendance_id"
+                f" WHERE p.team_id = ? AND p.user_id IN ({', '.join('?' * len(chunk))}) AND a.end_time IS NULL",
+                (team_id or "", *chunk)
+            )
+            for row in rows:
+                records[row["user_id"]] = self._to_attendance(row, projection)
+        return records
+
+    def get_active_attendance_page(
+        self,
+        team_id: str = None,
+        cursor: Optional[str] = None,
+        page_size: int = DEFAULT_ACTIVE_PAGE_SIZE,
+        projection: Projection = None
+    ) -> Tuple[List[AttendanceRecord], Optional[str]]:
+        """アクティブな勤怠記録をID順に page_size 件ずつ取得（次のページのカーソルも返す）"""
+        sql = "SELECT doc_id, data FROM attendance WHERE end_time IS NULL"
+        params: List[Any] = []
+        if team_id:
+            sql += " AND team_id = ?"
+            params.append(team_id)
+        if cursor is not None:
+            sql += " AND doc_id > ?"
+            params.append(validate_page_cursor(cursor))
+        sql += " ORDER BY doc_id LIMIT ?"
+        # 1件多く読み、次のページがあるかを判定する
+        params.append(page_size + 1)
+
+        rows = self._query(sql, tuple(params))
+        records = [self._to_attendance(row, projection) for row in rows[:page_size]]
+        next_cursor = records[-1].doc_id if len(rows) > page_size else None
+        return records, next_cursor
+
+    def get_all_active_attendances(self, team_id: str = None, projection: Projection = None) -> List[AttendanceRecord]:
+        """すべてのアクティブな勤怠記録を取得"""
+        sql = "SELECT doc_id, data FROM attendance WHERE end_time IS NULL"
+        params: Tuple = ()
+        if team_id:
+            sql += " AND team_id = ?"
+            params = (team_id,)
+        return [self._to_attendance(row, projection) for row in self._query(sql + " ORDER BY doc_id", params)]
+
+    def get_team_presence(self, team_id: str) -> Dict[str, Dict[str, Any]]:
+        """チームの在席状況を出勤中の勤怠記録から作成"""
+        return {record.user_id: presence_entry(record) for record in self.get_all_active_attendances(team_id, TIMING_FIELDS)}
+
+    def update_attendance(self, attendance: Attendance) -> None:
+        """勤怠記録全体を上書き"""
+        if not attendance.doc_id:
+            raise ValueError("Cannot update attendance without doc_id.")
+        self._commit(attendance, lambda conn: attendance.to_dict())
+
+    def update_attendance_fields(self, attendance: Attendance) -> None:
+        """読み込み後に変更されたフィールドだけを更新（変更がなければ何もしない）"""
+        if not attendance.doc_id:
+            raise ValueError("Cannot update attendance without doc_id.")
+        if not attendance.dirty_fields and not attendance.appended_breaks:
+            return
+
+        def write(conn):
+            row = conn.execute("SELECT data FROM attendance WHERE doc_id = ?", (attendance.doc_id,)).fetchone()
+            return apply_field_updates(json.loads(row["data"]), attendance)
+
+        self._commit(attendance, write)
+
+    def get_complete_rollup(self, user_id: str, year: int, month: int, team_id: str = None) -> Optional[Dict[str, Any]]:
+        """全勤務を含むロールアップを取得（ない場合・不完全な場合はNone）"""
+        rows = self._query(
+            "SELECT data FROM attendance_rollups WHERE doc_id = ?",
+            (rollup_doc_id(rollup_key(team_id, user_id, year, month)),)
+        )
+        data = json.loads(rows[0]["data"]) if rows else None
+        if data is None or not data.get("complete"):
+            return None
+        return data
+
+    def get_rollups_for_users(
+        self,
+        user_ids: Sequence[str],
+        year: int,
+        month: int,
+        team_id: str = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """複数のユーザーの指定月のロールアップを IN_CHUNK_SIZE 人ずつ取得"""
+        doc_ids = {
+            rollup_doc_id(rollup_key(team_id, user_id, year, month)): user_id
+            for user_id in user_ids
+        }
+        keys = list(doc_ids)
+        rollups = {}
+        for i in range(0, len(keys), IN_CHUNK_SIZE):
+            chunk = keys[i:i + IN_CHUNK_SIZE]
+            rows = self._query(
+                f"SELECT doc_id, data FROM attendance_rollups WHERE doc_id IN ({', '.join('?' * len(chunk))})",
+                tuple(chunk)
+            )
+            for row in rows:
+                rollups[doc_ids[row["doc_id"]]] = json.loads(row["data"])
+        return rollups
+
+    def get_work_descriptions(self, attendance_ids: Sequence[str]) -> Dict[str, str]:
+        """勤怠記録ごとの業務内容を IN_CHUNK_SIZE 件ずつ取得（記載のない記録は含まない）"""
+        attendance_ids = list(dict.fromkeys(attendance_ids))
+        descriptions = {}
+        for i in range(0, len(attendance_ids), IN_CHUNK_SIZE):
+            chunk = attendance_ids[i:i + IN_CHUNK_SIZE]
+            rows = self._query(
+                f"SELECT doc_id, json_extract(data, '$.work_description') AS work_description"
+                f" FROM attendance WHERE doc_id IN ({', '.join('?' * len(chunk))})",
+                tuple(chunk)
+            )
+            for row in rows:
+                if row["work_description"]:
+                    descriptions[row["doc_id"]] = row["work_description"]
+        return descriptions
+
+    @staticmethod
+    def _closed_month_version(conn: sqlite3.Connection, summary_id: str) -> int:
+        row = conn.execute("SELECT version FROM closed_month_versions WHERE doc_id = ?", (summary_id,)).fetchone()
+        return row["version"] if row else 0
+
+    def get_closed_month_summary(self, key: MonthKey) -> ClosedMonthSnapshot:
+        """保存済みの締め済みの月の月次サマリーと、その月のバージョンを取得"""
+        summary_id = closed_month_doc_id(key)
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM closed_month_summaries WHERE doc_id = ?", (summary_id,)).fetchone()
+            version = self._closed_month_version(self._conn, summary_id)
+        return ClosedMonthSnapshot(json.loads(row["data"]) if row else None, version)
+
+    def save_closed_month_summary(self, key: MonthKey, data: Dict[str, Any], version: int) -> bool:
+        """締め済みの月の月次サマリーを、バージョンが version のままの場合だけ保存"""
+        summary_id = closed_month_doc_id(key)
+        with self._transaction() as conn:
+            if self._closed_month_version(conn, summary_id) != version:
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO closed_month_summaries (doc_id, data) VALUES (?, ?)",
+                (summary_id, _encode(data))
+            )
+        return True
+
+    def _stream(
+        self,
+        where: str,
+        params: Tuple,
+        start_date: datetime,
+        end_date: datetime,
+        page_size: Optional[int],
+        projection: Projection
+    ) -> Iterator[AttendanceRecord]:
+        """
+        条件に合う期間内の勤怠記録を (start_time, doc_id) 順に page_size 件ずつ読み込みながら1件ずつ返す
+        - ページの間はロックを手放すため、読み込み中も打刻を待たせない
+        """
+        page_size = page_size or self.page_size
+        last = (_epoch(start_date), "")
+        while True:
+            rows = self._query(
+                f"SELECT doc_id, data, start_time FROM attendance WHERE {where}"
+                " AND (start_time > ? OR (start_time = ? AND doc_id > ?)) AND start_time <= ?"
+                " ORDER BY start_time, doc_id LIMIT ?",
+                params + (last[0], last[0], last[1], _epoch(end_date), page_size)
+            )
+            for row in rows:
+                yield self._to_attendance(row, projection)
+            if len(rows) < page_size:
+                return
+            last = (rows[-1]["start_time"], rows[-1]["doc_id"])
+
+    def iter_attendance_by_period(
+        self,
+        user_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        team_id: str = None,
+        page_size: Optional[int] = None,
+        projection: Projection = None
+    ) -> Iterator[AttendanceRecord]:
+        """指定期間の勤怠記録を出勤時刻順に1件ずつ返す"""
+        if team_id:
+            return self._stream("user_id = ? AND team_id = ?", (user_id, team_id), start_date, end_date, page_size, projection)
+        return self._stream("user_id = ?", (user_id,), start_date, end_date, page_size, projection)
+
+    def get_attendance_by_period(
+        self,
+        user_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        team_id: str = None,
+        page_size: Optional[int] = None,
+        projection: Projection = None
+    ) -> List[AttendanceRecord]:
+        """指定期間の勤怠記録をリストで取得"""
+        return list(self.iter_attendance_by_period(user_id, start_date, end_date, team_id, page_size, projection))
+
+    def iter_team_attendance_by_period(
+        self,
+        team_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        page_size: Optional[int] = None,
+        projection: Projection = None
+    ) -> Iterator[AttendanceRecord]:
+        """ワークスペース全員の指定期間の勤怠記録を出勤時刻順に1件ずつ返す"""
+        return self._stream("team_id = ?", (team_id,), start_date, end_date, page_size, projection)
+
+    def get_team_attendance_by_period(
+        self,
+        team_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        page_size: Optional[int] = None,
+        projection: Projection = None
+    ) -> List[AttendanceRecord]:
+        """ワークスペース全員の指定期間の勤怠記録をリストで取得"""
+        return list(self.iter_team_attendance_by_period(team_id, start_date, end_date, page_size, projection))
+
+    def get_attendance_stats(
+        self,
+        user_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        team_id: str = None
+    ) -> Dict[str, Any]:
+        """指定期間の勤怠統計を勤怠記録から集計"""
+        return build_attendance_stats(
+            self.iter_attendance_by_period(user_id, start_date, end_date, team_id, projection=TIMING_FIELDS)
+        )
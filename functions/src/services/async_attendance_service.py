@@ -0,0 +1,84 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from src.models.attendance import Attendance
+from src.repositories.base import AsyncAttendanceRepository
+from src.services.attendance_service import rejection_message
+from src.services.attendance_state import (
+    AttendanceEvent,
+    AttendanceState,
+    InvalidTransition,
+    begin_break,
+    close_shift,
+    close_shift_with_report,
+    finish_break,
+    guarded_transition,
+    open_shift
+)
+from src.utils.time_utils import get_current_time
+
+class AsyncAttendanceService:
+    """AttendanceService の非同期版"""
+
+    def __init__(self, repository: AsyncAttendanceRepository):
+        self.repository = repository
+
+    async def punch_in(self, user_id: str, user_name: str, team_id: str) -> Tuple[bool, str, Optional[datetime]]:
+        """出勤処理"""
+        attendance = open_shift(user_id, user_name, team_id, get_current_time())
+        if not await self.repository.create_active_attendance(attendance):
+            return False, rejection_message(InvalidTransition(AttendanceState.WORKING, AttendanceEvent.PUNCH_IN)), None
+        return True, "出勤を記録しました。", attendance.start_time
+
+    async def punch_out(self, user_id: str, team_id: str) -> Tuple[bool, str, Optional[Attendance]]:
+        """退勤処理"""
+        try:
+            attendance = await self.repository.update_active_attendance(
+                user_id, team_id, guarded_transition(AttendanceEvent.PUNCH_OUT, close_shift)
+            )
+        except InvalidTransition as e:
+            return False, rejection_message(e), None
+        return True, "退勤を記録しました。", attendance
+
+    async def punch_out_with_report(
+        self,
+        user_id: str,
+        team_id: str,
+        work_description: Optional[str],
+        report_channel_id: Optional[str],
+        mention_user_ids: List[str]
+    ) -> Tuple[bool, str, Optional[Attendance]]:
+        """
+        退勤処理（業務報告付き）
+        退勤時刻と業務報告のフィールドを1つのトランザクションで書き込むため、退勤だけが記録されて報告が失われることはない
+        """
+        mutate = close_shift_with_report(work_description, report_channel_id, mention_user_ids)
+        try:
+            attendance = await self.repository.update_active_attendance(
+                user_id, team_id, guarded_transition(AttendanceEvent.PUNCH_OUT, mutate)
+            )
+        except InvalidTransition as e:
+            return False, rejection_message(e), None
+        return True, "退勤を記録しました。", attendance
+
+    async def start_break(self, user_id: str, team_id: str) -> Tuple[bool, str, Optional[datetime]]:
+        """休憩開始処理"""
+        try:
+            attendance = await self.repository.update_active_attendance(
+                user_id, team_id, guarded_transition(AttendanceEvent.START_BREAK, begin_break)
+            )
+        except InvalidTransition as e:
+            return False, rejection_message(e), None
+        return True, "休憩を開始しました。", attendance.break_periods[-1].start_time
+
+    async def end_break(self, user_id: str, team_id: str) -> Tuple[bool, str, Optional[Tuple[datetime, float]]]:
+        """休憩終了処理"""
+        try:
+            attendance = await self.repository.update_active_attendance(
+                user_id, team_id, guarded_transition(AttendanceEvent.END_BREAK, finish_break)
+            )
+        except InvalidTransition as e:
+            return False, rejection_message(e), None
+
+        current_break = attendance.break_periods[-1]
+        return True, "休憩を終了しました。", (current_break.end_time, current_break.get_duration())
@@ -0,0 +1,118 @@
+from typing import Dict, Any, Optional, Tuple
+
+from ..models.attendance import SUMMARY_FIELDS, TIMING_FIELDS
+from ..repositories.base import AsyncAttendanceRepository
+from ..repositories.closed_month_cache import (
+    ClosedMonthCache,
+    decode_summary,
+    encode_summary,
+    get_closed_month_cache,
+    month_key
+)
+from ..repositories.rollups import rollup_to_summary
+from ..utils.time_utils import get_start_of_month, get_end_of_month, is_closed_month
+from .monthly_summary_service import (
+    MonthlySummaryBuilder,
+    TeamSummaryBuilder,
+    build_summary_csv,
+    build_team_summary_csv
+)
+
+class AsyncMonthlySummaryService:
+    """MonthlySummaryService の非同期版"""
+
+    def __init__(
+        self,
+        repository: AsyncAttendanceRepository,
+        month_cache: Optional[ClosedMonthCache] = None,
+        persist_closed_months: bool = True
+    ):
+        self.repository = repository
+        self.month_cache = month_cache or get_closed_month_cache()
+        self.persist_closed_months = persist_closed_months
+
+    async def get_monthly_summary(
+        self,
+        user_id: str,
+        year: int,
+        month: int,
+        team_id: str = None,
+        include_descriptions: bool = False
+    ) -> Dict[str, Any]:
+        """
+        指定された月の勤怠サマリーを取得（締め済みの月はキャッシュを使う）
+        - include_descriptions=False の場合、締め済みでない月の業務内容は読み込まない
+        """
+        if not is_closed_month(year, month):
+            return await self._build_monthly_summary(user_id, year, month, team_id, include_descriptions)
+
+        key = month_key(team_id, user_id, year, month)
+        summary = self.month_cache.get(key)
+        if summary is not None:
+            return summary
+
+        # 集計中に記録が変更された場合、古い集計をキャッシュ・保存しないよう、読み込む前の世代・バージョンを控える
+        generation = self.month_cache.generation(key)
+        snapshot = await self.repository.get_closed_month_summary(key) if self.persist_closed_months else None
+        if snapshot is not None and snapshot.summary is not None:
+            summary = decode_summary(snapshot.summary)
+        else:
+            summary = await self._build_monthly_summary(user_id, year, month, team_id, include_descriptions=True)
+            if snapshot is not None and not await self.repository.save_closed_month_summary(
+                key, encode_summary(summary), snapshot.version
+            ):
+                return summary
+
+        self.month_cache.put(key, summary, generation)
+        return summary
+
+    async def _build_monthly_summary(
+        self,
+        user_id: str,
+        year: int,
+        month: int,
+        team_id: str = None,
+        include_descriptions: bool = False
+    ) -> Dict[str, Any]:
+        """ロールアップ（なければ勤怠記録）から月次サマリーを集計"""
+        rollup = await self.repository.get_complete_rollup(user_id, year, month, team_id=team_id)
+        if rollup is not None:
+            # ロールアップには業務内容を保存しないため、必要な場合だけ勤務ごとの業務内容をまとめて読み込む
+            if not include_descriptions:
+                return rollup_to_summary(rollup, {})
+            return rollup_to_summary(rollup, await self.repository.get_work_descriptions(list(rollup["shifts"])))
+
+        start_date = get_start_of_month(year, month)
+        end_date = get_end_of_month(year, month)
+
+        # 勤怠記録を1件ずつ読み込みながら集計
+        builder = MonthlySummaryBuilder(year, month)
+        async for record in self.repository.iter_attendance_by_period(
+            user_id, start_date, end_date, team_id=team_id,
+            projection=SUMMARY_FIELDS if include_descriptions else TIMING_FIELDS
+        ):
+            builder.add(record)
+        return builder.build()
+
+    async def generate_csv(self, user_id: str, user_name: str, year: int, month: int, team_id: str = None) -> Tuple[str, str]:
+        """月次サマリーのCSVを生成"""
+        summary = await self.get_monthly_summary(user_id, year, month, team_id=team_id, include_descriptions=True)
+        return build_summary_csv(summary, user_name)
+
+    async def get_team_monthly_summary(self, team_id: str, year: int, month: int) -> Dict[str, Any]:
+        """ワークスペース全員の指定された月の勤怠サマリーを1つのクエリで集計"""
+        start_date = get_start_of_month(year, month)
+        end_date = get_end_of_month(year, month)
+
+        # 勤怠記録を1件ずつ読み込みながらユーザーごとに集計
+        builder = TeamSummaryBuilder(year, month)
+        async for record in self.repository.iter_team_attendance_by_period(
+            team_id, start_date, end_date, projection=SUMMARY_FIELDS
+        ):
+            builder.add(record)
+        return builder.build()
+
+    async def generate_team_csv(self, team_id: str, year: int, month: int) -> Tuple[str, str]:
+        """ワークスペース全員の月次サマリーのCSVを生成"""
+        team_summary = await self.get_team_monthly_summary(team_id, year, month)
+        return build_team_summary_csv(team_summary, team_id)
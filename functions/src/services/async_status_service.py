@@ -0,0 +1,47 @@
+from typing import Dict, List, Any, Optional, Tuple
+
+from src.models.attendance import TIMING_FIELDS
+from src.repositories.base import DEFAULT_ACTIVE_PAGE_SIZE, AsyncAttendanceRepository
+from src.services.status_service import build_employee_status, page_presence_statuses
+from src.utils.time_utils import get_current_time
+
+class AsyncStatusService:
+    """StatusService の非同期版"""
+
+    def __init__(self, repository: AsyncAttendanceRepository, read_presence: bool = False):
+        self.repository = repository
+        self.read_presence = read_presence
+
+    async def get_active_employees(self, team_id: str) -> List[Dict[str, Any]]:
+        """現在アクティブな（出勤中または休憩中の）従業員の状態一覧を取得"""
+        if self.read_presence:
+            statuses, _ = page_presence_statuses(await self.repository.get_team_presence(team_id), team_id, get_current_time())
+            return statuses
+
+        active_records = await self.repository.get_all_active_attendances(team_id=team_id, projection=TIMING_FIELDS)
+        current_time = get_current_time()
+        return [build_employee_status(record, current_time) for record in active_records]
+
+    async def get_active_employees_page(
+        self,
+        team_id: str,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """現在アクティブな従業員の状態一覧を1ページ分取得（次のページのカーソルも返す）"""
+        if self.read_presence:
+            return page_presence_statuses(
+                await self.repository.get_team_presence(team_id), team_id, get_current_time(), cursor, DEFAULT_ACTIVE_PAGE_SIZE
+            )
+
+        active_records, next_cursor = await self.repository.get_active_attendance_page(
+            team_id=team_id, cursor=cursor, projection=TIMING_FIELDS
+        )
+        current_time = get_current_time()
+        return [build_employee_status(record, current_time) for record in active_records], next_cursor
+
+    async def get_employee_status(self, user_id: str, team_id: str) -> Optional[Dict[str, Any]]:
+        """特定の従業員の現在の状態を取得"""
+        active_attendance = await self.repository.get_active_attendance(user_id, team_id=team_id)
+        if not active_attendance:
+            return None
+        return build_employee_status(active_attendance, get_current_time())
@@ -1,69 +1,104 @@
 from datetime import datetime
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 
-from src.models.attendance import Attendance, BreakPeriod
-from src.repositories.firestore_repository import FirestoreRepository
+from src.models.attendance import Attendance
+from src.repositories.base import AttendanceRepository
+from src.services.attendance_state import (
+    AttendanceEvent,
+    AttendanceState,
+    InvalidTransition,
+    begin_break,
+    close_shift,
+    close_shift_with_report,
+    finish_break,
+    guarded_transition,
+    open_shift
+)
 from src.utils.time_utils import get_current_time
 
+# 受け付けられない打刻に対するメッセージ: (現在の状態, 打刻) -> メッセージ
+REJECTION_MESSAGES = {
+    (AttendanceState.WORKING, AttendanceEvent.PUNCH_IN): "既に出勤済みです。",
+    (AttendanceState.ON_BREAK, AttendanceEvent.PUNCH_IN): "既に出勤済みです。",
+    (AttendanceState.OFF, AttendanceEvent.PUNCH_OUT): "出勤記録が見つかりません。",
+    (AttendanceState.ON_BREAK, AttendanceEvent.PUNCH_OUT): "休憩中は退勤できません。まず休憩を終了してください。",
+    (AttendanceState.OFF, AttendanceEvent.START_BREAK): "出勤記録が見つかりません。",
+    (AttendanceState.ON_BREAK, AttendanceEvent.START_BREAK): "既に休憩中です。",
+    (AttendanceState.OFF, AttendanceEvent.END_BREAK): "出勤記録が見つかりません。",
+    (AttendanceState.WORKING, AttendanceEvent.END_BREAK): "休憩が開始されていません。",
+}
+
+def rejection_message(error: InvalidTransition) -> str:
+    """受け付けられない打刻に対するメッセージ"""
+    return REJECTION_MESSAGES.get((error.state, error.event), "現在の状態ではこの操作はできません。")
+
 class AttendanceService:
-    def __init__(self, repository: FirestoreRepository):
+    """
+    打刻処理（off → working ⇄ on_break → off の状態遷移）
+
+    どの打刻も出勤中の記録の読み取りと書き込みを1つのトランザクションで処理するため、
+    二重タップやSlackのリトライで同じ打刻が同時に届いても、記録されるのは1回だけ。
+    """
+
+    def __init__(self, repository: AttendanceRepository):
         self.repository = repository
 
     def punch_in(self, user_id: str, user_name: str, team_id: str) -> Tuple[bool, str, Optional[datetime]]:
         """出勤処理"""
-        active_attendance = self.repository.get_active_attendance(user_id, team_id)
-        if active_attendance:
-            return False, "既に出勤済みです。", None
-
-        current_time = get_current_time()
-        attendance = Attendance(
-            user_id=user_id,
-            user_name=user_name,
-            team_id=team_id,  # ワークスペースIDを追加
-            start_time=current_time
-        )
-        self.repository.create_attendance(attendance)
-        return True, "出勤を記録しました。", current_time
+        attendance = open_shift(user_id, user_name, team_id, get_current_time())
+        if not self.repository.create_active_attendance(attendance):
+            return False, rejection_message(InvalidTransition(AttendanceState.WORKING, AttendanceEvent.PUNCH_IN)), None
+        return True, "出勤を記録しました。", attendance.start_time
 
     def punch_out(self, user_id: str, team_id: str) -> Tuple[bool, str, Optional[Attendance]]:
         """退勤処理"""
-        active_attendance = self.repository.get_active_attendance(user_id, team_id)
-        if not active_attendance:
-            return False, "出勤記録が見つかりません。", None
+        try:
+            attendance = self.repository.update_active_attendance(
+                user_id, team_id, guarded_transition(AttendanceEvent.PUNCH_OUT, close_shift)
+            )
+        except InvalidTransition as e:
+            return False, rejection_message(e), None
+        return True, "退勤を記録しました。", attendance
 
-        if active_attendance.break_periods and not active_attendance.break_periods[-1].end_time:
-            return False, "休憩中は退勤できません。まず休憩を終了してください。", None
-
-        active_attendance.end_time = get_current_time()
-        self.repository.update_attendance(active_attendance)
-        return True, "退勤を記録しました。", active_attendance
+    def punch_out_with_report(
+        self,
+        user_id: str,
+        team_id: str,
+        work_description: Optional[str],
+        report_channel_id: Optional[str],
+        mention_user_ids: List[str]
+    ) -> Tuple[bool, str, Optional[Attendance]]:
+        """
+        退勤処理（業務報告付き）
+        退勤時刻と業務報告のフィールドを1つのトランザクションで書き込むため、退勤だけが記録されて報告が失われることはない
+        """
+        mutate = close_shift_with_report(work_description, report_channel_id, mention_user_ids)
+        try:
+            attendance = self.repository.update_active_attendance(
+                user_id, team_id, guarded_transition(AttendanceEvent.PUNCH_OUT, mutate)
+            )
+        except InvalidTransition as e:
+            return False, rejection_message(e), None
+        return True, "退勤を記録しました。", attendance
 
     def start_break(self, user_id: str, team_id: str) -> Tuple[bool, str, Optional[datetime]]:
         """休憩開始処理"""
-        active_attendance = self.repository.get_active_attendance(user_id, team_id)
-        if not active_attendance:
-            return False, "出勤記録が見つかりません。", None
-
-        if active_attendance.break_periods and not active_attendance.break_periods[-1].end_time:
-            return False, "既に休憩中です。", None
-
-        current_time = get_current_time()
-        active_attendance.break_periods.append(BreakPeriod(start_time=current_time))
-        self.repository.update_attendance(active_attendance)
-        return True, "休憩を開始しました。", current_time
+        try:
+            attendance = self.repository.update_active_attendance(
+                user_id, team_id, guarded_transition(AttendanceEvent.START_BREAK, begin_break)
+            )
+        except InvalidTransition as e:
+            return False, rejection_message(e), None
+        return True, "休憩を開始しました。", attendance.break_periods[-1].start_time
 
     def end_break(self, user_id: str, team_id: str) -> Tuple[bool, str, Optional[Tuple[datetime, float]]]:
         """休憩終了処理"""
-        active_attendance = self.repository.get_active_attendance(user_id, team_id)
-        if not active_attendance:
-            return False, "出勤記録が見つかりません。", None
-
-        if not active_attendance.break_periods or active_attendance.break_periods[-1].end_time:
-            return False, "休憩が開始されていません。", None
+        try:
+            attendance = self.repository.update_active_attendance(
+                user_id, team_id, guarded_transition(AttendanceEvent.END_BREAK, finish_break)
+            )
+        except InvalidTransition as e:
+            return False, rejection_message(e), None
 
-        current_time = get_current_time()
-        active_attendance.break_periods[-1].end_time = current_time
-        break_duration = active_attendance.break_periods[-1].get_duration()
-        
-        self.repository.update_attendance(active_attendance)
-        return True, "休憩を終了しました。", (current_time, break_duration)
\ No newline at end of file
+        current_break = attendance.break_periods[-1]
+        return True, "休憩を終了しました。", (current_break.end_time, current_break.get_duration())
@@ -0,0 +1,103 @@
+from datetime import datetime
+from enum import Enum
+from typing import Callable, List, Optional
+
+from src.models.attendance import Attendance, BreakPeriod
+from src.utils.time_utils import get_current_time
+
+class AttendanceState(Enum):
+    """ユーザーの勤務状態"""
+    OFF = "off"            # 未出勤・退勤済み
+    WORKING = "working"    # 勤務中
+    ON_BREAK = "on_break"  # 休憩中
+
+class AttendanceEvent(Enum):
+    """勤務状態を変える打刻"""
+    PUNCH_IN = "punch_in"
+    START_BREAK = "start_break"
+    END_BREAK = "end_break"
+    PUNCH_OUT = "punch_out"
+
+# 許可する状態遷移: (現在の状態, 打刻) -> 遷移後の状態
+#   off -> working <-> on_break
+#          working -> off
+TRANSITIONS = {
+    (AttendanceState.OFF, AttendanceEvent.PUNCH_IN): AttendanceState.WORKING,
+    (AttendanceState.WORKING, AttendanceEvent.START_BREAK): AttendanceState.ON_BREAK,
+    (AttendanceState.ON_BREAK, AttendanceEvent.END_BREAK): AttendanceState.WORKING,
+    (AttendanceState.WORKING, AttendanceEvent.PUNCH_OUT): AttendanceState.OFF,
+}
+
+class InvalidTransition(Exception):
+    """現在の状態では受け付けられない打刻"""
+
+    def __init__(self, state: AttendanceState, event: AttendanceEvent):
+        super().__init__(f"Cannot {event.value} while {state.value}")
+        self.state = state
+        self.event = event
+
+def state_of(attendance: Optional[Attendance]) -> AttendanceState:
+    """出勤中の勤怠記録（なければNone）から現在の状態を判定"""
+    if attendance is None or attendance.end_time is not None:
+        return AttendanceState.OFF
+    if attendance.break_periods and not attendance.break_periods[-1].end_time:
+        return AttendanceState.ON_BREAK
+    return AttendanceState.WORKING
+
+def next_state(state: AttendanceState, event: AttendanceEvent) -> AttendanceState:
+    """遷移後の状態を返す（許可されていない遷移は InvalidTransition）"""
+    try:
+        return TRANSITIONS[(state, event)]
+    except KeyError:
+        raise InvalidTransition(state, event) from None
+
+def open_shift(user_id: str, user_name: str, team_id: str, now: datetime) -> Attendance:
+    """出勤: 新しい勤怠記録を作成"""
+    return Attendance(
+        user_id=user_id,
+        user_name=user_name,
+        team_id=team_id,
+        start_time=now
+    )
+
+def begin_break(attendance: Attendance, now: datetime) -> Attendance:
+    """休憩開始"""
+    attendance.add_break(BreakPeriod(start_time=now))
+    return attendance
+
+def finish_break(attendance: Attendance, now: datetime) -> Attendance:
+    """休憩終了"""
+    attendance.end_current_break(now)
+    return attendance
+
+def close_shift(attendance: Attendance, now: datetime) -> Attendance:
+    """退勤"""
+    attendance.end_time = now
+    return attendance
+
+def close_shift_with_report(
+    work_description: Optional[str],
+    report_channel_id: Optional[str],
+    mention_user_ids: List[str],
+    work_progress: str = ""
+) -> Callable[[Attendance, datetime], Attendance]:
+    """退勤と同時に業務報告のフィールドを設定する関数を返す（退勤時刻と報告を1回の書き込みで保存する）"""
+    def apply(attendance: Attendance, now: datetime) -> Attendance:
+        close_shift(attendance, now)
+        attendance.work_description = work_description
+        attendance.work_progress = work_progress
+        attendance.report_channel_id = report_channel_id
+        attendance.mention_user_ids = list(mention_user_ids or [])
+        return attendance
+    return apply
+
+def guarded_transition(event: AttendanceEvent, mutate: Callable[[Attendance, datetime], Attendance]):
+    """
+    状態遷移を検証してから mutate を適用する関数を返す（repository.update_active_attendance に渡す）
+
+    許可されていない遷移の場合は InvalidTransition を送出し、何も書き込まれない。
+    """
+    def apply(active_attendance: Optional[Attendance]) -> Attendance:
+        next_state(state_of(active_attendance), event)
+        return mutate(active_attendance, get_current_time())
+    return apply
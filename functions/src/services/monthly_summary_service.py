@@ -1,118 +1,338 @@
 from datetime import datetime, timedelta
 import calendar
-import csv
-from io import StringIO
-from typing import List, Dict, Any, Tuple
+from typing import Iterable, List, Dict, Any, Optional, Tuple
 
-from ..models.attendance import Attendance
-from ..repositories.firestore_repository import FirestoreRepository
-from ..utils.time_utils import get_current_time, get_start_of_month, get_end_of_month
+from ..models.attendance import SUMMARY_FIELDS, TIMING_FIELDS, AttendanceRecord
+from ..repositories.base import AttendanceRepository
+from ..repositories.closed_month_cache import (
+    ClosedMonthCache,
+    decode_summary,
+    encode_summary,
+    get_closed_month_cache,
+    month_key
+)
+from ..repositories.rollups import rollup_to_summary
+from ..utils.time_utils import get_current_time, get_start_of_month, get_end_of_month, is_closed_month
 
-class MonthlySummaryService:
-    def __init__(self, repository: FirestoreRepository):
-        self.repository = repository
+class MonthlySummaryBuilder:
+    """勤怠記録を1件ずつ受け取り、日ごと・週ごと・月間の勤務時間を集計する"""
 
-    def get_monthly_summary(self, user_id: str, year: int, month: int, team_id: str = None) -> Dict[str, Any]:
-        """指定された月の勤怠サマリーを取得"""
-        # 月の開始日と終了日を取得
-        start_date = get_start_of_month(year, month)
-        end_date = get_end_of_month(year, month)
+    def __init__(self, year: int, month: int):
+        self.year = year
+        self.month = month
+        # 日ごとの勤怠記録を集計
+        self.daily_records = {}
+        self.weekly_totals = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}  # 週ごとの合計時間
+        self.total_working_time = 0
+
+    def add(self, record: AttendanceRecord) -> None:
+        """勤怠記録を1件集計に加える"""
+        date = record.start_time.date()
+        week_number = (date.day - 1) // 7 + 1
         
-        # 指定月の全ての勤怠記録を取得（ワークスペース制限つき）
-        records = self.repository.get_attendance_by_period(user_id, start_date, end_date, team_id=team_id)
+        if date not in self.daily_records:
+            self.daily_records[date] = {
+                'working_time': 0,
+                'break_time': 0,
+                'week_number': week_number,
+                # 当日に複数の勤怠がある場合は、業務内容を連結させるなどの対応をする
+                # ここでは簡単のため、一つでもあれば追記する仕組みにしておく
+                'work_description': []
+            }
         
-        # 日ごとの勤怠記録を集計
-        daily_records = {}
-        weekly_totals = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}  # 週ごとの合計時間
-        total_working_time = 0
+        working_time = record.get_working_time()
+        break_time = record.get_total_break_time()
         
-        for record in records:
-            date = record.start_time.date()
-            week_number = (date.day - 1) // 7 + 1
-            
-            if date not in daily_records:
-                daily_records[date] = {
-                    'working_time': 0,
-                    'break_time': 0,
-                    'week_number': week_number,
-                    # 当日に複数の勤怠がある場合は、業務内容を連結させるなどの対応をする
-                    # ここでは簡単のため、一つでもあれば追記する仕組みにしておく
-                    'work_description': []
-                }
-            
-            working_time = record.get_working_time()
-            break_time = record.get_total_break_time()
-            
-            daily_records[date]['working_time'] += working_time
-            daily_records[date]['break_time'] += break_time
-            weekly_totals[week_number] += working_time
-            total_working_time += working_time
-
-            # 業務内容があればリストに追加
-            if record.work_description:
-                daily_records[date]['work_description'].append(record.work_description)
+        daily = self.daily_records[date]
+        daily['working_time'] += working_time
+        daily['break_time'] += break_time
+        self.weekly_totals[week_number] += working_time
+        self.total_working_time += working_time
+
+        # 業務内容があればリストに追加
+        if record.work_description:
+            daily['work_description'].append(record.work_description)
+
+    def build(self) -> Dict[str, Any]:
+        """集計結果を返す"""
+        return {
+            'daily_records': self.daily_records,
+            'weekly_totals': self.weekly_totals,
+            'total_working_time': self.total_working_time,
+            'year': self.year,
+            'month': self.month
+        }
+
+def summarize_attendance(records: Iterable[AttendanceRecord], year: int, month: int) -> Dict[str, Any]:
+    """勤怠記録から日ごと・週ごと・月間の勤務時間を集計（records は1件ずつ読み進める）"""
+    builder = MonthlySummaryBuilder(year, month)
+    for record in records:
+        builder.add(record)
+    return builder.build()
+
+class TeamSummaryBuilder:
+    """ワークスペース全員の勤怠記録を1件ずつ受け取り、ユーザーごとに振り分けて集計する"""
+
+    def __init__(self, year: int, month: int):
+        self.year = year
+        self.month = month
+        self.builders: Dict[str, MonthlySummaryBuilder] = {}
+        self.user_names: Dict[str, str] = {}
+
+    def add(self, record: AttendanceRecord) -> None:
+        """勤怠記録を1件、そのユーザーの集計に加える"""
+        builder = self.builders.get(record.user_id)
+        if builder is None:
+            builder = self.builders[record.user_id] = MonthlySummaryBuilder(self.year, self.month)
+        builder.add(record)
+        # 表示名が変わっている場合は後から読んだ記録の名前を使う
+        self.user_names[record.user_id] = record.user_name
+
+    def build(self) -> Dict[str, Any]:
+        """
+        集計結果を返す
+        - members はユーザー名順で、各要素は user_id, user_name と summarize_attendance と同じ形式の summary を持つ
+        """
+        members = [
+            {
+                'user_id': user_id,
+                'user_name': self.user_names[user_id],
+                'summary': builder.build()
+            }
+            for user_id, builder in self.builders.items()
+        ]
+        members.sort(key=lambda member: (member['user_name'], member['user_id']))
 
         return {
-            'daily_records': daily_records,
-            'weekly_totals': weekly_totals,
-            'total_working_time': total_working_time,
-            'year': year,
-            'month': month
+            'members': members,
+            'total_working_time': sum(member['summary']['total_working_time'] for member in members),
+            'year': self.year,
+            'month': self.month
         }
+
+def summarize_team_attendance(records: Iterable[AttendanceRecord], year: int, month: int) -> Dict[str, Any]:
+    """ワークスペース全員の勤怠記録をユーザーごとに集計（records は1件ずつ読み進める）"""
+    builder = TeamSummaryBuilder(year, month)
+    for record in records:
+        builder.add(record)
+    return builder.build()
+
+def _format_time_to_hours_and_minutes(minutes: float) -> str:
+    hours = int(minutes // 60)
+    mins = int(minutes % 60)
+    if hours > 0:
+        return f"{hours}時間{mins}分"
+    return f"{mins}分"
+
+def build_summary_csv(summary: Dict[str, Any], user_name: str) -> Tuple[str, str]:
+    """月次サマリーからCSVのファイル名と内容を生成"""
+    # CSV関連のモジュールはダウンロード時にしか使わないため、ここで import する
+    import csv
+    from io import StringIO
+
+    year = summary['year']
+    month = summary['month']
+
+    # CSVファイル名を生成
+    filename = f"attendance_summary_{user_name}_{year}_{month:02d}.csv"
     
-    def _format_time_to_hours_and_minutes(self, minutes: float) -> str:
-        hours = int(minutes // 60)
-        mins = int(minutes % 60)
-        if hours > 0:
-            return f"{hours}時間{mins}分"
-        return f"{mins}分"
+    # CSVデータを生成
+    output = StringIO()
+    writer = csv.writer(output)
     
-    def generate_csv(self, user_id: str, user_name: str, year: int, month: int, team_id: str = None) -> Tuple[str, str]:
-        """月次サマリーのCSVを生成"""
-        summary = self.get_monthly_summary(user_id, year, month, team_id=team_id)
-        
-        # CSVファイル名を生成
-        filename = f"attendance_summary_{user_name}_{year}_{month:02d}.csv"
-        
-        # CSVデータを生成
-        output = StringIO()
-        writer = csv.writer(output)
-        
-        # ヘッダー行を書き込み
-        writer.writerow(['従業員名', user_name])
-        writer.writerow(['年月', f'{year}年{month}月'])
-        writer.writerow([])
-        # 列順: 日付, 曜日, 勤務時間, 休憩時間, 業務内容, 週番号
-        writer.writerow(['日付', '曜日', '勤務時間', '休憩時間', '業務内容', '週番号'])
-        
-        # 日々のデータを書き込み
+    # ヘッダー行を書き込み
+    writer.writerow(['従業員名', user_name])
+    writer.writerow(['年月', f'{year}年{month}月'])
+    writer.writerow([])
+    # 列順: 日付, 曜日, 勤務時間, 休憩時間, 業務内容, 週番号
+    writer.writerow(['日付', '曜日', '勤務時間', '休憩時間', '業務内容', '週番号'])
+    
+    # 日々のデータを書き込み
+    daily_records = summary['daily_records']
+    for date in sorted(daily_records.keys()):
+        record = daily_records[date]
+        date_str = date.strftime('%Y-%m-%d')
+        weekday_str = date.strftime('%A')
+        working_time_str = _format_time_to_hours_and_minutes(record['working_time'])
+        break_time_str = _format_time_to_hours_and_minutes(record['break_time'])
+        work_desc_str = "\n".join(record['work_description']) if record['work_description'] else ""
+        week_num = record['week_number']
+
+        writer.writerow([
+            date_str,
+            weekday_str,
+            working_time_str,
+            break_time_str,
+            work_desc_str,
+            week_num
+        ])
+    
+    # 週次サマリーを書き込み
+    writer.writerow([])
+    writer.writerow(['週次サマリー'])
+    for week, total in summary['weekly_totals'].items():
+        writer.writerow([f'第{week}週', _format_time_to_hours_and_minutes(total)])
+    
+    # 月次合計を書き込み
+    writer.writerow([])
+    writer.writerow(['月間合計勤務時間', _format_time_to_hours_and_minutes(summary['total_working_time'])])
+    
+    return filename, output.getvalue()
+
+def build_team_summary_csv(team_summary: Dict[str, Any], team_id: str) -> Tuple[str, str]:
+    """
+    ワークスペース全員の月次サマリーから給与計算用のCSVのファイル名と内容を生成
+    - 前半に従業員ごとの月間合計、後半に従業員ごとの日々の明細を書き込む
+    """
+    import csv
+    from io import StringIO
+
+    year = team_summary['year']
+    month = team_summary['month']
+    filename = f"attendance_team_summary_{team_id}_{year}_{month:02d}.csv"
+
+    output = StringIO()
+    writer = csv.writer(output)
+
+    writer.writerow(['年月', f'{year}年{month}月'])
+    writer.writerow(['従業員数', len(team_summary['members'])])
+    writer.writerow([])
+
+    # 従業員ごとの月間合計
+    writer.writerow(['従業員名', 'ユーザーID', '出勤日数', '月間合計勤務時間', '月間合計休憩時間', '勤務時間（分）']
+                    + [f'第{week}週' for week in range(1, 6)])
+    for member in team_summary['members']:
+        summary = member['summary']
         daily_records = summary['daily_records']
+        total_break_time = sum(record['break_time'] for record in daily_records.values())
+        writer.writerow([
+            member['user_name'],
+            member['user_id'],
+            len(daily_records),
+            _format_time_to_hours_and_minutes(summary['total_working_time']),
+            _format_time_to_hours_and_minutes(total_break_time),
+            int(summary['total_working_time'])
+        ] + [_format_time_to_hours_and_minutes(summary['weekly_totals'].get(week, 0)) for week in range(1, 6)])
+
+    writer.writerow([])
+    writer.writerow(['全従業員の合計勤務時間', _format_time_to_hours_and_minutes(team_summary['total_working_time'])])
+
+    # 従業員ごとの日々の明細
+    writer.writerow([])
+    writer.writerow(['従業員名', 'ユーザーID', '日付', '曜日', '勤務時間', '休憩時間', '業務内容', '週番号'])
+    for member in team_summary['members']:
+        daily_records = member['summary']['daily_records']
         for date in sorted(daily_records.keys()):
             record = daily_records[date]
-            date_str = date.strftime('%Y-%m-%d')
-            weekday_str = date.strftime('%A')
-            working_time_str = self._format_time_to_hours_and_minutes(record['working_time'])
-            break_time_str = self._format_time_to_hours_and_minutes(record['break_time'])
-            work_desc_str = "\n".join(record['work_description']) if record['work_description'] else ""
-            week_num = record['week_number']
-
             writer.writerow([
-                date_str,
-                weekday_str,
-                working_time_str,
-                break_time_str,
-                work_desc_str,
-                week_num
+                member['user_name'],
+                member['user_id'],
+                date.strftime('%Y-%m-%d'),
+                date.strftime('%A'),
+                _format_time_to_hours_and_minutes(record['working_time']),
+                _format_time_to_hours_and_minutes(record['break_time']),
+                "\n".join(record['work_description']) if record['work_description'] else "",
+                record['week_number']
             ])
+
+    return filename, output.getvalue()
+
+class MonthlySummaryService:
+    def __init__(
+        self,
+        repository: AttendanceRepository,
+        month_cache: Optional[ClosedMonthCache] = None,
+        persist_closed_months: bool = True
+    ):
+        self.repository = repository
+        # 締め済みの月のサマリーのキャッシュ（プロセス内のLRU → Firestoreに保存したサマリーの順に参照）
+        self.month_cache = month_cache or get_closed_month_cache()
+        self.persist_closed_months = persist_closed_months
+
+    def get_monthly_summary(
+        self,
+        user_id: str,
+        year: int,
+        month: int,
+        team_id: str = None,
+        include_descriptions: bool = False
+    ) -> Dict[str, Any]:
+        """
+        指定された月の勤怠サマリーを取得
+        - 締め済みの月は記録が変わらないため、キャッシュにあれば勤怠記録を読み込まずに返す
+          （キャッシュ・保存する月次サマリーは、CSVにも使えるよう常に業務内容を含める）
+        - include_descriptions=False の場合、締め済みでない月の業務内容は読み込まない
+          （ロールアップがあれば /summary の表示はロールアップ1件の読み取りで済む）
+        """
+        if not is_closed_month(year, month):
+            return self._build_monthly_summary(user_id, year, month, team_id, include_descriptions)
+
+        key = month_key(team_id, user_id, year, month)
+        summary = self.month_cache.get(key)
+        if summary is not None:
+            return summary
+
+        # 集計中に記録が変更された場合、古い集計をキャッシュ・保存しないよう、読み込む前の世代・バージョンを控える
+        generation = self.month_cache.generation(key)
+        snapshot = self.repository.get_closed_month_summary(key) if self.persist_closed_months else None
+        if snapshot is not None and snapshot.summary is not None:
+            summary = decode_summary(snapshot.summary)
+        else:
+            summary = self._build_monthly_summary(user_id, year, month, team_id, include_descriptions=True)
+            if snapshot is not None and not self.repository.save_closed_month_summary(
+                key, encode_summary(summary), snapshot.version
+            ):
+                return summary
+
+        self.month_cache.put(key, summary, generation)
+        return summary
+
+    def _build_monthly_summary(
+        self,
+        user_id: str,
+        year: int,
+        month: int,
+        team_id: str = None,
+        include_descriptions: bool = False
+    ) -> Dict[str, Any]:
+        """ロールアップ（なければ勤怠記録）から月次サマリーを集計"""
+        rollup = self.repository.get_complete_rollup(user_id, year, month, team_id=team_id)
+        if rollup is not None:
+            # ロールアップには業務内容を保存しないため、必要な場合だけ勤務ごとの業務内容をまとめて読み込む
+            if not include_descriptions:
+                return rollup_to_summary(rollup, {})
+            return rollup_to_summary(rollup, self.repository.get_work_descriptions(list(rollup["shifts"])))
+
+        # 月の開始日と終了日を取得
+        start_date = get_start_of_month(year, month)
+        end_date = get_end_of_month(year, month)
         
-        # 週次サマリーを書き込み
-        writer.writerow([])
-        writer.writerow(['週次サマリー'])
-        for week, total in summary['weekly_totals'].items():
-            writer.writerow([f'第{week}週', self._format_time_to_hours_and_minutes(total)])
-        
-        # 月次合計を書き込み
-        writer.writerow([])
-        writer.writerow(['月間合計勤務時間', self._format_time_to_hours_and_minutes(summary['total_working_time'])])
+        # 指定月の勤怠記録を1件ずつ読み込みながら集計（ワークスペース制限つき）
+        # 集計に使うフィールドだけを読み込む
+        records = self.repository.iter_attendance_by_period(
+            user_id, start_date, end_date, team_id=team_id,
+            projection=SUMMARY_FIELDS if include_descriptions else TIMING_FIELDS
+        )
         
-        return filename, output.getvalue()
\ No newline at end of file
+        return summarize_attendance(records, year, month)
+    
+    def generate_csv(self, user_id: str, user_name: str, year: int, month: int, team_id: str = None) -> Tuple[str, str]:
+        """月次サマリーのCSVを生成"""
+        summary = self.get_monthly_summary(user_id, year, month, team_id=team_id, include_descriptions=True)
+        return build_summary_csv(summary, user_name)
+
+    def get_team_monthly_summary(self, team_id: str, year: int, month: int) -> Dict[str, Any]:
+        """
+        ワークスペース全員の指定された月の勤怠サマリーを取得
+        - 全員分の勤怠記録を1つのクエリで読み込みながら、ユーザーごとに振り分けて集計する
+        """
+        start_date = get_start_of_month(year, month)
+        end_date = get_end_of_month(year, month)
+
+        records = self.repository.iter_team_attendance_by_period(team_id, start_date, end_date, projection=SUMMARY_FIELDS)
+        return summarize_team_attendance(records, year, month)
+
+    def generate_team_csv(self, team_id: str, year: int, month: int) -> Tuple[str, str]:
+        """ワークスペース全員の月次サマリーのCSVを生成"""
+        team_summary = self.get_team_monthly_summary(team_id, year, month)
+        return build_team_summary_csv(team_summary, team_id)
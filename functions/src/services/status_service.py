@@ -1,15 +1,93 @@
 from datetime import datetime
 from typing import Dict, List, Any, Tuple, Optional
 
-from src.models.attendance import Attendance
-from src.repositories.firestore_repository import FirestoreRepository
+from src.models.attendance import TIMING_FIELDS, AttendanceRecord
+from src.repositories.base import DEFAULT_ACTIVE_PAGE_SIZE, AttendanceRepository
 from src.utils.time_utils import get_current_time
 
+def build_employee_status(record: AttendanceRecord, current_time: datetime) -> Dict[str, Any]:
+    """
+    勤怠記録から従業員の状態情報を構築
+
+    Args:
+        record: アクティブな（終了していない）勤怠記録
+        current_time: 経過時間計算に使う現在時刻
+
+    Returns:
+        Dict[str, Any]: 従業員の状態情報
+    """
+    # 休憩中かどうかの判定
+    is_on_break = False
+    break_start_time = None
+
+    if record.break_periods and not record.break_periods[-1].end_time:
+        is_on_break = True
+        break_start_time = record.break_periods[-1].start_time
+
+    # 勤務開始からの経過時間（分）
+    working_duration = (current_time - record.start_time).total_seconds() / 60
+
+    # 休憩中の場合は休憩開始からの経過時間も計算
+    break_duration = None
+    if is_on_break and break_start_time:
+        break_duration = (current_time - break_start_time).total_seconds() / 60
+
+    # 状態情報の構築
+    return {
+        'user_id': record.user_id,
+        'user_name': record.user_name,
+        'team_id': record.team_id,
+        'status': 'on_break' if is_on_break else 'working',
+        'start_time': record.start_time,
+        'working_duration': working_duration,  # 勤務開始からの経過時間（分）
+        'break_duration': break_duration,  # 休憩開始からの経過時間（分）、休憩中でない場合はNone
+        'total_break_time': record.get_total_break_time()  # これまでの休憩時間合計（分）
+    }
+
+def build_presence_status(user_id: str, team_id: str, entry: Dict[str, Any], current_time: datetime) -> Dict[str, Any]:
+    """
+    チームの在席状況の1人分から、build_employee_status と同じ形式の状態情報を構築
+    - 休憩合計は終了済みの休憩のみ（build_employee_status と同じ）
+    """
+    is_on_break = entry["status"] == "on_break"
+    break_duration = None
+    if is_on_break and entry.get("break_start_time"):
+        break_duration = (current_time - entry["break_start_time"]).total_seconds() / 60
+
+    return {
+        'user_id': user_id,
+        'user_name': entry.get("user_name", ""),
+        'team_id': team_id,
+        'status': entry["status"],
+        'start_time': entry["start_time"],
+        'working_duration': (current_time - entry["start_time"]).total_seconds() / 60,
+        'break_duration': break_duration,
+        'total_break_time': entry.get("total_break_time", 0.0)
+    }
+
+def page_presence_statuses(
+    members: Dict[str, Dict[str, Any]],
+    team_id: str,
+    current_time: datetime,
+    cursor: Optional[str] = None,
+    page_size: Optional[int] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    在席状況をユーザーID順に並べ、cursor（前のページの最後のユーザーID）より後を page_size 人分返す
+    - page_size が None の場合は全員を返す
+    """
+    user_ids = sorted(user_id for user_id in members if cursor is None or user_id > cursor)
+    page_ids = user_ids if page_size is None else user_ids[:page_size]
+    next_cursor = page_ids[-1] if len(page_ids) < len(user_ids) else None
+    return [build_presence_status(user_id, team_id, members[user_id], current_time) for user_id in page_ids], next_cursor
+
 class StatusService:
     """従業員の現在の勤怠状態を管理するサービス"""
     
-    def __init__(self, repository: FirestoreRepository):
+    def __init__(self, repository: AttendanceRepository, read_presence: bool = False):
         self.repository = repository
+        # Trueの場合、勤怠記録を検索せずにチームの在席状況ドキュメントから一覧を作る
+        self.read_presence = read_presence
     
     def get_active_employees(self, team_id: str) -> List[Dict[str, Any]]:
         """
@@ -21,46 +99,44 @@ class StatusService:
         Returns:
             List[Dict[str, Any]]: アクティブな従業員の状態情報リスト
         """
-        # アクティブな（終了していない）勤怠記録を特定のワークスペースのみ取得
-        active_records = self.repository.get_all_active_attendances(team_id=team_id)
+        if self.read_presence:
+            statuses, _ = page_presence_statuses(self.repository.get_team_presence(team_id), team_id, get_current_time())
+            return statuses
+
+        # アクティブな（終了していない）勤怠記録を特定のワークスペースのみ、状態の表示に使うフィールドだけ取得
+        active_records = self.repository.get_all_active_attendances(team_id=team_id, projection=TIMING_FIELDS)
         
         # 現在時刻を取得（経過時間計算用）
         current_time = get_current_time()
         
         # 各従業員の状態情報を構築
-        employee_statuses = []
-        for record in active_records:
-            # 休憩中かどうかの判定
-            is_on_break = False
-            break_start_time = None
-            
-            if record.break_periods and not record.break_periods[-1].end_time:
-                is_on_break = True
-                break_start_time = record.break_periods[-1].start_time
-            
-            # 勤務開始からの経過時間（分）
-            working_duration = (current_time - record.start_time).total_seconds() / 60
-            
-            # 休憩中の場合は休憩開始からの経過時間も計算
-            break_duration = None
-            if is_on_break and break_start_time:
-                break_duration = (current_time - break_start_time).total_seconds() / 60
-            
-            # 状態情報の構築
-            status_info = {
-                'user_id': record.user_id,
-                'user_name': record.user_name,
-                'team_id': record.team_id,
-                'status': 'on_break' if is_on_break else 'working',
-                'start_time': record.start_time,
-                'working_duration': working_duration,  # 勤務開始からの経過時間（分）
-                'break_duration': break_duration,  # 休憩開始からの経過時間（分）、休憩中でない場合はNone
-                'total_break_time': record.get_total_break_time()  # これまでの休憩時間合計（分）
-            }
-            
-            employee_statuses.append(status_info)
+        return [build_employee_status(record, current_time) for record in active_records]
+    
+    def get_active_employees_page(
+        self,
+        team_id: str,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        現在アクティブな従業員の状態一覧を1ページ分取得
         
-        return employee_statuses
+        Args:
+            team_id: チームID (Slackワークスペース)
+            cursor: 前のページの next_cursor（最初のページは None）
+            
+        Returns:
+            Tuple[List[Dict[str, Any]], Optional[str]]: 従業員の状態情報リストと次のページのカーソル（最後のページは None）
+        """
+        if self.read_presence:
+            return page_presence_statuses(
+                self.repository.get_team_presence(team_id), team_id, get_current_time(), cursor, DEFAULT_ACTIVE_PAGE_SIZE
+            )
+
+        active_records, next_cursor = self.repository.get_active_attendance_page(
+            team_id=team_id, cursor=cursor, projection=TIMING_FIELDS
+        )
+        current_time = get_current_time()
+        return [build_employee_status(record, current_time) for record in active_records], next_cursor
     
     def get_employee_status(self, user_id: str, team_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -79,32 +155,4 @@ class StatusService:
             return None
         
         # 現在時刻を取得（経過時間計算用）
-        current_time = get_current_time()
-        
-        # 休憩中かどうかの判定
-        is_on_break = False
-        break_start_time = None
-        
-        if active_attendance.break_periods and not active_attendance.break_periods[-1].end_time:
-            is_on_break = True
-            break_start_time = active_attendance.break_periods[-1].start_time
-        
-        # 勤務開始からの経過時間（分）
-        working_duration = (current_time - active_attendance.start_time).total_seconds() / 60
-        
-        # 休憩中の場合は休憩開始からの経過時間も計算
-        break_duration = None
-        if is_on_break and break_start_time:
-            break_duration = (current_time - break_start_time).total_seconds() / 60
-        
-        # 状態情報の構築
-        return {
-            'user_id': active_attendance.user_id,
-            'user_name': active_attendance.user_name,
-            'team_id': active_attendance.team_id,
-            'status': 'on_break' if is_on_break else 'working',
-            'start_time': active_attendance.start_time,
-            'working_duration': working_duration,  # 勤務開始からの経過時間（分）
-            'break_duration': break_duration,  # 休憩開始からの経過時間（分）、休憩中でない場合はNone
-            'total_break_time': active_attendance.get_total_break_time()  # これまでの休憩時間合計（分）
-        }
\ No newline at end of file
+        return build_employee_status(active_attendance, get_current_time())
@@ -0,0 +1,43 @@
+from slack_bolt.async_app import AsyncApp
+
+from src.config import get_config
+from src.repositories.factory import create_async_repository
+from src.services.async_attendance_service import AsyncAttendanceService
+from src.services.async_monthly_summary_service import AsyncMonthlySummaryService
+from src.services.async_status_service import AsyncStatusService
+from src.slack.commands.async_attendance_commands import AsyncAttendanceCommands
+from src.slack.commands.async_status_commands import AsyncStatusCommands
+from src.slack.commands.async_summary_commands import AsyncSummaryCommands
+from src.slack.events import handle_bot_invited_to_channel_async
+from src.slack.oauth import create_installation_store
+
+def create_async_slack_app() -> AsyncApp:
+    """
+    Socket Mode用の AsyncApp を組み立てる
+
+    リポジトリ・サービス・コマンドはすべて非同期版を使うため、
+    1プロセスで複数ユーザーの打刻を並行して処理できる。
+    """
+    config = get_config()
+
+    # storage.backend で Firestore・メモリ・SQLite を選ぶ
+    repository = create_async_repository(config)
+
+    app = AsyncApp(
+        token=config.slack.bot_token,
+        signing_secret=config.slack.signing_secret
+    )
+
+    # Slackステータス更新に使うユーザートークンはOAuthで保存されたものを参照する（保存先は storage.backend で選ぶ）
+    installation_store = create_installation_store(config)
+
+    AsyncAttendanceCommands(app, AsyncAttendanceService(repository), installation_store=installation_store)
+    AsyncSummaryCommands(app, AsyncMonthlySummaryService(
+        repository,
+        persist_closed_months=config.storage.persist_closed_months
+    ))
+    AsyncStatusCommands(app, AsyncStatusService(repository, read_presence=config.storage.read_presence))
+
+    app.event("member_joined_channel")(handle_bot_invited_to_channel_async)
+
+    return app
@@ -0,0 +1,215 @@
+import asyncio
+import json
+from functools import partial
+from typing import Callable, Optional
+
+from slack_bolt.async_app import AsyncApp
+from slack_sdk.errors import SlackApiError
+from slack_sdk.oauth.installation_store import InstallationStore
+from slack_sdk.web.async_client import AsyncWebClient
+
+from src.services.async_attendance_service import AsyncAttendanceService
+from src.slack.message_builder import MessageBuilder
+from src.slack.oauth import forget_revoked_installation
+
+class AsyncAttendanceCommands:
+    """AttendanceCommands の非同期版（AsyncApp用）"""
+
+    def __init__(
+        self,
+        app: AsyncApp,
+        attendance_service: AsyncAttendanceService,
+        installation_store: Optional[InstallationStore] = None
+    ):
+        self.app = app
+        self.attendance_service = attendance_service
+        # ユーザートークン取得用（Socket Modeでは同期版のストアをスレッドプールで呼び出す）
+        self.installation_store = installation_store
+        self._register_commands()
+        self.app.view("punch_out_report_modal")(self._handle_punch_out_modal_submission)
+
+    def _register_commands(self) -> None:
+        """すべてのコマンドを登録"""
+        self._register_command("/punch_in", self._handle_punch_in)
+        self._register_command("/punch_out", self._handle_punch_out_modal_trigger)
+        self._register_command("/break_begin", self._handle_break_begin)
+        self._register_command("/break_end", self._handle_break_end)
+
+    def _register_command(self, command: str, handler: Callable) -> None:
+        """個別のコマンドを登録"""
+        self.app.command(command)(handler)
+
+    async def _handle_slack_status(self, user_id: str, text: str, emoji: str):
+        """
+        Slackのステータスを更新する。
+        - ただし Bot Token は使えないため、ユーザートークンを利用する。
+        """
+        if self.installation_store is None:
+            return
+
+        try:
+            auth_test = await self.app.client.auth_test()
+            loop = asyncio.get_running_loop()
+            installation = await loop.run_in_executor(
+                None,
+                partial(
+                    self.installation_store.find_installation,
+                    team_id=auth_test.get("team_id"),
+                    enterprise_id=auth_test.get("enterprise_id", None),
+                    user_id=user_id
+                )
+            )
+
+            if not installation or not installation.user_token:
+                print(f"[WARNING] Installation not found or user_token not found for user {user_id}")
+                return
+
+            user_client = AsyncWebClient(token=installation.user_token)
+            try:
+                await user_client.users_profile_set(
+                    user=user_id,
+                    profile={
+                        "status_text": text,
+                        "status_emoji": emoji,
+                        "status_expiration": 0
+                    }
+                )
+            except SlackApiError as e:
+                # 他のインスタンスで取り消されたトークンを、キャッシュから使い続けないようにする
+                forget_revoked_installation(self.installation_store, e, installation.enterprise_id, installation.team_id)
+                raise
+        except Exception as e:
+            print(f"Slackのステータス更新に失敗しました: {e}")
+
+    async def _handle_punch_in(self, ack, command, say):
+        """出勤コマンドの処理"""
+        await ack()
+
+        success, message, time = await self.attendance_service.punch_in(
+            user_id=command["user_id"],
+            user_name=command["user_name"],
+            team_id=command.get("team_id", "")
+        )
+
+        if success:
+            await self._handle_slack_status(user_id=command["user_id"], text="業務中", emoji=":sunny:")
+            blocks = MessageBuilder.create_punch_in_message(username=command["user_name"], time=time)
+        else:
+            blocks = MessageBuilder.create_error_message(message)
+
+        await say(text="出勤", blocks=blocks, channel=command["channel_id"])
+
+    async def _handle_punch_out_modal_trigger(self, ack, command, client):
+        """/punch_out を入力したときにモーダルを開く"""
+        await ack()
+
+        private_metadata = json.dumps({
+            "channel_id": command["channel_id"],
+            "team_id": command.get("team_id", "")
+        })
+        await client.views_open(
+            trigger_id=command["trigger_id"],
+            view=MessageBuilder.create_punch_out_modal(private_metadata)
+        )
+
+    async def _handle_punch_out_modal_submission(self, ack, body, view, client, logger):
+        """退勤モーダル送信時の処理（処理内容は同期版と同じ）"""
+        await ack()
+
+        try:
+            meta_dict = json.loads(view.get("private_metadata", "{}"))
+        except Exception as e:
+            logger.info(f"No private_metadata found: {e}")
+            meta_dict = {}
+
+        fallback_channel_id = meta_dict.get("channel_id", "")
+        team_id = meta_dict.get("team_id", "")
+
+        user_id = body["user"]["id"]
+        user_name = body["user"]["name"]
+
+        values = view["state"]["values"]
+        work_description = values["work_description_block"]["work_description_input"]["value"]
+        channel_id_selected = values["report_channel_block"]["report_channel_input"]["selected_conversation"]
+        mention_users_selected = values["mention_users_block"]["mention_users_input"].get("selected_users", [])
+
+        success, message, attendance = await self.attendance_service.punch_out_with_report(
+            user_id=user_id,
+            team_id=team_id,
+            work_description=work_description,
+            report_channel_id=channel_id_selected,
+            mention_user_ids=mention_users_selected
+        )
+
+        if not success or not attendance:
+            await client.chat_postMessage(channel=user_id, text=f"退勤処理に失敗しました: {message}")
+            return
+
+        working_time = attendance.get_working_time()
+        break_time = attendance.get_total_break_time()
+
+        if channel_id_selected:
+            fallback_text, report_blocks = MessageBuilder.create_work_report_message(
+                user_id=user_id,
+                working_time=working_time,
+                break_time=break_time,
+                work_description=work_description,
+                mention_user_ids=mention_users_selected
+            )
+            try:
+                await client.chat_postMessage(
+                    channel=channel_id_selected,
+                    text=fallback_text,
+                    blocks=report_blocks,
+                    mrkdwn=True
+                )
+            except Exception as e:
+                await client.chat_postMessage(channel=user_id, text=f"業務報告の投稿に失敗しました: {str(e)}")
+
+        blocks = MessageBuilder.create_punch_out_message(
+            username=user_name,
+            time=attendance.end_time,
+            working_time=working_time,
+            total_break_time=break_time
+        )
+        await self._handle_slack_status(user_id=user_id, text="", emoji="")
+        await client.chat_postMessage(channel=fallback_channel_id, text="退勤", blocks=blocks)
+
+    async def _handle_break_begin(self, ack, command, say):
+        """休憩開始コマンドの処理"""
+        await ack()
+
+        success, message, time = await self.attendance_service.start_break(
+            user_id=command["user_id"],
+            team_id=command.get("team_id", "")
+        )
+
+        if success:
+            await self._handle_slack_status(user_id=command["user_id"], text="休憩中", emoji=":coffee:")
+            blocks = MessageBuilder.create_break_start_message(username=command["user_name"], time=time)
+        else:
+            blocks = MessageBuilder.create_error_message(message)
+
+        await say(text="休憩開始", blocks=blocks, channel=command["channel_id"])
+
+    async def _handle_break_end(self, ack, command, say):
+        """休憩終了コマンドの処理"""
+        await ack()
+
+        success, message, result = await self.attendance_service.end_break(
+            user_id=command["user_id"],
+            team_id=command.get("team_id", "")
+        )
+
+        if success and result is not None:
+            await self._handle_slack_status(user_id=command["user_id"], text="業務中", emoji=":sunny:")
+            time, duration = result
+            blocks = MessageBuilder.create_break_end_message(
+                username=command["user_name"],
+                time=time,
+                duration=duration
+            )
+        else:
+            blocks = MessageBuilder.create_error_message(message)
+
+        await say(text="休憩終了", blocks=blocks, channel=command["channel_id"])
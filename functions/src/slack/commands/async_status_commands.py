@@ -0,0 +1,74 @@
+import json
+
+from slack_bolt.async_app import AsyncApp
+
+from src.services.async_status_service import AsyncStatusService
+from src.slack.commands.status_commands import INVALID_CURSOR_MESSAGE
+from src.slack.message_builder import MessageBuilder
+
+class AsyncStatusCommands:
+    """StatusCommands の非同期版（AsyncApp用）"""
+
+    def __init__(self, app: AsyncApp, status_service: AsyncStatusService):
+        self.app = app
+        self.status_service = status_service
+        self.app.command("/allstatus")(self._handle_status)
+        self.app.command("/mystatus")(self._handle_my_status)
+        self.app.action("allstatus_next_page")(self._handle_status_next_page)
+
+    async def _handle_status(self, ack, command, say):
+        """/allstatus コマンド - すべてのアクティブな従業員の状態を表示"""
+        await ack()
+
+        active_employees, next_cursor = await self.status_service.get_active_employees_page(team_id=command.get("team_id"))
+        if not active_employees:
+            await say("現在、出勤中の従業員はいません。")
+            return
+
+        await say(
+            text="従業員の勤怠状況",
+            blocks=MessageBuilder.create_employee_status_message(active_employees, next_cursor=next_cursor),
+            channel=command["channel_id"]
+        )
+
+    async def _handle_status_next_page(self, ack, body, say):
+        """/allstatus の「次のページを表示」ボタン - ボタンのカーソルから続きを表示"""
+        await ack()
+
+        value = json.loads(body["actions"][0]["value"])
+        channel_id = body["channel"]["id"]
+        try:
+            active_employees, next_cursor = await self.status_service.get_active_employees_page(
+                team_id=body.get("team", {}).get("id"),
+                cursor=value["cursor"]
+            )
+        except ValueError:
+            await say(text=INVALID_CURSOR_MESSAGE, channel=channel_id)
+            return
+        if not active_employees:
+            await say(text="これ以上出勤中の従業員はいません。", channel=channel_id)
+            return
+
+        await say(
+            text="従業員の勤怠状況",
+            blocks=MessageBuilder.create_employee_status_message(
+                active_employees, page=value.get("page", 2), next_cursor=next_cursor
+            ),
+            channel=channel_id
+        )
+
+    async def _handle_my_status(self, ack, command, say):
+        """/mystatus コマンド - 自分自身の現在の状態を表示"""
+        await ack()
+
+        user_name = command["user_name"]
+        status = await self.status_service.get_employee_status(command["user_id"], team_id=command.get("team_id"))
+        if not status:
+            await say(text=f"{user_name}さんは現在出勤していません。", channel=command["channel_id"])
+            return
+
+        await say(
+            text="あなたの勤怠状況",
+            blocks=MessageBuilder.create_my_status_message(user_name, status),
+            channel=command["channel_id"]
+        )
@@ -0,0 +1,178 @@
+import json
+
+from slack_bolt.async_app import AsyncApp
+
+from ...services.async_monthly_summary_service import AsyncMonthlySummaryService
+from ..message_builder import MessageBuilder
+from ..permissions import ADMIN_ONLY_MESSAGE, is_workspace_admin_async
+
+class AsyncSummaryCommands:
+    """SummaryCommands の非同期版（AsyncApp用）"""
+
+    def __init__(self, app: AsyncApp, summary_service: AsyncMonthlySummaryService):
+        self.app = app
+        self.summary_service = summary_service
+        self.app.command("/summary")(self._handle_summary)
+        self.app.command("/help")(self._handle_help)
+        self.app.view("summary_modal")(self._handle_summary_modal_submission)
+        self.app.action("download_csv")(self._handle_csv_download)
+        self.app.command("/teamsummary")(self._handle_team_summary)
+        self.app.view("team_summary_modal")(self._handle_team_summary_modal_submission)
+        self.app.action("download_team_csv")(self._handle_team_csv_download)
+
+    async def _handle_summary(self, ack, command, client):
+        """/summary コマンド: モーダルを開く"""
+        await ack()
+
+        private_metadata = json.dumps({"team_id": command.get("team_id", "")})
+        await client.views_open(
+            trigger_id=command["trigger_id"],
+            view=MessageBuilder.create_summary_modal(private_metadata)
+        )
+
+    async def _handle_summary_modal_submission(self, ack, body, view, client, logger):
+        """モーダル送信時（「表示」ボタン押下時）の処理"""
+        await ack()
+
+        try:
+            team_id = json.loads(view.get("private_metadata", "{}")).get("team_id", "")
+        except Exception:
+            team_id = ""
+            logger.error("Failed to parse private_metadata")
+
+        values = view["state"]["values"]
+        year = int(values["year_block"]["year_select"]["selected_option"]["value"])
+        month = int(values["month_block"]["month_select"]["selected_option"]["value"])
+        channel_list = values["channel_block"]["channel_select"]["selected_conversations"]
+
+        summary = await self.summary_service.get_monthly_summary(
+            user_id=body["user"]["id"],
+            year=year,
+            month=month,
+            team_id=team_id
+        )
+        blocks = MessageBuilder.create_monthly_summary_message(username=body["user"]["name"], summary=summary)
+
+        for ch in channel_list or []:
+            try:
+                await client.chat_postMessage(channel=ch, text=f"{year}年{month}月の勤怠サマリー", blocks=blocks)
+            except Exception as e:
+                logger.error(f"Failed to post summary to channel {ch}: {e}")
+
+    async def _handle_help(self, ack, command, say):
+        """/help コマンドの処理"""
+        await ack()
+        await say(text=MessageBuilder.HELP_MESSAGE, channel=command["channel_id"])
+
+    async def _handle_csv_download(self, ack, body, client):
+        """CSVダウンロードボタンの処理"""
+        await ack()
+
+        year, month = map(int, body["actions"][0]["value"].split("-"))
+        channel_id = body["channel"]["id"]
+
+        filename, csv_content = await self.summary_service.generate_csv(
+            user_id=body["user"]["id"],
+            user_name=body["user"]["name"],
+            year=year,
+            month=month,
+            team_id=body.get("team", {}).get("id", "")
+        )
+
+        try:
+            response = await client.files_upload_v2(
+                channel=channel_id,
+                filename=filename,
+                content=csv_content,
+                title=f"{year}年{month}月の勤怠記録",
+                initial_comment=f"{year}年{month}月の勤怠記録をCSVでダウンロードしました。"
+            )
+            if not response["ok"]:
+                await client.chat_postMessage(
+                    channel=channel_id,
+                    text=f"CSVファイルのアップロードに失敗しました：{response.get('error', '不明なエラー')}"
+                )
+        except Exception as e:
+            await client.chat_postMessage(channel=channel_id, text=f"CSVファイルのアップロードに失敗しました：{str(e)}")
+
+    async def _handle_team_summary(self, ack, command, client, logger):
+        """/teamsummary コマンド: ワークスペースの管理者・オーナーであればモーダルを開く"""
+        await ack()
+
+        if not await is_workspace_admin_async(client, command["user_id"], logger):
+            await client.chat_postEphemeral(channel=command["channel_id"], user=command["user_id"], text=ADMIN_ONLY_MESSAGE)
+            return
+
+        private_metadata = json.dumps({"team_id": command.get("team_id", "")})
+        await client.views_open(
+            trigger_id=command["trigger_id"],
+            view=MessageBuilder.create_summary_modal(
+                private_metadata,
+                callback_id="team_summary_modal",
+                title="全従業員のサマリー"
+            )
+        )
+
+    async def _handle_team_summary_modal_submission(self, ack, body, view, client, logger):
+        """チームサマリーのモーダル送信時の処理"""
+        await ack()
+
+        try:
+            team_id = json.loads(view.get("private_metadata", "{}")).get("team_id", "")
+        except Exception:
+            team_id = ""
+            logger.error("Failed to parse private_metadata")
+
+        values = view["state"]["values"]
+        year = int(values["year_block"]["year_select"]["selected_option"]["value"])
+        month = int(values["month_block"]["month_select"]["selected_option"]["value"])
+        channel_list = values["channel_block"]["channel_select"]["selected_conversations"]
+
+        # モーダルを開いた後に権限が外れた場合に備えて、送信時にも確認する
+        user_id = body["user"]["id"]
+        if not await is_workspace_admin_async(client, user_id, logger):
+            for ch in channel_list or []:
+                await client.chat_postEphemeral(channel=ch, user=user_id, text=ADMIN_ONLY_MESSAGE)
+            return
+
+        team_summary = await self.summary_service.get_team_monthly_summary(team_id=team_id, year=year, month=month)
+        blocks = MessageBuilder.create_team_summary_message(team_summary)
+
+        for ch in channel_list or []:
+            try:
+                await client.chat_postMessage(channel=ch, text=f"{year}年{month}月の全従業員の勤怠サマリー", blocks=blocks)
+            except Exception as e:
+                logger.error(f"Failed to post team summary to channel {ch}: {e}")
+
+    async def _handle_team_csv_download(self, ack, body, client, logger):
+        """全従業員のCSVダウンロードボタンの処理（ワークスペースの管理者・オーナーのみ）"""
+        await ack()
+
+        channel_id = body["channel"]["id"]
+        if not await is_workspace_admin_async(client, body["user"]["id"], logger):
+            await client.chat_postEphemeral(channel=channel_id, user=body["user"]["id"], text=ADMIN_ONLY_MESSAGE)
+            return
+
+        year, month = map(int, body["actions"][0]["value"].split("-"))
+
+        filename, csv_content = await self.summary_service.generate_team_csv(
+            team_id=body.get("team", {}).get("id", ""),
+            year=year,
+            month=month
+        )
+
+        try:
+            response = await client.files_upload_v2(
+                channel=channel_id,
+                filename=filename,
+                content=csv_content,
+                title=f"{year}年{month}月の全従業員の勤怠記録",
+                initial_comment=f"{year}年{month}月の全従業員の勤怠記録をCSVでダウンロードしました。"
+            )
+            if not response["ok"]:
+                await client.chat_postMessage(
+                    channel=channel_id,
+                    text=f"CSVファイルのアップロードに失敗しました：{response.get('error', '不明なエラー')}"
+                )
+        except Exception as e:
+            await client.chat_postMessage(channel=channel_id, text=f"CSVファイルのアップロードに失敗しました：{str(e)}")
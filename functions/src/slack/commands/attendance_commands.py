@@ -1,15 +1,20 @@
 from typing import Callable, List
 from slack_bolt import App
 from slack_sdk import WebClient
+from slack_sdk.errors import SlackApiError
 
 from src.services.attendance_service import AttendanceService
+from src.slack.listeners import register_listener
 from src.slack.message_builder import MessageBuilder
+from src.slack.oauth import forget_revoked_installation
 from src.models.attendance import Attendance
 
 class AttendanceCommands:
-    def __init__(self, app: App, attendance_service: AttendanceService):
+    def __init__(self, app: App, attendance_service: AttendanceService, ack_first: bool = False):
         self.app = app
         self.attendance_service = attendance_service
+        # Trueの場合、ackを先に返してFirestoreやSlack APIへのアクセスはack後に実行する
+        self.ack_first = ack_first
         self._register_commands()
         self._register_view_submissions()
 
@@ -26,15 +31,13 @@ class AttendanceCommands:
         モーダル（退勤報告用）からの view_submission をハンドル
         callback_id を "punch_out_report_modal" とする
         """
-        @self.app.view("punch_out_report_modal")
         def handle_punch_out_modal_submission(ack, body, view, client, logger, say, command=None):
             """
             退勤モーダル送信時の処理:
             1. フォーム入力情報を取得
-            2. 退勤処理
-            3. Firestore に業務情報を保存
-            4. 選択されたチャンネルに業務報告を投稿
-            5. コマンド実行チャンネルに退勤メッセージを送信
+            2. 退勤処理（業務情報も同じ書き込みで保存）
+            3. 選択されたチャンネルに業務報告を投稿
+            4. コマンド実行チャンネルに退勤メッセージを送信
             """
             ack()
 
@@ -62,16 +65,17 @@ class AttendanceCommands:
             # --- [1] フォーム入力情報を取得 ---
             work_description = view["state"]["values"]["work_description_block"]["work_description_input"]["value"]
             
-            # 「詳しい進捗」欄は廃止するため、空の文字列をセット
-            work_progress = ""
-
             channel_id_selected = view["state"]["values"]["report_channel_block"]["report_channel_input"]["selected_conversation"]
             mention_users_selected = view["state"]["values"]["mention_users_block"]["mention_users_input"].get("selected_users", [])
 
-            # --- [2] 退勤処理 ---
-            success, message, attendance = self.attendance_service.punch_out(
+            # --- [2] 退勤処理と業務情報の保存 ---
+            # 退勤時刻と業務情報は1つのトランザクションで書き込む
+            success, message, attendance = self.attendance_service.punch_out_with_report(
                 user_id=user_id,
-                team_id=team_id  # チームIDを渡す
+                team_id=team_id,  # チームIDを渡す
+                work_description=work_description,
+                report_channel_id=channel_id_selected,
+                mention_user_ids=mention_users_selected
             )
 
             if not success or not attendance:
@@ -79,84 +83,19 @@ class AttendanceCommands:
                 client.chat_postMessage(channel=user_id, text=f"退勤処理に失敗しました: {message}")
                 return
 
-            # --- [3] Firestore に業務情報を保存 ---
-            attendance.work_description = work_description
-            attendance.work_progress = work_progress
-            attendance.report_channel_id = channel_id_selected
-            attendance.mention_user_ids = mention_users_selected
-
-            # 退勤時に update_attendance は punch_out 内部で完了しているが、
-            # 業務情報を上書きするために再度 update する
-            self.attendance_service.repository.update_attendance(attendance)
-
-            # --- [4] 選択されたチャンネルに業務報告を投稿 ---
+            # --- [3] 選択されたチャンネルに業務報告を投稿 ---
             if channel_id_selected:
                 # 実働時間・休憩時間の算出
                 working_time = attendance.get_working_time()
                 break_time = attendance.get_total_break_time()
 
-                # メンション文字列
-                mention_text = ""
-                if mention_users_selected:
-                    mention_text = " ".join([f"<@{uid}>" for uid in mention_users_selected])
-
-                # Blocks 形式で見やすく表示
-                # Markdownで整形した各項目を表示
-                report_blocks = [
-                    {
-                        "type": "header",
-                        "text": {
-                            "type": "plain_text",
-                            "text": "本日の業務報告",
-                            "emoji": True
-                        }
-                    },
-                    {
-                        "type": "section",
-                        "fields": [
-                            {
-                                "type": "mrkdwn",
-                                "text": f"*報告者:*\n<@{user_id}>"
-                            },
-                            {
-                                "type": "mrkdwn",
-                                "text": f"*実働時間:*\n{MessageBuilder.format_duration(working_time)}"
-                            }
-                        ]
-                    },
-                    {
-                        "type": "section",
-                        "fields": [
-                            {
-                                "type": "mrkdwn",
-                                "text": f"*休憩時間:*\n{MessageBuilder.format_duration(break_time)}"
-                            }
-                        ]
-                    },
-                    {
-                        "type": "divider"
-                    },
-                    {
-                        "type": "section",
-                        "fields": [
-                            {
-                                "type": "mrkdwn",
-                                "text": f"*業務内容:*\n{work_description}"
-                            }
-                        ]
-                    }
-                ]
-
-                # 投稿するテキスト（fallback用）
-                fallback_text = (
-                    f"報告者: <@{user_id}>\n"
-                    f"実働時間: {MessageBuilder.format_duration(working_time)}\n"
-                    f"休憩時間: {MessageBuilder.format_duration(break_time)}\n"
-                    f"業務内容:\n{work_description}"
+                fallback_text, report_blocks = MessageBuilder.create_work_report_message(
+                    user_id=user_id,
+                    working_time=working_time,
+                    break_time=break_time,
+                    work_description=work_description,
+                    mention_user_ids=mention_users_selected
                 )
-                # メンションを冒頭に追加する場合
-                if mention_text:
-                    fallback_text = mention_text + "\n" + fallback_text
 
                 try:
                     client.chat_postMessage(
@@ -171,7 +110,7 @@ class AttendanceCommands:
                         text=f"業務報告の投稿に失敗しました: {str(e)}"
                     )
 
-            # --- [5] コマンド実行チャンネルに退勤メッセージを送信 ---
+            # --- [4] コマンド実行チャンネルに退勤メッセージを送信 ---
             blocks = MessageBuilder.create_punch_out_message(
                 username=user_name,
                 time=attendance.end_time,
@@ -189,9 +128,11 @@ class AttendanceCommands:
                 blocks=blocks
             )
 
+        register_listener(self.app.view("punch_out_report_modal"), handle_punch_out_modal_submission, self.ack_first)
+
     def _register_command(self, command: str, handler: Callable) -> None:
         """個別のコマンドを登録"""
-        self.app.command(command)(handler)
+        register_listener(self.app.command(command), handler, self.ack_first)
 
     def _handle_slack_status(self, user_id: str, text: str, emoji: str):
         """
@@ -214,14 +155,19 @@ class AttendanceCommands:
                 return
             
             user_client = WebClient(token=installation.user_token)
-            user_client.users_profile_set(
-                user=user_id,
-                profile={
-                    "status_text": text,
-                    "status_emoji": emoji,
-                    "status_expiration": 0
-                }
-            )
+            try:
+                user_client.users_profile_set(
+                    user=user_id,
+                    profile={
+                        "status_text": text,
+                        "status_emoji": emoji,
+                        "status_expiration": 0
+                    }
+                )
+            except SlackApiError as e:
+                # 他のインスタンスで取り消されたトークンを、キャッシュから使い続けないようにする
+                forget_revoked_installation(self.app.installation_store, e, installation.enterprise_id, installation.team_id)
+                raise
         except Exception as e:
             print(f"Slackのステータス更新に失敗しました: {e}")
 
@@ -268,70 +214,7 @@ class AttendanceCommands:
             "team_id": command.get("team_id", "")  # チームIDも保存
         })
 
-        # モーダルから「詳しい進捗」欄を削除
-        modal_view = {
-            "type": "modal",
-            "callback_id": "punch_out_report_modal",
-            "title": {
-                "type": "plain_text",
-                "text": "退勤報告"
-            },
-            "submit": {
-                "type": "plain_text",
-                "text": "退勤"
-            },
-            "close": {
-                "type": "plain_text",
-                "text": "キャンセル"
-            },
-            "private_metadata": private_metadata,
-            "blocks": [
-                {
-                    "type": "input",
-                    "block_id": "work_description_block",
-                    "label": {
-                        "type": "plain_text",
-                        "text": "本日の業務内容"
-                    },
-                    "element": {
-                        "type": "plain_text_input",
-                        "action_id": "work_description_input",
-                        "multiline": True
-                    }
-                },
-                {
-                    "type": "input",
-                    "block_id": "report_channel_block",
-                    "label": {
-                        "type": "plain_text",
-                        "text": "報告先チャンネル"
-                    },
-                    "element": {
-                        "type": "conversations_select",
-                        "action_id": "report_channel_input",
-                        "default_to_current_conversation": False,
-                        "response_url_enabled": False
-                    }
-                },
-                {
-                    "type": "input",
-                    "block_id": "mention_users_block",
-                    "optional": True,
-                    "label": {
-                        "type": "plain_text",
-                        "text": "メンションするユーザー（任意）"
-                    },
-                    "element": {
-                        "type": "multi_users_select",
-                        "action_id": "mention_users_input",
-                        "placeholder": {
-                            "type": "plain_text",
-                            "text": "メンションしたいユーザーを選択"
-                        }
-                    }
-                }
-            ]
-        }
+        modal_view = MessageBuilder.create_punch_out_modal(private_metadata)
 
         client.views_open(
             trigger_id=command["trigger_id"],
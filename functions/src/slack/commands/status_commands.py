@@ -1,20 +1,28 @@
+import json
 from typing import List, Dict, Any
 from slack_bolt import App
 
 from src.services.status_service import StatusService
+from src.slack.listeners import register_listener
 from src.slack.message_builder import MessageBuilder
 from src.utils.time_utils import get_current_time
 
+# 「次のページを表示」ボタンのカーソルが正しくない場合のメッセージ
+INVALID_CURSOR_MESSAGE = "次のページを表示できませんでした。/allstatus からやり直してください。"
+
 class StatusCommands:
-    def __init__(self, app: App, status_service: StatusService):
+    def __init__(self, app: App, status_service: StatusService, ack_first: bool = False):
         self.app = app
         self.status_service = status_service
+        # Trueの場合、ackを先に返してFirestoreやSlack APIへのアクセスはack後に実行する
+        self.ack_first = ack_first
         self._register_commands()
     
     def _register_commands(self) -> None:
         """コマンドを登録"""
-        self.app.command("/allstatus")(self._handle_status)
-        self.app.command("/mystatus")(self._handle_my_status)
+        register_listener(self.app.command("/allstatus"), self._handle_status, self.ack_first)
+        register_listener(self.app.command("/mystatus"), self._handle_my_status, self.ack_first)
+        register_listener(self.app.action("allstatus_next_page"), self._handle_status_next_page, self.ack_first)
     
     def _handle_status(self, ack, command, say, client):
         """
@@ -25,15 +33,15 @@ class StatusCommands:
         # コマンドを実行したワークスペースのIDを取得
         team_id = command.get("team_id")
         
-        # アクティブな従業員の状態を取得（同じワークスペースに限定）
-        active_employees = self.status_service.get_active_employees(team_id=team_id)
+        # アクティブな従業員の状態を最初のページだけ取得（同じワークスペースに限定）
+        active_employees, next_cursor = self.status_service.get_active_employees_page(team_id=team_id)
         
         if not active_employees:
             say("現在、出勤中の従業員はいません。")
             return
         
         # Slackブロックメッセージを構築
-        blocks = MessageBuilder.create_employee_status_message(active_employees)
+        blocks = MessageBuilder.create_employee_status_message(active_employees, next_cursor=next_cursor)
         
         # メッセージを送信
         say(
@@ -42,6 +50,40 @@ class StatusCommands:
             channel=command["channel_id"]
         )
     
+    def _handle_status_next_page(self, ack, body, say):
+        """
+        /allstatus の「次のページを表示」ボタン - ボタンのカーソルから続きを表示
+        """
+        ack()
+        
+        value = json.loads(body["actions"][0]["value"])
+        team_id = body.get("team", {}).get("id")
+        
+        try:
+            active_employees, next_cursor = self.status_service.get_active_employees_page(
+                team_id=team_id,
+                cursor=value["cursor"]
+            )
+        except ValueError:
+            # ボタンの value のカーソルが正しくない場合
+            say(text=INVALID_CURSOR_MESSAGE, channel=body["channel"]["id"])
+            return
+        
+        if not active_employees:
+            say(text="これ以上出勤中の従業員はいません。", channel=body["channel"]["id"])
+            return
+        
+        blocks = MessageBuilder.create_employee_status_message(
+            active_employees,
+            page=value.get("page", 2),
+            next_cursor=next_cursor
+        )
+        say(
+            text="従業員の勤怠状況",
+            blocks=blocks,
+            channel=body["channel"]["id"]
+        )
+    
     def _handle_my_status(self, ack, command, say, client):
         """
         /mystatus コマンド - 自分自身の現在の状態を表示
@@ -6,12 +6,16 @@ from slack_bolt import App
 # from slack_sdk import WebClient
 
 from ...services.monthly_summary_service import MonthlySummaryService
+from ..listeners import register_listener
 from ..message_builder import MessageBuilder
+from ..permissions import ADMIN_ONLY_MESSAGE, is_workspace_admin
 
 class SummaryCommands:
-    def __init__(self, app: App, summary_service: MonthlySummaryService):
+    def __init__(self, app: App, summary_service: MonthlySummaryService, ack_first: bool = False):
         self.app = app
         self.summary_service = summary_service
+        # Trueの場合、ackを先に返してFirestoreやSlack APIへのアクセスはack後に実行する
+        self.ack_first = ack_first
         self._register_commands()
 
     def _register_commands(self) -> None:
@@ -19,13 +23,12 @@ class SummaryCommands:
         すべてのコマンドとビュー（モーダル）サブミッション、アクションを登録
         """
         # /summary コマンド
-        self.app.command("/summary")(self._handle_summary)
+        register_listener(self.app.command("/summary"), self._handle_summary, self.ack_first)
 
         # 新規追加: /help コマンド
-        self.app.command("/help")(self._handle_help)
+        register_listener(self.app.command("/help"), self._handle_help, self.ack_first)
 
         # モーダルの submit アクション
-        @self.app.view("summary_modal")
         def _handle_summary_modal_submission(ack, body, view, client, logger):
             """
             モーダル送信時（「表示」ボタン押下時）の処理
@@ -80,8 +83,15 @@ class SummaryCommands:
                     except Exception as e:
                         logger.error(f"Failed to post summary to channel {ch}: {e}")
 
+        register_listener(self.app.view("summary_modal"), _handle_summary_modal_submission, self.ack_first)
+
         # CSVダウンロードのボタンアクション
-        self.app.action("download_csv")(self._handle_csv_download)
+        register_listener(self.app.action("download_csv"), self._handle_csv_download, self.ack_first)
+
+        # /teamsummary コマンド（ワークスペース全員のサマリー）
+        register_listener(self.app.command("/teamsummary"), self._handle_team_summary, self.ack_first)
+        register_listener(self.app.view("team_summary_modal"), self._handle_team_summary_modal_submission, self.ack_first)
+        register_listener(self.app.action("download_team_csv"), self._handle_team_csv_download, self.ack_first)
 
     def _handle_summary(self, ack, command, client):
         """
@@ -97,75 +107,7 @@ class SummaryCommands:
         private_metadata = json.dumps({"team_id": team_id})
 
         # モーダルのレイアウト定義
-        modal_view = {
-            "type": "modal",
-            "callback_id": "summary_modal",
-            "title": {
-                "type": "plain_text",
-                "text": "勤怠サマリー表示"
-            },
-            "submit": {
-                "type": "plain_text",
-                "text": "表示"
-            },
-            "close": {
-                "type": "plain_text",
-                "text": "キャンセル"
-            },
-            "private_metadata": private_metadata,
-            "blocks": [
-                {
-                    "type": "section",
-                    "block_id": "year_block",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": "年を選択してください"
-                    },
-                    "accessory": {
-                        "type": "static_select",
-                        "action_id": "year_select",
-                        "placeholder": {
-                            "type": "plain_text",
-                            "text": "年"
-                        },
-                        "options": self._build_year_options()
-                    }
-                },
-                {
-                    "type": "section",
-                    "block_id": "month_block",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": "月を選択してください"
-                    },
-                    "accessory": {
-                        "type": "static_select",
-                        "action_id": "month_select",
-                        "placeholder": {
-                            "type": "plain_text",
-                            "text": "月"
-                        },
-                        "options": self._build_month_options()
-                    }
-                },
-                {
-                    "type": "input",
-                    "block_id": "channel_block",
-                    "element": {
-                        "type": "multi_conversations_select",
-                        "action_id": "channel_select",
-                        "placeholder": {
-                            "type": "plain_text",
-                            "text": "投稿先チャンネルを選択"
-                        }
-                    },
-                    "label": {
-                        "type": "plain_text",
-                        "text": "サマリーを表示するチャンネル"
-                    }
-                }
-            ]
-        }
+        modal_view = MessageBuilder.create_summary_modal(private_metadata)
 
         # モーダルを開く
         client.views_open(
@@ -179,20 +121,7 @@ class SummaryCommands:
         以前の handle_mention_help と同じメッセージを表示
         """
         ack()
-        help_message = (
-            "▼ 以下のコマンドをご利用いただけます。\n\n"
-            "• `/punch_in`: 出勤\n"
-            "• `/punch_out`: 退勤\n"
-            "• `/break_begin`: 休憩開始\n"
-            "• `/break_end`: 休憩終了\n"
-            "• `/summary`: 勤怠サマリー\n"
-            "• `/allstatus`: 従業員の勤怠状況一覧\n"
-            "• `/mystatus`: 自分の勤怠状況確認\n"
-            "• `/help`: 使い方ガイドの表示\n\n"
-            "こちらのガイドサイトにも詳しい使い方が掲載されています。\n"
-            "<https://aerial-lentil-c95.notion.site/bot-164d7101a27680d98fbae0385153a637>\n\n"
-            "不明点があればお気軽にお問い合わせください！"
-        )
+        help_message = MessageBuilder.HELP_MESSAGE
         # /help コマンドを打ったチャンネルにヘルプを投稿
         say(text=help_message, channel=command["channel_id"])
 
@@ -239,33 +168,102 @@ class SummaryCommands:
                 text=f"CSVファイルのアップロードに失敗しました：{str(e)}"
             )
 
-    def _build_year_options(self) -> List[Dict[str, Any]]:
+    def _handle_team_summary(self, ack, command, client, logger):
         """
-        2023年から現在の+1年くらいまで、あるいは固定範囲を想定して
-        年を選択できる static_select の options を構築
+        /teamsummary コマンド:
+        1. ワークスペースの管理者・オーナーでなければ、本人にだけ見えるメッセージで断る
+        2. モーダルを開く (年・月・チャンネル選択 + 「表示」ボタン)
         """
-        year_options = []
-        for y in range(2022, 2027):
-            year_options.append({
-                "text": {
-                    "type": "plain_text",
-                    "text": f"{y}年"
-                },
-                "value": str(y)
-            })
-        return year_options
-
-    def _build_month_options(self) -> List[Dict[str, Any]]:
+        ack()
+
+        if not is_workspace_admin(client, command["user_id"], logger):
+            client.chat_postEphemeral(channel=command["channel_id"], user=command["user_id"], text=ADMIN_ONLY_MESSAGE)
+            return
+
+        private_metadata = json.dumps({"team_id": command.get("team_id", "")})
+        client.views_open(
+            trigger_id=command["trigger_id"],
+            view=MessageBuilder.create_summary_modal(
+                private_metadata,
+                callback_id="team_summary_modal",
+                title="全従業員のサマリー"
+            )
+        )
+
+    def _handle_team_summary_modal_submission(self, ack, body, view, client, logger):
         """
-        1〜12月を選択できる static_select の options
+        チームサマリーのモーダル送信時の処理
+        1. 年・月・選択チャンネルを取得
+        2. ワークスペース全員の勤怠記録を1回のクエリで集計し、選択したチャンネルに投稿
         """
-        month_options = []
-        for m in range(1, 13):
-            month_options.append({
-                "text": {
-                    "type": "plain_text",
-                    "text": f"{m}月"
-                },
-                "value": str(m)
-            })
-        return month_options
\ No newline at end of file
+        ack()
+
+        try:
+            team_id = json.loads(view.get("private_metadata", "{}")).get("team_id", "")
+        except Exception:
+            team_id = ""
+            logger.error("Failed to parse private_metadata")
+
+        values = view["state"]["values"]
+        year = int(values["year_block"]["year_select"]["selected_option"]["value"])
+        month = int(values["month_block"]["month_select"]["selected_option"]["value"])
+        channel_list = values["channel_block"]["channel_select"]["selected_conversations"]
+
+        # モーダルを開いた後に権限が外れた場合に備えて、送信時にも確認する
+        user_id = body["user"]["id"]
+        if not is_workspace_admin(client, user_id, logger):
+            for ch in channel_list or []:
+                client.chat_postEphemeral(channel=ch, user=user_id, text=ADMIN_ONLY_MESSAGE)
+            return
+
+        team_summary = self.summary_service.get_team_monthly_summary(team_id=team_id, year=year, month=month)
+        blocks = MessageBuilder.create_team_summary_message(team_summary)
+
+        for ch in channel_list or []:
+            try:
+                client.chat_postMessage(
+                    channel=ch,
+                    text=f"{year}年{month}月の全従業員の勤怠サマリー",
+                    blocks=blocks
+                )
+            except Exception as e:
+                logger.error(f"Failed to post team summary to channel {ch}: {e}")
+
+    def _handle_team_csv_download(self, ack, body, client, logger):
+        """
+        全従業員のCSVダウンロードボタンの処理:
+        1. ボタンを押したのがワークスペースの管理者・オーナーでなければ、本人にだけ見えるメッセージで断る
+        2. ボタンの value から年・月を取得
+        3. ワークスペース全員のCSVを生成してアップロード
+        """
+        ack()
+
+        channel_id = body["channel"]["id"]
+        if not is_workspace_admin(client, body["user"]["id"], logger):
+            client.chat_postEphemeral(channel=channel_id, user=body["user"]["id"], text=ADMIN_ONLY_MESSAGE)
+            return
+
+        year, month = map(int, body["actions"][0]["value"].split("-"))
+        team_id = body.get("team", {}).get("id", "")
+
+        filename, csv_content = self.summary_service.generate_team_csv(team_id=team_id, year=year, month=month)
+
+        try:
+            response = client.files_upload_v2(
+                channel=channel_id,
+                filename=filename,
+                content=csv_content,
+                title=f"{year}年{month}月の全従業員の勤怠記録",
+                initial_comment=f"{year}年{month}月の全従業員の勤怠記録をCSVでダウンロードしました。"
+            )
+
+            if not response["ok"]:
+                client.chat_postMessage(
+                    channel=channel_id,
+                    text=f"CSVファイルのアップロードに失敗しました：{response.get('error', '不明なエラー')}"
+                )
+        except Exception as e:
+            client.chat_postMessage(
+                channel=channel_id,
+                text=f"CSVファイルのアップロードに失敗しました：{str(e)}"
+            )
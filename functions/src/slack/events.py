@@ -1,3 +1,20 @@
+# Botがチャンネルに追加された際に案内する使い方
+USAGE_INSTRUCTIONS = (
+    "こんにちは！チャンネルにBotを追加していただきありがとうございます。\n\n"
+    "▼ まずはこちらのガイドサイトもご参照ください：\n"
+    "<https://aerial-lentil-c95.notion.site/bot-164d7101a27680d98fbae0385153a637>\n\n"
+    "▼ 簡単な使い方はこちら：\n"
+    "- `/punch_in`: 出勤\n"
+    "- `/punch_out`: 退勤\n"
+    "- `/break_begin`: 休憩開始\n"
+    "- `/break_end`: 休憩終了\n"
+    "- `/summary`: 勤怠サマリー\n"
+    "- `/allstatus`: 従業員の勤怠状況一覧\n"
+    "- `/mystatus`: 自分の勤怠状況確認\n"
+    "- `/help`: 使い方ガイドの表示\n\n"
+    "ご不明点があればお気軽にメンションしてください！"
+)
+
 def handle_bot_invited_to_channel(event, client, logger):
     """
     Bot自身がチャンネルに追加された際に、自動で使い方とガイドサイトを案内する。
@@ -10,24 +27,21 @@ def handle_bot_invited_to_channel(event, client, logger):
 
         # joined_user が bot_user_id と一致＝Bot自身がチャンネルに招待された
         if event.get("user") == bot_user_id:
-            usage_instructions = (
-                "こんにちは！チャンネルにBotを追加していただきありがとうございます。\n\n"
-                "▼ まずはこちらのガイドサイトもご参照ください：\n"
-                "<https://aerial-lentil-c95.notion.site/bot-164d7101a27680d98fbae0385153a637>\n\n"
-                "▼ 簡単な使い方はこちら：\n"
-                "- `/punch_in`: 出勤\n"
-                "- `/punch_out`: 退勤\n"
-                "- `/break_begin`: 休憩開始\n"
-                "- `/break_end`: 休憩終了\n"
-                "- `/summary`: 勤怠サマリー\n"
-                "- `/allstatus`: 従業員の勤怠状況一覧\n"
-                "- `/mystatus`: 自分の勤怠状況確認\n"
-                "- `/help`: 使い方ガイドの表示\n\n"
-                "ご不明点があればお気軽にメンションしてください！"
-            )
             client.chat_postMessage(
                 channel=event["channel"],
-                text=usage_instructions
+                text=USAGE_INSTRUCTIONS
+            )
+    except Exception as e:
+        logger.error(f"Error in handle_bot_invited_to_channel: {e}")
+
+async def handle_bot_invited_to_channel_async(event, client, logger):
+    """handle_bot_invited_to_channel の非同期版（AsyncApp用）"""
+    try:
+        auth_result = await client.auth_test()
+        if event.get("user") == auth_result["user_id"]:
+            await client.chat_postMessage(
+                channel=event["channel"],
+                text=USAGE_INSTRUCTIONS
             )
     except Exception as e:
-        logger.error(f"Error in handle_bot_invited_to_channel: {e}")
\ No newline at end of file
+        logger.error(f"Error in handle_bot_invited_to_channel_async: {e}")
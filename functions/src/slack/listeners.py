@@ -0,0 +1,20 @@
+from typing import Callable
+
+def ack_only(ack):
+    """Slackへの応答（ack）のみを行うリスナー"""
+    ack()
+
+def register_listener(listener: Callable, handler: Callable, ack_first: bool) -> None:
+    """
+    リスナーを登録する
+
+    Args:
+        listener: app.command("/punch_in") などが返すデコレーター
+        handler: 処理本体
+        ack_first: Trueの場合はackだけを即座に返し、処理本体はlazyリスナーとしてack後に実行する
+            （Bolt標準のランナーで同じインスタンスのスレッドに渡すため、CPUの常時割り当てが必要）
+    """
+    if ack_first:
+        listener(ack=ack_only, lazy=[handler])
+    else:
+        listener(handler)
@@ -1,7 +1,31 @@
+import json
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 
 class MessageBuilder:
+    # /help コマンドで表示するメッセージ
+    HELP_MESSAGE = (
+        "▼ 以下のコマンドをご利用いただけます。\n\n"
+        "• `/punch_in`: 出勤\n"
+        "• `/punch_out`: 退勤\n"
+        "• `/break_begin`: 休憩開始\n"
+        "• `/break_end`: 休憩終了\n"
+        "• `/summary`: 勤怠サマリー\n"
+        "• `/teamsummary`: 全従業員の勤怠サマリー・CSV出力\n"
+        "• `/allstatus`: 従業員の勤怠状況一覧\n"
+        "• `/mystatus`: 自分の勤怠状況確認\n"
+        "• `/help`: 使い方ガイドの表示\n\n"
+        "こちらのガイドサイトにも詳しい使い方が掲載されています。\n"
+        "<https://aerial-lentil-c95.notion.site/bot-164d7101a27680d98fbae0385153a637>\n\n"
+        "不明点があればお気軽にお問い合わせください！"
+    )
+
+    # 勤怠状況一覧の1つのセクションにまとめる人数（セクションの文字数上限に収まる範囲）
+    STATUS_LINES_PER_SECTION = 20
+
+    # チームサマリーのメッセージに勤務時間を載せる人数（セクションの文字数上限に収まる範囲）
+    TEAM_SUMMARY_MEMBER_LIMIT = 50
+
     @staticmethod
     def format_time(dt: datetime) -> str:
         """時刻を見やすい形式にフォーマット"""
@@ -206,6 +230,264 @@ class MessageBuilder:
             }
         ]
 
+    @staticmethod
+    def create_work_report_message(
+        user_id: str,
+        working_time: float,
+        break_time: float,
+        work_description: str,
+        mention_user_ids: List[str]
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        退勤時の業務報告メッセージを作成
+
+        Returns:
+            Tuple[str, List[Dict[str, Any]]]: 通知用のテキスト（fallback）とSlackブロックメッセージ
+        """
+        # メンション文字列
+        mention_text = ""
+        if mention_user_ids:
+            mention_text = " ".join([f"<@{uid}>" for uid in mention_user_ids])
+
+        # Blocks 形式で見やすく表示
+        # Markdownで整形した各項目を表示
+        report_blocks = [
+            {
+                "type": "header",
+                "text": {
+                    "type": "plain_text",
+                    "text": "本日の業務報告",
+                    "emoji": True
+                }
+            },
+            {
+                "type": "section",
+                "fields": [
+                    {
+                        "type": "mrkdwn",
+                        "text": f"*報告者:*\n<@{user_id}>"
+                    },
+                    {
+                        "type": "mrkdwn",
+                        "text": f"*実働時間:*\n{MessageBuilder.format_duration(working_time)}"
+                    }
+                ]
+            },
+            {
+                "type": "section",
+                "fields": [
+                    {
+                        "type": "mrkdwn",
+                        "text": f"*休憩時間:*\n{MessageBuilder.format_duration(break_time)}"
+                    }
+                ]
+            },
+            {
+                "type": "divider"
+            },
+            {
+                "type": "section",
+                "fields": [
+                    {
+                        "type": "mrkdwn",
+                        "text": f"*業務内容:*\n{work_description}"
+                    }
+                ]
+            }
+        ]
+
+        # 投稿するテキスト（fallback用）
+        fallback_text = (
+            f"報告者: <@{user_id}>\n"
+            f"実働時間: {MessageBuilder.format_duration(working_time)}\n"
+            f"休憩時間: {MessageBuilder.format_duration(break_time)}\n"
+            f"業務内容:\n{work_description}"
+        )
+        # メンションを冒頭に追加する場合
+        if mention_text:
+            fallback_text = mention_text + "\n" + fallback_text
+
+        return fallback_text, report_blocks
+
+    @staticmethod
+    def create_punch_out_modal(private_metadata: str) -> Dict[str, Any]:
+        """退勤報告用のモーダルを作成"""
+        # モーダルから「詳しい進捗」欄を削除
+        return {
+            "type": "modal",
+            "callback_id": "punch_out_report_modal",
+            "title": {
+                "type": "plain_text",
+                "text": "退勤報告"
+            },
+            "submit": {
+                "type": "plain_text",
+                "text": "退勤"
+            },
+            "close": {
+                "type": "plain_text",
+                "text": "キャンセル"
+            },
+            "private_metadata": private_metadata,
+            "blocks": [
+                {
+                    "type": "input",
+                    "block_id": "work_description_block",
+                    "label": {
+                        "type": "plain_text",
+                        "text": "本日の業務内容"
+                    },
+                    "element": {
+                        "type": "plain_text_input",
+                        "action_id": "work_description_input",
+                        "multiline": True
+                    }
+                },
+                {
+                    "type": "input",
+                    "block_id": "report_channel_block",
+                    "label": {
+                        "type": "plain_text",
+                        "text": "報告先チャンネル"
+                    },
+                    "element": {
+                        "type": "conversations_select",
+                        "action_id": "report_channel_input",
+                        "default_to_current_conversation": False,
+                        "response_url_enabled": False
+                    }
+                },
+                {
+                    "type": "input",
+                    "block_id": "mention_users_block",
+                    "optional": True,
+                    "label": {
+                        "type": "plain_text",
+                        "text": "メンションするユーザー（任意）"
+                    },
+                    "element": {
+                        "type": "multi_users_select",
+                        "action_id": "mention_users_input",
+                        "placeholder": {
+                            "type": "plain_text",
+                            "text": "メンションしたいユーザーを選択"
+                        }
+                    }
+                }
+            ]
+        }
+
+    @staticmethod
+    def create_summary_modal(
+        private_metadata: str,
+        callback_id: str = "summary_modal",
+        title: str = "勤怠サマリー表示"
+    ) -> Dict[str, Any]:
+        """月次サマリー表示用のモーダルを作成（年・月・チャンネル選択 + 「表示」ボタン）"""
+        # モーダルのレイアウト定義
+        return {
+            "type": "modal",
+            "callback_id": callback_id,
+            "title": {
+                "type": "plain_text",
+                "text": title
+            },
+            "submit": {
+                "type": "plain_text",
+                "text": "表示"
+            },
+            "close": {
+                "type": "plain_text",
+                "text": "キャンセル"
+            },
+            "private_metadata": private_metadata,
+            "blocks": [
+                {
+                    "type": "section",
+                    "block_id": "year_block",
+                    "text": {
+                        "type": "mrkdwn",
+                        "text": "年を選択してください"
+                    },
+                    "accessory": {
+                        "type": "static_select",
+                        "action_id": "year_select",
+                        "placeholder": {
+                            "type": "plain_text",
+                            "text": "年"
+                        },
+                        "options": MessageBuilder.build_year_options()
+                    }
+                },
+                {
+                    "type": "section",
+                    "block_id": "month_block",
+                    "text": {
+                        "type": "mrkdwn",
+                        "text": "月を選択してください"
+                    },
+                    "accessory": {
+                        "type": "static_select",
+                        "action_id": "month_select",
+                        "placeholder": {
+                            "type": "plain_text",
+                            "text": "月"
+                        },
+                        "options": MessageBuilder.build_month_options()
+                    }
+                },
+                {
+                    "type": "input",
+                    "block_id": "channel_block",
+                    "element": {
+                        "type": "multi_conversations_select",
+                        "action_id": "channel_select",
+                        "placeholder": {
+                            "type": "plain_text",
+                            "text": "投稿先チャンネルを選択"
+                        }
+                    },
+                    "label": {
+                        "type": "plain_text",
+                        "text": "サマリーを表示するチャンネル"
+                    }
+                }
+            ]
+        }
+
+    @staticmethod
+    def build_year_options() -> List[Dict[str, Any]]:
+        """
+        2023年から現在の+1年くらいまで、あるいは固定範囲を想定して
+        年を選択できる static_select の options を構築
+        """
+        year_options = []
+        for y in range(2022, 2027):
+            year_options.append({
+                "text": {
+                    "type": "plain_text",
+                    "text": f"{y}年"
+                },
+                "value": str(y)
+            })
+        return year_options
+
+    @staticmethod
+    def build_month_options() -> List[Dict[str, Any]]:
+        """
+        1〜12月を選択できる static_select の options
+        """
+        month_options = []
+        for m in range(1, 13):
+            month_options.append({
+                "text": {
+                    "type": "plain_text",
+                    "text": f"{m}月"
+                },
+                "value": str(m)
+            })
+        return month_options
+
     @staticmethod
     def create_error_message(error_message: str) -> List[Dict[str, Any]]:
         """エラーメッセージを作成"""
@@ -331,12 +613,146 @@ class MessageBuilder:
         return blocks
         
     @staticmethod
-    def create_employee_status_message(employee_statuses: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def create_team_summary_message(team_summary: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        ワークスペース全員の月次サマリーメッセージを作成
+        - ブロック数・セクションの文字数（3000文字）の上限を超えないよう、従業員ごとの合計は
+          STATUS_LINES_PER_SECTION 人ずつ1つのセクションにまとめ、TEAM_SUMMARY_MEMBER_LIMIT 人を超える分はCSVで確認してもらう
+        """
+        year = team_summary['year']
+        month = team_summary['month']
+        members = team_summary['members']
+
+        blocks = [
+            {
+                "type": "divider"
+            },
+            {
+                "type": "header",
+                "text": {
+                    "type": "plain_text",
+                    "text": f"📊 {year}年{month}月の全従業員の勤怠サマリー",
+                    "emoji": True
+                }
+            }
+        ]
+
+        if not members:
+            blocks.extend([
+                {
+                    "type": "section",
+                    "text": {
+                        "type": "mrkdwn",
+                        "text": f"{year}年{month}月は稼働がありませんでした。"
+                    }
+                },
+                {
+                    "type": "divider"
+                }
+            ])
+            return blocks
+
+        blocks.extend([
+            {
+                "type": "section",
+                "fields": [
+                    {
+                        "type": "mrkdwn",
+                        "text": f"*従業員数:*\n{len(members)}人"
+                    },
+                    {
+                        "type": "mrkdwn",
+                        "text": f"*合計勤務時間:*\n{MessageBuilder.format_duration(team_summary['total_working_time'])}"
+                    }
+                ]
+            },
+            {
+                "type": "divider"
+            }
+        ])
+
+        lines = [
+            f"• {member['user_name']}: {MessageBuilder.format_duration(member['summary']['total_working_time'])}"
+            for member in members[:MessageBuilder.TEAM_SUMMARY_MEMBER_LIMIT]
+        ]
+        for i in range(0, len(lines), MessageBuilder.STATUS_LINES_PER_SECTION):
+            blocks.append({
+                "type": "section",
+                "text": {
+                    "type": "mrkdwn",
+                    "text": "\n".join(lines[i:i + MessageBuilder.STATUS_LINES_PER_SECTION])
+                }
+            })
+
+        if len(members) > MessageBuilder.TEAM_SUMMARY_MEMBER_LIMIT:
+            blocks.append({
+                "type": "context",
+                "elements": [
+                    {
+                        "type": "mrkdwn",
+                        "text": f"ほか{len(members) - MessageBuilder.TEAM_SUMMARY_MEMBER_LIMIT}人の勤務時間はCSVでご確認ください。"
+                    }
+                ]
+            })
+
+        # CSVダウンロードボタンを追加
+        blocks.extend([
+            {
+                "type": "divider"
+            },
+            {
+                "type": "actions",
+                "elements": [
+                    {
+                        "type": "button",
+                        "text": {
+                            "type": "plain_text",
+                            "text": "全従業員のCSVをダウンロード",
+                            "emoji": True
+                        },
+                        "value": f"{year}-{month}",
+                        "action_id": "download_team_csv",
+                        "style": "primary"
+                    }
+                ]
+            }
+        ])
+
+        return blocks
+
+    @staticmethod
+    def format_employee_status_line(status: Dict[str, Any]) -> str:
+        """従業員の勤怠状況を1行で表示"""
+        # 状態に応じたアイコンとテキスト
+        status_emoji = "☕️" if status["status"] == "on_break" else "💼"
+        status_text = "休憩中" if status["status"] == "on_break" else "業務中"
+
+        # 休憩時間の表示（休憩中の場合）
+        break_info = ""
+        if status["status"] == "on_break" and status["break_duration"]:
+            break_info = f" / 現在の休憩 {MessageBuilder.format_duration(status['break_duration'])}"
+
+        return (
+            f"{status_emoji} *<@{status['user_id']}>* {status_text}"
+            f"（{status['start_time'].strftime('%H:%M')}〜 経過 {MessageBuilder.format_duration(status['working_duration'])}"
+            f" / 休憩合計 {MessageBuilder.format_duration(status['total_break_time'])}{break_info}）"
+        )
+
+    @staticmethod
+    def create_employee_status_message(
+        employee_statuses: List[Dict[str, Any]],
+        page: int = 1,
+        next_cursor: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
         """
         従業員の勤怠状況一覧メッセージを作成
+        - ブロック数の上限（50）を超えないよう、従業員は1人1行で STATUS_LINES_PER_SECTION 人ずつ1つのセクションにまとめる
+        - 次のページがある場合は、カーソルから続きを表示するボタンを追加する
         
         Args:
-            employee_statuses: 従業員の勤怠状況のリスト
+            employee_statuses: 従業員の勤怠状況のリスト（1ページ分）
+            page: ページ番号（1始まり）
+            next_cursor: 次のページのカーソル（最後のページは None）
             
         Returns:
             List[Dict[str, Any]]: Slackブロックメッセージ
@@ -355,7 +771,7 @@ class MessageBuilder:
                 "type": "header",
                 "text": {
                     "type": "plain_text",
-                    "text": "👥 従業員勤怠状況",
+                    "text": "👥 従業員勤怠状況" if page == 1 else f"👥 従業員勤怠状況（{page}ページ目）",
                     "emoji": True
                 }
             },
@@ -373,36 +789,38 @@ class MessageBuilder:
             }
         ]
         
-        # 従業員ごとのステータスブロックを追加
-        for status in employee_statuses:
-            # 状態に応じたアイコンとテキスト
-            status_emoji = "☕️" if status["status"] == "on_break" else "💼"
-            status_text = "休憩中" if status["status"] == "on_break" else "業務中"
-            
-            # 時間表示
-            working_time = MessageBuilder.format_duration(status["working_duration"])
-            
-            # 休憩時間の表示（休憩中の場合）
-            break_info = ""
-            if status["status"] == "on_break" and status["break_duration"]:
-                break_time = MessageBuilder.format_duration(status["break_duration"])
-                break_info = f"• *現在の休憩時間:* {break_time}\n"
-            
+        # 従業員ごとのステータスを1行ずつ、セクションにまとめて追加
+        lines = [MessageBuilder.format_employee_status_line(status) for status in employee_statuses]
+        for i in range(0, len(lines), MessageBuilder.STATUS_LINES_PER_SECTION):
             blocks.append({
                 "type": "section",
                 "text": {
                     "type": "mrkdwn",
-                    "text": f"*<@{status['user_id']}>* {status_emoji} {status_text}\n"
-                           f"• *勤務開始:* {MessageBuilder.format_time(status['start_time'])}\n"
-                           f"• *経過時間:* {working_time}\n"
-                           f"{break_info}"
-                           f"• *休憩合計:* {MessageBuilder.format_duration(status['total_break_time'])}"
+                    "text": "\n".join(lines[i:i + MessageBuilder.STATUS_LINES_PER_SECTION])
                 }
             })
-            
-            blocks.append({
-                "type": "divider"
-            })
+
+        if next_cursor:
+            blocks.extend([
+                {
+                    "type": "divider"
+                },
+                {
+                    "type": "actions",
+                    "elements": [
+                        {
+                            "type": "button",
+                            "text": {
+                                "type": "plain_text",
+                                "text": "次のページを表示",
+                                "emoji": True
+                            },
+                            "value": json.dumps({"cursor": next_cursor, "page": page + 1}),
+                            "action_id": "allstatus_next_page"
+                        }
+                    ]
+                }
+            ])
         
         return blocks
     
@@ -1,17 +1,104 @@
 # src/slack/oauth.py
 
 import os
+import tempfile
+from typing import Optional
+from slack_bolt.authorization import AuthorizeResult
+from slack_bolt.authorization.authorize import InstallationStoreAuthorize
+from slack_bolt.context import BoltContext
 from slack_bolt.oauth.oauth_settings import OAuthSettings
-from firebase_admin import firestore
-from .store.firestore_installation_store import FirestoreInstallationStore
-from .store.firestore_state_store import FirestoreStateStore
+from slack_sdk.errors import SlackApiError
+from slack_sdk.oauth.installation_store import InstallationStore
+from slack_sdk.oauth.state_store import OAuthStateStore
 
-def setup_oauth_flow(client_id: str, client_secret: str, db: firestore.Client):
+from src.config import AppConfig
+from src.repositories.factory import BACKEND_MEMORY, BACKEND_SQLITE
+
+# OAuthのstateの有効期限（秒）
+STATE_EXPIRATION_SECONDS = 600
+
+# トークンが無効になった（アンインストール・取り消し・再発行された）ことを示すSlack APIのエラー
+REVOKED_TOKEN_ERRORS = frozenset({"invalid_auth", "not_authed", "account_inactive", "token_revoked", "tokens_revoked"})
+
+def _firestore_client(config: AppConfig):
+    # リポジトリと同じ、プロセスで共有するクライアントを使う
+    from src.repositories.firestore_client import get_firestore_client_factory
+    return get_firestore_client_factory().client(
+        config.firebase.project_id,
+        config.firebase.credentials_path,
+        config.firebase.channel_options
+    )
+
+def create_installation_store(config: AppConfig) -> InstallationStore:
+    """
+    storage.backend に応じたインストール情報のストアを作成
+    - firestore: Firestore（OAuthでインストールしたワークスペースの情報を共有する）
+    - memory: 一時ディレクトリのファイル（プロセス終了後は使わない。ベンチマーク・負荷テスト用）
+    - sqlite: 勤怠記録と同じSQLiteのデータベースファイル
+    """
+    backend = config.storage.backend
+    if backend == BACKEND_MEMORY:
+        from slack_sdk.oauth.installation_store import FileInstallationStore
+        return FileInstallationStore(base_dir=tempfile.mkdtemp(prefix="slack-installations-"))
+    if backend == BACKEND_SQLITE:
+        from slack_sdk.oauth.installation_store.sqlite3 import SQLite3InstallationStore
+        return SQLite3InstallationStore(database=config.storage.sqlite_path, client_id=config.slack.client_id)
+
+    from .store.firestore_installation_store import FirestoreInstallationStore
+    return FirestoreInstallationStore(_firestore_client(config))
+
+def create_state_store(config: AppConfig) -> OAuthStateStore:
+    """storage.backend に応じたOAuthのstateのストアを作成（create_installation_store と同じ保存先）"""
+    backend = config.storage.backend
+    if backend == BACKEND_MEMORY:
+        from slack_sdk.oauth.state_store import FileOAuthStateStore
+        return FileOAuthStateStore(
+            expiration_seconds=STATE_EXPIRATION_SECONDS,
+            base_dir=tempfile.mkdtemp(prefix="slack-oauth-states-")
+        )
+    if backend == BACKEND_SQLITE:
+        from slack_sdk.oauth.state_store.sqlite3 import SQLite3OAuthStateStore
+        return SQLite3OAuthStateStore(database=config.storage.sqlite_path, expiration_seconds=STATE_EXPIRATION_SECONDS)
+
+    from .store.firestore_state_store import FirestoreStateStore
+    return FirestoreStateStore(_firestore_client(config), expiration_seconds=STATE_EXPIRATION_SECONDS)
+
+class CacheRefreshingAuthorize(InstallationStoreAuthorize):
+    """
+    インストール情報をキャッシュするストア（forget_team を持つもの）用の authorize
+    - キャッシュのトークンが検証（auth.test）に失敗した場合は、他のインスタンスでアンインストール・
+      トークンの再発行が行われたとみなし、そのワークスペースのキャッシュを捨てて保存済みの情報で1回だけ再試行する
+    """
+
+    def __call__(self, *, context: BoltContext, enterprise_id: Optional[str], team_id: Optional[str], **kwargs) -> Optional[AuthorizeResult]:
+        result = super().__call__(context=context, enterprise_id=enterprise_id, team_id=team_id, **kwargs)
+        forget_team = getattr(self.installation_store, "forget_team", None)
+        if result is None and forget_team is not None and forget_team(
+            enterprise_id=enterprise_id,
+            team_id=team_id,
+            is_enterprise_install=context.is_enterprise_install
+        ):
+            result = super().__call__(context=context, enterprise_id=enterprise_id, team_id=team_id, **kwargs)
+        return result
+
+def forget_revoked_installation(
+    installation_store: Optional[InstallationStore],
+    error: SlackApiError,
+    enterprise_id: Optional[str],
+    team_id: Optional[str]
+) -> None:
+    """Slack APIのエラーがトークンの無効化によるものであれば、ストアのキャッシュからワークスペースの情報を捨てる"""
+    forget_team = getattr(installation_store, "forget_team", None)
+    if forget_team is not None and error.response.get("error") in REVOKED_TOKEN_ERRORS:
+        forget_team(enterprise_id=enterprise_id, team_id=team_id)
+
+def setup_oauth_flow(
+    client_id: str,
+    client_secret: str,
+    installation_store: InstallationStore,
+    state_store: OAuthStateStore
+):
     """OAuthフローの設定を行う"""
-    
-    # インストール情報と状態管理用のストアを初期化
-    installation_store = FirestoreInstallationStore(db)
-    state_store = FirestoreStateStore(db)
 
     # スコープ設定
     # 'bot'スコープを削除し、'files:write:user'を使用
@@ -44,5 +131,11 @@ def setup_oauth_flow(client_id: str, client_secret: str, db: firestore.Client):
         success_url="/slack/oauth_success",
         failure_url="/slack/oauth_failure"
     )
+    oauth_settings.authorize = CacheRefreshingAuthorize(
+        logger=oauth_settings.authorize.logger,
+        client_id=client_id,
+        client_secret=client_secret,
+        installation_store=installation_store
+    )
     
     return oauth_settings
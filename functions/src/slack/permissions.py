@@ -0,0 +1,27 @@
+# 全従業員の勤務時間・業務報告を扱う操作（/teamsummary・全従業員のCSV）を許可しない場合のメッセージ
+ADMIN_ONLY_MESSAGE = "全従業員のサマリー・CSVは、ワークスペースの管理者・オーナーのみ利用できます。"
+
+def is_admin_user(user: dict) -> bool:
+    """users.info の user がワークスペースの管理者・オーナーかどうか"""
+    return bool(user.get("is_admin") or user.get("is_owner") or user.get("is_primary_owner"))
+
+def is_workspace_admin(client, user_id: str, logger=None) -> bool:
+    """
+    ユーザーがワークスペースの管理者・オーナーかどうか（users.info で毎回確認する）
+    - ユーザー情報を取得できない場合は許可しない
+    """
+    try:
+        return is_admin_user(client.users_info(user=user_id)["user"])
+    except Exception as e:
+        if logger:
+            logger.error(f"Failed to fetch user info for {user_id}: {e}")
+        return False
+
+async def is_workspace_admin_async(client, user_id: str, logger=None) -> bool:
+    """is_workspace_admin の非同期版（AsyncApp用）"""
+    try:
+        return is_admin_user((await client.users_info(user=user_id))["user"])
+    except Exception as e:
+        if logger:
+            logger.error(f"Failed to fetch user info for {user_id}: {e}")
+        return False
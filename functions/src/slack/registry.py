@@ -0,0 +1,127 @@
+import threading
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from slack_bolt import App
+from slack_bolt.adapter.flask import SlackRequestHandler
+
+from src.config import get_config
+from src.repositories.base import AttendanceRepository
+from src.repositories.factory import create_repository
+from src.services.attendance_service import AttendanceService
+from src.services.monthly_summary_service import MonthlySummaryService
+from src.services.status_service import StatusService
+from src.slack.commands.attendance_commands import AttendanceCommands
+from src.slack.commands.summary_commands import SummaryCommands
+from src.slack.commands.status_commands import StatusCommands
+from src.slack.events import handle_bot_invited_to_channel
+from src.slack.listeners import register_listener
+from src.slack.oauth import create_installation_store, create_state_store, setup_oauth_flow
+from src.utils.cold_start import get_cold_start_profiler
+
+@dataclass
+class SlackBotComponents:
+    """1インスタンス内で使い回すSlackボットの構成要素"""
+    repository: AttendanceRepository
+    attendance_service: AttendanceService
+    monthly_summary_service: MonthlySummaryService
+    status_service: StatusService
+    app: App
+    handler: SlackRequestHandler
+
+def build_components() -> SlackBotComponents:
+    """リポジトリ・サービス・Bolt App・ハンドラーを組み立てる"""
+    profiler = get_cold_start_profiler()
+
+    with profiler.phase("config"):
+        config = get_config()
+
+    # Initialize repository（storage.backend で Firestore・メモリ・SQLite を選ぶ）
+    with profiler.phase("repository"):
+        repository = create_repository(config)
+
+    # Initialize services
+    attendance_service = AttendanceService(repository)
+    monthly_summary_service = MonthlySummaryService(
+        repository,
+        persist_closed_months=config.storage.persist_closed_months
+    )
+    status_service = StatusService(repository, read_presence=config.storage.read_presence)
+
+    # Setup OAuth（インストール情報・stateの保存先もリポジトリと同じく storage.backend で選ぶ）
+    # OAuthSettingsでinstall_path, redirect_uri_path, success_url, failure_urlを指定済み
+    with profiler.phase("oauth_settings"):
+        oauth_settings = setup_oauth_flow(
+            client_id=config.slack.client_id,
+            client_secret=config.slack.client_secret,
+            installation_store=create_installation_store(config),
+            state_store=create_state_store(config)
+        )
+
+    # Initialize Slack app with OAuth
+    ack_first = config.application.ack_first
+    with profiler.phase("bolt_app"):
+        # ack-firstモードではリスナー本体（ack）をレスポンス前に実行し、
+        # 残りの処理（lazyリスナー）はBolt標準のランナーでスレッドに渡す。
+        # 処理はキューに保存しないため、レスポンス送信後もCPUが割り当てられる環境（CPUの常時割り当て）専用
+        app = App(oauth_settings=oauth_settings, process_before_response=ack_first)
+        if ack_first:
+            print("[WARNING] ack_first is enabled: deferred handlers run on in-process threads and require always-allocated CPU")
+
+    # Register commands
+    with profiler.phase("register_listeners"):
+        AttendanceCommands(app, attendance_service, ack_first=ack_first)
+        SummaryCommands(app, monthly_summary_service, ack_first=ack_first)
+        StatusCommands(app, status_service, ack_first=ack_first)
+
+        # Register events
+        register_listener(app.event("member_joined_channel"), handle_bot_invited_to_channel, ack_first)
+
+    return SlackBotComponents(
+        repository=repository,
+        attendance_service=attendance_service,
+        monthly_summary_service=monthly_summary_service,
+        status_service=status_service,
+        app=app,
+        handler=SlackRequestHandler(app)
+    )
+
+class AppRegistry:
+    """
+    プロセス全体で1つだけSlackボットの構成要素を保持するレジストリ
+
+    - 初回のget()で構成要素を組み立て、以降のリクエストでは使い回す
+    - 同時に複数のリクエストが来ても組み立ては1回だけ行われる（ダブルチェックロッキング）
+    - 組み立てに失敗した場合は保持せず、次のリクエストで再試行する
+    """
+
+    def __init__(self, builder: Callable[[], SlackBotComponents] = build_components):
+        self._builder = builder
+        self._components: Optional[SlackBotComponents] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> SlackBotComponents:
+        """構成要素を取得（未構築なら構築する）"""
+        components = self._components
+        if components is not None:
+            return components
+
+        with self._lock:
+            if self._components is None:
+                self._components = self._builder()
+            return self._components
+
+    def is_ready(self) -> bool:
+        """構成要素が構築済みかどうか"""
+        return self._components is not None
+
+    def reset(self) -> None:
+        """保持している構成要素を破棄（次回のget()で再構築される）"""
+        with self._lock:
+            self._components = None
+
+_registry = AppRegistry()
+
+def get_app_registry() -> AppRegistry:
+    """プロセス共通のレジストリを取得"""
+    return _registry
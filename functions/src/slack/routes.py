@@ -0,0 +1,102 @@
+import hmac
+import json
+import os
+from typing import Callable, Dict, Optional, Tuple
+
+from flask import Request, Response
+
+# Bolt・Firestore・OAuthを必要としないルートのハンドラー
+# Noneを返した場合は通常のBolt処理に委譲する
+FastRouteHandler = Callable[[Request], Optional[Response]]
+
+def _json_response(payload: Dict, status: int = 200) -> Response:
+    return Response(
+        json.dumps(payload),
+        status=status,
+        mimetype='application/json'
+    )
+
+def handle_oauth_success(request: Request) -> Response:
+    """インストール成功後の静的メッセージを表示"""
+    return Response(
+        "<html><body><h1>インストールが完了しました！</h1>"
+        "<p>このページを閉じ、Slackワークスペースでボットをお使いください。</p></body></html>",
+        status=200,
+        mimetype='text/html'
+    )
+
+def handle_oauth_failure(request: Request) -> Response:
+    """インストール失敗時の静的メッセージを表示"""
+    error = request.args.get("error", "不明なエラー")
+    return Response(
+        f"<html><body><h1>インストールに失敗しました</h1>"
+        f"<p>エラー: {error}</p>"
+        f"<p><a href='/slack/install'>再度インストールを試みる</a></p></body></html>",
+        status=400,
+        mimetype='text/html'
+    )
+
+def _is_authorized_deep_warmup(request: Request) -> bool:
+    """
+    ディープウォームアップを実行してよいリクエストかを判定
+
+    環境変数 WARMUP_SECRET と X-Warmup-Token ヘッダーを定数時間で比較する（未設定の場合は常にFalse）
+    """
+    secret = os.environ.get("WARMUP_SECRET")
+    token = request.headers.get("X-Warmup-Token")
+    if not secret or not token:
+        return False
+    return hmac.compare_digest(token.encode("utf-8"), secret.encode("utf-8"))
+
+def handle_warmup(request: Request) -> Optional[Response]:
+    """
+    ウォームアップリクエストの処理
+
+    - 通常: 処理せずにOKを返す
+    - X-Warmup-Mode: deep の場合: AppRegistryやFirestoreのチャネル、インストール情報のキャッシュを準備し、
+      フェーズごとの所要時間を返す（X-Warmup-Token が WARMUP_SECRET と一致する場合のみ。
+      一致しない場合は通常のウォームアップとして扱い、内部の情報は返さない）
+    """
+    if request.headers.get("X-Warmup-Request") != "true":
+        return None
+
+    if request.headers.get("X-Warmup-Mode") == "deep":
+        if _is_authorized_deep_warmup(request):
+            print("***** Received deep warmup request for slack_bot_function *****")
+            # Bolt・Firestoreを読み込むため、ディープウォームアップ時にのみ import する
+            from src.deep_warmup import run_deep_warmup
+            report = run_deep_warmup()
+            print(f"***** Deep warmup finished: {json.dumps(report)} *****")
+            return _json_response(report, status=200 if report["status"] == "ok" else 500)
+        print("***** Rejected unauthorized deep warmup request for slack_bot_function *****")
+
+    print("***** Received warmup request for slack_bot_function *****")
+    return _json_response({
+        "status": "ok",
+        "message": "Warmup successful"
+    })
+
+def handle_health(request: Request) -> Response:
+    """ヘルスチェック"""
+    return _json_response({"status": "ok"})
+
+# (HTTPメソッド, パス) -> ハンドラー
+# 成功・失敗時のURLはSlack BoltがOAuth完了後にリダイレクトする先で、静的なページを返すのみ
+FAST_ROUTES: Dict[Tuple[str, str], FastRouteHandler] = {
+    ("GET", "/slack/oauth_success"): handle_oauth_success,
+    ("GET", "/slack/oauth_failure"): handle_oauth_failure,
+    ("GET", "/warmup"): handle_warmup,
+    ("GET", "/health"): handle_health,
+}
+
+def dispatch_fast_path(request: Request) -> Optional[Response]:
+    """
+    Boltを経由せずに処理できるリクエストであればレスポンスを返す
+
+    Returns:
+        Optional[Response]: 該当するルートがない場合はNone
+    """
+    handler = FAST_ROUTES.get((request.method, request.path))
+    if handler is None:
+        return None
+    return handler(request)
@@ -1,19 +1,116 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 import json
+import threading
+import time
 from datetime import datetime
 from firebase_admin import firestore
+from google.cloud.firestore_v1.base_query import FieldFilter
 from slack_sdk.oauth.installation_store import InstallationStore
 from slack_sdk.oauth.installation_store.models.installation import Installation
 from slack_sdk.oauth.installation_store.models.bot import Bot
 
+# Firestoreの in クエリに1回で渡せる値の数の上限
+IN_QUERY_LIMIT = 30
+
 class FirestoreInstallationStore(InstallationStore):
     """Firestoreベースのインストール情報永続化クラス"""
     
-    def __init__(self, db: firestore.Client):
+    def __init__(self, db: firestore.Client, cache_ttl_seconds: int = 300):
         self.db = db
         self.installations_collection = self.db.collection('slack_installations')
         self.bots_collection = self.db.collection('slack_bots')
 
+        # インスタンス内キャッシュ: (種別, ドキュメントID) -> (有効期限, オブジェクト)
+        # トークンはほぼ変わらないため、他インスタンスでの更新はTTLで反映する
+        # （ただしトークンが無効になったことが分かった場合は forget_team で即座に捨てる）
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self._cache: Dict[Tuple[str, str], Tuple[float, Any]] = {}
+        self._cache_lock = threading.Lock()
+
+    def _cache_get(self, kind: str, doc_id: str) -> Optional[Any]:
+        entry = self._cache.get((kind, doc_id))
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            with self._cache_lock:
+                self._cache.pop((kind, doc_id), None)
+            return None
+        return value
+
+    def _cache_put(self, kind: str, doc_id: str, value: Any) -> None:
+        with self._cache_lock:
+            self._cache[(kind, doc_id)] = (time.monotonic() + self.cache_ttl_seconds, value)
+
+    def _cache_invalidate(self, kind: str, doc_id: str) -> None:
+        with self._cache_lock:
+            self._cache.pop((kind, doc_id), None)
+
+    def forget_team(
+        self,
+        *,
+        enterprise_id: Optional[str],
+        team_id: Optional[str],
+        is_enterprise_install: Optional[bool] = False
+    ) -> bool:
+        """
+        ワークスペースのBot情報・インストール情報（ユーザー単位のものを含む）をキャッシュから捨てる
+        - 他のインスタンスでアンインストール・トークンの再発行が行われ、キャッシュのトークンが無効になった場合に使う
+
+        Returns:
+            bool: 捨てたエントリがあったかどうか
+        """
+        bot_doc_id = self._generate_bot_id(enterprise_id, team_id, is_enterprise_install)
+        team_doc_id = self._generate_installation_id(enterprise_id, team_id, is_enterprise_install, None)
+        with self._cache_lock:
+            keys = [
+                key for key in self._cache
+                if key == ('bot', bot_doc_id)
+                or (key[0] == 'installation' and (key[1] == team_doc_id or key[1].startswith(f"{team_doc_id}-U")))
+            ]
+            for key in keys:
+                del self._cache[key]
+        return bool(keys)
+
+    def prime_cache(self, team_limit: int = 50) -> Dict[str, int]:
+        """
+        インストール済みワークスペースのBot情報・インストール情報をキャッシュに読み込む
+        （ウォームアップ用。Bot情報のクエリ1回と、IN_QUERY_LIMIT ワークスペースごとのインストール情報のクエリ1回）
+
+        Args:
+            team_limit: 読み込むワークスペース数の上限
+
+        Returns:
+            Dict[str, int]: 読み込んだBot情報・インストール情報の件数
+        """
+        bot_count = 0
+        installation_count = 0
+        team_ids = []
+
+        for bot_doc in self.bots_collection.limit(team_limit).stream():
+            self._cache_put('bot', bot_doc.id, self._create_bot_from_doc(bot_doc))
+            bot_count += 1
+
+            team_id = bot_doc.to_dict().get('team_id')
+            if team_id and team_id not in team_ids:
+                team_ids.append(team_id)
+
+        # ワークスペース単位・ユーザー単位のインストール情報を、in クエリでワークスペースをまとめて読み込む
+        for i in range(0, len(team_ids), IN_QUERY_LIMIT):
+            installation_docs = (
+                self.installations_collection
+                .where(filter=FieldFilter('team_id', 'in', team_ids[i:i + IN_QUERY_LIMIT]))
+                .stream()
+            )
+            for installation_doc in installation_docs:
+                self._cache_put('installation', installation_doc.id, self._create_installation_from_doc(installation_doc))
+                installation_count += 1
+
+        return {
+            'bots': bot_count,
+            'installations': installation_count
+        }
+
     def save(self, installation: Installation):
         """インストール情報を保存"""
         # 基本のインストール情報（ユーザーIDありの場合）
@@ -40,6 +137,7 @@ class FirestoreInstallationStore(InstallationStore):
             user_id=installation.user_id
         )
         self.installations_collection.document(user_doc_id).set(installation_data)
+        self._cache_invalidate('installation', user_doc_id)
 
         # ボットトークンがある場合、user_idなしのワークスペース/エンタープライズ単位のドキュメントも保存する
         # これにより、user_idを指定しなくてもbotインストール情報が取得可能になる
@@ -53,6 +151,7 @@ class FirestoreInstallationStore(InstallationStore):
             bot_level_data = dict(installation_data)
             bot_level_data['user_id'] = None
             self.installations_collection.document(bot_level_doc_id).set(bot_level_data)
+            self._cache_invalidate('installation', bot_level_doc_id)
 
             # Bot情報も保存
             bot_data = {
@@ -73,6 +172,7 @@ class FirestoreInstallationStore(InstallationStore):
                 is_enterprise_install=installation.is_enterprise_install
             )
             self.bots_collection.document(bot_doc_id).set(bot_data)
+            self._cache_invalidate('bot', bot_doc_id)
 
     def find_installation(
         self,
@@ -89,6 +189,10 @@ class FirestoreInstallationStore(InstallationStore):
             is_enterprise_install=is_enterprise_install,
             user_id=user_id
         )
+
+        cached = self._cache_get('installation', doc_id)
+        if cached is not None:
+            return cached
         
         doc = self.installations_collection.document(doc_id).get()
         if not doc.exists:
@@ -103,13 +207,20 @@ class FirestoreInstallationStore(InstallationStore):
                     is_enterprise_install=is_enterprise_install,
                     user_id=None
                 )
+                cached = self._cache_get('installation', no_user_doc_id)
+                if cached is not None:
+                    return cached
                 doc = self.installations_collection.document(no_user_doc_id).get()
                 if not doc.exists:
                     return None
-                return self._create_installation_from_doc(doc)
+                installation = self._create_installation_from_doc(doc)
+                self._cache_put('installation', no_user_doc_id, installation)
+                return installation
             return None
             
-        return self._create_installation_from_doc(doc)
+        installation = self._create_installation_from_doc(doc)
+        self._cache_put('installation', doc_id, installation)
+        return installation
 
     def find_bot(
         self,
@@ -124,12 +235,18 @@ class FirestoreInstallationStore(InstallationStore):
             team_id=team_id,
             is_enterprise_install=is_enterprise_install
         )
+
+        cached = self._cache_get('bot', doc_id)
+        if cached is not None:
+            return cached
         
         doc = self.bots_collection.document(doc_id).get()
         if not doc.exists:
             return None
             
-        return self._create_bot_from_doc(doc)
+        bot = self._create_bot_from_doc(doc)
+        self._cache_put('bot', doc_id, bot)
+        return bot
 
     def delete_installation(
         self,
@@ -148,6 +265,10 @@ class FirestoreInstallationStore(InstallationStore):
         )
         
         self.installations_collection.document(doc_id).delete()
+        self._cache_invalidate('installation', doc_id)
+        if user_id is None:
+            # ワークスペース単位の削除（アンインストール）では、ユーザー単位のキャッシュも捨てる
+            self.forget_team(enterprise_id=enterprise_id, team_id=team_id, is_enterprise_install=is_enterprise_install)
 
         # ボットレベルのドキュメントも削除
         if user_id is not None:
@@ -158,6 +279,7 @@ class FirestoreInstallationStore(InstallationStore):
                 user_id=None
             )
             self.installations_collection.document(bot_level_doc_id).delete()
+            self._cache_invalidate('installation', bot_level_doc_id)
 
     def delete_bot(
         self,
@@ -174,6 +296,7 @@ class FirestoreInstallationStore(InstallationStore):
         )
         
         self.bots_collection.document(doc_id).delete()
+        self._cache_invalidate('bot', doc_id)
 
     def _generate_installation_id(
         self,
@@ -244,5 +367,7 @@ class FirestoreInstallationStore(InstallationStore):
             bot_id=data.get('bot_id'),
             bot_user_id=data.get('bot_user_id'),
             bot_scopes=data.get('bot_scopes', []),
-            is_enterprise_install=data.get('is_enterprise_install', False)
+            is_enterprise_install=data.get('is_enterprise_install', False),
+            # Bot では必須（保存時刻のない古いドキュメントは読み込んだ時刻にする）
+            installed_at=data.get('installed_at') or time.time()
         )
@@ -0,0 +1,166 @@
+import builtins
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List
+
+@dataclass
+class ImportTiming:
+    """
+    モジュール1つ分のimport時間（`python -X importtime` の1行に相当）
+
+    self_us: そのモジュール自身の実行時間（子モジュールのimportを除く）
+    cumulative_us: 子モジュールのimportを含む合計時間
+    depth: importのネストの深さ（0がトップレベル）
+    """
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int = 0
+
+def parse_importtime(stderr_text: str) -> List[ImportTiming]:
+    """
+    `python -X importtime` がstderrに出力する内容をパースする
+
+    例:
+        import time: self [us] | cumulative | imported package
+        import time:       331 |        331 |   _io
+    """
+    timings = []
+    for line in stderr_text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        self_part, cumulative_part, name_part = parts
+        try:
+            self_us = int(self_part.strip())
+            cumulative_us = int(cumulative_part.strip())
+        except ValueError:
+            # ヘッダー行（self [us] | cumulative | imported package）
+            continue
+        indent = len(name_part) - len(name_part.lstrip(" "))
+        timings.append(ImportTiming(
+            name=name_part.strip(),
+            self_us=self_us,
+            cumulative_us=cumulative_us,
+            depth=max(0, (indent - 1) // 2)
+        ))
+    return timings
+
+class ColdStartProfiler:
+    """
+    コールドスタート時の初期化処理を計測するプロファイラー
+
+    - phase(): 初期化フェーズ（Firebase初期化、Bolt Appの構築など）ごとの所要時間を記録
+    - track_imports(): ブロック内で新たにimportされたモジュールごとの所要時間を
+      `-X importtime` と同じ形式（self / cumulative）で記録（ブロックに入ったスレッドのimportのみ）
+    - emit_report(): 記録内容を1度だけログに出力
+
+    phase() は常に記録する（perf_counter の呼び出しのみ）。
+    import のフックとレポート出力は enabled の場合のみ行う。
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.phases: List[Dict[str, Any]] = []
+        self.imports: List[ImportTiming] = []
+        self._started = time.perf_counter()
+        self._emitted = False
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """初期化フェーズの所要時間を記録"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append({
+                'name': name,
+                'elapsed_ms': round((time.perf_counter() - started) * 1000, 2)
+            })
+
+    @contextmanager
+    def track_imports(self) -> Iterator[None]:
+        """ブロック内のimportをフックしてモジュールごとの所要時間を記録"""
+        if not self.enabled:
+            yield
+            return
+
+        original_import = builtins.__import__
+        # フックはプロセス全体に効くため、ブロックに入ったスレッドのimportだけを記録する
+        # （Boltのリスナーのスレッドなどのimportが混ざると、stack が壊れて時間が正しく計れない）
+        owner = threading.get_ident()
+        # [モジュール名, 子モジュールのimportに要した時間]
+        stack: List[List[Any]] = []
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            # 他のスレッドのimport・読み込み済みのモジュールは計測しない
+            if threading.get_ident() != owner or (level == 0 and name in sys.modules):
+                return original_import(name, globals, locals, fromlist, level)
+
+            label = name if level == 0 else f"{'.' * level}{name}"
+            frame = [label, 0.0]
+            stack.append(frame)
+            started = time.perf_counter()
+            try:
+                return original_import(name, globals, locals, fromlist, level)
+            finally:
+                elapsed = time.perf_counter() - started
+                stack.pop()
+                if stack:
+                    stack[-1][1] += elapsed
+                self.imports.append(ImportTiming(
+                    name=label,
+                    self_us=int((elapsed - frame[1]) * 1_000_000),
+                    cumulative_us=int(elapsed * 1_000_000),
+                    depth=len(stack)
+                ))
+
+        builtins.__import__ = timed_import
+        try:
+            yield
+        finally:
+            builtins.__import__ = original_import
+
+    def report(self, top: int = 20) -> Dict[str, Any]:
+        """計測結果をまとめる"""
+        top_level = [timing for timing in self.imports if timing.depth == 0]
+        slowest = sorted(self.imports, key=lambda timing: timing.self_us, reverse=True)[:top]
+        return {
+            'since_start_ms': round((time.perf_counter() - self._started) * 1000, 2),
+            'phases': list(self.phases),
+            'total_import_ms': round(sum(timing.cumulative_us for timing in top_level) / 1000, 2),
+            'top_level_imports': [
+                {'name': timing.name, 'cumulative_ms': round(timing.cumulative_us / 1000, 2)}
+                for timing in sorted(top_level, key=lambda timing: timing.cumulative_us, reverse=True)[:top]
+            ],
+            'slowest_modules': [
+                {'name': timing.name, 'self_ms': round(timing.self_us / 1000, 2)}
+                for timing in slowest
+            ]
+        }
+
+    def emit_report(self) -> None:
+        """計測結果を1度だけログに出力（enabled の場合のみ）"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._emitted:
+                return
+            self._emitted = True
+        print(f"***** Cold start profile: {json.dumps(self.report(), ensure_ascii=False)} *****")
+
+_profiler = ColdStartProfiler(
+    enabled=os.getenv("APP_COLD_START_PROFILE", "false").lower() == "true"
+)
+
+def get_cold_start_profiler() -> ColdStartProfiler:
+    """プロセス共通のプロファイラーを取得"""
+    return _profiler
@@ -4,27 +4,43 @@ import pytz
 
 from ..config import get_config
 
+_timezone = None
+
+# 月が変わってから記録が変更されうる期間（日をまたぐ勤務の退勤・業務報告など）
+CLOSED_MONTH_GRACE = timedelta(days=1)
+
+def get_timezone():
+    """設定されたタイムゾーンを取得（初回のみ設定から読み込む）"""
+    global _timezone
+    if _timezone is None:
+        _timezone = pytz.timezone(get_config().application.timezone)
+    return _timezone
+
 def get_current_time() -> datetime:
     """現在時刻を設定されたタイムゾーンで取得"""
-    config = get_config()
-    timezone = pytz.timezone(config.application.timezone)
-    return datetime.now(timezone)
+    return datetime.now(get_timezone())
 
 def get_start_of_month(year: int, month: int) -> datetime:
     """月初日の0時0分を取得"""
-    config = get_config()
-    timezone = pytz.timezone(config.application.timezone)
-    return datetime(year, month, 1, 0, 0, 0, tzinfo=timezone)
+    timezone = get_timezone()
+    # pytzのタイムゾーンを tzinfo= に渡すとLMT（例: +09:19）になるため localize を使う
+    return timezone.localize(datetime(year, month, 1, 0, 0, 0))
 
 def get_end_of_month(year: int, month: int) -> datetime:
     """月末日の23時59分59秒を取得"""
-    config = get_config()
-    timezone = pytz.timezone(config.application.timezone)
+    timezone = get_timezone()
     
     # 月末日を取得
     _, last_day = calendar.monthrange(year, month)
     
-    return datetime(year, month, last_day, 23, 59, 59, tzinfo=timezone)
+    return timezone.localize(datetime(year, month, last_day, 23, 59, 59))
+
+def is_closed_month(year: int, month: int, now: datetime = None) -> bool:
+    """翌月の初日から猶予期間が過ぎた（以降は記録が変わらないとみなせる）月かどうか"""
+    if now is None:
+        now = get_current_time()
+    next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return now >= get_start_of_month(next_year, next_month) + CLOSED_MONTH_GRACE
 
 def get_week_number(date: datetime) -> int:
     """日付から週番号を取得（1-5）"""
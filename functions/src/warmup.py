@@ -1,6 +1,5 @@
 from firebase_functions import https_fn
 import json
-import requests
 import os
 
 @https_fn.on_request()
@@ -18,6 +17,9 @@ def warmup_function(request: https_fn.Request) -> https_fn.Response:
     
     # slack_bot_functionも温める
     try:
+        # requests はウォームアップ時にしか使わないため、ここで import する
+        import requests
+
         # リージョンとプロジェクトIDを環境変数から取得（デプロイ時に自動的に設定される）
         region = os.environ.get('FUNCTION_REGION', 'us-central1')
         project_id = os.environ.get('GCP_PROJECT', 'slack-attendance-bot-4a3a5')
@@ -25,13 +27,23 @@ def warmup_function(request: https_fn.Request) -> https_fn.Response:
         # slack_bot_functionのURLを構築
         bot_function_url = f"https://{region}-{project_id}.cloudfunctions.net/slack_bot_function"
         
-        # 簡単なGETリクエストを送信（実際の関数を呼び出さないようにするためのパス）
+        # ウォームアップモード（deep: キャッシュ等まで準備する / shallow: 200を返すのみ）
+        warmup_mode = os.environ.get('WARMUP_MODE', 'deep')
+        
+        # GETリクエストを送信（Boltのハンドラーを通らないウォームアップ専用のパス）
         warmup_response = requests.get(
             f"{bot_function_url}/warmup", 
-            headers={"X-Warmup-Request": "true"},
-            timeout=10
+            headers={
+                "X-Warmup-Request": "true",
+                "X-Warmup-Mode": warmup_mode,
+                # ディープウォームアップは WARMUP_SECRET と一致するトークンを送った場合のみ実行される
+                "X-Warmup-Token": os.environ.get('WARMUP_SECRET', '')
+            },
+            timeout=30
         )
         print(f"***** Warmed up slack_bot_function - Status: {warmup_response.status_code} *****")
+        if warmup_mode == 'deep':
+            print(f"***** Deep warmup report: {warmup_response.text} *****")
     except Exception as e:
         print(f"***** Error warming up slack_bot_function: {str(e)} *****")
     
@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# functions/ をパスに追加して src パッケージを import 可能にする
+FUNCTIONS_DIR = Path(__file__).resolve().parent.parent
+if str(FUNCTIONS_DIR) not in sys.path:
+    sys.path.insert(0, str(FUNCTIONS_DIR))
@@ -0,0 +1,156 @@
+"""/allstatus のカーソルによるページングのテスト"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src.models.attendance import TIMING_FIELDS, Attendance
+from src.repositories.firestore_repository import FirestoreRepository
+from src.repositories.memory_repository import InMemoryRepository
+from src.repositories.sqlite_repository import SqliteRepository
+from src.services.status_service import StatusService
+from src.slack.commands.status_commands import INVALID_CURSOR_MESSAGE, StatusCommands
+from src.utils.time_utils import get_current_time
+
+TEAM_ID = "T1"
+PAGE_SIZE = 3
+INVALID_CURSORS = ["", "attendance/A1", "..", "__name__", "A" * 1501, 42]
+
+def read_all_pages(repository, page_size=PAGE_SIZE):
+    """最後のページまで読み、ページごとの doc_id を返す"""
+    pages, cursor = [], None
+    while True:
+        records, cursor = repository.get_active_attendance_page(TEAM_ID, cursor, page_size, TIMING_FIELDS)
+        pages.append([record.doc_id for record in records])
+        if cursor is None:
+            return pages
+
+class FakeQuery:
+    """attendance コレクションの等値フィルター・ドキュメントID順・start_after・limit だけを扱うクエリ"""
+
+    def __init__(self, db, filters=(), after=None, limit=None):
+        self.db, self.filters, self.after, self.limit_count = db, filters, after, limit
+
+    def _with(self, **changes):
+        values = dict(filters=self.filters, after=self.after, limit=self.limit_count)
+        values.update(changes)
+        return FakeQuery(self.db, **values)
+
+    def where(self, filter):
+        return self._with(filters=self.filters + ((filter.field_path, filter.value),))
+
+    def order_by(self, field):
+        return self
+
+    def select(self, fields):
+        return self
+
+    def start_after(self, cursor):
+        return self._with(after=cursor["__name__"].id)
+
+    def limit(self, count):
+        return self._with(limit=count)
+
+    def stream(self):
+        self.db.queries += 1
+        doc_ids = [
+            doc_id for doc_id, data in sorted(self.db.docs.items())
+            if all(data.get(field) == value for field, value in self.filters)
+            and (self.after is None or doc_id > self.after)
+        ]
+        for doc_id in doc_ids[:self.limit_count]:
+            yield SimpleNamespace(id=doc_id, exists=True, to_dict=lambda doc_id=doc_id: dict(self.db.docs[doc_id]))
+
+class FakeAttendanceCollection(FakeQuery):
+    def document(self, doc_id):
+        return SimpleNamespace(id=doc_id)
+
+def make_firestore_repository(active_count):
+    db = SimpleNamespace(docs={}, queries=0)
+    for i in range(active_count):
+        db.docs[f"A{i:03d}"] = {"user_id": f"U{i}", "team_id": TEAM_ID, "start_time": get_current_time(), "end_time": None}
+    # 退勤済み・他のワークスペースの記録はページに含まれない
+    db.docs["A000x"] = {"user_id": "U0", "team_id": TEAM_ID, "start_time": get_current_time(), "end_time": get_current_time()}
+    db.docs["A001x"] = {"user_id": "U9", "team_id": "T2", "start_time": get_current_time(), "end_time": None}
+    repository = FirestoreRepository.__new__(FirestoreRepository)
+    repository.attendance_collection = FakeAttendanceCollection(db)
+    return repository, db
+
+@pytest.fixture(params=["memory", "sqlite", "firestore"])
+def make_repository(request):
+    def make(active_count):
+        if request.param == "firestore":
+            return make_firestore_repository(active_count)[0]
+        repository = InMemoryRepository() if request.param == "memory" else SqliteRepository(":memory:")
+        for i in range(active_count):
+            attendance = Attendance(user_id=f"U{i}", user_name=f"user{i}", team_id=TEAM_ID, start_time=get_current_time())
+            assert repository.create_active_attendance(attendance)
+        repository.create_active_attendance(Attendance(user_id="U9", user_name="other", team_id="T2", start_time=get_current_time()))
+        return repository
+    return make
+
+@pytest.mark.parametrize("active_count, page_sizes", [
+    (0, [0]),
+    (2, [2]),
+    (PAGE_SIZE, [PAGE_SIZE]),
+    (PAGE_SIZE + 1, [PAGE_SIZE, 1]),
+    (PAGE_SIZE * 2, [PAGE_SIZE, PAGE_SIZE]),
+])
+def test_pages_cover_every_active_record_once(make_repository, active_count, page_sizes):
+    pages = read_all_pages(make_repository(active_count))
+
+    # ちょうど埋まった最後のページでも、空のページを続けて返さない
+    assert [len(page) for page in pages] == page_sizes
+    doc_ids = [doc_id for page in pages for doc_id in page]
+    assert len(doc_ids) == active_count
+    assert doc_ids == sorted(set(doc_ids))
+
+def test_firestore_exactly_full_last_page_reads_no_extra_page():
+    repository, db = make_firestore_repository(PAGE_SIZE * 2)
+
+    pages = read_all_pages(repository)
+
+    assert pages == [["A000", "A001", "A002"], ["A003", "A004", "A005"]]
+    assert db.queries == 2
+
+@pytest.mark.parametrize("cursor", INVALID_CURSORS)
+def test_invalid_cursor_is_rejected(make_repository, cursor):
+    repository = make_repository(PAGE_SIZE + 1)
+
+    with pytest.raises(ValueError):
+        repository.get_active_attendance_page(TEAM_ID, cursor, PAGE_SIZE)
+
+class FakeSlackApp:
+    def __init__(self):
+        self.actions = {}
+
+    def command(self, name):
+        return lambda handler: None
+
+    def action(self, action_id):
+        return lambda handler: self.actions.setdefault(action_id, handler)
+
+def press_next_page(app, value):
+    said = []
+    body = {"actions": [{"value": value}], "team": {"id": TEAM_ID}, "channel": {"id": "C1"}}
+    app.actions["allstatus_next_page"](ack=lambda: None, body=body, say=lambda **kwargs: said.append(kwargs))
+    return said
+
+def test_next_page_button_with_tampered_cursor_is_answered():
+    app = FakeSlackApp()
+    StatusCommands(app, StatusService(make_firestore_repository(PAGE_SIZE + 1)[0]))
+
+    said = press_next_page(app, json.dumps({"cursor": "../active_attendance/T1-U1", "page": 2}))
+
+    assert said == [{"text": INVALID_CURSOR_MESSAGE, "channel": "C1"}]
+
+def test_next_page_button_shows_the_following_page():
+    app = FakeSlackApp()
+    StatusCommands(app, StatusService(make_firestore_repository(PAGE_SIZE + 1)[0]))
+
+    said = press_next_page(app, json.dumps({"cursor": "A002", "page": 2}))
+
+    assert len(said) == 1
+    assert said[0]["text"] == "従業員の勤怠状況"
+    assert "U3" in json.dumps(said[0]["blocks"], ensure_ascii=False)
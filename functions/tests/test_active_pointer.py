@@ -0,0 +1,85 @@
+"""出勤中の記録へのポインターが古くなっている場合の出勤の打刻のテスト"""
+
+from datetime import timedelta
+
+import pytest
+
+from src.models.attendance import Attendance
+from src.repositories.base import active_pointer_id
+from src.repositories.memory_repository import InMemoryRepository
+from src.repositories.sqlite_repository import SqliteRepository
+from src.services.attendance_service import AttendanceService
+from src.utils.time_utils import get_current_time
+
+USER_ID = "U1"
+TEAM_ID = "T1"
+
+def seed_pointer(repository, attendance_id: str) -> None:
+    """ポインターだけを直接書き込む（退勤の書き込みでポインターが残った状態・記録の削除を再現する）"""
+    if isinstance(repository, InMemoryRepository):
+        repository._active[active_pointer_id(TEAM_ID, USER_ID)] = attendance_id
+    else:
+        with repository._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO active_attendance (team_id, user_id, attendance_id) VALUES (?, ?, ?)",
+                (TEAM_ID, USER_ID, attendance_id)
+            )
+
+def create_closed_shift(repository) -> Attendance:
+    start = get_current_time() - timedelta(hours=9)
+    attendance = Attendance(
+        user_id=USER_ID,
+        user_name="alice",
+        team_id=TEAM_ID,
+        start_time=start,
+        end_time=start + timedelta(hours=8)
+    )
+    repository.create_attendance(attendance)
+    return attendance
+
+@pytest.fixture(params=["memory", "sqlite"])
+def repository(request):
+    if request.param == "memory":
+        return InMemoryRepository()
+    return SqliteRepository(":memory:")
+
+def test_punch_in_overwrites_pointer_to_closed_shift(repository):
+    closed = create_closed_shift(repository)
+    seed_pointer(repository, closed.doc_id)
+    service = AttendanceService(repository)
+
+    success, _, _ = service.punch_in(USER_ID, "alice", TEAM_ID)
+
+    assert success
+    active = repository.get_active_attendance(USER_ID, TEAM_ID)
+    assert active is not None and active.doc_id != closed.doc_id
+
+def test_punch_in_overwrites_pointer_to_missing_record(repository):
+    seed_pointer(repository, "deleted-attendance")
+    service = AttendanceService(repository)
+
+    success, _, _ = service.punch_in(USER_ID, "alice", TEAM_ID)
+
+    assert success
+    assert repository.get_active_attendance(USER_ID, TEAM_ID) is not None
+
+def test_punch_in_rejected_while_shift_is_open(repository):
+    service = AttendanceService(repository)
+    assert service.punch_in(USER_ID, "alice", TEAM_ID)[0]
+
+    success, _, _ = service.punch_in(USER_ID, "alice", TEAM_ID)
+
+    assert not success
+    assert len(repository.get_all_active_attendances(TEAM_ID)) == 1
+
+def test_closing_another_shift_keeps_pointer_to_open_shift(repository):
+    service = AttendanceService(repository)
+    assert service.punch_in(USER_ID, "alice", TEAM_ID)[0]
+    active = repository.get_active_attendance(USER_ID, TEAM_ID)
+
+    # 過去の勤務を手動で修正して退勤済みにしても、出勤中の記録へのポインターは残る
+    closed = create_closed_shift(repository)
+    closed.end_time = closed.end_time + timedelta(minutes=30)
+    repository.update_attendance_fields(closed)
+
+    assert repository.get_active_attendance(USER_ID, TEAM_ID).doc_id == active.doc_id
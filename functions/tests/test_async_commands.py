@@ -0,0 +1,141 @@
+"""Socket Mode用の非同期のコマンド（AsyncApp）を、メモリのストレージで通しで実行するテスト"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src.config import build_config
+from src.repositories.async_adapter import AsyncRepositoryAdapter
+from src.repositories.factory import create_async_repository
+from src.services.async_attendance_service import AsyncAttendanceService
+from src.services.async_status_service import AsyncStatusService
+from src.services.attendance_service import rejection_message
+from src.services.attendance_state import AttendanceEvent, AttendanceState, InvalidTransition
+from src.slack.commands.async_attendance_commands import AsyncAttendanceCommands
+from src.slack.commands.async_status_commands import AsyncStatusCommands
+from src.slack.commands.status_commands import INVALID_CURSOR_MESSAGE
+from src.slack.message_builder import MessageBuilder
+from src.utils.time_utils import get_current_time
+
+USER_ID = "U1"
+TEAM_ID = "T1"
+
+class FakeAsyncApp:
+    """登録されたリスナーを保持するだけの AsyncApp の代わり"""
+
+    def __init__(self):
+        self.listeners = {}
+
+    def _register(self, kind, name):
+        return lambda handler: self.listeners.setdefault((kind, name), handler)
+
+    def command(self, name):
+        return self._register("command", name)
+
+    def view(self, callback_id):
+        return self._register("view", callback_id)
+
+    def action(self, action_id):
+        return self._register("action", action_id)
+
+class Recorder:
+    """ack・say・client.chat_postMessage の呼び出しを記録する"""
+
+    def __init__(self):
+        self.acks = 0
+        self.messages = []
+
+    async def ack(self):
+        self.acks += 1
+
+    async def say(self, text=None, **kwargs):
+        self.messages.append(dict(kwargs, text=text))
+
+    async def chat_postMessage(self, **kwargs):
+        self.messages.append(kwargs)
+
+@pytest.fixture
+def repository():
+    config = build_config({
+        "slack": {"bot_token": "xoxb-test", "signing_secret": "signing-secret"},
+        "firebase": {"project_id": "test-project", "credentials_path": "config/missing-credentials.json"},
+        "application": {"timezone": "Asia/Tokyo"},
+        "storage": {"backend": "memory"}
+    })
+    repository = create_async_repository(config)
+    assert isinstance(repository, AsyncRepositoryAdapter)
+    return repository
+
+@pytest.fixture
+def app(repository):
+    app = FakeAsyncApp()
+    AsyncAttendanceCommands(app, AsyncAttendanceService(repository))
+    AsyncStatusCommands(app, AsyncStatusService(repository))
+    return app
+
+def run_command(app, name, recorder):
+    command = {"user_id": USER_ID, "user_name": "alice", "team_id": TEAM_ID, "channel_id": "C0"}
+    asyncio.run(app.listeners[("command", name)](ack=recorder.ack, command=command, say=recorder.say))
+
+def submit_punch_out_modal(app, recorder):
+    view = {
+        "private_metadata": json.dumps({"channel_id": "C0", "team_id": TEAM_ID}),
+        "state": {"values": {
+            "work_description_block": {"work_description_input": {"value": "資料作成"}},
+            "report_channel_block": {"report_channel_input": {"selected_conversation": "C1"}},
+            "mention_users_block": {"mention_users_input": {"selected_users": ["U2"]}},
+        }}
+    }
+    asyncio.run(app.listeners[("view", "punch_out_report_modal")](
+        ack=recorder.ack, body={"user": {"id": USER_ID, "name": "alice"}}, view=view,
+        client=recorder, logger=SimpleNamespace(info=print)
+    ))
+
+def test_shift_round_trip(app, repository):
+    recorder = Recorder()
+
+    for name in ["/punch_in", "/break_begin", "/break_end", "/mystatus"]:
+        run_command(app, name, recorder)
+    submit_punch_out_modal(app, recorder)
+
+    assert recorder.acks == 5
+    assert [message["text"] for message in recorder.messages[:4]] == ["出勤", "休憩開始", "休憩終了", "あなたの勤怠状況"]
+    # 業務報告（C1）と退勤のメッセージ（C0）
+    assert [message["channel"] for message in recorder.messages[4:]] == ["C1", "C0"]
+
+    now = get_current_time()
+    records = repository.repository.get_attendance_by_period(USER_ID, now.replace(hour=0, minute=0), now, TEAM_ID)
+    assert len(records) == 1
+    shift = records[0]
+    assert shift.end_time is not None
+    assert len(shift.break_periods) == 1 and shift.break_periods[0].end_time is not None
+    assert shift.report_channel_id == "C1"
+    assert repository.repository.get_work_descriptions([shift.doc_id]) == {shift.doc_id: "資料作成"}
+    assert asyncio.run(repository.get_active_attendance(USER_ID, TEAM_ID)) is None
+
+def test_second_punch_in_is_rejected(app, repository):
+    recorder = Recorder()
+
+    run_command(app, "/punch_in", recorder)
+    run_command(app, "/punch_in", recorder)
+
+    expected = MessageBuilder.create_error_message(
+        rejection_message(InvalidTransition(AttendanceState.WORKING, AttendanceEvent.PUNCH_IN))
+    )
+    assert recorder.messages[1]["blocks"] == expected
+    assert len(asyncio.run(repository.get_all_active_attendances(TEAM_ID))) == 1
+
+def test_next_page_button_with_tampered_cursor_is_answered(app):
+    recorder = Recorder()
+    run_command(app, "/punch_in", recorder)
+    body = {
+        "actions": [{"value": json.dumps({"cursor": "a/b", "page": 2})}],
+        "team": {"id": TEAM_ID},
+        "channel": {"id": "C1"}
+    }
+
+    asyncio.run(app.listeners[("action", "allstatus_next_page")](ack=recorder.ack, body=body, say=recorder.say))
+
+    assert recorder.messages[-1] == {"text": INVALID_CURSOR_MESSAGE, "channel": "C1"}
@@ -0,0 +1,73 @@
+"""勤怠記録のモデルの勤務時間のキャッシュのテスト"""
+
+from datetime import timedelta
+
+import pytest
+
+from src.models.attendance import Attendance, AttendanceTiming, BreakPeriod
+from src.utils.time_utils import get_start_of_month
+
+START = get_start_of_month(2024, 5) + timedelta(hours=9)
+
+def make_shift(cls=Attendance, breaks=()):
+    return cls(user_id="U1", start_time=START, end_time=START + timedelta(hours=8), break_periods=list(breaks))
+
+def test_break_periods_is_read_only():
+    attendance = make_shift()
+
+    with pytest.raises(AttributeError):
+        attendance.break_periods.append(BreakPeriod(START, START + timedelta(hours=1)))
+
+def test_add_break_invalidates_cached_durations():
+    attendance = make_shift()
+    assert attendance.get_total_break_time() == 0
+    assert attendance.get_working_time() == 480
+
+    attendance.add_break(BreakPeriod(START + timedelta(hours=3), START + timedelta(hours=4)))
+
+    assert attendance.get_total_break_time() == 60
+    assert attendance.get_working_time() == 420
+
+@pytest.mark.parametrize("cls", [Attendance, AttendanceTiming])
+def test_editing_a_break_invalidates_cached_durations(cls):
+    period = BreakPeriod(START + timedelta(hours=3), START + timedelta(hours=4))
+    attendance = make_shift(cls, [period])
+    assert attendance.get_working_time() == 420
+
+    attendance.break_periods[0].end_time = START + timedelta(hours=5)
+
+    assert attendance.get_total_break_time() == 120
+    assert attendance.get_working_time() == 360
+
+def test_editing_a_break_marks_break_periods_dirty():
+    attendance = make_shift(breaks=[BreakPeriod(START + timedelta(hours=3))])
+    attendance.clear_dirty()
+
+    attendance.break_periods[0].end_time = START + timedelta(hours=4)
+
+    assert attendance.dirty_fields == {"break_periods"}
+
+def test_replaced_breaks_no_longer_affect_the_record():
+    old = BreakPeriod(START + timedelta(hours=3), START + timedelta(hours=4))
+    attendance = make_shift(breaks=[old])
+    attendance.break_periods = [BreakPeriod(START + timedelta(hours=3), START + timedelta(hours=3, minutes=30))]
+    assert attendance.get_total_break_time() == 30
+
+    # 置き換え前の休憩を変更しても、この記録の休憩は変わらない
+    attendance.clear_dirty()
+    old.end_time = START + timedelta(hours=6)
+
+    assert attendance.get_total_break_time() == 30
+    assert attendance.dirty_fields == set()
+
+def test_end_current_break_updates_durations_and_dirty_fields():
+    attendance = make_shift()
+    attendance.add_break(BreakPeriod(START + timedelta(hours=3)))
+    attendance.clear_dirty()
+    assert attendance.get_total_break_time() == 0
+
+    attendance.end_current_break(START + timedelta(hours=3, minutes=45))
+
+    assert attendance.get_total_break_time() == 45
+    assert attendance.get_working_time() == 435
+    assert "break_periods" in attendance.dirty_fields
@@ -0,0 +1,84 @@
+"""attendance_reports に分けた業務報告と、移行前の勤怠記録に残る業務報告の読み込みのテスト"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.models.attendance import SUMMARY_FIELDS, TIMING_FIELDS
+from src.repositories.firestore_repository import FirestoreRepository
+from src.utils.time_utils import get_current_time
+
+TEAM_ID = "T1"
+
+class FakeDb:
+    """collection().document() と get_all だけを扱う Firestore クライアントの代わり"""
+
+    def __init__(self):
+        self.docs = {}
+        self.get_all_calls = []
+
+    def collection(self, name):
+        return SimpleNamespace(document=lambda doc_id: SimpleNamespace(id=doc_id, path=(name, doc_id)))
+
+    def get_all(self, refs, field_paths=None):
+        refs = list(refs)
+        self.get_all_calls.append((refs[0].path[0], sorted(ref.id for ref in refs), field_paths))
+        for ref in refs:
+            data = self.docs.get(ref.path)
+            if field_paths is not None and data is not None:
+                data = {name: value for name, value in data.items() if name in field_paths}
+            yield SimpleNamespace(id=ref.id, exists=data is not None, to_dict=lambda data=data: data)
+
+    def reads_of(self, collection):
+        return [ids for name, ids, _ in self.get_all_calls if name == collection]
+
+@pytest.fixture
+def db():
+    db = FakeDb()
+    shift = {"user_id": "U1", "team_id": TEAM_ID, "start_time": get_current_time(), "end_time": None}
+    # 分割後の記録（勤怠記録には業務内容がない）
+    db.docs[("attendance", "A1")] = dict(shift, user_id="U1")
+    db.docs[("attendance_reports", "A1")] = {"work_description": "分割後の報告"}
+    # 移行前の記録（勤怠記録に業務内容が残っている）
+    db.docs[("attendance", "A2")] = dict(shift, user_id="U2", work_description="移行前の報告")
+    # 移行中の記録（両方にある場合は attendance_reports を優先する）
+    db.docs[("attendance", "A3")] = dict(shift, user_id="U3", work_description="古い報告")
+    db.docs[("attendance_reports", "A3")] = {"work_description": "新しい報告"}
+    # 報告のない記録
+    db.docs[("attendance", "A4")] = dict(shift, user_id="U4")
+    for user_id, doc_id in [("U1", "A1"), ("U2", "A2"), ("U3", "A3"), ("U4", "A4")]:
+        db.docs[("active_attendance", f"{TEAM_ID}-{user_id}")] = {"attendance_id": doc_id}
+    return db
+
+@pytest.fixture
+def repository(db):
+    repository = FirestoreRepository.__new__(FirestoreRepository)
+    repository.db = db
+    for attribute, name in [
+        ("attendance_collection", "attendance"),
+        ("active_attendance_collection", "active_attendance"),
+        ("report_collection", "attendance_reports"),
+    ]:
+        setattr(repository, attribute, db.collection(name))
+    return repository
+
+def test_work_descriptions_from_split_and_legacy_documents(repository, db):
+    descriptions = repository.get_work_descriptions(["A1", "A2", "A3", "A4"])
+
+    assert descriptions == {"A1": "分割後の報告", "A2": "移行前の報告", "A3": "新しい報告"}
+    # 勤怠記録は attendance_reports にない記録だけ読む
+    assert db.reads_of("attendance_reports") == [["A1", "A2", "A3", "A4"]]
+    assert db.reads_of("attendance") == [["A2", "A4"]]
+
+def test_summary_projection_attaches_reports(repository):
+    records = repository.get_active_attendances_for_users(["U1", "U2", "U3", "U4"], TEAM_ID, SUMMARY_FIELDS)
+
+    assert {user_id: record.work_description for user_id, record in records.items()} == {
+        "U1": "分割後の報告", "U2": "移行前の報告", "U3": "新しい報告", "U4": None
+    }
+
+def test_timing_projection_does_not_read_reports(repository, db):
+    records = repository.get_active_attendances_for_users(["U1", "U2"], TEAM_ID, TIMING_FIELDS)
+
+    assert set(records) == {"U1", "U2"}
+    assert db.reads_of("attendance_reports") == []
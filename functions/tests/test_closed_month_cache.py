@@ -0,0 +1,146 @@
+"""締め済みの月の月次サマリーのキャッシュ（プロセス内のLRU・保存済みのサマリー）と無効化のテスト"""
+
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from src.models.attendance import Attendance
+from src.repositories import closed_month_cache
+from src.repositories.closed_month_cache import ClosedMonthCache, get_closed_month_cache, month_key
+from src.repositories.firestore_repository import closed_month_snapshot_of
+from src.repositories.memory_repository import InMemoryRepository
+from src.repositories.sqlite_repository import SqliteRepository
+from src.services.monthly_summary_service import MonthlySummaryService
+from src.utils.time_utils import get_start_of_month
+
+USER_ID = "U1"
+TEAM_ID = "T1"
+YEAR, MONTH = 2024, 5
+KEY = month_key(TEAM_ID, USER_ID, YEAR, MONTH)
+
+def make_summary(total):
+    return {"daily_records": {}, "weekly_totals": {}, "total_working_time": total, "year": YEAR, "month": MONTH}
+
+@pytest.fixture(autouse=True)
+def shared_cache(monkeypatch):
+    # 書き込み時の無効化はプロセスで共有するキャッシュに対して行われるため、テストごとに作り直す
+    monkeypatch.setattr(closed_month_cache, "_closed_month_cache", None)
+    return get_closed_month_cache()
+
+@pytest.fixture(params=["memory", "sqlite"])
+def repository(request):
+    if request.param == "memory":
+        return InMemoryRepository()
+    return SqliteRepository(":memory:")
+
+def create_shift(repository, hours=8) -> Attendance:
+    start = get_start_of_month(YEAR, MONTH) + timedelta(hours=9)
+    attendance = Attendance(
+        user_id=USER_ID, user_name="alice", team_id=TEAM_ID, start_time=start, end_time=start + timedelta(hours=hours)
+    )
+    repository.create_attendance(attendance)
+    return attendance
+
+def extend_shift(repository, attendance, hours):
+    attendance.end_time = attendance.start_time + timedelta(hours=hours)
+    repository.update_attendance(attendance)
+
+def fail(*args, **kwargs):
+    raise AssertionError("read should have been served from the cache")
+
+def test_lru_evicts_least_recently_used():
+    cache = ClosedMonthCache(max_entries=2)
+    keys = [month_key(TEAM_ID, USER_ID, YEAR, month) for month in (1, 2, 3)]
+    cache.put(keys[0], make_summary(1))
+    cache.put(keys[1], make_summary(2))
+    cache.get(keys[0])
+
+    cache.put(keys[2], make_summary(3))
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0])["total_working_time"] == 1
+    assert cache.get(keys[2])["total_working_time"] == 3
+
+def test_lru_entries_expire():
+    cache = ClosedMonthCache(ttl_seconds=-1)
+    cache.put(KEY, make_summary(1))
+
+    assert cache.get(KEY) is None
+
+def test_lru_put_after_invalidate_is_dropped():
+    cache = ClosedMonthCache()
+    generation = cache.generation(KEY)
+    cache.invalidate(KEY)
+
+    cache.put(KEY, make_summary(1), generation)
+
+    assert cache.get(KEY) is None
+
+def test_second_read_is_served_from_lru(repository, monkeypatch):
+    create_shift(repository)
+    service = MonthlySummaryService(repository)
+    assert service.get_monthly_summary(USER_ID, YEAR, MONTH, TEAM_ID)["total_working_time"] == 480
+
+    monkeypatch.setattr(repository, "get_closed_month_summary", fail)
+    monkeypatch.setattr(repository, "iter_attendance_by_period", fail)
+
+    assert service.get_monthly_summary(USER_ID, YEAR, MONTH, TEAM_ID)["total_working_time"] == 480
+
+def test_other_instance_reads_persisted_summary(repository, monkeypatch):
+    create_shift(repository)
+    MonthlySummaryService(repository).get_monthly_summary(USER_ID, YEAR, MONTH, TEAM_ID)
+
+    # 別のインスタンス（空のLRU）からは保存済みのサマリーを読み、勤怠記録は読まない
+    monkeypatch.setattr(repository, "iter_attendance_by_period", fail)
+    monkeypatch.setattr(repository, "get_complete_rollup", fail)
+    service = MonthlySummaryService(repository, month_cache=ClosedMonthCache())
+
+    assert service.get_monthly_summary(USER_ID, YEAR, MONTH, TEAM_ID)["total_working_time"] == 480
+
+def test_edit_invalidates_both_tiers(repository):
+    attendance = create_shift(repository)
+    service = MonthlySummaryService(repository)
+    service.get_monthly_summary(USER_ID, YEAR, MONTH, TEAM_ID)
+    version = repository.get_closed_month_summary(KEY).version
+
+    extend_shift(repository, attendance, 10)
+
+    snapshot = repository.get_closed_month_summary(KEY)
+    assert snapshot.summary is None
+    assert snapshot.version == version + 1
+    assert service.get_monthly_summary(USER_ID, YEAR, MONTH, TEAM_ID)["total_working_time"] == 600
+
+def test_edit_during_scan_does_not_save_stale_summary(repository, monkeypatch):
+    attendance = create_shift(repository)
+    service = MonthlySummaryService(repository)
+    build = service._build_monthly_summary
+
+    def build_then_edit(*args, **kwargs):
+        summary = build(*args, **kwargs)
+        # 集計が終わってから保存するまでの間に、記録の変更がコミットされる
+        monkeypatch.setattr(service, "_build_monthly_summary", build)
+        extend_shift(repository, attendance, 10)
+        return summary
+
+    monkeypatch.setattr(service, "_build_monthly_summary", build_then_edit)
+
+    assert service.get_monthly_summary(USER_ID, YEAR, MONTH, TEAM_ID)["total_working_time"] == 480
+    assert repository.get_closed_month_summary(KEY).summary is None
+    assert service.month_cache.get(KEY) is None
+    assert service.get_monthly_summary(USER_ID, YEAR, MONTH, TEAM_ID)["total_working_time"] == 600
+
+def test_save_with_stale_version_is_rejected(repository):
+    version = repository.get_closed_month_summary(KEY).version
+    create_shift(repository)
+
+    assert not repository.save_closed_month_summary(KEY, {"total_working_time": 0}, version)
+    assert repository.get_closed_month_summary(KEY).summary is None
+
+def test_firestore_document_without_version_is_a_miss():
+    legacy = SimpleNamespace(exists=True, to_dict=lambda: make_summary(480))
+    invalidated = SimpleNamespace(exists=True, to_dict=lambda: {"version": 3})
+
+    assert closed_month_snapshot_of(legacy) == (None, 0)
+    assert closed_month_snapshot_of(invalidated) == (None, 3)
+    assert closed_month_snapshot_of(SimpleNamespace(exists=False, to_dict=lambda: None)) == (None, 0)
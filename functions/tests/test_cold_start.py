@@ -0,0 +1,47 @@
+"""コールドスタートのプロファイラーのimport計測のテスト"""
+
+import builtins
+import sys
+
+import pytest
+
+from src.utils.cold_start import ColdStartProfiler
+
+MODULES = ("profiled_main", "profiled_child", "profiled_other")
+
+@pytest.fixture
+def modules(tmp_path, monkeypatch):
+    (tmp_path / "profiled_child.py").write_text("")
+    (tmp_path / "profiled_other.py").write_text("")
+    # import の途中で別のスレッドがimportする（Boltのリスナーのスレッドを想定）
+    (tmp_path / "profiled_main.py").write_text(
+        "import threading\n"
+        "import profiled_child\n"
+        "thread = threading.Thread(target=lambda: __import__('profiled_other'))\n"
+        "thread.start()\n"
+        "thread.join()\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield
+    for name in MODULES:
+        sys.modules.pop(name, None)
+
+def test_track_imports_records_only_the_entering_thread(modules):
+    profiler = ColdStartProfiler(enabled=True)
+
+    with profiler.track_imports():
+        import profiled_main  # noqa: F401
+
+    assert "profiled_other" in sys.modules
+    assert [(timing.name, timing.depth) for timing in profiler.imports] == [("profiled_child", 1), ("profiled_main", 0)]
+    main = profiler.imports[-1]
+    assert main.self_us <= main.cumulative_us
+
+def test_track_imports_restores_import_hook():
+    original_import = builtins.__import__
+    profiler = ColdStartProfiler(enabled=True)
+
+    with profiler.track_imports():
+        assert builtins.__import__ is not original_import
+
+    assert builtins.__import__ is original_import
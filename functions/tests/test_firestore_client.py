@@ -0,0 +1,28 @@
+"""共有する Firestore クライアントのチャネル作成のテスト"""
+
+from types import SimpleNamespace
+
+from google.auth.credentials import AnonymousCredentials
+from google.cloud import firestore
+
+from src.repositories.firestore_client import FirestoreClientFactory
+
+def test_channel_options_applied_to_pinned_client():
+    client = firestore.Client(project="test-project", credentials=AnonymousCredentials())
+    factory = FirestoreClientFactory()
+
+    factory._open_channel(client, "sync", {"keepalive_time_ms": 5000})
+
+    assert client._firestore_api_internal is not None
+    assert factory.health()["channels"]["sync"]["options"]["grpc.keepalive_time_ms"] == 5000
+
+def test_missing_client_internals_fall_back_to_default_channel():
+    # 内部の属性名が変わったバージョンのクライアントを想定
+    client = SimpleNamespace(_emulator_host=None, _firestore_api_internal=None)
+    factory = FirestoreClientFactory()
+
+    factory._open_channel(client, "sync", None)
+
+    assert client._firestore_api_internal is None
+    assert not hasattr(client, "_transport")
+    assert factory.health()["channels"] == {}
@@ -0,0 +1,158 @@
+"""Firestoreのインストール情報ストアのキャッシュのテスト"""
+
+import logging
+from types import SimpleNamespace
+
+from slack_bolt.context import BoltContext
+from slack_sdk.errors import SlackApiError
+
+from src.slack.oauth import CacheRefreshingAuthorize, forget_revoked_installation
+from src.slack.store.firestore_installation_store import FirestoreInstallationStore
+
+class FakeQuery:
+    """where（== と in）・limit・stream だけを扱うクエリ"""
+
+    def __init__(self, db, name, filters=(), limit=None):
+        self.db, self.name, self.filters, self.limit_count = db, name, filters, limit
+
+    def where(self, filter):
+        return FakeQuery(self.db, self.name, self.filters + (filter,), self.limit_count)
+
+    def limit(self, count):
+        return FakeQuery(self.db, self.name, self.filters, count)
+
+    def _matches(self, data):
+        for condition in self.filters:
+            value = data.get(condition.field_path)
+            if condition.op_string == "==" and value != condition.value:
+                return False
+            if condition.op_string == "in" and value not in condition.value:
+                return False
+        return True
+
+    def stream(self):
+        self.db.queries.append((self.name, tuple((f.field_path, f.op_string, f.value) for f in self.filters)))
+        docs = [
+            SimpleNamespace(id=doc_id, exists=True, to_dict=lambda data=data: dict(data))
+            for doc_id, data in sorted(self.db.docs[self.name].items()) if self._matches(data)
+        ]
+        return iter(docs[:self.limit_count])
+
+class FakeDocument:
+    def __init__(self, db, name, doc_id):
+        self.db, self.name, self.id = db, name, doc_id
+
+    def get(self):
+        self.db.reads.append((self.name, self.id))
+        data = self.db.docs[self.name].get(self.id)
+        return SimpleNamespace(id=self.id, exists=data is not None, to_dict=lambda: dict(data))
+
+    def set(self, data):
+        self.db.docs[self.name][self.id] = dict(data)
+
+    def delete(self):
+        self.db.docs[self.name].pop(self.id, None)
+
+class FakeCollection(FakeQuery):
+    def document(self, doc_id):
+        return FakeDocument(self.db, self.name, doc_id)
+
+class FakeDb:
+    def __init__(self):
+        self.docs = {"slack_installations": {}, "slack_bots": {}}
+        self.queries = []
+        self.reads = []
+
+    def collection(self, name):
+        return FakeCollection(self, name)
+
+def install(db, team_id, user_ids=()):
+    db.docs["slack_bots"][f"T{team_id}"] = {"team_id": team_id, "bot_token": f"xoxb-{team_id}"}
+    db.docs["slack_installations"][f"T{team_id}"] = {"team_id": team_id, "bot_token": f"xoxb-{team_id}"}
+    for user_id in user_ids:
+        db.docs["slack_installations"][f"T{team_id}-U{user_id}"] = {
+            "team_id": team_id, "user_id": user_id, "bot_token": f"xoxb-{team_id}"
+        }
+
+def test_prime_cache_reads_installations_in_chunked_queries():
+    db = FakeDb()
+    for i in range(45):
+        install(db, f"{i:03d}", user_ids=["U1"] if i % 2 == 0 else ())
+    store = FirestoreInstallationStore(db)
+
+    counts = store.prime_cache(team_limit=50)
+
+    assert counts == {"bots": 45, "installations": 45 + 23}
+    installation_queries = [filters for name, filters in db.queries if name == "slack_installations"]
+    assert [len(filters[0][2]) for filters in installation_queries] == [30, 15]
+    assert len(db.queries) == 3
+
+    # 読み込んだ情報はドキュメントを読まずに返す
+    assert store.find_bot(enterprise_id=None, team_id="007").bot_token == "xoxb-007"
+    assert store.find_installation(enterprise_id=None, team_id="008", user_id="U1").user_id == "U1"
+    assert db.reads == []
+
+def cache_keys(store):
+    return sorted(store._cache)
+
+def test_uninstall_drops_cached_user_installations():
+    db = FakeDb()
+    install(db, "001", user_ids=["U1"])
+    install(db, "002", user_ids=["U1"])
+    store = FirestoreInstallationStore(db)
+    store.prime_cache()
+
+    store.delete_installation(enterprise_id=None, team_id="001")
+
+    assert cache_keys(store) == [("bot", "T002"), ("installation", "T002"), ("installation", "T002-UU1")]
+
+class FakeAuthClient:
+    """有効なトークンだけ auth.test に成功する WebClient の代わり"""
+
+    def __init__(self, valid_tokens):
+        self.valid_tokens = valid_tokens
+
+    def auth_test(self, token):
+        if token not in self.valid_tokens:
+            raise SlackApiError("invalid_auth", {"ok": False, "error": "invalid_auth"})
+        return {"ok": True, "team_id": "001", "user_id": "UBOT", "bot_id": "B1"}
+
+def authorize(store, valid_tokens):
+    authorize = CacheRefreshingAuthorize(logger=logging.getLogger(__name__), installation_store=store)
+    context = BoltContext({"client": FakeAuthClient(valid_tokens)})
+    return authorize(context=context, enterprise_id=None, team_id="001", user_id="U2")
+
+def test_authorize_rereads_installation_when_cached_token_is_rejected():
+    db = FakeDb()
+    install(db, "001")
+    store = FirestoreInstallationStore(db)
+    assert authorize(store, {"xoxb-001"}).bot_token == "xoxb-001"
+
+    # 他のインスタンスでトークンが再発行された
+    db.docs["slack_installations"]["T001"]["bot_token"] = "xoxb-rotated"
+
+    assert authorize(store, {"xoxb-rotated"}).bot_token == "xoxb-rotated"
+
+def test_authorize_fails_after_uninstall_on_another_instance():
+    db = FakeDb()
+    install(db, "001")
+    store = FirestoreInstallationStore(db)
+    assert authorize(store, {"xoxb-001"}) is not None
+
+    del db.docs["slack_installations"]["T001"]
+    del db.docs["slack_bots"]["T001"]
+
+    assert authorize(store, set()) is None
+    assert cache_keys(store) == []
+
+def test_revoked_user_token_is_dropped_from_cache():
+    db = FakeDb()
+    install(db, "001", user_ids=["U1"])
+    store = FirestoreInstallationStore(db)
+    store.prime_cache()
+
+    forget_revoked_installation(store, SlackApiError("ratelimited", {"error": "ratelimited"}), None, "001")
+    assert cache_keys(store) == [("bot", "T001"), ("installation", "T001"), ("installation", "T001-UU1")]
+
+    forget_revoked_installation(store, SlackApiError("token_revoked", {"error": "token_revoked"}), None, "001")
+    assert cache_keys(store) == []
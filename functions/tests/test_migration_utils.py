@@ -0,0 +1,151 @@
+"""マイグレーションのフレームワーク（scripts/migration_utils.py）のテスト"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from migration_utils import Checkpoint, CollectionMigration, MigrationError, migrate_partition  # noqa: E402
+
+COLLECTION = "attendance"
+
+class FakeQuery:
+    """ドキュメントID順の order_by・start_at・start_after・end_before・limit だけを扱うクエリ"""
+
+    def __init__(self, store, start=None, after=None, end=None, limit=None):
+        self.store = store
+        self.start, self.after, self.end, self.limit_count = start, after, end, limit
+
+    def _with(self, **changes):
+        values = dict(start=self.start, after=self.after, end=self.end, limit=self.limit_count)
+        values.update(changes)
+        return FakeQuery(self.store, **values)
+
+    def order_by(self, field):
+        return self
+
+    def select(self, fields):
+        return self
+
+    def start_at(self, cursor):
+        return self._with(start=cursor["__name__"].id)
+
+    def start_after(self, cursor):
+        return self._with(after=cursor["__name__"].id)
+
+    def end_before(self, cursor):
+        return self._with(end=cursor["__name__"].id)
+
+    def limit(self, count):
+        return self._with(limit=count)
+
+    def stream(self):
+        self.store.queries += 1
+        ids = [
+            doc_id for doc_id in sorted(self.store.docs)
+            if (self.start is None or doc_id >= self.start)
+            and (self.after is None or doc_id > self.after)
+            and (self.end is None or doc_id < self.end)
+        ]
+        for doc_id in ids[:self.limit_count]:
+            yield SimpleNamespace(
+                id=doc_id,
+                reference=SimpleNamespace(id=doc_id),
+                to_dict=lambda doc_id=doc_id: dict(self.store.docs[doc_id])
+            )
+
+class FakeCollection(FakeQuery):
+    def document(self, doc_id):
+        return SimpleNamespace(id=doc_id)
+
+class FakeBulkWriter:
+    def __init__(self, store):
+        self.store = store
+        self.pending = []
+        self.on_error = None
+
+    def on_write_error(self, callback):
+        self.on_error = callback
+
+    def update(self, reference, updates):
+        self.pending.append((reference, updates))
+
+    def flush(self):
+        for reference, updates in self.pending:
+            if reference.id in self.store.failing_ids:
+                failure = SimpleNamespace(attempts=1, operation=SimpleNamespace(reference=reference))
+                # 再試行の上限まで失敗させる
+                while self.on_error(failure, self):
+                    failure.attempts += 1
+                continue
+            self.store.docs[reference.id].update(updates)
+        self.pending = []
+
+    def close(self):
+        self.flush()
+
+class FakeDb:
+    def __init__(self, doc_count):
+        self.docs = {f"doc-{i:03d}": {"migrated": False} for i in range(doc_count)}
+        self.failing_ids = set()
+        self.queries = 0
+
+    def collection(self, name):
+        return FakeCollection(self)
+
+    def bulk_writer(self):
+        return FakeBulkWriter(self)
+
+def mark_migrated(data):
+    return {} if data["migrated"] else {"migrated": True}
+
+MIGRATION = CollectionMigration(COLLECTION, mark_migrated)
+
+class NullProgress:
+    def update(self, count):
+        pass
+
+def make_checkpoint(tmp_path, restart=False):
+    checkpoint = Checkpoint(tmp_path / "checkpoint.json", restart=restart)
+    if checkpoint.partitions(COLLECTION) is None:
+        checkpoint.set_partitions(COLLECTION, [(None, None)])
+    return checkpoint
+
+def run(db, checkpoint, batch_size=3):
+    args = SimpleNamespace(batch_size=batch_size, dry_run=False)
+    return migrate_partition(db, MIGRATION, 0, (None, None), args, checkpoint, NullProgress())
+
+def test_partition_that_fills_the_last_page_is_marked_done(tmp_path):
+    db = FakeDb(6)
+
+    assert run(db, make_checkpoint(tmp_path)) == 6
+
+    resumed = make_checkpoint(tmp_path)
+    assert resumed.progress(COLLECTION, 0) == {"last_id": "doc-005", "done": True}
+    db.queries = 0
+    assert run(db, resumed) == 0
+    assert db.queries == 0
+
+def test_resume_continues_after_checkpointed_id(tmp_path):
+    db = FakeDb(7)
+    checkpoint = make_checkpoint(tmp_path)
+    checkpoint.record(COLLECTION, 0, "doc-003", False)
+
+    assert run(db, make_checkpoint(tmp_path)) == 3
+    assert [doc_id for doc_id, data in sorted(db.docs.items()) if data["migrated"]] == ["doc-004", "doc-005", "doc-006"]
+    assert make_checkpoint(tmp_path).progress(COLLECTION, 0) == {"last_id": "doc-006", "done": True}
+
+def test_failed_write_does_not_advance_checkpoint(tmp_path):
+    db = FakeDb(6)
+    db.failing_ids = {"doc-004"}
+
+    with pytest.raises(MigrationError):
+        run(db, make_checkpoint(tmp_path))
+
+    # 最初のページだけが完了として記録され、失敗したページは再開時に読み直す
+    assert make_checkpoint(tmp_path).progress(COLLECTION, 0) == {"last_id": "doc-002", "done": False}
@@ -0,0 +1,60 @@
+"""移行前の記録を含む期間検索の結果のマージのテスト"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from src.repositories import async_firestore_repository
+from src.repositories.firestore_repository import merge_period_streams
+
+JST = timezone(timedelta(hours=9))
+UTC = timezone.utc
+PST = timezone(timedelta(hours=-8))
+
+def record(name, *args, tz=JST):
+    return SimpleNamespace(name=name, start_time=datetime(*args, tzinfo=tz))
+
+# ISO-8601文字列の順（現地時刻の順）に並んだ移行前の記録
+LEGACY = [
+    record("legacy-jst", 2024, 5, 1, 9, 0),                  # 00:00 UTC
+    record("legacy-utc", 2024, 5, 1, 10, 0, tz=UTC),         # 10:00 UTC
+    record("legacy-pst", 2024, 5, 1, 10, 30, tz=PST),        # 18:30 UTC
+    record("legacy-later", 2024, 5, 1, 17, 0),               # 08:00 UTC
+    record("legacy-next-week", 2024, 5, 8, 9, 0),
+]
+TIMESTAMPS = [
+    record("ts-1", 2024, 5, 1, 12, 0),                       # 03:00 UTC
+    record("ts-2", 2024, 5, 2, 9, 0),
+]
+EXPECTED = ["legacy-jst", "ts-1", "legacy-later", "legacy-utc", "legacy-pst", "ts-2", "legacy-next-week"]
+
+def test_merge_orders_mixed_offset_legacy_records():
+    merged = merge_period_streams([iter(TIMESTAMPS), iter(LEGACY)])
+
+    assert [r.name for r in merged] == EXPECTED
+
+def test_merge_reads_legacy_records_lazily():
+    consumed = []
+    month_of_legacy = [record(f"legacy-{day}", 2024, 6, day, 9, 0) for day in range(1, 31)]
+
+    def legacy_stream():
+        for r in month_of_legacy:
+            consumed.append(r.name)
+            yield r
+
+    merged = merge_period_streams([iter([]), legacy_stream()])
+
+    assert next(merged).name == "legacy-1"
+    # 28時間以上後の記録を読んだ時点で先頭の記録が確定するため、残りの記録は読み込まない
+    assert consumed == ["legacy-1", "legacy-2", "legacy-3"]
+
+def test_async_merge_matches_sync_merge():
+    async def stream(records):
+        for r in records:
+            yield r
+
+    async def collect():
+        merged = async_firestore_repository.merge_period_streams([stream(TIMESTAMPS), stream(LEGACY)])
+        return [r.name async for r in merged]
+
+    assert asyncio.run(collect()) == EXPECTED
@@ -0,0 +1,58 @@
+"""勤怠記録の書き込みとチームの在席状況の整合性のテスト"""
+
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from src.repositories.firestore_repository import stage_presence_release
+from src.repositories.memory_repository import InMemoryRepository
+from src.repositories.sqlite_repository import SqliteRepository
+from src.services.attendance_service import AttendanceService
+
+USER_ID = "U1"
+TEAM_ID = "T1"
+
+@pytest.fixture(params=["memory", "sqlite"])
+def repository(request):
+    if request.param == "memory":
+        return InMemoryRepository()
+    return SqliteRepository(":memory:")
+
+def test_closing_shift_with_update_attendance_clears_presence(repository):
+    service = AttendanceService(repository)
+    assert service.punch_in(USER_ID, "alice", TEAM_ID)[0]
+    assert USER_ID in repository.get_team_presence(TEAM_ID)
+
+    attendance = repository.get_active_attendance(USER_ID, TEAM_ID)
+    attendance.end_time = attendance.start_time + timedelta(hours=8)
+    repository.update_attendance(attendance)
+
+    assert USER_ID not in repository.get_team_presence(TEAM_ID)
+
+class RecordingWriter:
+    def __init__(self):
+        self.writes = []
+
+    def set(self, ref, data, merge=False):
+        self.writes.append((ref, data))
+
+class FakeCollection:
+    def document(self, doc_id):
+        return doc_id
+
+def pointer_to(attendance_id):
+    return SimpleNamespace(exists=True, get=lambda field: attendance_id)
+
+@pytest.mark.parametrize("pointer, released", [
+    (SimpleNamespace(exists=False), True),
+    (pointer_to("A1"), True),
+    (pointer_to("A2"), False),
+])
+def test_presence_release_keeps_entry_of_other_open_shift(pointer, released):
+    writer = RecordingWriter()
+    attendance = SimpleNamespace(doc_id="A1", user_id=USER_ID, team_id=TEAM_ID, end_time=object())
+
+    stage_presence_release(writer, FakeCollection(), pointer, attendance, shards=4)
+
+    assert bool(writer.writes) == released
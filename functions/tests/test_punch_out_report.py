@@ -0,0 +1,199 @@
+"""業務報告付きの退勤が1回の書き込みで保存されることのテスト"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src.repositories import firestore_repository, memory_repository
+from src.repositories.firestore_repository import FirestoreRepository
+from src.repositories.memory_repository import InMemoryRepository
+from src.services.attendance_service import AttendanceService
+from src.slack.commands.attendance_commands import AttendanceCommands
+from src.utils.time_utils import get_current_time
+
+USER_ID = "U1"
+TEAM_ID = "T1"
+
+class FakeSlackApp:
+    """登録されたリスナーを保持するだけの Bolt App の代わり"""
+
+    def __init__(self):
+        self.views = {}
+        self.client = None
+        self.installation_store = None
+
+    def command(self, name):
+        return lambda handler: None
+
+    def view(self, callback_id):
+        return lambda handler: self.views.setdefault(callback_id, handler)
+
+class FakeSlackClient:
+    def __init__(self):
+        self.messages = []
+
+    def chat_postMessage(self, **kwargs):
+        self.messages.append(kwargs)
+
+def submit_punch_out_modal(app, client, description="資料作成", channel="C1", mentions=("U2", "U3")):
+    view = {
+        "private_metadata": json.dumps({"channel_id": "C0", "team_id": TEAM_ID}),
+        "state": {"values": {
+            "work_description_block": {"work_description_input": {"value": description}},
+            "report_channel_block": {"report_channel_input": {"selected_conversation": channel}},
+            "mention_users_block": {"mention_users_input": {"selected_users": list(mentions)}},
+        }}
+    }
+    body = {"user": {"id": USER_ID, "name": "alice"}}
+    app.views["punch_out_report_modal"](
+        ack=lambda: None, body=body, view=view, client=client, logger=SimpleNamespace(info=print), say=None
+    )
+
+def saved_shift(repository):
+    now = get_current_time()
+    records = repository.get_attendance_by_period(USER_ID, now.replace(hour=0, minute=0), now, TEAM_ID)
+    assert len(records) == 1
+    return records[0]
+
+@pytest.fixture
+def repository():
+    repository = InMemoryRepository()
+    assert AttendanceService(repository).punch_in(USER_ID, "alice", TEAM_ID)[0]
+    return repository
+
+def test_punch_out_modal_submission_is_a_single_write(repository):
+    app, client = FakeSlackApp(), FakeSlackClient()
+    AttendanceCommands(app, AttendanceService(repository))
+    writes_before = repository.write_count
+
+    submit_punch_out_modal(app, client)
+
+    assert repository.write_count == writes_before + 1
+    shift = saved_shift(repository)
+    assert shift.end_time is not None
+    assert shift.report_channel_id == "C1"
+    assert shift.mention_user_ids == ["U2", "U3"]
+    assert repository.get_work_descriptions([shift.doc_id]) == {shift.doc_id: "資料作成"}
+    assert [message["channel"] for message in client.messages] == ["C1", "C0"]
+
+def test_failed_punch_out_saves_no_report_fields(repository, monkeypatch):
+    app, client = FakeSlackApp(), FakeSlackClient()
+    AttendanceCommands(app, AttendanceService(repository))
+    writes_before = repository.write_count
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("write failed")
+
+    # 退勤の書き込みに含まれるロールアップの更新で失敗させる
+    monkeypatch.setattr(memory_repository, "apply_shift", fail)
+    with pytest.raises(RuntimeError):
+        submit_punch_out_modal(app, client)
+
+    assert repository.write_count == writes_before
+    shift = saved_shift(repository)
+    assert shift.end_time is None
+    assert shift.report_channel_id is None
+    assert not shift.mention_user_ids
+    assert repository.get_work_descriptions([shift.doc_id]) == {}
+    assert repository.get_active_attendance(USER_ID, TEAM_ID).doc_id == shift.doc_id
+
+class FakeSnapshot:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+        self.exists = data is not None
+
+    def get(self, field):
+        return self._data[field]
+
+    def to_dict(self):
+        return dict(self._data) if self._data is not None else None
+
+class FakeDocument:
+    def __init__(self, db, collection, doc_id):
+        self.db, self.collection, self.id = db, collection, doc_id
+        self.path = (collection, doc_id)
+
+    def get(self, transaction=None):
+        return FakeSnapshot(self.id, self.db.docs.get(self.path))
+
+class FakeCollection:
+    def __init__(self, db, name):
+        self.db, self.name = db, name
+
+    def document(self, doc_id=None):
+        return FakeDocument(self.db, self.name, doc_id or "generated")
+
+class FakeTransaction:
+    """書き込みを記録し、commit で1回の書き込みとして反映する"""
+
+    def __init__(self, db):
+        self.db = db
+        self.writes = []
+
+    def set(self, ref, data, merge=False):
+        self.writes.append(("set", ref.path, data))
+
+    def update(self, ref, data):
+        self.writes.append(("update", ref.path, data))
+
+    def delete(self, ref):
+        self.writes.append(("delete", ref.path, None))
+
+    def commit(self):
+        self.db.commits.append(self.writes)
+
+class FakeFirestore:
+    def __init__(self):
+        self.docs = {}
+        self.commits = []
+
+    def collection(self, name):
+        return FakeCollection(self, name)
+
+    def transaction(self):
+        return FakeTransaction(self)
+
+def fake_transactional(func):
+    def run(transaction):
+        result = func(transaction)
+        transaction.commit()
+        return result
+    return run
+
+def test_firestore_punch_out_with_report_commits_one_transaction(monkeypatch):
+    monkeypatch.setattr(firestore_repository.firestore, "transactional", fake_transactional)
+    db = FakeFirestore()
+    repository = FirestoreRepository.__new__(FirestoreRepository)
+    repository.db = db
+    repository.rollups_complete_since = None
+    repository.presence_shards = 4
+    for attribute, name in [
+        ("attendance_collection", "attendance"),
+        ("active_attendance_collection", "active_attendance"),
+        ("closed_month_collection", "closed_month_summaries"),
+        ("rollup_collection", "attendance_rollups"),
+        ("presence_collection", "team_presence"),
+        ("report_collection", "attendance_reports"),
+    ]:
+        setattr(repository, attribute, db.collection(name))
+
+    # 出勤中の記録とポインターを用意する
+    db.docs[("attendance", "A1")] = {
+        "user_id": USER_ID, "user_name": "alice", "team_id": TEAM_ID,
+        "start_time": get_current_time(), "end_time": None, "break_periods": []
+    }
+    db.docs[("active_attendance", f"{TEAM_ID}-{USER_ID}")] = {"attendance_id": "A1"}
+
+    success, _, _ = AttendanceService(repository).punch_out_with_report(USER_ID, TEAM_ID, "資料作成", "C1", ["U2"])
+
+    assert success
+    assert len(db.commits) == 1
+    writes = {(kind, path): data for kind, path, data in db.commits[0]}
+    attendance_update = writes[("update", ("attendance", "A1"))]
+    assert attendance_update["end_time"] is not None
+    assert attendance_update["report_channel_id"] == "C1"
+    assert attendance_update["mention_user_ids"] == ["U2"]
+    assert writes[("set", ("attendance_reports", "A1"))]["work_description"] == "資料作成"
+    assert ("delete", ("active_attendance", f"{TEAM_ID}-{USER_ID}")) in writes
@@ -0,0 +1,33 @@
+"""Firestore以外の storage.backend での構成要素の組み立てのテスト"""
+
+import pytest
+from slack_sdk.oauth.installation_store import FileInstallationStore
+from slack_sdk.oauth.installation_store.sqlite3 import SQLite3InstallationStore
+
+from src.config import build_config
+from src.repositories.memory_repository import InMemoryRepository
+from src.repositories.sqlite_repository import SqliteRepository
+from src.slack import registry
+
+def make_config(storage):
+    return build_config({
+        "slack": {"client_id": "111.222", "client_secret": "client-secret", "signing_secret": "signing-secret"},
+        # 存在しない認証情報ファイル（Firestoreに接続しようとすると失敗する）
+        "firebase": {"project_id": "test-project", "credentials_path": "config/missing-credentials.json"},
+        "application": {"timezone": "Asia/Tokyo"},
+        "storage": storage
+    })
+
+@pytest.mark.parametrize("backend, repository_class, store_class", [
+    ("memory", InMemoryRepository, FileInstallationStore),
+    ("sqlite", SqliteRepository, SQLite3InstallationStore),
+])
+def test_build_components_without_firestore(monkeypatch, tmp_path, backend, repository_class, store_class):
+    config = make_config({"backend": backend, "sqlite_path": str(tmp_path / "attendance.sqlite3")})
+    monkeypatch.setattr(registry, "get_config", lambda: config)
+
+    components = registry.build_components()
+
+    assert isinstance(components.repository, repository_class)
+    assert isinstance(components.app.installation_store, store_class)
+    assert components.app.oauth_flow.settings.state_store is not None
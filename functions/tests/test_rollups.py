@@ -0,0 +1,82 @@
+"""ロールアップから作る月次サマリー・勤怠統計のテスト"""
+
+from datetime import timedelta
+
+import pytest
+
+from src.models.attendance import Attendance, BreakPeriod
+from src.repositories.memory_repository import InMemoryRepository
+from src.repositories.sqlite_repository import SqliteRepository
+from src.services.monthly_summary_service import MonthlySummaryService, summarize_attendance
+from src.utils.time_utils import get_end_of_month, get_start_of_month
+
+USER_ID = "U1"
+TEAM_ID = "T1"
+YEAR, MONTH = 2024, 5
+
+@pytest.fixture(params=["memory", "sqlite"])
+def repository(request):
+    if request.param == "memory":
+        return InMemoryRepository(rollups_complete_since="2000-01")
+    return SqliteRepository(":memory:", rollups_complete_since="2000-01")
+
+def create_shift(repository, day: int, description=None) -> Attendance:
+    start = get_start_of_month(YEAR, MONTH) + timedelta(days=day - 1, hours=9)
+    attendance = Attendance(
+        user_id=USER_ID,
+        user_name="alice",
+        team_id=TEAM_ID,
+        start_time=start,
+        end_time=start + timedelta(hours=9),
+        break_periods=[BreakPeriod(start + timedelta(hours=3), start + timedelta(hours=4))],
+        work_description=description
+    )
+    repository.create_attendance(attendance)
+    return attendance
+
+def test_rollup_keeps_only_timing_fields(repository):
+    create_shift(repository, 1, "設計レビュー" * 100)
+
+    rollup = repository.get_complete_rollup(USER_ID, YEAR, MONTH, TEAM_ID)
+
+    assert rollup is not None
+    assert all("work_description" not in entry for entry in rollup["shifts"].values())
+
+def test_summary_from_rollup_joins_work_descriptions(repository):
+    create_shift(repository, 1, "設計")
+    create_shift(repository, 1)
+    create_shift(repository, 2, "実装")
+    service = MonthlySummaryService(repository, persist_closed_months=False)
+
+    summary = service._build_monthly_summary(USER_ID, YEAR, MONTH, TEAM_ID, include_descriptions=True)
+    expected = summarize_attendance(
+        repository.iter_attendance_by_period(USER_ID, get_start_of_month(YEAR, MONTH), get_end_of_month(YEAR, MONTH), TEAM_ID),
+        YEAR,
+        MONTH
+    )
+
+    assert summary == expected
+    assert [record["work_description"] for record in summary["daily_records"].values()] == [["設計"], ["実装"]]
+
+def test_summary_without_descriptions_reads_only_the_rollup(repository, monkeypatch):
+    create_shift(repository, 1, "設計")
+    create_shift(repository, 2, "実装")
+    service = MonthlySummaryService(repository, persist_closed_months=False)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("summary must not read attendance records or reports")
+
+    monkeypatch.setattr(repository, "get_work_descriptions", fail)
+    monkeypatch.setattr(repository, "iter_attendance_by_period", fail)
+    summary = service._build_monthly_summary(USER_ID, YEAR, MONTH, TEAM_ID)
+
+    assert summary["total_working_time"] == 2 * 8 * 60
+    assert all(record["work_description"] == [] for record in summary["daily_records"].values())
+
+def test_get_work_descriptions_skips_records_without_description(repository):
+    with_text = create_shift(repository, 1, "設計")
+    without_text = create_shift(repository, 2)
+
+    descriptions = repository.get_work_descriptions([with_text.doc_id, without_text.doc_id, "missing"])
+
+    assert descriptions == {with_text.doc_id: "設計"}
@@ -0,0 +1,47 @@
+"""全従業員のサマリー（/teamsummary）の権限確認・メッセージ作成のテスト"""
+
+import pytest
+
+from src.slack.message_builder import MessageBuilder
+from src.slack.permissions import is_workspace_admin
+
+class FakeClient:
+    def __init__(self, user=None, error=None):
+        self.user = user
+        self.error = error
+
+    def users_info(self, user):
+        if self.error:
+            raise self.error
+        return {"user": self.user}
+
+@pytest.mark.parametrize("user, expected", [
+    ({"id": "U1", "is_admin": True}, True),
+    ({"id": "U1", "is_owner": True}, True),
+    ({"id": "U1", "is_admin": False, "is_owner": False}, False),
+    ({"id": "U1"}, False),
+])
+def test_is_workspace_admin(user, expected):
+    assert is_workspace_admin(FakeClient(user=user), "U1") is expected
+
+def test_is_workspace_admin_rejects_when_users_info_fails():
+    assert is_workspace_admin(FakeClient(error=RuntimeError("missing_scope")), "U1") is False
+
+def test_team_summary_member_lines_are_split_into_sections():
+    members = [
+        {"user_name": f"user{i}", "summary": {"total_working_time": 480}}
+        for i in range(MessageBuilder.TEAM_SUMMARY_MEMBER_LIMIT)
+    ]
+    blocks = MessageBuilder.create_team_summary_message({
+        "year": 2024,
+        "month": 5,
+        "members": members,
+        "total_working_time": 480 * len(members),
+    })
+
+    member_sections = [
+        block["text"]["text"] for block in blocks
+        if block["type"] == "section" and "text" in block and block["text"]["text"].startswith("•")
+    ]
+    assert [len(text.splitlines()) for text in member_sections] == [20, 20, 10]
+    assert all(len(text) <= 3000 for text in member_sections)
@@ -0,0 +1,89 @@
+"""ディープウォームアップの認可と実行間隔のテスト"""
+
+import json
+import sys
+import types
+
+import pytest
+from werkzeug.test import EnvironBuilder
+from flask import Request
+
+from src import deep_warmup
+from src.slack.routes import dispatch_fast_path
+
+SECRET = "warmup-secret"
+
+def make_request(**headers) -> Request:
+    base = {"X-Warmup-Request": "true", "X-Warmup-Mode": "deep"}
+    base.update(headers)
+    return Request(EnvironBuilder(path="/warmup", method="GET", headers=base).get_environ())
+
+@pytest.fixture
+def deep_runs(monkeypatch):
+    """run_deep_warmup の呼び出しを記録する"""
+    runs = []
+
+    def run_deep_warmup():
+        runs.append(True)
+        return {"status": "ok", "phases": []}
+
+    monkeypatch.setattr(deep_warmup, "run_deep_warmup", run_deep_warmup)
+    return runs
+
+@pytest.mark.parametrize("headers", [{}, {"X-Warmup-Token": "wrong"}])
+def test_deep_warmup_requires_matching_token(monkeypatch, deep_runs, headers):
+    monkeypatch.setenv("WARMUP_SECRET", SECRET)
+
+    response = dispatch_fast_path(make_request(**headers))
+
+    assert response.status_code == 200
+    assert json.loads(response.get_data()) == {"status": "ok", "message": "Warmup successful"}
+    assert deep_runs == []
+
+def test_deep_warmup_disabled_without_secret(monkeypatch, deep_runs):
+    monkeypatch.delenv("WARMUP_SECRET", raising=False)
+
+    dispatch_fast_path(make_request(**{"X-Warmup-Token": ""}))
+
+    assert deep_runs == []
+
+def test_deep_warmup_runs_with_matching_token(monkeypatch, deep_runs):
+    monkeypatch.setenv("WARMUP_SECRET", SECRET)
+
+    response = dispatch_fast_path(make_request(**{"X-Warmup-Token": SECRET}))
+
+    assert response.status_code == 200
+    assert json.loads(response.get_data())["phases"] == []
+    assert deep_runs == [True]
+
+class FakeRegistry:
+    def __init__(self):
+        self.builds = 0
+
+    def is_ready(self) -> bool:
+        return self.builds > 0
+
+    def get(self):
+        self.builds += 1
+        return types.SimpleNamespace(app=types.SimpleNamespace(installation_store=None))
+
+def test_deep_warmup_skipped_when_recently_primed(monkeypatch):
+    registry = FakeRegistry()
+    monkeypatch.setitem(sys.modules, "src.slack.registry", types.SimpleNamespace(get_app_registry=lambda: registry))
+    monkeypatch.setitem(sys.modules, "src.repositories.firestore_client", types.SimpleNamespace(
+        get_firestore_client_factory=lambda: types.SimpleNamespace(warm_up=lambda: {})
+    ))
+    monkeypatch.setattr(deep_warmup, "get_config", lambda: None)
+    monkeypatch.setattr(deep_warmup, "_last_deep_warmup", None)
+
+    first = deep_warmup.run_deep_warmup()
+    second = deep_warmup.run_deep_warmup()
+
+    assert first["status"] == "ok" and "skipped" not in first
+    assert second["skipped"] is True
+    assert registry.builds == 1
+
+    # 間隔を過ぎれば再実行する
+    monkeypatch.setattr(deep_warmup, "_last_deep_warmup", deep_warmup._last_deep_warmup - deep_warmup.DEEP_WARMUP_MIN_INTERVAL_SECONDS)
+    assert "skipped" not in deep_warmup.run_deep_warmup()
+    assert registry.builds == 2